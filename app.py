@@ -3,12 +3,20 @@ FastAPI backend for RAG-based NCD Chatbot.
 Provides REST API endpoints for chat functionality.
 """
 
-from fastapi import FastAPI, HTTPException
+from fastapi import Depends, FastAPI, File, Header, HTTPException, Response, UploadFile, WebSocket
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from pydantic import BaseModel
-from typing import List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List, Optional
+import functools
+import shutil
+import signal
 import sys
 import os
+import threading
+import time
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -17,7 +25,26 @@ load_dotenv()
 # Add parent directory to path to import src modules
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+# LOW_MEMORY=1 lowers the cache and thread defaults below, so it is applied
+# before any of them are read
+from src.memory_report import (
+    apply_low_memory_settings,
+    low_memory_enabled,
+    memory_report,
+    release_memory,
+    start_tracing,
+)
+
+apply_low_memory_settings()
+if os.getenv("MEMORY_TRACE", "0") == "1":
+    start_tracing()
+
 from src.chatbot import NCDChatbot
+from src.ingestion_jobs import IngestionJobManager
+from src.request_profiler import SlowRequestProfiler, merge_collapsed, request_stage
+from src.sessions import SessionStore
+from src.startup_profiler import profiler
+from src.ws_chat import ChatConnection
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -36,26 +63,132 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress large responses (long answers, full source texts)
+app.add_middleware(GZipMiddleware, minimum_size=int(os.getenv("GZIP_MIN_SIZE", "1000")))
+
+# Opt-in profiling: /chat requests slower than SLOW_REQUEST_MS are kept with
+# their stage timings and stack samples (GET /admin/slow-requests)
+slow_request_ms = os.getenv("SLOW_REQUEST_MS")
+request_profiler = SlowRequestProfiler(
+    threshold_ms=float(slow_request_ms) if slow_request_ms else None,
+    sample_interval_ms=float(os.getenv("SLOW_REQUEST_SAMPLE_MS", "10")),
+    capacity=int(os.getenv("SLOW_REQUEST_CAPTURES", "50"))
+)
+
 # Initialize chatbot instance (singleton)
 chatbot_instance = None
+# get_chatbot runs on HTTP and /ws/chat worker threads; only one may load the model and index
+_chatbot_init_lock = threading.Lock()
+
+# Conversation sessions: bounded count, idle expiry and history token cap
+session_store = SessionStore(
+    max_sessions=int(os.getenv("SESSION_MAX_COUNT", "1000")),
+    ttl_seconds=float(os.getenv("SESSION_TTL_SECONDS", "1800")),
+    max_history_tokens=int(os.getenv("SESSION_HISTORY_TOKENS", "800"))
+)
+
+# Uploaded documents are parsed and embedded in the background
+DATA_DIR = os.getenv("DATA_DIR", "data")
+ingestion_jobs = IngestionJobManager(
+    max_workers=int(os.getenv("INGEST_WORKERS", "1")),
+    batch_size=int(os.getenv("INGEST_BATCH_SIZE", "64")),
+    max_jobs=int(os.getenv("INGEST_MAX_JOBS", "100"))
+)
+
+# /ws/chat answers on its own threads so long streams can't take over the
+# threadpool used by the HTTP endpoints
+WS_STREAM_WORKERS = int(os.getenv("WS_STREAM_WORKERS", "16"))
+ws_stream_executor = ThreadPoolExecutor(max_workers=WS_STREAM_WORKERS, thread_name_prefix="ws-chat")
+# Questions in flight across all connections; more are refused rather than
+# queued behind streams that hold every worker thread
+ws_in_flight = threading.BoundedSemaphore(int(os.getenv("WS_MAX_IN_FLIGHT", str(WS_STREAM_WORKERS))))
+
+# Snapshot following: every worker re-reads the CURRENT pointer at most this
+# often and hot-swaps in the background when it changes (SIGHUP forces a check)
+SNAPSHOT_CHECK_INTERVAL = float(os.getenv("SNAPSHOT_CHECK_INTERVAL", "5"))
+_snapshot_state = {"checked_at": 0.0, "force": False}
+_snapshot_reload_lock = threading.Lock()
+
+
+def _reload_in_background(chatbot, version: str):
+    """Load a snapshot off the request path, then swap it in."""
+    try:
+        chatbot.reload(version)
+    except Exception as e:
+        print(f"Snapshot reload to {version} failed: {str(e)}")
+    finally:
+        _snapshot_reload_lock.release()
+
+
+def follow_snapshots(chatbot):
+    """Start a background reload if the active snapshot changed."""
+    if chatbot.snapshots is None:
+        return
+    
+    now = time.monotonic()
+    if not _snapshot_state["force"] and now - _snapshot_state["checked_at"] < SNAPSHOT_CHECK_INTERVAL:
+        return
+    _snapshot_state["checked_at"] = now
+    _snapshot_state["force"] = False
+    
+    version = chatbot.snapshots.current_version()
+    if version and version != chatbot.index_version and _snapshot_reload_lock.acquire(blocking=False):
+        threading.Thread(
+            target=_reload_in_background,
+            args=(chatbot, version),
+            daemon=True
+        ).start()
+
+
+def _handle_sighup(signum, frame):
+    """Force a snapshot check on the next request."""
+    _snapshot_state["force"] = True
+
+
+if hasattr(signal, "SIGHUP"):
+    try:
+        signal.signal(signal.SIGHUP, _handle_sighup)
+    except ValueError:
+        # Not in the main thread (e.g. imported by a test runner thread)
+        pass
+
+
+def require_admin(x_admin_token: Optional[str] = Header(default=None)):
+    """Protect admin endpoints with the ADMIN_TOKEN environment variable."""
+    admin_token = os.getenv("ADMIN_TOKEN")
+    if not admin_token:
+        raise HTTPException(
+            status_code=403,
+            detail="Admin API disabled. Set ADMIN_TOKEN to enable it."
+        )
+    if x_admin_token != admin_token:
+        raise HTTPException(status_code=401, detail="Invalid admin token")
 
 
 def get_chatbot():
     """Get or create chatbot instance."""
     global chatbot_instance
-    if chatbot_instance is None:
-        try:
-            chatbot_instance = NCDChatbot()
-        except FileNotFoundError as e:
-            raise HTTPException(
-                status_code=503,
-                detail="Vector store not initialized. Please run setup first."
-            )
-        except Exception as e:
-            raise HTTPException(
-                status_code=500,
-                detail=f"Failed to initialize chatbot: {str(e)}"
-            )
+    if chatbot_instance is not None:
+        follow_snapshots(chatbot_instance)
+        return chatbot_instance
+    with _chatbot_init_lock:
+        if chatbot_instance is None:
+            try:
+                chatbot = NCDChatbot()
+                if low_memory_enabled():
+                    # Give back the temporary buffers used while loading the model
+                    release_memory()
+                chatbot_instance = chatbot
+            except FileNotFoundError as e:
+                raise HTTPException(
+                    status_code=503,
+                    detail="Vector store not initialized. Please run setup first."
+                )
+            except Exception as e:
+                raise HTTPException(
+                    status_code=500,
+                    detail=f"Failed to initialize chatbot: {str(e)}"
+                )
     return chatbot_instance
 
 
@@ -64,11 +197,25 @@ class ChatRequest(BaseModel):
     """Chat request model."""
     question: str
     return_sources: bool = False
+    session_id: Optional[str] = None
+    start_session: bool = False
+    # Named collection under COLLECTIONS_ROOT; omit for the default index
+    collection: Optional[str] = None
 
 
 class SourceDocument(BaseModel):
-    """Source document metadata."""
+    """Source document metadata (fetch the text from /sources/{chunk_id})."""
+    source: str
+    chunk_id: Optional[str] = None
+    page: Optional[int] = None
+    content: Optional[str] = None
+
+
+class SourceChunk(BaseModel):
+    """Full text of one source chunk."""
+    chunk_id: str
     source: str
+    page: Optional[int] = None
     content: str
 
 
@@ -76,6 +223,22 @@ class ChatResponse(BaseModel):
     """Chat response model."""
     answer: str
     sources: Optional[List[SourceDocument]] = None
+    session_id: Optional[str] = None
+    # True when the LLM was unavailable and the answer was extracted from the sources
+    degraded: bool = False
+
+
+class JobResponse(BaseModel):
+    """Ingestion job status."""
+    job_id: str
+    filename: str
+    status: str
+    chunks_total: int = 0
+    chunks_done: int = 0
+    index_version: Optional[str] = None
+    error: Optional[str] = None
+    created_at: float
+    finished_at: Optional[float] = None
 
 
 class HealthResponse(BaseModel):
@@ -84,6 +247,19 @@ class HealthResponse(BaseModel):
     message: str
 
 
+class ReloadRequest(BaseModel):
+    """Snapshot reload request."""
+    version: Optional[str] = None
+
+
+class SnapshotResponse(BaseModel):
+    """Snapshot status response."""
+    loaded: Optional[str] = None
+    current: Optional[str] = None
+    previous: Optional[str] = None
+    versions: List[str] = []
+
+
 # API Endpoints
 @app.get("/", response_model=HealthResponse)
 async def root():
@@ -111,11 +287,28 @@ async def health_check():
         }
 
 
+def check_collection(chatbot: NCDChatbot, collection: Optional[str]) -> None:
+    """Reject requests for a collection that is not available."""
+    if collection is None:
+        return
+    if chatbot.collections is None:
+        raise HTTPException(status_code=400, detail="Collections are not enabled")
+    if not chatbot.collections.exists(collection):
+        raise HTTPException(status_code=404, detail=f"Unknown collection '{collection}'")
+
+
 @app.post("/chat", response_model=ChatResponse)
-async def chat(request: ChatRequest):
+def chat(request: ChatRequest):
     """
     Chat endpoint - send a question and get an answer.
     
+    Send start_session=true to begin a conversation, then pass the returned
+    session_id with follow-up questions. An expired session_id silently
+    starts a new session, so always use the session_id from the response.
+    
+    A plain def, so FastAPI runs it in its thread pool: the LLM call would
+    otherwise block uploads, job polling and WebSocket streams.
+    
     Args:
         request: ChatRequest with question and optional return_sources flag
         
@@ -129,17 +322,30 @@ async def chat(request: ChatRequest):
         )
     
     try:
-        chatbot = get_chatbot()
-        response = chatbot.ask(
-            question=request.question,
-            return_sources=request.return_sources
-        )
+        with request_profiler.capture("POST /chat", detail=request.question[:200]):
+            with request_stage("load chatbot"):
+                chatbot = get_chatbot()
+            check_collection(chatbot, request.collection)
+            session = None
+            if request.session_id or request.start_session:
+                session = session_store.get_or_create(request.session_id)
+            
+            response = chatbot.ask(
+                question=request.question,
+                return_sources=request.return_sources,
+                session=session,
+                collection=request.collection
+            )
         
         return ChatResponse(
             answer=response["answer"],
-            sources=response.get("sources")
+            sources=response.get("sources"),
+            session_id=session.session_id if session else None,
+            degraded=response.get("degraded", False)
         )
     
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -148,12 +354,292 @@ async def chat(request: ChatRequest):
 
 
 @app.post("/chat/stream")
-async def chat_stream(request: ChatRequest):
+def chat_stream(request: ChatRequest):
+    """
+    Same as /chat, kept for existing clients.
+    Use the /ws/chat WebSocket to receive answers as they are generated.
     """
-    Streaming chat endpoint (for future WebSocket implementation).
-    Currently returns same as /chat endpoint.
+    return chat(request)
+
+
+def _open_ws_stream(message: dict) -> Iterator[dict]:
+    """Start streaming the answer to one /ws/chat question (worker thread)."""
+    chatbot = get_chatbot()
+    collection = message.get("collection")
+    check_collection(chatbot, collection)
+    session = None
+    if message.get("session_id") or message.get("start_session"):
+        session = session_store.get_or_create(message.get("session_id"))
+    return chatbot.stream(message["question"], session=session, collection=collection)
+
+
+@app.websocket("/ws/chat")
+async def ws_chat(websocket: WebSocket):
+    """
+    Chat over one long-lived WebSocket.
+    
+    Send {"type": "ask", "id": "q1", "question": "..."} (optionally with
+    session_id, start_session and collection, as for /chat) and receive
+    "token" events, then "sources" and "done", all tagged with "id".
+    Several questions can run at once, up to WS_MAX_QUESTIONS per
+    connection and WS_MAX_IN_FLIGHT in total; send {"type": "cancel",
+    "id": "q1"} to stop one. A client that reads nothing for
+    WS_SEND_TIMEOUT seconds is disconnected.
+    """
+    await websocket.accept()
+    connection = ChatConnection(
+        websocket,
+        open_stream=_open_ws_stream,
+        executor=ws_stream_executor,
+        max_questions=int(os.getenv("WS_MAX_QUESTIONS", "4")),
+        send_queue_size=int(os.getenv("WS_SEND_QUEUE", "256")),
+        send_timeout=float(os.getenv("WS_SEND_TIMEOUT", "30")),
+        in_flight=ws_in_flight
+    )
+    await connection.run()
+
+
+@functools.lru_cache(maxsize=int(os.getenv("SOURCE_CACHE_SIZE", "512")))
+def _load_source(chunk_id: str) -> dict:
+    """Fetch a chunk's text; cached because chunk IDs are content-addressed."""
+    source = get_chatbot().get_source(chunk_id)
+    if source is None:
+        # Raising keeps misses out of the cache
+        raise KeyError(chunk_id)
+    return source
+
+
+@app.get("/sources/{chunk_id}", response_model=SourceChunk)
+async def get_source(chunk_id: str, response: Response):
     """
-    return await chat(request)
+    Full text of a source chunk referenced by an answer.
+    
+    Clients can load citations only when the user opens them.
+    """
+    try:
+        source = _load_source(chunk_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Source chunk not found")
+    
+    response.headers["Cache-Control"] = "public, max-age=86400, immutable"
+    return source
+
+
+@app.delete("/sessions/{session_id}", status_code=204)
+async def end_session(session_id: str):
+    """End a conversation session and free its history."""
+    if not session_store.delete(session_id):
+        raise HTTPException(status_code=404, detail="Session not found")
+
+
+@app.post("/documents", response_model=JobResponse, status_code=202, dependencies=[Depends(require_admin)])
+async def upload_document(file: UploadFile = File(...)):
+    """
+    Upload a PDF or TXT document and index it in the background.
+    
+    Poll GET /jobs/{job_id} for progress; chat requests keep being served
+    from the current index until the job finishes.
+    """
+    filename = os.path.basename(file.filename or "")
+    if not filename.endswith((".pdf", ".txt")):
+        raise HTTPException(status_code=400, detail="Only .pdf and .txt files are supported")
+    
+    file_path = os.path.join(DATA_DIR, filename)
+    chatbot = get_chatbot()
+    
+    def save_upload():
+        os.makedirs(DATA_DIR, exist_ok=True)
+        # Exclusive create: of two concurrent uploads of a name, one gets 409
+        with open(file_path, "xb") as f:
+            try:
+                shutil.copyfileobj(file.file, f)
+            except BaseException:
+                os.remove(file_path)
+                raise
+    
+    try:
+        await run_in_threadpool(save_upload)
+    except FileExistsError:
+        raise HTTPException(status_code=409, detail=f"'{filename}' already exists")
+    return ingestion_jobs.submit(file_path, chatbot, remove_on_failure=True).to_dict()
+
+
+@app.get("/jobs/{job_id}", response_model=JobResponse, dependencies=[Depends(require_admin)])
+async def get_job(job_id: str):
+    """Progress of a document ingestion job."""
+    job = ingestion_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
+
+@app.get("/admin/startup", dependencies=[Depends(require_admin)])
+async def startup_report():
+    """Cold-start timings: deferred imports and model/index load stages."""
+    report = profiler.report()
+    report["chatbot_loaded"] = chatbot_instance is not None
+    return report
+
+
+@app.get("/admin/slow-requests", dependencies=[Depends(require_admin)])
+async def slow_requests(format: str = "json", limit: int = 20):
+    """
+    Recent /chat requests slower than SLOW_REQUEST_MS, newest first.
+    
+    format=json returns each request's stage timings and stack samples;
+    format=collapsed merges the samples into collapsed-stack text for
+    flamegraph.pl or speedscope.
+    """
+    if format not in ("json", "collapsed"):
+        raise HTTPException(status_code=400, detail="format must be 'json' or 'collapsed'")
+    captures = request_profiler.captures(limit)
+    if format == "collapsed":
+        return Response(merge_collapsed(captures), media_type="text/plain")
+    return {**request_profiler.stats(), "captures": captures}
+
+
+@app.get("/admin/index", dependencies=[Depends(require_admin)])
+async def index_stats():
+    """Chunk count, chunks per source, on-disk size and settings of the served index."""
+    return get_chatbot().vs_manager.index_stats()
+
+
+@app.get("/admin/llm", dependencies=[Depends(require_admin)])
+async def llm_circuit_stats():
+    """
+    State of the LLM circuit breaker, with failed and short-circuited call
+    counts, and the HTTP connection pool (connections opened vs reused).
+    """
+    chatbot = get_chatbot()
+    http = chatbot.llm_http.stats() if chatbot.llm_http else None
+    return {**chatbot.llm_breaker.stats(), "http_pool": http}
+
+
+@app.get("/admin/memory", dependencies=[Depends(require_admin)])
+async def memory_stats(top: int = 10):
+    """
+    Resident memory by component (embedding model, index, Python heap by
+    package) and the fill level of every in-process cache.
+    
+    The heap breakdown needs MEMORY_TRACE=1.
+    """
+    source_cache = _load_source.cache_info()
+    profiler_stats = request_profiler.stats()
+    caches = {
+        "sessions": {"entries": len(session_store), "max": session_store.max_sessions},
+        "sources": {"entries": source_cache.currsize, "max": source_cache.maxsize},
+        "slow_requests": {"entries": profiler_stats["buffered"], "max": profiler_stats["capacity"]},
+        "ingestion_jobs": {"entries": len(ingestion_jobs), "max": ingestion_jobs.max_jobs},
+        "startup_timings": {"entries": len(profiler), "max": profiler.max_records},
+    }
+    chatbot = get_chatbot()
+    # numpy and mmap indexes cache the rows matching each topic filter
+    filter_cache_stats = getattr(chatbot.vs_manager.vector_store, "filter_cache_stats", None)
+    if filter_cache_stats is not None:
+        caches["filter_rows"] = filter_cache_stats()
+    if chatbot.collections is not None:
+        caches["collections"] = {
+            "entries": len(chatbot.collections.stats()["loaded"]),
+            "max": chatbot.collections.max_loaded,
+        }
+    return await run_in_threadpool(memory_report, chatbot, caches, top)
+
+
+@app.get("/admin/collections", dependencies=[Depends(require_admin)])
+async def collection_stats():
+    """Collections on disk, the ones loaded now and their estimated memory."""
+    collections = get_chatbot().collections
+    if collections is None:
+        raise HTTPException(status_code=409, detail="Collections are not enabled. Set COLLECTIONS_ROOT first.")
+    return collections.stats()
+
+
+@app.delete("/admin/collections/{name}", status_code=204, dependencies=[Depends(require_admin)])
+async def unload_collection(name: str):
+    """Unload a collection now; it is loaded again by the next request for it."""
+    collections = get_chatbot().collections
+    if collections is None or not collections.evict(name):
+        raise HTTPException(status_code=404, detail="Collection not loaded")
+
+
+@app.get("/admin/intent-gate", dependencies=[Depends(require_admin)])
+async def intent_gate_stats():
+    """Questions answered from templates and the LLM calls that saved."""
+    return get_chatbot().intent_gate.stats()
+
+
+@app.get("/admin/faq", dependencies=[Depends(require_admin)])
+async def faq_stats():
+    """Precomputed FAQ answers served instead of running the pipeline."""
+    faq_store = get_chatbot().faq_store
+    if faq_store is None:
+        raise HTTPException(status_code=409, detail="No FAQ store loaded. Set FAQ_STORE first.")
+    return faq_store.stats()
+
+
+def _snapshot_status(chatbot) -> SnapshotResponse:
+    """Describe the loaded and available snapshots."""
+    if chatbot.snapshots is None:
+        raise HTTPException(
+            status_code=409,
+            detail="Snapshots are not enabled. Set INDEX_SNAPSHOT_ROOT first."
+        )
+    return SnapshotResponse(
+        loaded=chatbot.index_version,
+        current=chatbot.snapshots.current_version(),
+        previous=chatbot.snapshots.previous_version(),
+        versions=chatbot.snapshots.list_versions()
+    )
+
+
+@app.get("/admin/snapshots", response_model=SnapshotResponse, dependencies=[Depends(require_admin)])
+async def list_snapshots():
+    """List index snapshots and the version this worker serves."""
+    return _snapshot_status(get_chatbot())
+
+
+@app.post("/admin/reload", response_model=SnapshotResponse, dependencies=[Depends(require_admin)])
+async def reload_snapshot(request: ReloadRequest = ReloadRequest()):
+    """
+    Hot-swap to a snapshot version (default: the CURRENT one) and make it current.
+    
+    The new index is loaded before the swap, so in-flight requests are not
+    dropped. Other workers follow via the CURRENT pointer. Without a version
+    this worker reloads CURRENT right away; the newest directory is never
+    picked on its own, since it may still be being built.
+    """
+    chatbot = get_chatbot()
+    status = _snapshot_status(chatbot)
+    version = request.version or status.current
+    if not version:
+        raise HTTPException(status_code=404, detail="No current snapshot. Pass a version to load.")
+    if version not in status.versions:
+        raise HTTPException(status_code=404, detail=f"Snapshot '{version}' not found")
+    
+    try:
+        await run_in_threadpool(chatbot.reload, version)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Reload failed: {str(e)}")
+    
+    chatbot.snapshots.activate(version)
+    return _snapshot_status(chatbot)
+
+
+@app.post("/admin/rollback", response_model=SnapshotResponse, dependencies=[Depends(require_admin)])
+async def rollback_snapshot():
+    """Hot-swap back to the previously active snapshot."""
+    chatbot = get_chatbot()
+    previous = _snapshot_status(chatbot).previous
+    if not previous:
+        raise HTTPException(status_code=409, detail="No previous snapshot to roll back to")
+    
+    try:
+        await run_in_threadpool(chatbot.reload, previous)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Rollback failed: {str(e)}")
+    
+    chatbot.snapshots.rollback()
+    return _snapshot_status(chatbot)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,67 @@
+"""
+Per-request overhead of the RetrievalQA chain versus the direct answer engine.
+
+Both engines run against the same in-process NumPy store with cheap fake
+embeddings and an instant fake LLM, so the difference is pure orchestration
+cost (callback managers, PromptTemplate rendering, document copies).
+
+Usage:
+    python -m benchmarks.answer_engine --chunks 3000
+"""
+
+import argparse
+
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+from benchmarks.common import SAMPLE_QUESTIONS, print_table, time_call
+from src.chatbot import NCDChatbot
+from src.numpy_store import NumpyVectorStore
+from src.vector_store import VectorStoreManager
+
+
+def build_chatbot(engine: str, store: NumpyVectorStore) -> NCDChatbot:
+    """Create a chatbot over the shared store with an instant fake LLM."""
+    vs_manager = VectorStoreManager(backend="numpy", embeddings=store.embeddings)
+    vs_manager.vector_store = store
+    llm = FakeListChatModel(responses=["Diabetes is a chronic condition."])
+    return NCDChatbot(answer_engine=engine, llm=llm, vs_manager=vs_manager)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--chunks", type=int, default=3000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    embedding = DeterministicFakeEmbedding(size=384)
+    documents = [
+        Document(page_content=f"Chunk {i} " + "lorem ipsum " * 80,
+                 metadata={"source": f"doc{i % 17}.pdf"})
+        for i in range(args.chunks)
+    ]
+    store = NumpyVectorStore.from_documents(documents, embedding)
+
+    rows = []
+    results = {}
+    for engine in ("chain", "direct"):
+        chatbot = build_chatbot(engine, store)
+
+        def run():
+            for question in SAMPLE_QUESTIONS:
+                chatbot.ask(question, return_sources=True)
+
+        stats = time_call(run, repeat=args.repeat)
+        per_request = stats["mean_ms"] / len(SAMPLE_QUESTIONS)
+        results[engine] = per_request
+        rows.append([engine, per_request, stats["p95_ms"] / len(SAMPLE_QUESTIONS)])
+
+    print(f"\n{args.chunks} chunks, fake embeddings and LLM, {len(SAMPLE_QUESTIONS)} questions per run\n")
+    print_table(["engine", "mean ms/request", "p95 ms/request"], rows)
+    print(f"\nOverhead removed per request: {results['chain'] - results['direct']:.3f} ms "
+          f"({(1 - results['direct'] / results['chain']) * 100:.0f}%)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Index size and embedding time with and without near-duplicate removal.
+
+Splits the documents once, runs the MinHash dedupe pass at each threshold
+and embeds every resulting chunk set with the index's embedding model.
+
+Usage:
+    python -m benchmarks.chunk_dedupe                  # uses data/
+    python -m benchmarks.chunk_dedupe --synthetic 40   # 40 documents sharing boilerplate
+    python -m benchmarks.chunk_dedupe --no-embed       # sizes only, no model needed
+"""
+
+import argparse
+import copy
+import random
+import time
+
+from langchain_core.documents import Document
+
+from benchmarks.common import print_table
+from src.data_ingestion import DataIngestion
+from src.dedupe import ChunkDeduplicator
+
+EMBEDDING_DIM = 384
+
+
+def build_synthetic(count: int, seed: int = 0):
+    """Build documents made of unique text plus paragraphs copied between them."""
+    rng = random.Random(seed)
+    vocabulary = [f"word{i}" for i in range(2000)]
+
+    def paragraph(words: int = 180) -> str:
+        return " ".join(rng.choice(vocabulary) for _ in range(words)) + ".\n\n"
+
+    shared = [paragraph() for _ in range(10)]
+    documents = []
+    for i in range(count):
+        parts = [paragraph() for _ in range(12)] + rng.sample(shared, 3)
+        rng.shuffle(parts)
+        documents.append(Document(page_content="".join(parts), metadata={"source": f"doc{i}.pdf"}))
+    return documents
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--data-dir", default="data")
+    parser.add_argument("--synthetic", type=int, default=0,
+                        help="Benchmark N generated documents instead of --data-dir")
+    parser.add_argument("--thresholds", default="0.5,0.8,0.9")
+    parser.add_argument("--no-embed", action="store_true", help="Skip the embedding timing")
+    args = parser.parse_args()
+
+    ingestion = DataIngestion(data_dir=args.data_dir, dedupe_threshold=0)
+    documents = build_synthetic(args.synthetic) if args.synthetic else ingestion.load_all_documents()
+    chunks = ingestion.split_documents(documents)
+
+    embeddings = None
+    if not args.no_embed:
+        from src.vector_store import VectorStoreManager
+        embeddings = VectorStoreManager(backend="numpy").embeddings
+
+    variants = [("off", chunks, 0.0)]
+    for threshold in (float(t) for t in args.thresholds.split(",")):
+        start = time.perf_counter()
+        kept, _ = ChunkDeduplicator(threshold=threshold).deduplicate(copy.deepcopy(chunks))
+        variants.append((str(threshold), kept, (time.perf_counter() - start) * 1000))
+
+    rows = []
+    for name, variant, dedupe_ms in variants:
+        chars = sum(len(chunk.page_content) for chunk in variant)
+        # Text plus one float32 vector per chunk
+        size_mb = (chars + len(variant) * EMBEDDING_DIM * 4) / 1e6
+        embed_s = "-"
+        if embeddings is not None:
+            start = time.perf_counter()
+            embeddings.embed_documents([chunk.page_content for chunk in variant])
+            embed_s = time.perf_counter() - start
+        rows.append([name, len(variant), chars, size_mb, dedupe_ms, embed_s])
+
+    print(f"\n{len(documents)} documents, {len(chunks)} chunks before dedupe\n")
+    print_table(["threshold", "chunks", "chars", "index MB", "dedupe ms", "embed s"], rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Chunk count, token sizes, embedding time and index size per chunking strategy.
+
+Token counts use the embedding model's tokenizer (estimated when it can't be
+loaded). all-MiniLM-L6-v2 ignores everything after 256 tokens, so the
+"truncated" column counts chunks the model only partly embeds.
+
+Usage:
+    python -m benchmarks.chunking               # uses data/
+    python -m benchmarks.chunking --no-embed    # sizes only, no model needed
+"""
+
+import argparse
+import time
+
+from benchmarks.common import print_table
+from src.chunking import CHUNKING_STRATEGIES, embedding_token_counter
+from src.data_ingestion import DataIngestion
+
+EMBEDDING_DIM = 384
+MODEL_MAX_TOKENS = 256
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--data-dir", default="data")
+    parser.add_argument("--strategies", default=",".join(CHUNKING_STRATEGIES))
+    parser.add_argument("--no-embed", action="store_true", help="Skip the embedding timing")
+    args = parser.parse_args()
+
+    count_tokens = embedding_token_counter()
+    documents = DataIngestion(data_dir=args.data_dir, dedupe_threshold=0).load_all_documents()
+
+    embeddings = None
+    if not args.no_embed:
+        from src.vector_store import VectorStoreManager
+        embeddings = VectorStoreManager(backend="numpy").embeddings
+
+    rows = []
+    for strategy in args.strategies.split(","):
+        # Dedupe off, so the numbers only reflect the splitter
+        ingestion = DataIngestion(data_dir=args.data_dir, dedupe_threshold=0, chunking=strategy)
+        start = time.perf_counter()
+        chunks = ingestion.split_documents(documents)
+        split_ms = (time.perf_counter() - start) * 1000
+
+        tokens = [count_tokens(chunk.page_content) for chunk in chunks]
+        chars = sum(len(chunk.page_content) for chunk in chunks)
+        # Text plus one float32 vector per chunk
+        size_mb = (chars + len(chunks) * EMBEDDING_DIM * 4) / 1e6
+        embed_s = "-"
+        if embeddings is not None:
+            start = time.perf_counter()
+            embeddings.embed_documents([chunk.page_content for chunk in chunks])
+            embed_s = time.perf_counter() - start
+
+        rows.append([
+            strategy,
+            len(chunks),
+            sum(tokens) / len(tokens),
+            max(tokens),
+            sum(t > MODEL_MAX_TOKENS for t in tokens),
+            size_mb,
+            split_ms,
+            embed_s,
+        ])
+
+    print(f"\n{len(documents)} documents\n")
+    print_table(
+        ["strategy", "chunks", "avg tokens", "max tokens", "truncated", "index MB", "split ms", "embed s"],
+        rows
+    )
+
+
+if __name__ == "__main__":
+    main()
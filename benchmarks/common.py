@@ -0,0 +1,74 @@
+"""
+Shared helpers for the benchmark scripts.
+"""
+
+import statistics
+import time
+from typing import Callable, Dict, List, Sequence
+
+# Representative user questions, one or more per disease PDF
+SAMPLE_QUESTIONS = [
+    "What is diabetes?",
+    "What are the symptoms of type 2 diabetes?",
+    "How is high blood pressure treated?",
+    "What causes high cholesterol?",
+    "What are the warning signs of a heart attack?",
+    "How is obesity measured?",
+    "What are the risk factors for lung cancer?",
+    "How is breast cancer diagnosed?",
+    "What are the symptoms of prostate cancer?",
+    "Can colorectal cancer be prevented?",
+    "What is liver cancer?",
+    "How is thyroid cancer treated?",
+    "What are the types of skin cancer?",
+    "What are the symptoms of bladder cancer?",
+    "What are non-communicable diseases?",
+    "How is cancer research done?",
+]
+
+
+def time_call(fn: Callable[[], object], repeat: int = 50, warmup: int = 3) -> Dict[str, float]:
+    """
+    Time a zero-argument callable.
+
+    Args:
+        fn: Callable to time
+        repeat: Number of timed calls
+        warmup: Number of untimed calls made first
+
+    Returns:
+        Dictionary with mean, p50 and p95 latency in milliseconds
+    """
+    for _ in range(warmup):
+        fn()
+
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+
+    samples.sort()
+    return {
+        "mean_ms": statistics.fmean(samples),
+        "p50_ms": samples[len(samples) // 2],
+        "p95_ms": samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+    }
+
+
+def print_table(headers: Sequence[str], rows: List[Sequence[object]]) -> None:
+    """
+    Print rows as an aligned plain-text table.
+
+    Args:
+        headers: Column titles
+        rows: Table rows
+    """
+    cells = [[str(h) for h in headers]] + [
+        [f"{v:.3f}" if isinstance(v, float) else str(v) for v in row] for row in rows
+    ]
+    widths = [max(len(row[i]) for row in cells) for i in range(len(headers))]
+    for n, row in enumerate(cells):
+        print("  ".join(cell.ljust(widths[i]) for i, cell in enumerate(row)))
+        if n == 0:
+            print("  ".join("-" * w for w in widths))
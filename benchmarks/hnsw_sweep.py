@@ -0,0 +1,163 @@
+"""
+Latency versus recall of Chroma's HNSW index for a grid of settings.
+
+Builds one collection per (M, construction_ef) pair and queries it at each
+search_ef. Recall@k is measured against exact brute-force search over the
+same vectors. Chroma reads search_ef when a process first loads the index,
+so every measurement runs in a fresh process.
+
+Usage:
+    python -m benchmarks.hnsw_sweep                          # uses chroma_db
+    python -m benchmarks.hnsw_sweep --synthetic 20000        # clustered random vectors
+    python -m benchmarks.hnsw_sweep --synthetic 20000 --plot hnsw_sweep.png
+"""
+
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from benchmarks.common import SAMPLE_QUESTIONS, print_table
+from src.numpy_store import normalize_rows, top_k_indices
+
+
+def build_synthetic(count: int, dim: int, queries: int = 200, seed: int = 0):
+    """Clustered random vectors and queries near the clusters."""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((50, dim))
+    vectors = centers[rng.integers(0, 50, count)] + rng.standard_normal((count, dim))
+    query_vectors = centers[rng.integers(0, 50, queries)] + rng.standard_normal((queries, dim))
+    return vectors.astype(np.float32), query_vectors.astype(np.float32)
+
+
+def build_from_chroma(persist_directory: str):
+    """Read the real collection's vectors and embed the sample questions."""
+    from src.vector_store import VectorStoreManager
+
+    manager = VectorStoreManager(persist_directory=persist_directory)
+    manager.load_vector_store()
+    _, vectors = manager._all_embeddings()
+    queries = np.asarray(manager.embeddings.embed_documents(SAMPLE_QUESTIONS), dtype=np.float32)
+    return vectors, queries
+
+
+def build_collection(path: str, vectors_file: str, space: str, m: int, construction_ef: int) -> float:
+    """Create a persistent collection in this (child) process; returns seconds taken."""
+    import chromadb
+
+    vectors = np.load(vectors_file)
+    ids = [str(i) for i in range(len(vectors))]
+    collection = chromadb.PersistentClient(path).create_collection(
+        "sweep",
+        metadata={"hnsw:space": space, "hnsw:M": m, "hnsw:construction_ef": construction_ef}
+    )
+    start = time.perf_counter()
+    for offset in range(0, len(ids), 1000):
+        collection.add(ids=ids[offset:offset + 1000], embeddings=vectors[offset:offset + 1000])
+    return time.perf_counter() - start
+
+
+def query_collection(path: str, search_ef: int, queries: np.ndarray, k: int):
+    """Set search_ef before the index is loaded, then time one query at a time."""
+    import chromadb
+
+    collection = chromadb.PersistentClient(path).get_collection("sweep")
+    collection.modify(configuration={"hnsw": {"ef_search": search_ef}})
+    # The first query loads the index
+    collection.query(query_embeddings=[queries[0]], n_results=k, include=[])
+    start = time.perf_counter()
+    found = [
+        set(collection.query(query_embeddings=[query], n_results=k, include=[])["ids"][0])
+        for query in queries
+    ]
+    return found, (time.perf_counter() - start) * 1000 / len(queries)
+
+
+def in_new_process(fn, *args):
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+        return pool.submit(fn, *args).result()
+
+
+def plot(rows, path: str) -> None:
+    """Draw recall against latency, one line per build setting."""
+    try:
+        import matplotlib
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+    except ImportError:
+        print("matplotlib not installed, skipping the chart. Install with: pip install matplotlib")
+        return
+
+    fig, ax = plt.subplots(figsize=(7, 5))
+    for build in sorted({(row[0], row[1]) for row in rows}):
+        points = [row for row in rows if (row[0], row[1]) == build]
+        ax.plot([row[5] for row in points], [row[4] for row in points], marker="o",
+                label=f"M={build[0]}, construction_ef={build[1]}")
+        for row in points:
+            ax.annotate(str(row[2]), (row[5], row[4]), fontsize=7)
+    ax.set_xlabel("ms / query")
+    ax.set_ylabel("recall@k")
+    ax.set_title("HNSW latency vs recall (labels: search_ef)")
+    ax.legend()
+    fig.savefig(path, dpi=120, bbox_inches="tight")
+    print(f"\nChart written to '{path}'")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--chroma-dir", default="chroma_db")
+    parser.add_argument("--synthetic", type=int, default=0,
+                        help="Benchmark N clustered random vectors instead of chroma_db")
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("-k", type=int, default=4)
+    parser.add_argument("--space", default="cosine", choices=["cosine", "l2", "ip"])
+    parser.add_argument("--m", default="8,16,32", help="Comma-separated M values")
+    parser.add_argument("--construction-ef", default="100,200")
+    parser.add_argument("--search-ef", default="10,20,40,80,160")
+    parser.add_argument("--plot", help="Write a latency/recall chart to this PNG file")
+    args = parser.parse_args()
+
+    if args.synthetic:
+        vectors, queries = build_synthetic(args.synthetic, args.dim)
+    else:
+        vectors, queries = build_from_chroma(args.chroma_dir)
+
+    # Exact neighbours in the same metric as the index
+    if args.space == "l2":
+        distances = (queries ** 2).sum(axis=1)[:, None] - 2 * queries @ vectors.T + (vectors ** 2).sum(axis=1)
+        truth = top_k_indices(-distances, args.k)
+    elif args.space == "cosine":
+        truth = top_k_indices(normalize_rows(queries) @ normalize_rows(vectors).T, args.k)
+    else:
+        truth = top_k_indices(queries @ vectors.T, args.k)
+    truth = [set(map(str, row)) for row in truth]
+
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        vectors_file = os.path.join(tmp, "vectors.npy")
+        np.save(vectors_file, vectors)
+        for m in (int(v) for v in args.m.split(",")):
+            for construction_ef in (int(v) for v in args.construction_ef.split(",")):
+                path = os.path.join(tmp, f"m{m}_ef{construction_ef}")
+                build_s = in_new_process(build_collection, path, vectors_file, args.space, m, construction_ef)
+                for search_ef in (int(v) for v in args.search_ef.split(",")):
+                    found, latency_ms = in_new_process(query_collection, path, search_ef, queries, args.k)
+                    recall = np.mean([len(a & b) / len(b) for a, b in zip(found, truth)])
+                    rows.append([m, construction_ef, search_ef, build_s, float(recall), latency_ms])
+                    print(f"M={m} construction_ef={construction_ef} search_ef={search_ef}: "
+                          f"recall {recall:.3f}, {latency_ms:.3f} ms/query")
+
+    print(f"\n{len(vectors)} vectors x {vectors.shape[1]} dims, {len(queries)} queries, "
+          f"k={args.k}, space={args.space}\n")
+    print_table(["M", "construction_ef", "search_ef", "build s", f"recall@{args.k}", "ms/query"], rows)
+    if args.plot:
+        plot(rows, args.plot)
+
+
+if __name__ == "__main__":
+    main()
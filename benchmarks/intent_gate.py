@@ -0,0 +1,95 @@
+"""
+Similarity of health and unrelated questions to the corpus centroid.
+
+The intent gate's off-topic check (INTENT_GATE=on) only embeds questions
+without a medical word, so the health questions here avoid those words on
+purpose. The suggested INTENT_MIN_SIMILARITY is halfway between the least
+similar health question and the most similar unrelated one.
+
+Usage:
+    python -m benchmarks.intent_gate                  # uses chroma_db
+    python -m benchmarks.intent_gate --chroma-dir chroma_db_v2
+"""
+
+import argparse
+
+import numpy as np
+
+from benchmarks.common import print_table
+from src.intent_gate import NCD_PATTERN
+
+# Health questions the keyword rule misses; these must never be turned away
+ON_TOPIC = [
+    "Why am I always thirsty and tired?",
+    "Why do my ankles swell in the evening?",
+    "Is it normal to get out of breath climbing stairs?",
+    "I found a lump in my breast, what should I do?",
+    "Is my waist size too big for my height?",
+    "How much salt is too much?",
+    "Should I worry about a mole that changed colour?",
+    "Why do I wake up at night to pee so often?",
+    "How often should I get a mammogram?",
+    "Is red meat bad for me?",
+    "What is a normal resting pulse?",
+    "Can vaping hurt me?",
+]
+# Questions the assistant should decline
+OFF_TOPIC = [
+    "What is the capital of France?",
+    "Write me a poem about the sea.",
+    "Who won the football world cup in 2018?",
+    "How do I reverse a linked list in Python?",
+    "What's the weather like tomorrow?",
+    "Recommend a good movie for tonight.",
+    "How do I change a car tyre?",
+    "What is the exchange rate of the euro?",
+    "Translate 'good morning' into Spanish.",
+    "How many planets are in the solar system?",
+]
+
+
+def similarities(embeddings, centroid: np.ndarray, questions) -> np.ndarray:
+    """Cosine similarity of each question's embedding to the centroid."""
+    vectors = np.asarray(embeddings.embed_documents(list(questions)), dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1)
+    norms[norms == 0] = 1.0
+    return vectors @ centroid / norms
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--chroma-dir", default="chroma_db")
+    args = parser.parse_args()
+
+    from src.vector_store import VectorStoreManager
+
+    manager = VectorStoreManager(persist_directory=args.chroma_dir)
+    manager.load_vector_store()
+    centroid = manager.corpus_centroid()
+    if centroid is None:
+        raise SystemExit("The index is empty")
+
+    for question in ON_TOPIC:
+        if NCD_PATTERN.search(question):
+            print(f"Note: '{question}' has a medical word and would skip the check")
+
+    on_topic = similarities(manager.embeddings, centroid, ON_TOPIC)
+    off_topic = similarities(manager.embeddings, centroid, OFF_TOPIC)
+    rows = [
+        [name, float(values.min()), float(np.median(values)), float(values.max())]
+        for name, values in (("health", on_topic), ("unrelated", off_topic))
+    ]
+    print()
+    print_table(["questions", "min", "median", "max"], rows)
+
+    low, high = float(on_topic.min()), float(off_topic.max())
+    print()
+    if low <= high:
+        print(f"The groups overlap (health min {low:.3f} <= unrelated max {high:.3f}).")
+        print("Any threshold turns away some health questions; keep INTENT_GATE=rules.")
+        return
+    print(f"Suggested INTENT_MIN_SIMILARITY={(low + high) / 2:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+Per-request latency of LLM calls with and without the pooled HTTP client.
+
+Runs ChatGroq against a local stub of the Groq chat completions API. The stub
+waits --handshake-ms on every new connection, standing in for the TCP and
+TLS round trips to the real API, and --answer-ms before each response.
+
+Compared:
+    new connection per call - every call pays the handshake
+    default client - the client ChatGroq builds itself; reuses connections
+        while calls keep coming, but httpx drops them after 5 s idle
+    pooled, cold - LLMHTTPPool, first call without warming
+    pooled, warmed - LLMHTTPPool after warm(), every call reuses a connection
+    ... after N s idle - one call after a pause, as between quiet-hour questions
+
+Usage:
+    python -m benchmarks.llm_http --handshake-ms 40 --repeat 30 --idle-seconds 6
+"""
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from benchmarks.common import print_table, time_call
+from src.llm_http import LLMHTTPPool
+
+
+def completion(content: str) -> bytes:
+    return json.dumps({
+        "id": "chatcmpl-stub",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": "stub",
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": content},
+            "finish_reason": "stop",
+        }],
+        "usage": {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15},
+    }).encode("utf-8")
+
+
+def start_stub_server(handshake_ms: float = 0.0, answer_ms: float = 0.0) -> ThreadingHTTPServer:
+    """Start a keep-alive stub of the Groq API on a free local port."""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Headers and body are written separately; without this, Nagle's
+        # algorithm and delayed ACKs add ~40 ms to every response
+        disable_nagle_algorithm = True
+
+        def setup(self):
+            # Runs once per connection, like a handshake
+            time.sleep(handshake_ms / 1000)
+            super().setup()
+
+        def _reply(self, body: bytes) -> None:
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_HEAD(self):
+            self.send_response(200)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            time.sleep(answer_ms / 1000)
+            self._reply(completion("A stub answer."))
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def make_llm(base_url: str, pool: LLMHTTPPool = None, http_client=None):
+    from langchain_groq import ChatGroq
+
+    kwargs = {}
+    if pool is not None:
+        kwargs = {"http_client": pool.client, "http_async_client": pool.async_client, "timeout": pool.timeout}
+    elif http_client is not None:
+        kwargs = {"http_client": http_client}
+    return ChatGroq(model="stub", groq_api_key="stub", groq_api_base=base_url, max_retries=0, **kwargs)
+
+
+def main():
+    import httpx
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--handshake-ms", type=float, default=40.0)
+    parser.add_argument("--answer-ms", type=float, default=5.0)
+    parser.add_argument("--repeat", type=int, default=30)
+    parser.add_argument("--idle-seconds", type=float, default=6.0,
+                        help="Pause before the idle calls (0 skips them)")
+    parser.add_argument("--idle-repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    server = start_stub_server(args.handshake_ms, args.answer_ms)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    rows = []
+
+    no_keepalive = httpx.Client(limits=httpx.Limits(max_keepalive_connections=0))
+    llm = make_llm(base_url, http_client=no_keepalive)
+    stats = time_call(lambda: llm.invoke("hi"), repeat=args.repeat)
+    rows.append(["new connection per call", stats["mean_ms"], stats["p95_ms"], "-"])
+
+    default_llm = make_llm(base_url)
+    stats = time_call(lambda: default_llm.invoke("hi"), repeat=args.repeat)
+    rows.append(["default client", stats["mean_ms"], stats["p95_ms"], "-"])
+
+    pool = LLMHTTPPool(base_url=base_url)
+    llm = make_llm(base_url, pool=pool)
+    start = time.perf_counter()
+    llm.invoke("hi")
+    rows.append(["pooled, cold (first call)", (time.perf_counter() - start) * 1000, "-", "-"])
+
+    pool = LLMHTTPPool(base_url=base_url)
+    pool.warm(2)
+    llm = make_llm(base_url, pool=pool)
+    stats = time_call(lambda: llm.invoke("hi"), repeat=args.repeat, warmup=0)
+    rows.append(["pooled, warmed", stats["mean_ms"], stats["p95_ms"], pool.stats()["reuse_ratio"]])
+
+    if args.idle_seconds:
+        for name, client_llm in [("default client", default_llm), ("pooled", llm)]:
+            samples = []
+            for _ in range(args.idle_repeat):
+                time.sleep(args.idle_seconds)
+                start = time.perf_counter()
+                client_llm.invoke("hi")
+                samples.append((time.perf_counter() - start) * 1000)
+            rows.append([f"{name}, after {args.idle_seconds:g} s idle", sum(samples) / len(samples), max(samples), "-"])
+
+    print(f"\nStub Groq API: {args.handshake_ms:g} ms per new connection, {args.answer_ms:g} ms per answer\n")
+    print_table(["client", "mean ms", "p95 (idle: max) ms", "reuse ratio"], rows)
+    print(f"\nPooled client: {json.dumps(pool.stats(), indent=2)}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Bulk embedding throughput for different numbers of worker processes.
+
+Embeds the same chunks in-process and with ParallelEmbedder at each worker
+count, and reports chunks/s and the speedup over in-process embedding. Pool
+startup (one model load per worker) is included, as it is in a real build.
+Each worker count needs as many free CPU cores times --torch-threads to scale.
+
+Usage:
+    python -m benchmarks.parallel_embedding --workers 1,2,4        # chunks of data/
+    python -m benchmarks.parallel_embedding --fake-model --chunks 4000
+"""
+
+import argparse
+import time
+import zlib
+
+from benchmarks.common import print_table
+from src.parallel_embedding import ParallelEmbedder, load_embedding_model
+
+
+class SyntheticEmbeddings:
+    """
+    CPU-bound stand-in for the sentence-transformer, for machines without it.
+
+    Hashes words into a bag-of-words vector and runs it through a small MLP
+    with torch, so the work per chunk and its threading look like a model's.
+    """
+
+    def __init__(self, dim: int = 384, layers: int = 12):
+        import torch
+
+        generator = torch.Generator().manual_seed(0)
+        self.dim = dim
+        self.weights = [torch.randn(dim, dim, generator=generator) / dim ** 0.5 for _ in range(layers)]
+
+    def embed_documents(self, texts):
+        import torch
+
+        bags = torch.zeros(len(texts), self.dim)
+        for row, text in enumerate(texts):
+            for word in text.lower().split():
+                bags[row, zlib.crc32(word.encode()) % self.dim] += 1.0
+        hidden = bags
+        for weight in self.weights:
+            # Repeated token-by-token work, roughly what a transformer spends per chunk
+            for _ in range(16):
+                hidden = torch.tanh(hidden @ weight)
+        return hidden.tolist()
+
+
+def load_chunks(data_dir: str):
+    from src.data_ingestion import DataIngestion
+
+    ingestion = DataIngestion(data_dir=data_dir)
+    return [chunk.page_content for chunk in ingestion.split_documents(ingestion.load_all_documents())]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", default="1,2,4", help="Comma-separated worker counts")
+    parser.add_argument("--torch-threads", type=int, default=1)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--data-dir", default="data")
+    parser.add_argument("--chunks", type=int, default=0,
+                        help="Embed N synthetic chunks instead of the chunks of --data-dir")
+    parser.add_argument("--fake-model", action="store_true",
+                        help="Use a synthetic torch model instead of the sentence-transformer")
+    args = parser.parse_args()
+
+    if args.chunks:
+        texts = [f"Chunk {i} about blood pressure, diabetes and cancer risk. " * 12 for i in range(args.chunks)]
+    else:
+        texts = load_chunks(args.data_dir)
+    factory = SyntheticEmbeddings if args.fake_model else load_embedding_model
+
+    import torch
+    torch.set_num_threads(args.torch_threads)
+    model = factory()
+    start = time.perf_counter()
+    for offset in range(0, len(texts), args.batch_size):
+        model.embed_documents(texts[offset:offset + args.batch_size])
+    baseline = len(texts) / (time.perf_counter() - start)
+    rows = [["in-process", args.torch_threads, baseline, 1.0]]
+
+    for workers in [int(value) for value in args.workers.split(",")]:
+        with ParallelEmbedder(workers, args.torch_threads, args.batch_size, factory=factory) as embedder:
+            for _ in embedder.embed_batches(texts):
+                pass
+            rate = embedder.stats()["chunks_per_second"]
+        rows.append([f"{workers} worker(s)", args.torch_threads, rate, rate / baseline])
+
+    print(f"\n{len(texts)} chunks, batches of {args.batch_size}\n")
+    print_table(["embedding", "torch threads", "chunks/s", "speedup"], rows)
+
+
+if __name__ == "__main__":
+    main()
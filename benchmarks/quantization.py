@@ -0,0 +1,116 @@
+"""
+Memory, disk size, recall and latency of quantized NumPy index storage.
+
+Recall@k is measured against the float32 store: the share of its top-k chunks
+that each variant also returns. int8 keeps only the codes in memory; the
+float32 rows it rescores with stay memory-mapped from the index files, so
+they count as "mapped", not resident. The index files themselves are float32
+for every variant; the codes are rebuilt when the index is loaded.
+
+Usage:
+    python -m benchmarks.quantization                   # uses chroma_db
+    python -m benchmarks.quantization --synthetic 50000 # clustered random vectors
+"""
+
+import argparse
+import os
+import tempfile
+
+import numpy as np
+
+from benchmarks.common import SAMPLE_QUESTIONS, print_table, time_call
+from src.numpy_store import NumpyVectorStore
+
+
+def build_synthetic(count: int, dim: int, queries: int = 200, seed: int = 0):
+    """Clustered random vectors, since real embeddings are far from uniform."""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((50, dim))
+    vectors = centers[rng.integers(0, 50, count)] + rng.standard_normal((count, dim))
+    query_vectors = centers[rng.integers(0, 50, queries)] + rng.standard_normal((queries, dim))
+    return vectors.astype(np.float32), query_vectors.astype(np.float32)
+
+
+def build_from_chroma(persist_directory: str):
+    """Export the real collection's vectors and embed the sample questions."""
+    from src.vector_store import VectorStoreManager
+
+    manager = VectorStoreManager(persist_directory=persist_directory)
+    manager.load_vector_store()
+    _, vectors = manager._all_embeddings()
+    queries = np.asarray(manager.embeddings.embed_documents(SAMPLE_QUESTIONS), dtype=np.float32)
+    return vectors, queries
+
+
+def directory_size(path: str) -> int:
+    return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--chroma-dir", default="chroma_db")
+    parser.add_argument("--synthetic", type=int, default=0,
+                        help="Benchmark N clustered random vectors instead of chroma_db")
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("-k", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.synthetic:
+        vectors, queries = build_synthetic(args.synthetic, args.dim)
+    else:
+        vectors, queries = build_from_chroma(args.chroma_dir)
+
+    ids = [str(i) for i in range(len(vectors))]
+    texts = [f"chunk {i}" for i in ids]
+    variants = [
+        ("float32", "float32", 0),
+        ("float16", "float16", 0),
+        ("int8, no rescoring", "int8", 0),
+        ("int8, rescore 2k", "int8", 2),
+        ("int8, rescore 4k", "int8", 4),
+        ("int8, rescore 8k", "int8", 8),
+    ]
+
+    rows = []
+    truth = None
+    with tempfile.TemporaryDirectory() as tmp:
+        source = NumpyVectorStore(None)
+        source.add_embeddings(texts, vectors, ids=ids)
+        source.save(f"{tmp}/index")
+        disk_mb = directory_size(f"{tmp}/index") / 1e6
+
+        for name, dtype, factor in variants:
+            store = NumpyVectorStore.load(f"{tmp}/index", None, dtype=dtype, rescore_factor=factor)
+            results = [
+                [doc.id for doc, _ in result]
+                for result in store.batch_search_by_vectors(queries, k=args.k)
+            ]
+            if truth is None:
+                truth = results
+            recall = np.mean([len(set(a) & set(b)) / len(b) for a, b in zip(results, truth)])
+
+            def search_each():
+                for query in queries:
+                    store.similarity_search_by_vector_with_score(query, k=args.k)
+
+            stats = time_call(search_each, repeat=args.repeat)
+            mapped = store._float_matrix.nbytes if store._float_matrix is not None else 0
+            rows.append([
+                name,
+                store.nbytes / 1e6,
+                mapped / 1e6,
+                disk_mb,
+                float(recall),
+                stats["mean_ms"] / len(queries),
+            ])
+
+    print(f"\n{len(vectors)} vectors x {vectors.shape[1]} dims, {len(queries)} queries, k={args.k}\n")
+    print_table(
+        ["storage", "resident MB", "mapped MB", "disk MB", f"recall@{args.k}", "ms/query"],
+        rows
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Per-request overhead of the slow request profiler.
+
+Runs the direct answer engine over an in-process NumPy store with fake
+embeddings and an instant fake LLM, with profiling off, with stage timings
+only, and with stack sampling at several intervals. Every request counts as
+slow (threshold 0), so the cost of keeping captures is included.
+
+Usage:
+    python -m benchmarks.request_profiler --chunks 3000
+"""
+
+import argparse
+
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from benchmarks.answer_engine import build_chatbot
+from benchmarks.common import SAMPLE_QUESTIONS, print_table, time_call
+from src.numpy_store import NumpyVectorStore
+from src.request_profiler import SlowRequestProfiler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--chunks", type=int, default=3000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    embedding = DeterministicFakeEmbedding(size=384)
+    documents = [
+        Document(page_content=f"Chunk {i} " + "lorem ipsum " * 80,
+                 metadata={"source": f"doc{i % 17}.pdf"})
+        for i in range(args.chunks)
+    ]
+    chatbot = build_chatbot("direct", NumpyVectorStore.from_documents(documents, embedding))
+
+    variants = [
+        ("off", None, 0),
+        ("stage timings only", 0, 0),
+        ("sampling every 10 ms", 0, 10),
+        ("sampling every 5 ms", 0, 5),
+        ("sampling every 1 ms", 0, 1),
+    ]
+    rows = []
+    baseline = None
+    for name, threshold_ms, interval_ms in variants:
+        profiler = SlowRequestProfiler(threshold_ms=threshold_ms, sample_interval_ms=interval_ms)
+
+        def run():
+            for question in SAMPLE_QUESTIONS:
+                with profiler.capture("POST /chat", detail=question):
+                    chatbot.ask(question, return_sources=True)
+
+        stats = time_call(run, repeat=args.repeat)
+        per_request = stats["mean_ms"] / len(SAMPLE_QUESTIONS)
+        baseline = baseline or per_request
+        samples = sum(c["samples"] for c in profiler.captures())
+        rows.append([name, per_request, f"{(per_request / baseline - 1) * 100:+.1f}%", samples])
+
+    print(f"\n{args.chunks} chunks, fake embeddings and LLM, {len(SAMPLE_QUESTIONS)} questions per run\n")
+    print_table(["profiler", "ms/request", "overhead", "samples kept"], rows)
+
+
+if __name__ == "__main__":
+    main()
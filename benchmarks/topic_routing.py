@@ -0,0 +1,164 @@
+"""
+Latency and accuracy of topic-routed retrieval versus global search.
+
+Each sample question has a known source document. Accuracy is the share of
+the top-k chunks that come from that document; routing accuracy is how often
+the router picked the right topic (or stayed global for general questions).
+
+Usage:
+    python -m benchmarks.topic_routing                   # uses chroma_db
+    python -m benchmarks.topic_routing --synthetic 5000  # clustered random vectors
+"""
+
+import argparse
+import tempfile
+import uuid
+
+import numpy as np
+
+from benchmarks.common import SAMPLE_QUESTIONS, print_table, time_call
+from src.numpy_store import NumpyVectorStore
+from src.topics import TopicRouter, compute_centroids, topic_filter, topic_for_source
+
+# Source document that answers each sample question (None: general question)
+EXPECTED_SOURCES = [
+    "Diabetes.pdf",
+    "Diabetes.pdf",
+    "High Blood Pressure.pdf",
+    "Cholesterol.pdf",
+    "Heart attacks.pdf",
+    "Obesity.pdf",
+    "Lung Cancer.pdf",
+    "Breast Cancer.pdf",
+    "Prostate Cancer.pdf",
+    "Colorectal Cancer.pdf",
+    "Liver Cancer.pdf",
+    "Thyroid Cancer.pdf",
+    "Skin Cancers.pdf",
+    "Bladder Cancer.pdf",
+    None,
+    "Cancer research and development.pdf",
+]
+
+
+def build_synthetic(count: int, dim: int, seed: int = 0):
+    """Build a Chroma collection of per-topic vector clusters and noisy queries."""
+    import chromadb
+
+    rng = np.random.default_rng(seed)
+    sources = sorted({s for s in EXPECTED_SOURCES if s} | {"overview-details-noncommuniable-diseases..pdf"})
+    centers = rng.standard_normal((len(sources), dim)).astype(np.float32)
+
+    labels = rng.integers(0, len(sources), size=count)
+    vectors = centers[labels] + 3.0 * rng.standard_normal((count, dim)).astype(np.float32)
+    metadatas = [{"source": sources[i], "topic": topic_for_source(sources[i])} for i in labels]
+
+    client = chromadb.EphemeralClient()
+    collection = client.create_collection(f"bench_{uuid.uuid4().hex}", metadata={"hnsw:space": "cosine"})
+    for start in range(0, count, 1000):
+        end = start + 1000
+        collection.add(
+            ids=[str(i) for i in range(start, min(end, count))],
+            embeddings=vectors[start:end],
+            documents=[f"chunk {i}" for i in range(start, min(end, count))],
+            metadatas=metadatas[start:end]
+        )
+
+    queries = np.array([
+        centers[sources.index(s)] if s else centers.mean(axis=0)
+        for s in EXPECTED_SOURCES
+    ]) + 3.0 * rng.standard_normal((len(EXPECTED_SOURCES), dim)).astype(np.float32)
+    return collection, queries.astype(np.float32)
+
+
+def build_from_chroma(persist_directory: str):
+    """Load the real collection and embed the sample questions."""
+    from src.vector_store import VectorStoreManager
+
+    manager = VectorStoreManager(persist_directory=persist_directory)
+    manager.load_vector_store()
+    queries = np.asarray(manager.embeddings.embed_documents(SAMPLE_QUESTIONS), dtype=np.float32)
+    return manager.vector_store._collection, queries
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--chroma-dir", default="chroma_db")
+    parser.add_argument("--synthetic", type=int, default=0,
+                        help="Benchmark N clustered random vectors instead of chroma_db")
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("-k", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    if args.synthetic:
+        collection, queries = build_synthetic(args.synthetic, args.dim)
+    else:
+        collection, queries = build_from_chroma(args.chroma_dir)
+
+    from src.mmap_index import export_collection
+    with tempfile.TemporaryDirectory() as tmp:
+        export_collection(collection, f"{tmp}/index")
+        store = NumpyVectorStore.load(f"{tmp}/index", None)
+
+    # Indexes built before topic tagging are tagged from their source names here
+    for metadata in store._metadatas:
+        metadata.setdefault("topic", topic_for_source(metadata.get("source", "")))
+
+    centroids = compute_centroids(store._metadatas, store._matrix)
+
+    routers = {
+        "global": None,
+        "keyword": TopicRouter(list(centroids), mode="keyword"),
+        "centroid": TopicRouter(list(centroids), centroids=centroids, mode="centroid"),
+    }
+    expected_topics = [topic_for_source(s) if s else None for s in EXPECTED_SOURCES]
+    k = args.k
+    n = len(queries)
+
+    rows = []
+    for name, router in routers.items():
+        filters = []
+        routed_right = 0
+        for question, vector, expected in zip(SAMPLE_QUESTIONS, queries, expected_topics):
+            topics = router.route(question, vector) if router else []
+            filters.append(topic_filter(topics))
+            routed_right += (topics == [expected]) if expected else (topics == [])
+
+        def chroma_run():
+            for vector, where in zip(queries, filters):
+                collection.query(query_embeddings=[vector], n_results=k, where=where)
+
+        def numpy_run():
+            for vector, where in zip(queries, filters):
+                results = store.similarity_search_by_vector_with_score(vector, k=k, filter=where)
+                if not results:
+                    store.similarity_search_by_vector_with_score(vector, k=k)
+
+        precision = []
+        for vector, where, source in zip(queries, filters, EXPECTED_SOURCES):
+            if source is None:
+                continue
+            docs = store.similarity_search_by_vector(vector, k=k, filter=where) \
+                or store.similarity_search_by_vector(vector, k=k)
+            precision.append(np.mean([doc.metadata["source"] == source for doc in docs]))
+
+        chroma_stats = time_call(chroma_run, repeat=args.repeat)
+        numpy_stats = time_call(numpy_run, repeat=args.repeat)
+        rows.append([
+            name,
+            "-" if router is None else f"{routed_right}/{n}",
+            float(np.mean(precision)),
+            chroma_stats["mean_ms"] / n,
+            numpy_stats["mean_ms"] / n,
+        ])
+
+    print(f"\n{len(store)} chunks, {len(centroids)} topics, k={k}, {n} queries per run\n")
+    print_table(
+        ["retrieval", "routed right", f"precision@{k}", "chroma ms/query", "numpy ms/query"],
+        rows
+    )
+
+
+if __name__ == "__main__":
+    main()
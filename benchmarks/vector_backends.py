@@ -0,0 +1,125 @@
+"""
+Latency comparison of the Chroma and NumPy vector store backends.
+
+Query embeddings are computed once up front, so the numbers isolate the
+search itself (client round trip, HNSW lookup and result decoding for Chroma
+versus one matrix-vector product for NumPy).
+
+Usage:
+    python -m benchmarks.vector_backends                  # uses chroma_db
+    python -m benchmarks.vector_backends --synthetic 5000 # random vectors
+"""
+
+import argparse
+import tempfile
+import uuid
+
+import numpy as np
+
+from benchmarks.common import SAMPLE_QUESTIONS, print_table, time_call
+from src.numpy_store import NumpyVectorStore
+
+
+def build_synthetic(count: int, dim: int, seed: int = 0):
+    """Build an ephemeral Chroma collection and random query vectors."""
+    import chromadb
+
+    rng = np.random.default_rng(seed)
+    vectors = rng.standard_normal((count, dim)).astype(np.float32)
+    texts = [f"chunk {i}" for i in range(count)]
+    ids = [str(i) for i in range(count)]
+    metadatas = [{"source": f"doc{i % 17}.pdf"} for i in range(count)]
+
+    client = chromadb.EphemeralClient()
+    collection = client.create_collection(f"bench_{uuid.uuid4().hex}")
+    for start in range(0, count, 1000):
+        end = start + 1000
+        collection.add(
+            ids=ids[start:end],
+            embeddings=vectors[start:end],
+            documents=texts[start:end],
+            metadatas=metadatas[start:end]
+        )
+
+    queries = rng.standard_normal((len(SAMPLE_QUESTIONS), dim)).astype(np.float32)
+    return collection, None, queries
+
+
+def build_from_chroma(persist_directory: str):
+    """Load the real collection and embed the sample questions."""
+    from src.vector_store import VectorStoreManager
+
+    manager = VectorStoreManager(persist_directory=persist_directory)
+    manager.load_vector_store()
+    queries = np.asarray(manager.embeddings.embed_documents(SAMPLE_QUESTIONS), dtype=np.float32)
+    return manager.vector_store._collection, manager.embeddings, queries
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--chroma-dir", default="chroma_db")
+    parser.add_argument("--synthetic", type=int, default=0,
+                        help="Benchmark N random vectors instead of chroma_db")
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("-k", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    if args.synthetic:
+        collection, embedding, queries = build_synthetic(args.synthetic, args.dim)
+    else:
+        collection, embedding, queries = build_from_chroma(args.chroma_dir)
+
+    # Export through the same path the numpy/mmap backends use
+    from src.mmap_index import export_collection
+    with tempfile.TemporaryDirectory() as tmp:
+        export_collection(collection, f"{tmp}/index")
+        store32 = NumpyVectorStore.load(f"{tmp}/index", embedding, dtype="float32")
+        store16 = NumpyVectorStore.load(f"{tmp}/index", embedding, dtype="float16")
+
+    k = args.k
+    n = len(queries)
+
+    def chroma_each():
+        for q in queries:
+            collection.query(query_embeddings=[q], n_results=k)
+
+    def numpy_each(store):
+        def run():
+            for q in queries:
+                store.similarity_search_by_vector_with_score(q, k=k)
+        return run
+
+    def numpy_batched(store):
+        return lambda: store.batch_search_by_vectors(queries, k=k)
+
+    # Recall of the float16 store against the exact float32 ranking
+    exact = store32.batch_search_by_vectors(queries, k=k)
+    half = store16.batch_search_by_vectors(queries, k=k)
+    recall16 = np.mean([
+        len({d.id for d, _ in a} & {d.id for d, _ in b}) / k for a, b in zip(exact, half)
+    ])
+
+    rows = []
+    for name, fn, matrix_bytes in [
+        ("chroma (one query at a time)", chroma_each, None),
+        ("numpy float32", numpy_each(store32), store32.nbytes),
+        ("numpy float16", numpy_each(store16), store16.nbytes),
+        ("numpy float32 batched", numpy_batched(store32), store32.nbytes),
+        ("numpy float16 batched", numpy_batched(store16), store16.nbytes),
+    ]:
+        stats = time_call(fn, repeat=args.repeat)
+        rows.append([
+            name,
+            stats["mean_ms"] / n,
+            stats["p95_ms"] / n,
+            "-" if matrix_bytes is None else f"{matrix_bytes / 1e6:.1f} MB",
+        ])
+
+    print(f"\n{len(store32)} chunks, {queries.shape[1]} dims, k={k}, {n} queries per run\n")
+    print_table(["backend", "mean ms/query", "p95 ms/query", "matrix"], rows)
+    print(f"\nfloat16 recall@{k} vs float32: {recall16:.3f}")
+
+
+if __name__ == "__main__":
+    main()
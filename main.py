@@ -3,6 +3,7 @@ Main application file for the NCD RAG Chatbot.
 Entry point for running the chatbot.
 """
 
+import argparse
 import sys
 from src.chatbot import NCDChatbot
 
@@ -11,10 +12,18 @@ def main():
     """
     Main function to run the chatbot.
     """
+    parser = argparse.ArgumentParser(description="Chat with the NCD chatbot in the terminal.")
+    parser.add_argument(
+        "--timings",
+        action="store_true",
+        help="Print retrieval and LLM latency after each answer"
+    )
+    args = parser.parse_args()
+
     try:
         print("Initializing NCD Chatbot...")
         chatbot = NCDChatbot()
-        chatbot.chat()
+        chatbot.chat(timings=args.timings)
     except FileNotFoundError as e:
         print("\n" + "=" * 70)
         print("⚠️  Vector Store Not Found")
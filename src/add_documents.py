@@ -3,16 +3,30 @@ Script to add new documents to existing vector store.
 Only processes documents that haven't been added yet.
 """
 
+import argparse
 import os
+import shutil
 from dotenv import load_dotenv
 from src.data_ingestion import DataIngestion
-from src.vector_store import VectorStoreManager
+from src.snapshots import SnapshotManager
+from src.vector_store import VectorStoreManager, build_backend
 
 
-def main():
+def main(argv=None):
     """
     Add new documents to the existing vector store.
+    
+    Args:
+        argv: Command-line arguments (defaults to sys.argv)
     """
+    parser = argparse.ArgumentParser(description="Add new documents to the vector store.")
+    parser.add_argument(
+        "--snapshot",
+        action="store_true",
+        help="Copy the current snapshot into a new version, update that and activate it"
+    )
+    args = parser.parse_args(argv)
+    
     print("=" * 70)
     print("Add New Documents to Vector Store")
     print("=" * 70)
@@ -25,11 +39,31 @@ def main():
     print("Step 1: Loading existing vector store")
     print("=" * 70)
     
+    snapshots = None
+    persist_directory = None
+    if args.snapshot:
+        snapshots = SnapshotManager(os.getenv("INDEX_SNAPSHOT_ROOT", "index_snapshots"))
+        current = snapshots.current_version()
+        if not current:
+            print("\n❌ No current snapshot found!")
+            print("Please run 'python -m src.setup --snapshot' first")
+            return
+        # Work on a copy so the live API keeps reading the current version
+        version, persist_directory = snapshots.create_snapshot(base_version=current)
+        print(f"Building snapshot {version} from {current}")
+    
+    def discard_snapshot():
+        if snapshots:
+            shutil.rmtree(persist_directory, ignore_errors=True)
+    
     try:
-        vs_manager = VectorStoreManager()
+        # Servers load snapshots with VECTOR_BACKEND, so update them in that format
+        backend = build_backend() if args.snapshot else "chroma"
+        vs_manager = VectorStoreManager(persist_directory=persist_directory, backend=backend)
         vs_manager.load_vector_store()
         print("✓ Vector store loaded")
     except FileNotFoundError:
+        discard_snapshot()
         print("\n❌ No existing vector store found!")
         print("Please run 'python src/setup.py' first to create the initial vector store")
         return
@@ -53,6 +87,7 @@ def main():
     all_documents = ingestion.load_all_documents()
     
     if not all_documents:
+        discard_snapshot()
         print("\n❌ No documents found in the 'data' directory")
         return
     
@@ -64,6 +99,7 @@ def main():
             new_documents.append(doc)
     
     if not new_documents:
+        discard_snapshot()
         print("\n✓ No new documents to add. All files are already in the vector store!")
         return
     
@@ -79,6 +115,7 @@ def main():
     chunks = ingestion.split_documents(new_documents)
     
     if not chunks:
+        discard_snapshot()
         print("\n❌ Failed to split documents")
         return
     
@@ -93,9 +130,14 @@ def main():
         vs_manager.add_documents(chunks)
         print("\n✓ New documents added successfully!")
     except Exception as e:
+        discard_snapshot()
         print(f"\n❌ Error adding documents: {str(e)}")
         return
     
+    if snapshots:
+        snapshots.activate(version)
+        print(f"✓ Snapshot {version} is now current (previous: {current})")
+    
     # Success
     print("\n" + "=" * 70)
     print("Update Complete!")
@@ -4,12 +4,92 @@ Uses LangChain to combine retrieval and generation with Groq's Llama3.
 """
 
 import os
-from typing import Optional
-from langchain_classic.chains import RetrievalQA
-from langchain_groq import ChatGroq
-from langchain_core.prompts import PromptTemplate
+import string
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Dict, Generator, Iterator, List, Optional, Tuple
 from dotenv import load_dotenv
-from src.vector_store import VectorStoreManager
+from src.circuit_breaker import CircuitBreaker, CircuitOpenError, extractive_answer
+from src.collection_registry import CollectionRegistry
+from src.faq_store import FAQStore
+from src.intent_gate import IntentGate
+from src.llm_http import LLMHTTPPool
+from src.request_profiler import request_stage
+from src.sessions import (
+    FOLLOW_UP_MIN_SIMILARITY,
+    ConversationSession,
+    condense_question,
+    cosine_similarity,
+)
+from src.topics import ROUTING_MODES, chunk_topics, topic_for_source
+from src.snapshots import SnapshotManager
+from src.startup_profiler import lazy_import, profiler
+from src.vector_store import DEFAULT_PERSIST_DIRECTORIES, EMBEDDING_MODEL_NAME, VectorStoreManager
+
+if TYPE_CHECKING:
+    from langchain_core.documents import Document
+
+# LangChain and the Groq client are imported on first use so importing this
+# module (app.py, main.py, test collection) stays cheap
+_LAZY_IMPORTS = {
+    "RetrievalQA": ("langchain_classic.chains", "RetrievalQA"),
+    "ChatGroq": ("langchain_groq", "ChatGroq"),
+    "PromptTemplate": ("langchain_core.prompts", "PromptTemplate"),
+    "RunnableLambda": ("langchain_core.runnables", "RunnableLambda"),
+}
+
+
+def __getattr__(name: str):
+    return lazy_import(__name__, _LAZY_IMPORTS, name)
+
+
+def _lazy(name: str):
+    """Get a lazily imported dependency (honours test patches)."""
+    return getattr(sys.modules[__name__], name)
+
+
+class _LLMStepError(Exception):
+    """Raised out of the QA chain when its LLM step failed or the circuit is open."""
+    
+    def __init__(self, error: Exception):
+        super().__init__(str(error))
+        self.error = error
+
+
+# "chain" runs RetrievalQA; "direct" does the same steps without chain machinery
+ANSWER_ENGINES = ("chain", "direct")
+
+
+def compile_prompt(template: str) -> List[Tuple[str, Optional[str]]]:
+    """
+    Pre-parse a str.format template into (literal text, field name) pairs.
+    
+    Args:
+        template: Prompt template with {field} placeholders
+        
+    Returns:
+        List of (literal, field) pairs; field is None for trailing text
+    """
+    return [
+        (literal, field)
+        for literal, field, _, _ in string.Formatter().parse(template)
+    ]
+
+
+def render_prompt(parts: List[Tuple[str, Optional[str]]], values: Dict[str, str]) -> str:
+    """
+    Render a compiled prompt by concatenation.
+    
+    Args:
+        parts: Output of compile_prompt
+        values: Value for every field
+        
+    Returns:
+        Rendered prompt text
+    """
+    return "".join(literal + (values[field] if field else "") for literal, field in parts)
 
 
 class NCDChatbot:
@@ -19,7 +99,10 @@ class NCDChatbot:
         self,
         model_name: str = "llama-3.1-8b-instant",
         temperature: float = 0.7,
-        groq_api_key: Optional[str] = None
+        groq_api_key: Optional[str] = None,
+        answer_engine: Optional[str] = None,
+        llm=None,
+        vs_manager: Optional[VectorStoreManager] = None
     ):
         """
         Initialize the chatbot.
@@ -28,6 +111,10 @@ class NCDChatbot:
             model_name: Groq model to use (llama-3.1-8b-instant, llama-3.1-70b-versatile, mixtral-8x7b-32768)
             temperature: Response creativity (0-1)
             groq_api_key: Groq API key
+            answer_engine: "chain" (RetrievalQA) or "direct" (same steps
+                without chain machinery); defaults to ANSWER_ENGINE or "chain"
+            llm: Chat model to use instead of creating a ChatGroq client
+            vs_manager: Loaded vector store manager to use instead of loading one
         """
         # Load environment variables
         load_dotenv()
@@ -37,24 +124,68 @@ class NCDChatbot:
         
         self.model_name = model_name
         self.temperature = temperature
+        self.answer_engine = answer_engine or os.getenv("ANSWER_ENGINE", "chain")
+        if self.answer_engine not in ANSWER_ENGINES:
+            raise ValueError(
+                f"Unknown answer engine '{self.answer_engine}'. "
+                f"Choose one of: {', '.join(ANSWER_ENGINES)}"
+            )
+        self.top_k = 4
+        # Follow-ups closer than this to the previous query reuse its chunks
+        self.follow_up_min_similarity = float(
+            os.getenv("SESSION_FOLLOW_UP_SIMILARITY", str(FOLLOW_UP_MIN_SIMILARITY))
+        )
+        
+        # Restrict retrieval to the question's disease topic when it is clear
+        self.topic_routing = os.getenv("TOPIC_ROUTING", "off")
+        if self.topic_routing not in ROUTING_MODES:
+            raise ValueError(
+                f"Unknown topic routing mode '{self.topic_routing}'. "
+                f"Choose one of: {', '.join(ROUTING_MODES)}"
+            )
         
         # Initialize Groq LLM
-        self.llm = ChatGroq(
-            model=self.model_name,
-            temperature=self.temperature,
-            groq_api_key=os.getenv("GROQ_API_KEY")
+        self.llm_http = None
+        if llm is not None:
+            self.llm = llm
+        else:
+            # One pooled keep-alive client for every LLM call of this worker,
+            # warmed in the background so the first question skips the handshake
+            self.llm_http = LLMHTTPPool.from_env()
+            if os.getenv("GROQ_API_KEY"):
+                self.llm_http.warm_in_background(int(os.getenv("LLM_HTTP_PREWARM", "2")))
+            llm_cls = _lazy("ChatGroq")
+            with profiler.measure("create LLM client"):
+                self.llm = llm_cls(
+                    model=self.model_name,
+                    temperature=self.temperature,
+                    groq_api_key=os.getenv("GROQ_API_KEY"),
+                    timeout=self.llm_http.timeout,
+                    http_client=self.llm_http.client,
+                    http_async_client=self.llm_http.async_client
+                )
+        
+        # After repeated LLM failures, answer from the retrieved chunks until
+        # a probe call succeeds again
+        self.llm_breaker = CircuitBreaker(
+            failure_threshold=int(os.getenv("LLM_FAILURE_THRESHOLD", "5")),
+            reset_timeout=float(os.getenv("LLM_RESET_SECONDS", "30"))
         )
         
-        # Initialize vector store manager
-        self.vs_manager = VectorStoreManager()
+        # Serve the active snapshot when INDEX_SNAPSHOT_ROOT is configured
+        snapshot_root = os.getenv("INDEX_SNAPSHOT_ROOT")
+        self.snapshots = SnapshotManager(snapshot_root) if snapshot_root else None
+        self.index_version = self.snapshots.current_version() if self.snapshots else None
+        self._reload_lock = threading.Lock()
+        # Requests using each live pipeline, so a swapped-out index is closed
+        # only after the last of them finishes
+        self._pipeline_lock = threading.Lock()
+        self._pipeline_leases: Dict[int, int] = {}
+        self._retired_pipelines: Dict[int, tuple] = {}
         
-        # Load vector store
-        try:
-            self.vs_manager.load_vector_store()
-        except FileNotFoundError:
-            raise FileNotFoundError(
-                "Vector store not found. Please run the setup script first to create it."
-            )
+        # Initialize vector store manager
+        if vs_manager is None:
+            vs_manager = self._load_vector_store(self.index_version)
         
         # Create custom prompt template
         self.prompt_template = """You are a medical information assistant specializing in non-communicable diseases (NCDs). 
@@ -85,30 +216,310 @@ Answer format:
 
 Keep response focused, scannable, and limited to 3-4 key sections."""
 
-        self.prompt = PromptTemplate(
-            template=self.prompt_template,
-            input_variables=["context", "question"]
+        # The direct engine renders this by plain concatenation
+        self._compiled_prompt = compile_prompt(self.prompt_template)
+        
+        if self.answer_engine == "chain":
+            self.prompt = _lazy("PromptTemplate")(
+                template=self.prompt_template,
+                input_variables=["context", "question"]
+            )
+        
+        # Vector store and retrieval QA chain are swapped together on reload
+        self._pipeline = (vs_manager, self._build_qa_chain(vs_manager))
+        
+        # Small talk and off-topic questions are answered without the LLM
+        self.intent_gate = IntentGate(
+            mode=os.getenv("INTENT_GATE", "rules"),
+            min_similarity=float(os.getenv("INTENT_MIN_SIMILARITY", "0.15"))
+        )
+        
+        # Precomputed answers to common questions (python -m src.faq_store)
+        self.faq_store = None
+        faq_path = os.getenv("FAQ_STORE")
+        if faq_path:
+            with profiler.measure("load FAQ store"):
+                self.faq_store = FAQStore.load(
+                    faq_path,
+                    min_similarity=float(os.getenv("FAQ_MIN_SIMILARITY", "0.92"))
+                )
+        self._on_index_loaded(vs_manager)
+        
+        # Named collections (one index directory each) are loaded on first
+        # use and share the embedding model; least recently used ones are
+        # unloaded beyond COLLECTION_CACHE_SIZE or COLLECTION_MEMORY_MB
+        self.collections = None
+        collections_root = os.getenv("COLLECTIONS_ROOT")
+        if collections_root:
+            memory_mb = os.getenv("COLLECTION_MEMORY_MB")
+            self.collections = CollectionRegistry(
+                collections_root,
+                load=self._load_collection,
+                memory_bytes=lambda pipeline: pipeline[0].memory_bytes(),
+                close=lambda pipeline: pipeline[0].close(),
+                max_loaded=int(os.getenv("COLLECTION_CACHE_SIZE", "4")),
+                max_memory_mb=float(memory_mb) if memory_mb else None
+            )
+    
+    @property
+    def vs_manager(self) -> VectorStoreManager:
+        """Vector store manager of the live index."""
+        return self._pipeline[0]
+    
+    @property
+    def qa_chain(self):
+        """RetrievalQA chain of the live index (None for the direct engine)."""
+        return self._pipeline[1]
+    
+    def _on_index_loaded(self, vs_manager: VectorStoreManager) -> None:
+        """
+        Refresh the state derived from the served index.
+        
+        Points the intent gate's off-topic check at the corpus centroid and
+        turns the FAQ store off if it was built from different content.
+        
+        Args:
+            vs_manager: Loaded vector store manager
+        """
+        if self.intent_gate.mode == "on":
+            try:
+                with profiler.measure("compute corpus centroid"):
+                    self.intent_gate.set_corpus_centroid(vs_manager.corpus_centroid())
+            except Exception as e:
+                # Greetings and thanks are still handled by the rules
+                print(f"Intent gate off-topic check disabled: {str(e)}")
+                self.intent_gate.set_corpus_centroid(None)
+        
+        if self.faq_store is not None:
+            corpus_version = vs_manager.corpus_version()
+            self.faq_store.active = (
+                self.faq_store.corpus_version == corpus_version
+                and self.faq_store.embedding_model == EMBEDDING_MODEL_NAME
+            )
+            if not self.faq_store.active:
+                print(
+                    f"FAQ store is for corpus version {self.faq_store.corpus_version} but the "
+                    f"index is {corpus_version}; rebuild it with: python -m src.faq_store"
+                )
+    
+    def _load_vector_store(
+        self,
+        version: Optional[str] = None,
+        embeddings=None,
+        persist_directory: Optional[str] = None
+    ) -> VectorStoreManager:
+        """
+        Create a vector store manager and load its store.
+        
+        Args:
+            version: Snapshot version to load (None for VECTOR_STORE_DIR)
+            embeddings: Embedding model to reuse across reloads
+            persist_directory: Index directory to load instead (collections)
+            
+        Returns:
+            Loaded VectorStoreManager
+        """
+        # INDEX_ARTIFACT replaces the default index, not snapshots or collections
+        artifact_path = None if version or persist_directory else os.getenv("INDEX_ARTIFACT")
+        persist_directory = persist_directory or os.getenv("VECTOR_STORE_DIR") or None
+        if version:
+            persist_directory = self.snapshots.path_for(version)
+        
+        # VECTOR_BACKEND=numpy searches in process, VECTOR_BACKEND=mmap
+        # shares one read-only index between workers
+        backend = os.getenv("VECTOR_BACKEND", "chroma")
+        if artifact_path:
+            if backend not in ("numpy", "mmap"):
+                raise ValueError("INDEX_ARTIFACT needs VECTOR_BACKEND=numpy or VECTOR_BACKEND=mmap.")
+            persist_directory = persist_directory or DEFAULT_PERSIST_DIRECTORIES[backend]
+        
+        vs_manager = VectorStoreManager(
+            persist_directory=persist_directory,
+            backend=backend,
+            dtype=os.getenv("VECTOR_DTYPE", "float32"),
+            embeddings=embeddings
         )
         
-        # Create retrieval QA chain
-        self.qa_chain = RetrievalQA.from_chain_type(
-            llm=self.llm,
+        if artifact_path:
+            from src.index_artifact import check_model, install_artifact, read_manifest
+            
+            # Refuse vectors from another model before unpacking anything, so
+            # a mismatched artifact never replaces the index already installed
+            with profiler.measure("check artifact model"):
+                check_model(read_manifest(artifact_path), vs_manager.embeddings, EMBEDDING_MODEL_NAME)
+            with profiler.measure("install index artifact"):
+                artifact = install_artifact(artifact_path, persist_directory)
+            print(f"Serving index artifact {artifact['version']}")
+        
+        try:
+            vs_manager.load_vector_store()
+        except FileNotFoundError:
+            raise FileNotFoundError(
+                "Vector store not found. Please run the setup script first to create it."
+            )
+        
+        if self.topic_routing != "off":
+            with profiler.measure("build topic router"):
+                vs_manager.enable_topic_routing(self.topic_routing)
+        return vs_manager
+    
+    def _build_qa_chain(self, vs_manager: VectorStoreManager):
+        """
+        Build the retrieval QA chain over a vector store.
+        
+        Args:
+            vs_manager: Loaded vector store manager
+            
+        Returns:
+            RetrievalQA chain, or None for the direct engine
+        """
+        if self.answer_engine == "direct":
+            return None
+        
+        return _lazy("RetrievalQA").from_chain_type(
+            llm=self._guarded_llm(),
             chain_type="stuff",
-            retriever=self.vs_manager.get_retriever(search_kwargs={"k": 4}),
+            retriever=vs_manager.get_retriever(search_kwargs={"k": self.top_k}),
             return_source_documents=True,
             chain_type_kwargs={"prompt": self.prompt}
         )
     
-    def ask(self, question: str, return_sources: bool = False) -> dict:
+    def _guarded_llm(self):
+        """
+        The LLM as the QA chain calls it, through the circuit breaker.
+        
+        Only this step of the chain is guarded: a retrieval error is not an
+        LLM failure and must not open the circuit. Failures leave the chain
+        as _LLMStepError, so callers can tell them apart.
+        
+        Returns:
+            Runnable taking the chain's prompt
+        """
+        def invoke(prompt, **kwargs):
+            try:
+                with request_stage("llm"), self.llm_breaker.guard():
+                    return self.llm.invoke(prompt, **kwargs)
+            except Exception as e:
+                raise _LLMStepError(e) from e
+        
+        return _lazy("RunnableLambda")(invoke)
+    
+    def reload(self, version: Optional[str] = None) -> Optional[str]:
+        """
+        Hot-swap the live index to another snapshot version.
+        
+        The new store and chain are built next to the old ones and swapped in
+        with a single assignment, so requests already running finish on the
+        version they started with.
+        
+        Args:
+            version: Snapshot version to serve (defaults to the CURRENT pointer)
+            
+        Returns:
+            The version now being served
+        """
+        if not self.snapshots:
+            raise ValueError("Snapshots are not enabled. Set INDEX_SNAPSHOT_ROOT first.")
+        
+        with self._reload_lock:
+            version = version or self.snapshots.current_version()
+            if not version:
+                raise FileNotFoundError("No active snapshot to load.")
+            
+            vs_manager = self._load_vector_store(version, embeddings=self.vs_manager.embeddings)
+            qa_chain = self._build_qa_chain(vs_manager)
+            
+            with self._pipeline_lock:
+                old_pipeline = self._pipeline
+                self._pipeline = (vs_manager, qa_chain)
+                in_use = self._pipeline_leases.get(id(old_pipeline), 0) > 0
+                if in_use:
+                    self._retired_pipelines[id(old_pipeline)] = old_pipeline
+            self.index_version = version
+            self._on_index_loaded(vs_manager)
+            if not in_use:
+                old_pipeline[0].close()
+            print(f"Now serving index snapshot {version}")
+            return version
+    
+    @contextmanager
+    def _use_pipeline(self, collection: Optional[str] = None) -> Iterator[tuple]:
+        """
+        Get the pipeline to answer from for the length of one request.
+        
+        The live index is read once, so a concurrent reload can't switch
+        versions halfway through a request; a named collection is loaded if
+        needed and not closed until the request finishes.
+        
+        Args:
+            collection: Collection name, or None for the live index
+            
+        Yields:
+            (vector store manager, QA chain) snapshot to use
+        """
+        if collection is None:
+            with self._pipeline_lock:
+                pipeline = self._pipeline
+                key = id(pipeline)
+                self._pipeline_leases[key] = self._pipeline_leases.get(key, 0) + 1
+            try:
+                yield pipeline
+            finally:
+                with self._pipeline_lock:
+                    self._pipeline_leases[key] -= 1
+                    if self._pipeline_leases[key] == 0:
+                        del self._pipeline_leases[key]
+                        retired = self._retired_pipelines.pop(key, None)
+                    else:
+                        retired = None
+                if retired is not None:
+                    # The last request on a swapped-out index closes it
+                    retired[0].close()
+            return
+        if self.collections is None:
+            raise ValueError("Collections are not enabled. Set COLLECTIONS_ROOT first.")
+        with self.collections.lease(collection) as pipeline:
+            yield pipeline
+    
+    def _load_collection(self, name: str, persist_directory: str) -> tuple:
+        """
+        Load a named collection, sharing the live index's embedding model.
+        
+        Args:
+            name: Collection name
+            persist_directory: Index directory of the collection
+            
+        Returns:
+            (vector store manager, QA chain) for the collection
+        """
+        with profiler.measure(f"load collection {name}"):
+            vs_manager = self._load_vector_store(
+                persist_directory=persist_directory,
+                embeddings=self.vs_manager.embeddings
+            )
+        return vs_manager, self._build_qa_chain(vs_manager)
+    
+    def ask(
+        self,
+        question: str,
+        return_sources: bool = False,
+        session: Optional[ConversationSession] = None,
+        collection: Optional[str] = None
+    ) -> dict:
         """
         Ask a question and get an answer.
         
         Args:
             question: User's question
             return_sources: Whether to return source documents
+            session: Optional conversation session for follow-up questions
+            collection: Collection to answer from (default: the live index)
             
         Returns:
-            Dictionary with 'answer' and optionally 'sources'
+            Dictionary with 'answer' and optionally 'sources' ('intent' is
+            set when the intent gate answered without the LLM, 'faq' when a
+            precomputed answer was served, 'degraded' when the LLM was
+            unavailable and the answer was extracted from the sources)
         """
         if not question or not question.strip():
             return {
@@ -116,36 +527,538 @@ Keep response focused, scannable, and limited to 3-4 key sections."""
                 "sources": []
             }
         
-        # Get answer from the chain
-        result = self.qa_chain.invoke({"query": question})
+        with self._use_pipeline(collection) as pipeline:
+            return self._ask(pipeline, question, return_sources, session, collection)
+    
+    def _ask(
+        self,
+        pipeline: tuple,
+        question: str,
+        return_sources: bool,
+        session: Optional[ConversationSession],
+        collection: Optional[str]
+    ) -> dict:
+        """
+        Answer a question from one pipeline (see ask).
+        
+        Args:
+            pipeline: (vector store manager, QA chain) snapshot to use
+            question: User's question
+            return_sources: Whether to return source documents
+            session: Optional conversation session
+            collection: Collection name, or None for the live index
+            
+        Returns:
+            Response dictionary
+        """
+        with request_stage("gate"):
+            response, query_vector = self._answer_without_llm(pipeline, question, session, collection)
+        if response is not None:
+            if not return_sources:
+                del response["sources"]
+            return response
+        
+        if session is not None:
+            return self._ask_in_session(pipeline, question, return_sources, session, query_vector)
+        
+        if self.answer_engine == "direct" or self.topic_routing != "off" or query_vector is not None:
+            documents = self._retrieve(pipeline, question, query_vector)
+            answer, degraded = self._generate_answer(pipeline, question, documents)
+        else:
+            try:
+                with request_stage("chain"):
+                    result = pipeline[1].invoke({"query": question})
+                answer, degraded = result["result"], False
+                documents = result.get("source_documents", [])
+            except _LLMStepError as e:
+                # Retrieval succeeded inside the chain; only the LLM is unavailable
+                documents = self._retrieve(pipeline, question)
+                answer, degraded = self._degraded_answer(question, documents, e.error)
         
         response = {
-            "answer": result["result"]
+            "answer": answer
         }
+        if degraded:
+            response["degraded"] = True
         
         if return_sources:
-            sources = []
-            for doc in result.get("source_documents", []):
-                sources.append({
-                    "source": doc.metadata.get("source", "Unknown"),
-                    "content": doc.page_content[:300]  # First 300 chars
-                })
-            response["sources"] = sources
+            response["sources"] = self._format_sources(documents)
         
         return response
     
-    def chat(self):
+    def stream(
+        self,
+        question: str,
+        session: Optional[ConversationSession] = None,
+        collection: Optional[str] = None
+    ) -> Iterator[dict]:
+        """
+        Answer a question, yielding the answer text as the LLM produces it.
+        
+        Yields {"type": "token", "text": ...} events, then one
+        {"type": "done", ...} event with the full answer, sources and
+        timings ('degraded' is set when the answer was extracted from the
+        sources because the LLM was unavailable). Closing the generator
+        early (e.g. on Ctrl-C) stops the LLM call; an unfinished turn is not
+        added to the session.
+        
+        Args:
+            question: User's question
+            session: Optional conversation session for follow-up questions
+            collection: Collection to answer from (default: the live index)
+            
+        Yields:
+            Event dictionaries
+        """
+        if not question or not question.strip():
+            yield {"type": "token", "text": "Please provide a valid question."}
+            yield {
+                "type": "done",
+                "answer": "Please provide a valid question.",
+                "sources": [],
+                "timings": {"total_ms": 0.0}
+            }
+            return
+        
+        with self._use_pipeline(collection) as pipeline:
+            yield from self._stream(pipeline, question, session, collection)
+    
+    def _stream(
+        self,
+        pipeline: tuple,
+        question: str,
+        session: Optional[ConversationSession],
+        collection: Optional[str]
+    ) -> Iterator[dict]:
+        """
+        Stream an answer from one pipeline (see stream).
+        
+        Args:
+            pipeline: (vector store manager, QA chain) snapshot to use
+            question: User's question
+            session: Optional conversation session
+            collection: Collection name, or None for the live index
+            
+        Yields:
+            Event dictionaries
+        """
+        timings = {}
+        start = time.perf_counter()
+        response, query_vector = self._answer_without_llm(pipeline, question, session, collection)
+        
+        if response is not None:
+            yield {"type": "token", "text": response["answer"]}
+            timings["total_ms"] = round((time.perf_counter() - start) * 1000, 2)
+            yield {"type": "done", **response, "timings": timings}
+            return
+        
+        if session is not None:
+            with session.lock:
+                retrieval_query, documents, reused, prompt_question, retrieval_vector = self._session_context(
+                    pipeline, question, session, query_vector
+                )
+                timings["retrieval_ms"] = round((time.perf_counter() - start) * 1000, 2)
+                answer, degraded = yield from self._stream_answer(prompt_question, documents, timings)
+                session.add_turn(question, answer, retrieval_query, documents, retrieval_vector)
+            extra = {"session_id": session.session_id, "reused_retrieval": reused}
+        else:
+            documents = self._retrieve(pipeline, question, query_vector)
+            timings["retrieval_ms"] = round((time.perf_counter() - start) * 1000, 2)
+            answer, degraded = yield from self._stream_answer(question, documents, timings)
+            extra = {}
+        if degraded:
+            extra["degraded"] = True
+        
+        timings["total_ms"] = round((time.perf_counter() - start) * 1000, 2)
+        yield {
+            "type": "done",
+            "answer": answer,
+            "sources": self._format_sources(documents),
+            "timings": timings,
+            **extra
+        }
+    
+    def _stream_answer(
+        self,
+        question: str,
+        documents: List["Document"],
+        timings: dict
+    ) -> Generator[dict, None, Tuple[str, bool]]:
+        """
+        Stream the LLM answer over already-retrieved documents.
+        
+        Both engines render the same prompt, so streaming always calls the
+        LLM directly instead of going through the chain. If the circuit is
+        open or the LLM fails before its first token, the extractive answer
+        is sent as a single token instead.
+        
+        Args:
+            question: Question text placed in the prompt
+            documents: Context documents
+            timings: Receives first_token_ms and llm_ms
+            
+        Returns:
+            Tuple of (full answer text, whether it is a degraded answer)
+        """
+        start = time.perf_counter()
+        parts = []
+        try:
+            with self.llm_breaker.guard():
+                for chunk in self.llm.stream(self.build_prompt(question, documents)):
+                    if not parts:
+                        timings["first_token_ms"] = round((time.perf_counter() - start) * 1000, 2)
+                    if chunk.content:
+                        parts.append(chunk.content)
+                        yield {"type": "token", "text": chunk.content}
+        except Exception as e:
+            if parts:
+                # Half an answer has been sent already; nothing sensible to append
+                raise
+            answer, degraded = self._degraded_answer(question, documents, e)
+            yield {"type": "token", "text": answer}
+            return answer, degraded
+        timings["llm_ms"] = round((time.perf_counter() - start) * 1000, 2)
+        return "".join(parts), False
+    
+    def _answer_without_llm(
+        self,
+        pipeline: tuple,
+        question: str,
+        session: Optional[ConversationSession],
+        collection: Optional[str] = None
+    ) -> Tuple[Optional[dict], Optional[List[float]]]:
+        """
+        Answer from the intent gate or the FAQ store if possible.
+        
+        The off-topic check and the FAQ store describe the live index, so
+        named collections only get the small-talk rules.
+        
+        Args:
+            pipeline: (vector store manager, QA chain) snapshot to use
+            question: User's question
+            session: Optional conversation session
+            collection: Collection name, or None for the live index
+            
+        Returns:
+            Tuple of (response with 'sources', or None if the question needs
+            the LLM; query embedding if one was computed, for reuse)
+        """
+        # Follow-ups like "and its causes?" only make sense with the history,
+        # so they are never rejected as off-topic
+        decision = self.intent_gate.check(
+            question,
+            embed_query=pipeline[0].embeddings.embed_query,
+            allow_off_topic=collection is None and (session is None or not session.turns)
+        )
+        if decision.answer is not None:
+            response = {"answer": decision.answer, "intent": decision.intent, "sources": []}
+            if session is not None:
+                response["session_id"] = session.session_id
+            return response, None
+        
+        query_vector = decision.query_vector
+        if collection is None and session is None and self.faq_store is not None and self.faq_store.active:
+            if query_vector is None:
+                query_vector = pipeline[0].embeddings.embed_query(question)
+            entry = self.faq_store.match(query_vector)
+            if entry is not None:
+                return {"answer": entry["answer"], "faq": True, "sources": entry["sources"]}, None
+        
+        return None, query_vector
+    
+    def _ask_in_session(
+        self,
+        pipeline: tuple,
+        question: str,
+        return_sources: bool,
+        session: ConversationSession,
+        question_vector: Optional[List[float]] = None
+    ) -> dict:
+        """
+        Answer a question using the session's history.
+        
+        Args:
+            pipeline: (vector store manager, QA chain) snapshot to use
+            question: User's question
+            return_sources: Whether to return source documents
+            session: Conversation session
+            question_vector: Embedding of the question, if already computed
+            
+        Returns:
+            Dictionary with 'answer', 'session_id', 'reused_retrieval'
+            and optionally 'sources'
+        """
+        with session.lock:
+            retrieval_query, documents, reused, prompt_question, retrieval_vector = self._session_context(
+                pipeline, question, session, question_vector
+            )
+            answer, degraded = self._generate_answer(pipeline, prompt_question, documents)
+            session.add_turn(question, answer, retrieval_query, documents, retrieval_vector)
+        
+        response = {
+            "answer": answer,
+            "session_id": session.session_id,
+            "reused_retrieval": reused
+        }
+        if degraded:
+            response["degraded"] = True
+        if return_sources:
+            response["sources"] = self._format_sources(documents)
+        return response
+    
+    def _session_context(
+        self,
+        pipeline: tuple,
+        question: str,
+        session: ConversationSession,
+        question_vector: Optional[List[float]] = None
+    ) -> Tuple[str, List["Document"], bool, str, Optional[List[float]]]:
+        """
+        Retrieve (or reuse) documents and build the question with history.
+        
+        Follow-ups on the same topic reuse the previous turn's retrieved
+        chunks instead of searching again; the bounded history goes into the
+        prompt. Call with session.lock held.
+        
+        Args:
+            pipeline: (vector store manager, QA chain) snapshot to use
+            question: User's question
+            session: Conversation session
+            question_vector: Embedding of the question, if already computed
+            
+        Returns:
+            Tuple of (retrieval query, documents, whether the previous
+            documents were reused, question text for the prompt, embedding
+            of the retrieval query - None when the documents were reused)
+        """
+        vs_manager = pipeline[0]
+        retrieval_query, is_follow_up = condense_question(question, session)
+        reused = False
+        if is_follow_up and session.last_documents and session.last_query_vector is not None:
+            if self._names_new_topic(vs_manager, question, session):
+                # The question names its own subject; prefixing the old
+                # query would pull the search back to the previous topic
+                retrieval_query = question
+            else:
+                if question_vector is None:
+                    question_vector = vs_manager.embeddings.embed_query(question)
+                similarity = cosine_similarity(question_vector, session.last_query_vector)
+                reused = similarity >= self.follow_up_min_similarity
+        
+        retrieval_vector = None
+        if reused:
+            documents = session.last_documents
+        else:
+            if retrieval_query == question and question_vector is not None:
+                retrieval_vector = question_vector
+            else:
+                retrieval_vector = vs_manager.embeddings.embed_query(retrieval_query)
+            documents = self._retrieve(pipeline, retrieval_query, retrieval_vector)
+        
+        history = session.history_text()
+        prompt_question = question
+        if history:
+            prompt_question = (
+                f"Conversation so far:\n{history}\n\n"
+                f"Follow-up question: {question}"
+            )
+        return retrieval_query, documents, reused, prompt_question, retrieval_vector
+    
+    def _names_new_topic(
+        self,
+        vs_manager: VectorStoreManager,
+        question: str,
+        session: ConversationSession
+    ) -> bool:
+        """
+        Check whether a follow-up names a topic the previous chunks don't cover.
+        
+        "Is lung cancer hereditary? What causes it?" after a diabetes turn
+        is worded as a follow-up but is about another disease.
+        
+        Args:
+            vs_manager: Vector store manager of the pipeline
+            question: User's question
+            session: Conversation session
+            
+        Returns:
+            True if the question is about a different topic
+        """
+        topics = vs_manager.mentioned_topics(question)
+        if not topics:
+            return False
+        previous = set()
+        for doc in session.last_documents:
+            previous |= chunk_topics(doc.metadata) or {topic_for_source(doc.metadata.get("source", ""))}
+        return previous.isdisjoint(topics)
+    
+    def _retrieve(
+        self,
+        pipeline: tuple,
+        query: str,
+        query_vector: Optional[List[float]] = None
+    ) -> List["Document"]:
+        """
+        Retrieve the context documents for a query.
+        
+        Args:
+            pipeline: (vector store manager, QA chain) snapshot to use
+            query: Retrieval query
+            query_vector: Embedding of the query, if already computed
+            
+        Returns:
+            Top-k documents
+        """
+        vs_manager, qa_chain = pipeline
+        with request_stage("retrieval"):
+            if self.topic_routing != "off":
+                documents, _ = vs_manager.routed_search(query, k=self.top_k, vector=query_vector)
+                return documents
+            if query_vector is not None:
+                return vs_manager.similarity_search_by_vector(query_vector, k=self.top_k)
+            if self.answer_engine == "direct":
+                return vs_manager.similarity_search(query, k=self.top_k)
+            return qa_chain.retriever.invoke(query)
+    
+    def build_prompt(self, question: str, documents: List["Document"]) -> str:
+        """
+        Render the prompt exactly as the "stuff" chain would.
+        
+        Args:
+            question: Question text placed in the prompt
+            documents: Context documents
+            
+        Returns:
+            Prompt text
+        """
+        context = "\n\n".join(doc.page_content for doc in documents)
+        return render_prompt(self._compiled_prompt, {"context": context, "question": question})
+    
+    def _generate_answer(
+        self,
+        pipeline: tuple,
+        question: str,
+        documents: List["Document"]
+    ) -> Tuple[str, bool]:
+        """
+        Run the LLM over already-retrieved documents.
+        
+        Args:
+            pipeline: (vector store manager, QA chain) snapshot to use
+            question: Question text placed in the prompt
+            documents: Context documents
+            
+        Returns:
+            Tuple of (answer text, whether it is a degraded answer because
+            the circuit is open or the LLM call failed)
+        """
+        try:
+            if self.answer_engine == "direct":
+                with request_stage("llm"), self.llm_breaker.guard():
+                    return self.llm.invoke(self.build_prompt(question, documents)).content, False
+            
+            # The chain's LLM step goes through the breaker (see _guarded_llm)
+            result = pipeline[1].combine_documents_chain.invoke({
+                "input_documents": documents,
+                "question": question
+            })
+            return result["output_text"], False
+        except _LLMStepError as e:
+            return self._degraded_answer(question, documents, e.error)
+        except Exception as e:
+            return self._degraded_answer(question, documents, e)
+    
+    def _degraded_answer(
+        self,
+        question: str,
+        documents: List["Document"],
+        error: Exception
+    ) -> Tuple[str, bool]:
+        """
+        Answer from the retrieved chunks when the LLM is unavailable.
+        
+        Args:
+            question: Question text placed in the prompt
+            documents: Context documents
+            error: Why the LLM was not used
+            
+        Returns:
+            Tuple of (extractive answer text, True)
+        """
+        if not isinstance(error, CircuitOpenError):
+            print(f"LLM call failed, serving an extractive answer: {error!r}")
+        with request_stage("extractive answer"):
+            return extractive_answer(question, documents), True
+    
+    def _format_sources(self, documents: List["Document"]) -> List[dict]:
+        """
+        Convert source documents to response dictionaries.
+        
+        Args:
+            documents: Retrieved documents
+            
+        Returns:
+            List of source dictionaries with chunk ID, source name and page;
+            the text is fetched on demand by chunk ID
+        """
+        sources = []
+        for doc in documents:
+            source = {
+                "chunk_id": doc.metadata.get("chunk_id") or doc.id,
+                "source": doc.metadata.get("source", "Unknown"),
+                "page": doc.metadata.get("page")
+            }
+            if not source["chunk_id"]:
+                # Indexes built before chunk IDs existed: inline a preview instead
+                source["content"] = doc.page_content[:300]
+            sources.append(source)
+        return sources
+    
+    def get_source(self, chunk_id: str) -> Optional[dict]:
+        """
+        Get the full text of a source chunk.
+        
+        Args:
+            chunk_id: Chunk ID from an answer's sources
+            
+        Returns:
+            Source dictionary with content, or None if the chunk is unknown
+        """
+        doc = self.vs_manager.get_chunk(chunk_id)
+        if doc is None:
+            return None
+        return {
+            "chunk_id": chunk_id,
+            "source": doc.metadata.get("source", "Unknown"),
+            "page": doc.metadata.get("page"),
+            "content": doc.page_content
+        }
+    
+    def chat(self, timings: bool = False):
         """
         Interactive chat mode.
+        
+        Answers are printed as they are generated; Ctrl-C stops the current
+        answer and returns to the prompt.
+        
+        Args:
+            timings: Print retrieval and LLM latency after each answer
         """
         print("=" * 70)
         print("Non-Communicable Diseases Chatbot")
         print("=" * 70)
         print("Ask me anything about non-communicable diseases!")
+        print("Press Ctrl-C to stop an answer.")
         print("Type 'quit', 'exit', or 'q' to end the conversation.\n")
         
+        # Keep context so follow-ups like "what about its treatment?" work
+        session = ConversationSession("cli")
+        
         while True:
-            question = input("You: ").strip()
+            try:
+                question = input("You: ").strip()
+            except (KeyboardInterrupt, EOFError):
+                question = "quit"
             
             if question.lower() in ['quit', 'exit', 'q']:
                 print("\nThank you for using the NCD Chatbot. Stay healthy!")
@@ -156,18 +1069,35 @@ Keep response focused, scannable, and limited to 3-4 key sections."""
             
             print("\nChatbot: ", end="", flush=True)
             
+            events = self.stream(question, session=session)
             try:
-                response = self.ask(question, return_sources=True)
-                print(response["answer"])
+                response = None
+                for event in events:
+                    if event["type"] == "token":
+                        print(event["text"], end="", flush=True)
+                    else:
+                        response = event
+                print()
                 
-                # Show sources if available
+                # Show sources once the answer is complete
                 if response.get("sources"):
                     print("\n📚 Sources:")
                     for i, source in enumerate(response["sources"], 1):
-                        print(f"  {i}. {source['source']}")
+                        page = f" (page {source['page']})" if source.get("page") else ""
+                        print(f"  {i}. {source['source']}{page}")
+                
+                if timings:
+                    print("\n⏱  " + "  ".join(
+                        f"{name.replace('_ms', '')}: {value:.0f} ms"
+                        for name, value in response["timings"].items()
+                    ))
                 
                 print()
             
+            except KeyboardInterrupt:
+                events.close()
+                print("\n[Answer cancelled]\n")
+            
             except Exception as e:
                 print(f"Error: {str(e)}\n")
 
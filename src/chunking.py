@@ -0,0 +1,244 @@
+"""
+Chunking strategies module.
+Builds the text splitter used by DataIngestion: the original character-based
+splitter, or splitters that measure chunks in embedding-model tokens and cut
+at sentence or section boundaries.
+"""
+
+import functools
+import re
+from typing import Callable, List, Optional
+
+from langchain_core.documents import Document
+from langchain_text_splitters import RecursiveCharacterTextSplitter, TextSplitter
+
+CHUNKING_STRATEGIES = ("recursive", "token", "sentence", "header")
+
+# Default (chunk_size, chunk_overlap): characters for "recursive", embedding
+# tokens otherwise. all-MiniLM-L6-v2 truncates input after 256 tokens.
+DEFAULT_SIZES = {
+    "recursive": (1000, 200),
+    "token": (200, 20),
+    "sentence": (200, 20),
+    "header": (200, 20),
+}
+
+_TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+# A sentence and the whitespace after it
+_SENTENCE_PATTERN = re.compile(r".+?(?:[.!?]+(?=\s|$)|$)\s*", re.DOTALL)
+
+
+def approximate_tokens(text: str) -> int:
+    """
+    Estimate the token count of a text without a tokenizer.
+
+    Args:
+        text: Text to measure
+
+    Returns:
+        Number of words and punctuation marks
+    """
+    return len(_TOKEN_PATTERN.findall(text))
+
+
+@functools.lru_cache(maxsize=1)
+def embedding_token_counter() -> Callable[[str], int]:
+    """
+    Get a function counting tokens the way the embedding model sees them.
+
+    Falls back to approximate_tokens() when the model's tokenizer can't be
+    loaded (e.g. offline before the model was first downloaded).
+
+    Returns:
+        Callable mapping a text to its token count
+    """
+    from src.vector_store import EMBEDDING_MODEL_NAME
+
+    try:
+        from transformers import AutoTokenizer
+
+        tokenizer = AutoTokenizer.from_pretrained(EMBEDDING_MODEL_NAME)
+    except Exception as e:
+        print(f"Could not load the {EMBEDDING_MODEL_NAME} tokenizer ({str(e)}); estimating token counts")
+        return approximate_tokens
+    return lambda text: len(tokenizer.encode(text, add_special_tokens=False))
+
+
+def _find_chunk(text: str, chunk: str, position: int) -> int:
+    found = text.find(chunk, position)
+    if found >= 0:
+        return found
+    # Splitting long runs rejoins pieces with single separators, so the chunk
+    # may differ from the text in whitespace only
+    pattern = r"\s+".join(re.escape(word) for word in chunk.split())
+    match = re.compile(pattern).search(text, position) or re.compile(pattern).search(text)
+    return match.start() if match else -1
+
+
+class _LocatingTextSplitter(TextSplitter):
+    """Splitter that finds each chunk's start offset by searching forward."""
+
+    def create_documents(self, texts: List[str], metadatas: Optional[List[dict]] = None) -> List[Document]:
+        # TextSplitter computes start_index with chunk_overlap, which is in
+        # tokens here, not characters; search after the previous chunk instead
+        metadatas = metadatas or [{}] * len(texts)
+        documents = []
+        for text, metadata in zip(texts, metadatas):
+            start = -1
+            for chunk in self.split_text(text):
+                start = _find_chunk(text, chunk, start + 1)
+                chunk_metadata = dict(metadata)
+                if self._add_start_index:
+                    chunk_metadata["start_index"] = start
+                documents.append(Document(page_content=chunk, metadata=chunk_metadata))
+        return documents
+
+
+class TokenTextSplitter(_LocatingTextSplitter, RecursiveCharacterTextSplitter):
+    """Recursive paragraph/line/word splitter with token-based chunk sizes."""
+
+
+class SentenceTextSplitter(_LocatingTextSplitter):
+    """Packs whole sentences into chunks; only over-long sentences are cut."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._fallback = RecursiveCharacterTextSplitter(
+            chunk_size=self._chunk_size,
+            chunk_overlap=0,
+            length_function=self._length_function,
+            # Pieces are rejoined without a separator, so keep their whitespace
+            strip_whitespace=False,
+        )
+
+    def split_text(self, text: str) -> List[str]:
+        pieces = []
+        for sentence in _SENTENCE_PATTERN.findall(text):
+            if self._length_function(sentence) > self._chunk_size:
+                pieces.extend(self._fallback.split_text(sentence))
+            else:
+                pieces.append(sentence)
+        # Sentences keep their trailing whitespace, so join without a separator
+        return self._merge_splits(pieces, "")
+
+
+class HeaderTextSplitter(_LocatingTextSplitter):
+    """Cuts only at section headings unless a section is too long.
+
+    Consecutive short sections are packed into one chunk; a section longer
+    than chunk_size is split by section_splitter. PDFs have no heading
+    markup, so a heading is a short line that starts with a capital letter,
+    has no closing punctuation (a question mark is fine) and follows the end
+    of a sentence. Chunks get their first heading as "section" metadata.
+    """
+
+    def __init__(self, section_splitter: TextSplitter, max_header_words: int = 8, **kwargs):
+        super().__init__(**kwargs)
+        self.section_splitter = section_splitter
+        self.max_header_words = max_header_words
+
+    def find_headers(self, text: str) -> List[tuple]:
+        """
+        Find section headings in extracted PDF text.
+
+        Args:
+            text: Document text
+
+        Returns:
+            List of (offset, heading) tuples in document order
+        """
+        headers = []
+        offset = 0
+        previous = ""
+        for line in text.splitlines(keepends=True):
+            stripped = line.strip()
+            if (
+                stripped
+                and stripped[0].isupper()
+                and len(stripped.split()) <= self.max_header_words
+                and not stripped.endswith((".", ",", ";", ":"))
+                and (not previous or previous.endswith((".", "!", "?", ":", ")")) or headers and headers[-1][1] == previous)
+            ):
+                headers.append((offset + line.index(stripped), stripped))
+            if stripped:
+                previous = stripped
+            offset += len(line)
+        return headers
+
+    def split_text(self, text: str) -> List[str]:
+        bounds = [offset for offset, _ in self.find_headers(text)]
+        if not bounds or bounds[0] != 0:
+            bounds.insert(0, 0)
+
+        chunks = []
+        current = ""
+        for start, end in zip(bounds, bounds[1:] + [len(text)]):
+            section = text[start:end]
+            if self._length_function(current + section) <= self._chunk_size:
+                current += section
+                continue
+            if current.strip():
+                chunks.append(current.strip())
+            current = ""
+            if self._length_function(section) <= self._chunk_size:
+                current = section
+            else:
+                chunks.extend(self.section_splitter.split_text(section))
+        if current.strip():
+            chunks.append(current.strip())
+        return chunks
+
+    def create_documents(self, texts: List[str], metadatas: Optional[List[dict]] = None) -> List[Document]:
+        metadatas = metadatas or [{}] * len(texts)
+        documents = []
+        for text, metadata in zip(texts, metadatas):
+            headers = self.find_headers(text)
+            for document in super().create_documents([text], [metadata]):
+                start = document.metadata.get("start_index", 0)
+                section = [heading for offset, heading in headers if offset <= start]
+                if section:
+                    document.metadata["section"] = section[-1]
+                documents.append(document)
+        return documents
+
+
+def make_text_splitter(
+    strategy: str = "recursive",
+    chunk_size: Optional[int] = None,
+    chunk_overlap: Optional[int] = None,
+    length_function: Optional[Callable[[str], int]] = None
+) -> TextSplitter:
+    """
+    Build the text splitter for a chunking strategy.
+
+    Args:
+        strategy: "recursive" (1000 characters, the original splitter),
+            "token" (embedding tokens), "sentence" (whole sentences) or
+            "header" (PDF sections, then sentences)
+        chunk_size: Chunk size in characters ("recursive") or tokens
+        chunk_overlap: Overlap in the same unit as chunk_size
+        length_function: Token counter (default: embedding_token_counter())
+
+    Returns:
+        Text splitter that adds start_index metadata
+    """
+    if strategy not in CHUNKING_STRATEGIES:
+        raise ValueError(
+            f"Unknown chunking strategy '{strategy}'. Choose one of: {', '.join(CHUNKING_STRATEGIES)}"
+        )
+    default_size, default_overlap = DEFAULT_SIZES[strategy]
+    options = {
+        "chunk_size": chunk_size or default_size,
+        "chunk_overlap": default_overlap if chunk_overlap is None else chunk_overlap,
+        "add_start_index": True,
+    }
+
+    if strategy == "recursive":
+        return RecursiveCharacterTextSplitter(length_function=len, **options)
+
+    options["length_function"] = length_function or embedding_token_counter()
+    if strategy == "token":
+        return TokenTextSplitter(**options)
+    if strategy == "sentence":
+        return SentenceTextSplitter(**options)
+    return HeaderTextSplitter(section_splitter=SentenceTextSplitter(**options), **options)
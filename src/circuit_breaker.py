@@ -0,0 +1,253 @@
+"""
+Circuit breaker module.
+Stops calling the LLM after repeated failures or timeouts and builds
+extractive answers from the retrieved chunks while it is unavailable.
+"""
+
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Callable, Iterator, List, Optional
+
+if TYPE_CHECKING:
+    from langchain_core.documents import Document
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+DEGRADED_INTRO = (
+    "The answer service is temporarily unavailable, so here are the most relevant "
+    "passages from the source documents:"
+)
+DEGRADED_NOTE = "Note: This is educational information. Always consult a healthcare professional for medical advice."
+
+SENTENCE_PATTERN = re.compile(r"(?<=[.!?])\s+(?=[A-Z0-9\"'(])")
+WORD_PATTERN = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset(
+    "a an and are as at be by can do does for from how i if in is it its me my of on or "
+    "should that the their there these this to was what when where which who why will with you your".split()
+)
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling the LLM while the circuit is open."""
+
+
+class CircuitBreaker:
+    """Closed / open / half-open breaker shared by all requests of a worker."""
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Initialize the breaker.
+
+        Args:
+            failure_threshold: Consecutive failed calls that open the circuit
+            reset_timeout: Seconds the circuit stays open before one probe
+                call is let through (half-open)
+            clock: Time source, replaceable in tests
+        """
+        if failure_threshold < 1:
+            raise ValueError("failure_threshold must be at least 1")
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._state = CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._counts = {"calls": 0, "failures": 0, "rejected": 0, "opened": 0}
+        self._last_error = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """Current state; an open circuit past its reset timeout reads as half-open."""
+        with self._lock:
+            if self._state == OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+                return HALF_OPEN
+            return self._state
+
+    def allow(self) -> bool:
+        """
+        Check whether a call may go to the LLM now.
+
+        In the half-open state only one probe call is allowed at a time; its
+        outcome closes or reopens the circuit. Every allowed call must be
+        followed by record_success, record_failure or release.
+
+        Returns:
+            True if the call may proceed
+        """
+        with self._lock:
+            if self._state == OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+                self._state = HALF_OPEN
+            if self._state == CLOSED or (self._state == HALF_OPEN and not self._probe_in_flight):
+                self._probe_in_flight = self._state == HALF_OPEN
+                self._counts["calls"] += 1
+                return True
+            self._counts["rejected"] += 1
+            return False
+
+    def record_success(self) -> None:
+        """Record a successful call; a successful probe closes the circuit."""
+        with self._lock:
+            if self._state == HALF_OPEN:
+                print("LLM circuit closed: probe call succeeded")
+            self._state = CLOSED
+            self._consecutive_failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self, error: Optional[BaseException] = None) -> None:
+        """
+        Record a failed or timed-out call.
+
+        Args:
+            error: The exception the call raised
+        """
+        with self._lock:
+            self._counts["failures"] += 1
+            self._consecutive_failures += 1
+            self._last_error = repr(error) if error is not None else None
+            if self._state == HALF_OPEN or self._consecutive_failures >= self.failure_threshold:
+                if self._state != OPEN:
+                    self._counts["opened"] += 1
+                    print(
+                        f"LLM circuit opened after {self._consecutive_failures} failure(s); "
+                        f"retrying in {self.reset_timeout:g}s. Last error: {self._last_error}"
+                    )
+                self._state = OPEN
+                self._opened_at = self._clock()
+            self._probe_in_flight = False
+
+    def release(self) -> None:
+        """Give back an allowed call that was abandoned without an outcome."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    @contextmanager
+    def guard(self) -> Iterator[None]:
+        """
+        Run the body as one LLM call.
+
+        An exception in the body counts as a failure and is re-raised; a body
+        abandoned by GeneratorExit or KeyboardInterrupt (a closed stream)
+        counts as neither.
+
+        Raises:
+            CircuitOpenError: If the circuit is open
+        """
+        if not self.allow():
+            raise CircuitOpenError("LLM circuit is open")
+        try:
+            yield
+        except Exception as e:
+            self.record_failure(e)
+            raise
+        except BaseException:
+            self.release()
+            raise
+        self.record_success()
+
+    def call(self, fn: Callable, *args, **kwargs):
+        """
+        Call fn through the breaker.
+
+        Raises:
+            CircuitOpenError: If the circuit is open
+        """
+        with self.guard():
+            return fn(*args, **kwargs)
+
+    def stats(self) -> dict:
+        """
+        Get the breaker state and counters.
+
+        Returns:
+            Dictionary with state, settings, counters and the last error
+        """
+        state = self.state
+        with self._lock:
+            retry_in = None
+            if state == OPEN:
+                retry_in = round(max(self.reset_timeout - (self._clock() - self._opened_at), 0.0), 1)
+            return {
+                "state": state,
+                "failure_threshold": self.failure_threshold,
+                "reset_timeout_seconds": self.reset_timeout,
+                "consecutive_failures": self._consecutive_failures,
+                "retry_in_seconds": retry_in,
+                "last_error": self._last_error,
+                **self._counts,
+            }
+
+
+def _terms(text: str) -> List[str]:
+    return [word for word in WORD_PATTERN.findall(text.lower()) if word not in STOPWORDS and len(word) > 1]
+
+
+def extractive_answer(question: str, documents: List["Document"], max_sentences: int = 4) -> str:
+    """
+    Build an answer from the retrieved chunks without the LLM.
+
+    Sentences are scored by the question terms they contain, weighted so
+    terms found in fewer sentences count more; ties go to the sentence from
+    the higher-ranked chunk. The picked sentences keep their source and page.
+
+    Args:
+        question: User's question
+        documents: Retrieved chunks, best first
+        max_sentences: Number of sentences to return
+
+    Returns:
+        Plain-text answer in the same layout as LLM answers
+    """
+    query_terms = set(_terms(question))
+    candidates = []
+    for rank, doc in enumerate(documents):
+        text = " ".join(doc.page_content.split())
+        for sentence in SENTENCE_PATTERN.split(text):
+            words = sentence.split()
+            if len(words) < 5 or len(words) > 80:
+                continue
+            candidates.append((rank, sentence, set(_terms(sentence)), doc.metadata))
+
+    if not candidates:
+        return (
+            "The answer service is temporarily unavailable and no matching passages were found. "
+            "Please try again in a moment.\n\n" + DEGRADED_NOTE
+        )
+
+    frequency = {}
+    for _, _, terms, _ in candidates:
+        for term in terms & query_terms:
+            frequency[term] = frequency.get(term, 0) + 1
+
+    def score(candidate):
+        rank, _, terms, _ = candidate
+        return (-sum(1.0 / frequency[term] for term in terms & query_terms), rank)
+
+    picked = []
+    seen = set()
+    for candidate in sorted(candidates, key=score):
+        key = candidate[1].lower()
+        if key in seen:
+            continue
+        seen.add(key)
+        picked.append(candidate)
+        if len(picked) == max_sentences:
+            break
+
+    lines = []
+    for _, sentence, _, metadata in picked:
+        citation = str(metadata.get("source", "Unknown"))
+        if metadata.get("page") is not None:
+            citation += f", page {metadata['page']}"
+        lines.append(f"• {sentence} ({citation})")
+    return f"{DEGRADED_INTRO}\n\n" + "\n".join(lines) + f"\n\n{DEGRADED_NOTE}"
@@ -0,0 +1,247 @@
+"""
+Collection registry module.
+Loads named collections on first use and keeps the most recently used ones
+in memory, within a count and memory budget.
+"""
+
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional
+
+# Collection names are directory names under the registry root
+COLLECTION_NAME_PATTERN = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_-]{0,63}$")
+
+
+class _Entry:
+    """A loaded collection and the requests currently using it."""
+
+    def __init__(self, value, memory_bytes: int, load_ms: float):
+        self.value = value
+        self.memory_bytes = memory_bytes
+        self.load_ms = load_ms
+        self.loaded_at = time.time()
+        self.hits = 0
+        self.leases = 0
+        self.evicted = False
+
+
+class CollectionRegistry:
+    """LRU cache of loaded collections, one subdirectory of root each."""
+
+    def __init__(
+        self,
+        root: str,
+        load: Callable[[str, str], object],
+        memory_bytes: Callable[[object], int],
+        close: Callable[[object], None],
+        max_loaded: int = 4,
+        max_memory_mb: Optional[float] = None
+    ):
+        """
+        Initialize the registry.
+
+        Args:
+            root: Directory with one index directory per collection
+            load: Loads a collection, given its name and directory
+            memory_bytes: Estimated resident size of a loaded collection
+            close: Releases a collection once it is evicted and unused
+            max_loaded: Most collections kept loaded at once
+            max_memory_mb: Most estimated memory used by loaded collections
+                (None for no limit); the collection being requested is
+                always kept, even if it alone is over the limit
+        """
+        if max_loaded < 1:
+            raise ValueError("max_loaded must be at least 1")
+        self.root = root
+        self.max_loaded = max_loaded
+        self.max_memory_mb = max_memory_mb
+        self._load = load
+        self._memory_bytes = memory_bytes
+        self._close = close
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._load_locks: Dict[str, threading.Lock] = {}
+        self._counts = {"hits": 0, "loads": 0, "evictions": 0}
+        self._lock = threading.Lock()
+
+    def path_for(self, name: str) -> str:
+        """
+        Get the index directory of a collection.
+
+        Args:
+            name: Collection name
+
+        Returns:
+            Directory path
+        """
+        if not COLLECTION_NAME_PATTERN.match(name):
+            raise ValueError(
+                f"Invalid collection name '{name}'. Use up to 64 letters, digits, '-' and '_'."
+            )
+        return os.path.join(self.root, name)
+
+    def exists(self, name: str) -> bool:
+        """Check whether a collection with this name is on disk."""
+        return bool(COLLECTION_NAME_PATTERN.match(name)) and os.path.isdir(self.path_for(name))
+
+    def names(self) -> List[str]:
+        """
+        List the collections on disk.
+
+        Returns:
+            Sorted collection names
+        """
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(name for name in os.listdir(self.root) if self.exists(name))
+
+    @contextmanager
+    def lease(self, name: str) -> Iterator[object]:
+        """
+        Use a collection, loading it if needed.
+
+        The collection is not closed while the body runs, even if it is
+        evicted meanwhile.
+
+        Args:
+            name: Collection name
+
+        Yields:
+            The loaded collection
+
+        Raises:
+            KeyError: If there is no such collection
+        """
+        entry = self._acquire(name)
+        try:
+            yield entry.value
+        finally:
+            with self._lock:
+                entry.leases -= 1
+                release = entry.evicted and entry.leases == 0
+            if release:
+                self._close(entry.value)
+
+    def _acquire(self, name: str) -> _Entry:
+        """Get a collection's entry with one lease taken, loading it on a miss."""
+        if not self.exists(name):
+            raise KeyError(f"Unknown collection '{name}'")
+        with self._lock:
+            entry = self._hit(name)
+            if entry is None:
+                load_lock = self._load_locks.setdefault(name, threading.Lock())
+        if entry is not None:
+            return entry
+
+        # One load per collection at a time; other collections stay available
+        with load_lock:
+            with self._lock:
+                entry = self._hit(name)
+            if entry is not None:
+                return entry
+
+            start = time.perf_counter()
+            value = self._load(name, self.path_for(name))
+            entry = _Entry(value, self._memory_bytes(value), (time.perf_counter() - start) * 1000)
+            print(
+                f"Loaded collection '{name}' in {entry.load_ms:.0f} ms "
+                f"(~{entry.memory_bytes / 1e6:.1f} MB)"
+            )
+
+            with self._lock:
+                self._counts["loads"] += 1
+                entry.leases = 1
+                self._entries[name] = entry
+                evicted = self._evict_over_budget()
+        for value in evicted:
+            self._close(value)
+        return entry
+
+    def _hit(self, name: str) -> Optional[_Entry]:
+        """Take a lease on a loaded entry and mark it most recently used (lock held)."""
+        entry = self._entries.get(name)
+        if entry is not None:
+            self._entries.move_to_end(name)
+            entry.hits += 1
+            entry.leases += 1
+            self._counts["hits"] += 1
+        return entry
+
+    def _evict_over_budget(self) -> List[object]:
+        """
+        Drop least recently used entries until within budget (lock held).
+
+        The most recently used entry is never dropped.
+
+        Returns:
+            Evicted values that nothing is using and can be closed now
+        """
+        to_close = []
+        limit = self.max_memory_mb * 1e6 if self.max_memory_mb is not None else None
+        while len(self._entries) > 1:
+            total = sum(entry.memory_bytes for entry in self._entries.values())
+            if len(self._entries) <= self.max_loaded and (limit is None or total <= limit):
+                break
+            name = next(iter(self._entries))
+            entry = self._entries.pop(name)
+            entry.evicted = True
+            self._counts["evictions"] += 1
+            print(f"Evicted collection '{name}' (least recently used)")
+            if entry.leases == 0:
+                to_close.append(entry.value)
+        return to_close
+
+    def evict(self, name: str) -> bool:
+        """
+        Unload a collection (once the requests using it finish).
+
+        Args:
+            name: Collection name
+
+        Returns:
+            True if it was loaded
+        """
+        with self._lock:
+            entry = self._entries.pop(name, None)
+            if entry is None:
+                return False
+            entry.evicted = True
+            self._counts["evictions"] += 1
+            close_now = entry.leases == 0
+        if close_now:
+            self._close(entry.value)
+        return True
+
+    def stats(self) -> dict:
+        """
+        Get the loaded collections and cache counters.
+
+        Returns:
+            Dictionary with settings, counters and one item per loaded
+            collection, most recently used last
+        """
+        with self._lock:
+            loaded = [
+                {
+                    "name": name,
+                    "memory_mb": round(entry.memory_bytes / 1e6, 2),
+                    "load_ms": round(entry.load_ms, 2),
+                    "loaded_at": round(entry.loaded_at, 3),
+                    "hits": entry.hits,
+                    "in_use": entry.leases,
+                }
+                for name, entry in self._entries.items()
+            ]
+            counts = dict(self._counts)
+        return {
+            "root": self.root,
+            "available": self.names(),
+            "max_loaded": self.max_loaded,
+            "max_memory_mb": self.max_memory_mb,
+            "memory_mb": round(sum(item["memory_mb"] for item in loaded), 2),
+            "loaded": loaded,
+            **counts,
+        }
@@ -3,28 +3,73 @@ Data ingestion module for loading and processing disease information documents.
 Supports PDF, TXT, and DOCX files.
 """
 
+import bisect
+import hashlib
 import os
-from typing import List
-from langchain_text_splitters import RecursiveCharacterTextSplitter
+from typing import List, Optional
 from langchain_core.documents import Document
+from src.chunking import make_text_splitter
+from src.dedupe import ChunkDeduplicator, DedupeReport
+from src.topics import topic_for_source
+
+
+def make_chunk_id(source: str, start_index: int, content: str) -> str:
+    """
+    Build a stable chunk ID from the chunk's source, position and text.
+    
+    Re-ingesting unchanged documents yields the same IDs, so clients can
+    cache chunk text by ID.
+    
+    Args:
+        source: Source filename
+        start_index: Character offset of the chunk in its document
+        content: Chunk text
+        
+    Returns:
+        16-character hexadecimal ID
+    """
+    digest = hashlib.sha1(f"{source}\x00{start_index}\x00{content}".encode("utf-8"))
+    return digest.hexdigest()[:16]
 
 
 class DataIngestion:
     """Handles loading and processing of disease documents."""
     
-    def __init__(self, data_dir: str = "data"):
+    def __init__(
+        self,
+        data_dir: str = "data",
+        dedupe_threshold: Optional[float] = None,
+        chunking: Optional[str] = None,
+        chunk_size: Optional[int] = None,
+        chunk_overlap: Optional[int] = None
+    ):
         """
         Initialize the data ingestion module.
         
         Args:
             data_dir: Directory containing the disease information files
+            dedupe_threshold: Shingle similarity at which chunks count as
+                near-duplicates (default: CHUNK_DEDUPE_THRESHOLD env var or
+                0, which keeps every chunk)
+            chunking: Chunking strategy (see src.chunking; default:
+                CHUNKING_STRATEGY env var or "recursive")
+            chunk_size: Chunk size in the strategy's unit (default:
+                CHUNK_SIZE env var or the strategy's default)
+            chunk_overlap: Chunk overlap in the same unit (default:
+                CHUNK_OVERLAP env var or the strategy's default)
         """
         self.data_dir = data_dir
-        self.text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=1000,
-            chunk_overlap=200,
-            length_function=len,
-        )
+        self.chunking = chunking or os.getenv("CHUNKING_STRATEGY", "recursive")
+        if chunk_size is None and os.getenv("CHUNK_SIZE"):
+            chunk_size = int(os.getenv("CHUNK_SIZE"))
+        if chunk_overlap is None and os.getenv("CHUNK_OVERLAP"):
+            chunk_overlap = int(os.getenv("CHUNK_OVERLAP"))
+        self.text_splitter = make_text_splitter(self.chunking, chunk_size, chunk_overlap)
+        if dedupe_threshold is None:
+            dedupe_threshold = float(os.getenv("CHUNK_DEDUPE_THRESHOLD", "0"))
+        self.deduplicator = ChunkDeduplicator(threshold=dedupe_threshold) if dedupe_threshold > 0 else None
+        # Report of the last split_documents() call, None when dedupe is off
+        self.dedupe_report: Optional[DedupeReport] = None
     
     def load_pdf_files(self) -> List[Document]:
         """
@@ -36,7 +81,7 @@ class DataIngestion:
         documents = []
         
         try:
-            from pypdf import PdfReader
+            from pypdf import PdfReader  # noqa: F401
         except ImportError:
             print("PyPDF not installed. Install with: pip install pypdf")
             return documents
@@ -47,18 +92,8 @@ class DataIngestion:
         
         for filename in os.listdir(self.data_dir):
             if filename.endswith('.pdf'):
-                file_path = os.path.join(self.data_dir, filename)
                 try:
-                    reader = PdfReader(file_path)
-                    content = ""
-                    for page in reader.pages:
-                        content += page.extract_text()
-                    
-                    doc = Document(
-                        page_content=content,
-                        metadata={"source": filename}
-                    )
-                    documents.append(doc)
+                    documents.extend(self._load_pdf(os.path.join(self.data_dir, filename)))
                     print(f"Loaded: {filename}")
                 except Exception as e:
                     print(f"Error loading {filename}: {str(e)}")
@@ -80,21 +115,54 @@ class DataIngestion:
         
         for filename in os.listdir(self.data_dir):
             if filename.endswith('.txt'):
-                file_path = os.path.join(self.data_dir, filename)
                 try:
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        content = f.read()
-                        doc = Document(
-                            page_content=content,
-                            metadata={"source": filename}
-                        )
-                        documents.append(doc)
-                        print(f"Loaded: {filename}")
+                    documents.extend(self._load_txt(os.path.join(self.data_dir, filename)))
+                    print(f"Loaded: {filename}")
                 except Exception as e:
                     print(f"Error loading {filename}: {str(e)}")
         
         return documents
     
+    def load_file(self, file_path: str) -> List[Document]:
+        """
+        Load a single PDF or TXT file.
+        
+        Args:
+            file_path: Path of the file
+            
+        Returns:
+            List of Document objects
+        """
+        if file_path.endswith('.pdf'):
+            return self._load_pdf(file_path)
+        if file_path.endswith('.txt'):
+            return self._load_txt(file_path)
+        raise ValueError(f"Unsupported file type: {os.path.basename(file_path)}")
+    
+    def _load_pdf(self, file_path: str) -> List[Document]:
+        from pypdf import PdfReader
+        
+        reader = PdfReader(file_path)
+        content = ""
+        page_starts = []
+        for page in reader.pages:
+            # Remember where each page begins to map chunks to pages
+            page_starts.append(len(content))
+            content += page.extract_text()
+        
+        return [Document(
+            page_content=content,
+            metadata={"source": os.path.basename(file_path), "page_starts": page_starts}
+        )]
+    
+    def _load_txt(self, file_path: str) -> List[Document]:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            content = f.read()
+        return [Document(
+            page_content=content,
+            metadata={"source": os.path.basename(file_path)}
+        )]
+    
     def load_all_documents(self) -> List[Document]:
         """
         Load all supported document types from the data directory.
@@ -119,6 +187,10 @@ class DataIngestion:
         """
         Split documents into smaller chunks for better retrieval.
         
+        With a dedupe threshold set, near-duplicate chunks (boilerplate and
+        repeated passages, also across PDFs) are dropped; the kept copy lists
+        the other sources and topics.
+        
         Args:
             documents: List of documents to split
             
@@ -130,8 +202,36 @@ class DataIngestion:
             return []
         
         chunks = self.text_splitter.split_documents(documents)
+        for chunk in chunks:
+            self._annotate_chunk(chunk)
         print(f"Documents split into {len(chunks)} chunks")
+        
+        if self.deduplicator:
+            chunks, self.dedupe_report = self.deduplicator.deduplicate(chunks)
+            print(self.dedupe_report.summary())
         return chunks
+    
+    def _annotate_chunk(self, chunk: Document) -> None:
+        """
+        Add page number, topic and stable chunk ID metadata to a chunk.
+        
+        Args:
+            chunk: Chunk produced by the text splitter
+        """
+        metadata = chunk.metadata
+        start_index = metadata.get("start_index", 0)
+        
+        # Lists can't be stored as Chroma metadata; keep only the page number
+        page_starts = metadata.pop("page_starts", None)
+        if page_starts:
+            metadata["page"] = bisect.bisect_right(page_starts, start_index)
+        
+        # Disease topic used to restrict retrieval (see src.topics)
+        metadata.setdefault("topic", topic_for_source(metadata.get("source", "")))
+        
+        chunk_id = make_chunk_id(metadata.get("source", ""), start_index, chunk.page_content)
+        metadata["chunk_id"] = chunk_id
+        chunk.id = chunk_id
 
 
 if __name__ == "__main__":
@@ -0,0 +1,208 @@
+"""
+Near-duplicate chunk detection module.
+Finds chunks that repeat the same passage (shared boilerplate, copied
+sections across PDFs) with MinHash signatures and LSH banding, so only one
+copy is embedded and the others are recorded as its provenance.
+"""
+
+import re
+import zlib
+from typing import Dict, List, Set, Tuple
+
+from langchain_core.documents import Document
+
+# Mersenne prime for the universal hash family used by MinHash
+_PRIME = (1 << 61) - 1
+_WORD_PATTERN = re.compile(r"\w+")
+
+
+class DedupeReport:
+    """Size of a chunk set before and after removing near-duplicates."""
+
+    def __init__(self, chunks_before: int, chunks_after: int, chars_before: int, chars_after: int):
+        self.chunks_before = chunks_before
+        self.chunks_after = chunks_after
+        self.chars_before = chars_before
+        self.chars_after = chars_after
+
+    @property
+    def chunks_removed(self) -> int:
+        return self.chunks_before - self.chunks_after
+
+    def to_dict(self) -> dict:
+        return {
+            "chunks_before": self.chunks_before,
+            "chunks_after": self.chunks_after,
+            "chunks_removed": self.chunks_removed,
+            "chars_before": self.chars_before,
+            "chars_after": self.chars_after,
+            # Embedding time scales with the number of chunks and their length
+            "chunk_reduction": round(self.chunks_removed / self.chunks_before, 4) if self.chunks_before else 0.0,
+            "char_reduction": round(1 - self.chars_after / self.chars_before, 4) if self.chars_before else 0.0,
+        }
+
+    def summary(self) -> str:
+        stats = self.to_dict()
+        return (
+            f"Removed {self.chunks_removed} near-duplicate chunks "
+            f"({stats['chunk_reduction']:.1%} fewer chunks, "
+            f"{stats['char_reduction']:.1%} less text to embed)"
+        )
+
+
+class ChunkDeduplicator:
+    """MinHash/LSH near-duplicate filter for text chunks."""
+
+    def __init__(self, threshold: float = 0.8, num_perm: int = 128, bands: int = 32, shingle_size: int = 5):
+        """
+        Initialize the deduplicator.
+
+        Args:
+            threshold: Lowest Jaccard similarity of word shingles at which two
+                chunks count as duplicates
+            num_perm: Number of MinHash permutations per signature
+            bands: Number of LSH bands (num_perm must be divisible by it);
+                more bands find more candidate pairs at lower similarity
+            shingle_size: Number of consecutive words per shingle
+        """
+        if not 0 < threshold <= 1:
+            raise ValueError("threshold must be in (0, 1]")
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        import numpy as np
+
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.shingle_size = shingle_size
+        rng = np.random.default_rng(1)
+        self._a = rng.integers(1, _PRIME, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, _PRIME, size=num_perm, dtype=np.uint64)
+
+    def shingles(self, text: str) -> Set[int]:
+        """
+        Hash the overlapping word n-grams of a text.
+
+        Args:
+            text: Chunk text
+
+        Returns:
+            Set of 32-bit shingle hashes
+        """
+        words = _WORD_PATTERN.findall(text.lower())
+        size = min(self.shingle_size, len(words)) or 1
+        return {
+            zlib.crc32(" ".join(words[i:i + size]).encode("utf-8"))
+            for i in range(max(1, len(words) - size + 1))
+        }
+
+    def signature(self, shingles: Set[int]):
+        """
+        Compute the MinHash signature of a shingle set.
+
+        Args:
+            shingles: Shingle hashes from shingles()
+
+        Returns:
+            NumPy array of num_perm minimum hash values
+        """
+        import numpy as np
+
+        values = np.fromiter(shingles, dtype=np.uint64, count=len(shingles))
+        # (a * x + b) mod p for every permutation and shingle; the shingle
+        # hashes are 32-bit and a < 2^61, so reduce a first to avoid overflow
+        hashes = ((self._a[:, None] % (1 << 32)) * values[None, :] + self._b[:, None]) % _PRIME
+        return hashes.min(axis=1)
+
+    def find_duplicates(self, texts: List[str]) -> Dict[int, List[int]]:
+        """
+        Group near-duplicate texts.
+
+        Args:
+            texts: Chunk texts, in document order
+
+        Returns:
+            Mapping of the first text of each duplicate group to the indexes
+            of its later duplicates
+        """
+        shingle_sets = [self.shingles(text) for text in texts]
+        rows = self.num_perm // self.bands
+        buckets: Dict[Tuple[int, bytes], List[int]] = {}
+        for i, shingles in enumerate(shingle_sets):
+            signature = self.signature(shingles)
+            for band in range(self.bands):
+                key = (band, signature[band * rows:(band + 1) * rows].tobytes())
+                buckets.setdefault(key, []).append(i)
+
+        parent = list(range(len(texts)))
+
+        def find(i: int) -> int:
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        checked = set()
+        for members in buckets.values():
+            for n, i in enumerate(members):
+                for j in members[n + 1:]:
+                    if (i, j) in checked:
+                        continue
+                    checked.add((i, j))
+                    # LSH only proposes candidates; confirm with the exact similarity
+                    a, b = shingle_sets[i], shingle_sets[j]
+                    if len(a & b) / len(a | b) >= self.threshold:
+                        root_i, root_j = find(i), find(j)
+                        # Keep the earliest chunk as the group representative
+                        parent[max(root_i, root_j)] = min(root_i, root_j)
+
+        groups: Dict[int, List[int]] = {}
+        for i in range(len(texts)):
+            root = find(i)
+            if root != i:
+                groups.setdefault(root, []).append(i)
+        return groups
+
+    def deduplicate(self, chunks: List[Document]) -> Tuple[List[Document], DedupeReport]:
+        """
+        Drop near-duplicate chunks, keeping the first copy of each passage.
+
+        The kept chunk records where else the passage appeared:
+        "duplicate_sources" lists the other source files (separated by "; ",
+        since Chroma metadata can't hold lists) and "duplicate_count" the
+        number of chunks merged into it.
+
+        Copies are merged across topics too. The kept chunk is flagged with
+        the dropped copies' topics (see src.topics.topic_flag), so searches
+        restricted to any of them still find it.
+
+        Args:
+            chunks: Chunks from the text splitter
+
+        Returns:
+            Tuple of (kept chunks, report)
+        """
+        from src.topics import topic_flag
+
+        groups = self.find_duplicates([chunk.page_content for chunk in chunks])
+        dropped = {i for members in groups.values() for i in members}
+
+        for keep, members in groups.items():
+            metadata = chunks[keep].metadata
+            own_source = metadata.get("source", "")
+            others = sorted({chunks[i].metadata.get("source", "") for i in members} - {own_source})
+            metadata["duplicate_count"] = len(members)
+            if others:
+                metadata["duplicate_sources"] = "; ".join(others)
+            topics = {chunks[i].metadata.get("topic") for i in members} - {metadata.get("topic"), None}
+            for topic in sorted(topics):
+                metadata[topic_flag(topic)] = True
+
+        kept = [chunk for i, chunk in enumerate(chunks) if i not in dropped]
+        report = DedupeReport(
+            chunks_before=len(chunks),
+            chunks_after=len(kept),
+            chars_before=sum(len(chunk.page_content) for chunk in chunks),
+            chars_after=sum(len(chunk.page_content) for chunk in kept),
+        )
+        return kept, report
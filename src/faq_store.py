@@ -0,0 +1,205 @@
+"""
+Precomputed FAQ answer module.
+A build step answers a curated list of common questions per document once,
+offline; at runtime, close matches are served from that file without
+retrieval or an LLM call.
+"""
+
+import json
+import os
+import threading
+from typing import Dict, List, Optional, Sequence
+
+FORMAT_VERSION = 1
+
+
+class FAQStore:
+    """Precomputed answers matched to new questions by embedding similarity."""
+
+    def __init__(
+        self,
+        entries: List[dict],
+        corpus_version: str,
+        embedding_model: Optional[str] = None,
+        min_similarity: float = 0.92
+    ):
+        """
+        Initialize the store.
+
+        Args:
+            entries: Dictionaries with question, answer, sources and embedding
+            corpus_version: Version of the index the answers were built from
+            embedding_model: Name of the model that embedded the questions
+            min_similarity: Lowest cosine similarity served as a match
+        """
+        import numpy as np
+
+        self.entries = entries
+        self.corpus_version = corpus_version
+        self.embedding_model = embedding_model
+        self.min_similarity = min_similarity
+        # Set to False when the live index no longer matches corpus_version
+        self.active = True
+
+        matrix = np.array([entry["embedding"] for entry in entries], dtype=np.float32)
+        if len(entries):
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            matrix = matrix / norms
+        self._matrix = matrix
+        self._hits = 0
+        self._misses = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    @classmethod
+    def load(cls, path: str, min_similarity: float = 0.92) -> "FAQStore":
+        """
+        Load a store written by save().
+
+        Args:
+            path: JSON file path
+            min_similarity: Lowest cosine similarity served as a match
+
+        Returns:
+            FAQStore instance
+        """
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("format_version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported FAQ store format version: {data.get('format_version')}")
+        return cls(
+            data["entries"],
+            corpus_version=data["corpus_version"],
+            embedding_model=data.get("embedding_model"),
+            min_similarity=min_similarity
+        )
+
+    def save(self, path: str) -> None:
+        """
+        Write the store to a JSON file (atomically).
+
+        Args:
+            path: JSON file path
+        """
+        data = {
+            "format_version": FORMAT_VERSION,
+            "corpus_version": self.corpus_version,
+            "embedding_model": self.embedding_model,
+            "entries": self.entries,
+        }
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def match(self, query_vector: Sequence[float]) -> Optional[dict]:
+        """
+        Find the precomputed answer for a question, if one is close enough.
+
+        Args:
+            query_vector: Embedding of the user question
+
+        Returns:
+            The matching entry, or None
+        """
+        if not self.active or not self.entries:
+            return None
+        import numpy as np
+
+        query = np.asarray(query_vector, dtype=np.float32)
+        similarities = self._matrix @ (query / (np.linalg.norm(query) or 1.0))
+        best = int(np.argmax(similarities))
+
+        with self._lock:
+            if similarities[best] >= self.min_similarity:
+                self._hits += 1
+                return self.entries[best]
+            self._misses += 1
+        return None
+
+    def stats(self) -> dict:
+        """
+        Report hit and miss counts.
+
+        Returns:
+            Dictionary of store and match statistics
+        """
+        with self._lock:
+            hits, misses = self._hits, self._misses
+        return {
+            "active": self.active,
+            "entries": len(self.entries),
+            "corpus_version": self.corpus_version,
+            "hits": hits,
+            "misses": misses,
+        }
+
+
+def build_faq_store(chatbot, questions: Dict[str, List[str]]) -> FAQStore:
+    """
+    Answer every curated question with the full pipeline.
+
+    Args:
+        chatbot: NCDChatbot used to produce the answers
+        questions: Curated questions per source document
+
+    Returns:
+        FAQStore for the chatbot's current index
+    """
+    from src.vector_store import EMBEDDING_MODEL_NAME
+
+    vs_manager = chatbot.vs_manager
+    all_questions = [(source, q) for source, source_questions in questions.items() for q in source_questions]
+    # embed_query, because that is how user questions are embedded at runtime
+    embeddings = [vs_manager.embeddings.embed_query(q) for _, q in all_questions]
+
+    entries = []
+    for (source, question), embedding in zip(all_questions, embeddings):
+        print(f"Answering: {question}")
+        response = chatbot.ask(question, return_sources=True)
+        if response.get("degraded"):
+            raise RuntimeError("The LLM is unavailable; not storing an extractive answer as an FAQ answer.")
+        entries.append({
+            "question": question,
+            "source": source,
+            "answer": response["answer"],
+            "sources": response.get("sources", []),
+            "embedding": [round(float(x), 6) for x in embedding],
+        })
+
+    return FAQStore(
+        entries,
+        corpus_version=vs_manager.corpus_version(),
+        embedding_model=EMBEDDING_MODEL_NAME
+    )
+
+
+if __name__ == "__main__":
+    import argparse
+    from dotenv import load_dotenv
+
+    parser = argparse.ArgumentParser(
+        description="Precompute answers to curated questions for instant serving."
+    )
+    parser.add_argument("--questions", default="faq_questions.json",
+                        help="JSON file mapping each source document to its questions")
+    parser.add_argument("--output", default="faq_store.json", help="FAQ store file to write")
+    args = parser.parse_args()
+
+    load_dotenv()
+    # Build from the LLM, not from an existing FAQ store or the intent gate
+    os.environ["FAQ_STORE"] = ""
+    os.environ["INTENT_GATE"] = "off"
+
+    from src.chatbot import NCDChatbot
+
+    with open(args.questions, "r", encoding="utf-8") as f:
+        curated = json.load(f)
+
+    store = build_faq_store(NCDChatbot(), curated)
+    store.save(args.output)
+    print(f"\nSaved {len(store)} answers for corpus version {store.corpus_version} to '{args.output}'")
+    print(f"Serve them with: FAQ_STORE={args.output}")
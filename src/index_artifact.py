@@ -0,0 +1,368 @@
+"""
+Index artifact module.
+Packs a built index (chunks, metadata, embeddings and a fingerprint of the
+embedding model) into one versioned, checksummed file, and installs such a
+file as a ready-to-load index without parsing or embedding anything.
+"""
+
+import hashlib
+import io
+import json
+import os
+import shutil
+import tempfile
+import time
+import zipfile
+from typing import TYPE_CHECKING, List, Optional
+
+import numpy as np
+from src.mmap_index import (
+    EMBEDDINGS_FILE,
+    METADATA_FILE,
+    OFFSETS_FILE,
+    TEXTS_FILE,
+    check_index_dir,
+    replace_index_dir,
+)
+
+if TYPE_CHECKING:
+    from langchain_core.embeddings import Embeddings
+    from src.vector_store import VectorStoreManager
+
+ARTIFACT_FORMAT_VERSION = 1
+MANIFEST_FILE = "manifest.json"
+# Copy of the manifest kept next to an installed index
+INSTALLED_MANIFEST_FILE = "artifact.json"
+INDEX_FILES = (EMBEDDINGS_FILE, OFFSETS_FILE, TEXTS_FILE, METADATA_FILE)
+EMBEDDING_DTYPES = ("float32", "float16")
+
+# Embedded at export and again at load; a different model (or revision)
+# gives different vectors even when the name is the same
+PROBE_TEXTS = [
+    "What are the symptoms of type 2 diabetes?",
+    "High blood pressure often has no warning signs.",
+    "Regular screening helps find colorectal cancer early.",
+]
+MIN_PROBE_SIMILARITY = 0.999
+
+
+class ArtifactError(ValueError):
+    """Raised for a corrupt, unsupported or incompatible index artifact."""
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def model_fingerprint(embeddings: "Embeddings", model_name: str) -> dict:
+    """
+    Fingerprint an embedding model by its name and its vectors for fixed probe texts.
+
+    Args:
+        embeddings: Loaded embedding model
+        model_name: Name the model was loaded by
+
+    Returns:
+        Dictionary with the model name, dimension and probe vectors
+    """
+    probes = np.asarray(embeddings.embed_documents(PROBE_TEXTS), dtype=np.float32)
+    return {
+        "model": model_name,
+        "dim": int(probes.shape[1]),
+        "probes": [[round(float(value), 6) for value in row] for row in probes],
+    }
+
+
+def check_model(manifest: dict, embeddings: "Embeddings", model_name: str) -> None:
+    """
+    Check that an artifact's embeddings came from the model used for queries.
+
+    Args:
+        manifest: Artifact manifest
+        embeddings: Embedding model the server will embed questions with
+        model_name: Name of that model
+
+    Raises:
+        ArtifactError: If the name, dimension or probe vectors differ
+    """
+    expected = manifest["model_fingerprint"]
+    if expected["model"] != model_name:
+        raise ArtifactError(
+            f"Index artifact was embedded with '{expected['model']}', but this server uses '{model_name}'."
+        )
+
+    current = np.asarray(embeddings.embed_documents(PROBE_TEXTS), dtype=np.float32)
+    stored = np.asarray(expected["probes"], dtype=np.float32)
+    if current.shape != stored.shape:
+        raise ArtifactError(
+            f"Index artifact has {stored.shape[1]}-dimensional embeddings, "
+            f"but '{model_name}' produces {current.shape[1]} dimensions."
+        )
+    similarity = np.sum(current * stored, axis=1) / (
+        np.linalg.norm(current, axis=1) * np.linalg.norm(stored, axis=1)
+    )
+    if float(similarity.min()) < MIN_PROBE_SIMILARITY:
+        raise ArtifactError(
+            f"Index artifact does not match the loaded '{model_name}' model "
+            f"(probe similarity {float(similarity.min()):.4f}); rebuild or re-export it."
+        )
+
+
+def export_artifact(
+    vs_manager: "VectorStoreManager",
+    path: str,
+    version: Optional[str] = None,
+    embedding_dtype: str = "float32"
+) -> dict:
+    """
+    Write the loaded index to an artifact file.
+
+    Args:
+        vs_manager: Manager with a loaded chroma or numpy store
+        path: Artifact file to write
+        version: Artifact version (default: corpus version and UTC time)
+        embedding_dtype: "float32", or "float16" for half-size embeddings
+            (cosine scores change by about 1e-4)
+
+    Returns:
+        The artifact manifest
+    """
+    from src.vector_store import EMBEDDING_MODEL_NAME
+
+    if embedding_dtype not in EMBEDDING_DTYPES:
+        raise ValueError(f"embedding_dtype must be one of: {', '.join(EMBEDDING_DTYPES)}")
+
+    corpus_version = vs_manager.corpus_version()
+    with tempfile.TemporaryDirectory() as tmp:
+        index_dir = os.path.join(tmp, "index")
+        count = vs_manager.export_mmap_index(index_dir)
+        members = {}
+        for name in INDEX_FILES:
+            with open(os.path.join(index_dir, name), "rb") as f:
+                members[name] = f.read()
+
+    matrix = np.load(io.BytesIO(members[EMBEDDINGS_FILE]))
+    if embedding_dtype != "float32":
+        buffer = io.BytesIO()
+        np.save(buffer, matrix.astype(embedding_dtype))
+        members[EMBEDDINGS_FILE] = buffer.getvalue()
+
+    manifest = {
+        "format_version": ARTIFACT_FORMAT_VERSION,
+        "version": version or f"{corpus_version}-{time.strftime('%Y%m%dT%H%M%SZ', time.gmtime())}",
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "corpus_version": corpus_version,
+        "count": count,
+        "dim": int(matrix.shape[1]),
+        "embedding_dtype": embedding_dtype,
+        "model_fingerprint": model_fingerprint(vs_manager.embeddings, EMBEDDING_MODEL_NAME),
+        "files": {name: {"sha256": _sha256(data), "bytes": len(data)} for name, data in members.items()},
+    }
+
+    tmp_path = f"{path}.tmp"
+    with zipfile.ZipFile(tmp_path, "w") as archive:
+        archive.writestr(MANIFEST_FILE, json.dumps(manifest, indent=2), zipfile.ZIP_DEFLATED)
+        for name, data in members.items():
+            # Embeddings barely compress; store them as-is so loading is a plain copy
+            compression = zipfile.ZIP_STORED if name.endswith(".npy") else zipfile.ZIP_DEFLATED
+            archive.writestr(name, data, compression)
+    os.replace(tmp_path, path)
+    return manifest
+
+
+def read_manifest(path: str) -> dict:
+    """
+    Read an artifact's manifest without verifying its files.
+
+    Args:
+        path: Artifact file
+
+    Returns:
+        The artifact manifest
+
+    Raises:
+        ArtifactError: If the file is not a supported artifact
+    """
+    try:
+        with zipfile.ZipFile(path) as archive:
+            manifest = json.loads(archive.read(MANIFEST_FILE))
+    except (zipfile.BadZipFile, KeyError, json.JSONDecodeError) as e:
+        raise ArtifactError(f"'{path}' is not an index artifact: {str(e)}")
+
+    if manifest.get("format_version") != ARTIFACT_FORMAT_VERSION:
+        raise ArtifactError(f"Unsupported index artifact format version: {manifest.get('format_version')}")
+    return manifest
+
+
+def _read_verified(archive: zipfile.ZipFile, manifest: dict) -> dict:
+    """Read the index files, checking each against its manifest checksum."""
+    members = {}
+    for name in INDEX_FILES:
+        expected = manifest["files"].get(name)
+        if expected is None:
+            raise ArtifactError(f"Index artifact manifest does not list '{name}'.")
+        try:
+            data = archive.read(name)
+        except KeyError:
+            raise ArtifactError(f"Index artifact is missing '{name}'.")
+        except zipfile.BadZipFile as e:
+            raise ArtifactError(f"Index artifact is corrupt: {str(e)}")
+        if _sha256(data) != expected["sha256"]:
+            raise ArtifactError(f"Checksum mismatch for '{name}'; the artifact is corrupt.")
+        members[name] = data
+    return members
+
+
+def verify_artifact(path: str) -> dict:
+    """
+    Check every file of an artifact against its checksum.
+
+    Args:
+        path: Artifact file
+
+    Returns:
+        The artifact manifest
+
+    Raises:
+        ArtifactError: If the artifact is unsupported or corrupt
+    """
+    manifest = read_manifest(path)
+    with zipfile.ZipFile(path) as archive:
+        _read_verified(archive, manifest)
+    return manifest
+
+
+def installed_manifest(index_dir: str) -> Optional[dict]:
+    """
+    Get the manifest of the artifact an index directory was installed from.
+
+    Args:
+        index_dir: Index directory
+
+    Returns:
+        The manifest, or None if the directory was not installed from an artifact
+    """
+    try:
+        with open(os.path.join(index_dir, INSTALLED_MANIFEST_FILE), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def install_artifact(path: str, index_dir: str) -> dict:
+    """
+    Unpack an artifact into an index directory for the numpy and mmap backends.
+
+    Nothing is rewritten when the directory already holds the same artifact,
+    so a restarted container skips straight to loading. Otherwise the files
+    are verified and unpacked next to the target and swapped into place
+    (see src.mmap_index.replace_index_dir), so a corrupt artifact never
+    replaces a working index and workers starting meanwhile always find one.
+
+    Args:
+        path: Artifact file
+        index_dir: Index directory to create or replace
+
+    Returns:
+        The artifact manifest
+
+    Raises:
+        ArtifactError: If the artifact is unsupported or corrupt
+        ValueError: If index_dir is a directory other than an index
+    """
+    manifest = read_manifest(path)
+    current = installed_manifest(index_dir)
+    if current is not None and current["files"] == manifest["files"]:
+        return manifest
+    check_index_dir(index_dir)
+
+    with zipfile.ZipFile(path) as archive:
+        members = _read_verified(archive, manifest)
+
+    if manifest["embedding_dtype"] != "float32":
+        # The index format is float32; the backends quantize on load if asked
+        buffer = io.BytesIO()
+        np.save(buffer, np.load(io.BytesIO(members[EMBEDDINGS_FILE])).astype(np.float32))
+        members[EMBEDDINGS_FILE] = buffer.getvalue()
+
+    parent = os.path.dirname(os.path.abspath(index_dir))
+    os.makedirs(parent, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(prefix=".artifact-", dir=parent)
+    for name, data in members.items():
+        with open(os.path.join(tmp_dir, name), "wb") as f:
+            f.write(data)
+    with open(os.path.join(tmp_dir, INSTALLED_MANIFEST_FILE), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+
+    try:
+        replace_index_dir(tmp_dir, index_dir)
+    except OSError:
+        # Several workers starting at once may all install the artifact
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        current = installed_manifest(index_dir)
+        if current is None or current["files"] != manifest["files"]:
+            raise
+        return manifest
+    print(f"Installed index artifact {manifest['version']} ({manifest['count']} chunks) to '{index_dir}'")
+    return manifest
+
+
+def _summary(manifest: dict) -> List[str]:
+    fingerprint = manifest["model_fingerprint"]
+    size = sum(entry["bytes"] for entry in manifest["files"].values())
+    return [
+        f"Version:   {manifest['version']} (corpus {manifest['corpus_version']})",
+        f"Created:   {manifest['created_at']}",
+        f"Chunks:    {manifest['count']} x {manifest['dim']} dims, {manifest['embedding_dtype']}",
+        f"Model:     {fingerprint['model']}",
+        f"Size:      {size / 1e6:.1f} MB uncompressed",
+    ]
+
+
+if __name__ == "__main__":
+    import argparse
+    from dotenv import load_dotenv
+    from src.vector_store import EMBEDDING_MODEL_NAME, VectorStoreManager
+
+    parser = argparse.ArgumentParser(description="Export, verify or install a portable index artifact.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    export_parser = commands.add_parser("export", help="Write the built index to an artifact file")
+    export_parser.add_argument("--output", default="ncd_index.zip", help="Artifact file to write")
+    export_parser.add_argument("--backend", default="chroma", choices=["chroma", "numpy"],
+                               help="Backend of the source index")
+    export_parser.add_argument("--source-dir", help="Source index directory (default: the backend's)")
+    export_parser.add_argument("--version", help="Artifact version (default: corpus version and time)")
+    export_parser.add_argument("--float16", action="store_true", help="Store half-size embeddings")
+    verify_parser = commands.add_parser("verify", help="Check an artifact's checksums and model")
+    verify_parser.add_argument("artifact")
+    verify_parser.add_argument("--skip-model", action="store_true",
+                               help="Only check checksums (does not load the embedding model)")
+    install_parser = commands.add_parser("install", help="Unpack an artifact for VECTOR_BACKEND=numpy or mmap")
+    install_parser.add_argument("artifact")
+    install_parser.add_argument("--output", default="numpy_index", help="Index directory to create")
+    args = parser.parse_args()
+
+    load_dotenv()
+
+    if args.command == "export":
+        vs_manager = VectorStoreManager(persist_directory=args.source_dir, backend=args.backend)
+        vs_manager.load_vector_store()
+        manifest = export_artifact(
+            vs_manager,
+            args.output,
+            version=args.version,
+            embedding_dtype="float16" if args.float16 else "float32"
+        )
+        print(f"Wrote '{args.output}' ({os.path.getsize(args.output) / 1e6:.1f} MB)")
+        print("\n".join(_summary(manifest)))
+    elif args.command == "verify":
+        manifest = verify_artifact(args.artifact)
+        print("\n".join(_summary(manifest)))
+        print("Checksums: OK")
+        if not args.skip_model:
+            check_model(manifest, VectorStoreManager(backend="numpy").embeddings, EMBEDDING_MODEL_NAME)
+            print("Model:     matches")
+    else:
+        manifest = install_artifact(args.artifact, args.output)
+        print("\n".join(_summary(manifest)))
+        print(f"Serve it with: VECTOR_BACKEND=numpy VECTOR_STORE_DIR={args.output} uvicorn app:app")
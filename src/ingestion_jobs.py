@@ -0,0 +1,201 @@
+"""
+Background ingestion job module.
+Runs document parsing and embedding in a worker pool so uploads don't block
+the API, and tracks each job's progress for polling.
+"""
+
+import os
+import shutil
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+
+class IngestionJob:
+    """Progress of one uploaded document (queued, running, succeeded or failed)."""
+
+    def __init__(self, filename: str, file_path: str, remove_on_failure: bool = False):
+        self.job_id = uuid.uuid4().hex
+        self.filename = filename
+        self.file_path = file_path
+        self.remove_on_failure = remove_on_failure
+        self.status = "queued"
+        self.chunks_total = 0
+        self.chunks_done = 0
+        self.index_version: Optional[str] = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+
+    def to_dict(self) -> dict:
+        """
+        Describe the job for the API.
+
+        Returns:
+            Dictionary of job fields
+        """
+        return {
+            "job_id": self.job_id,
+            "filename": self.filename,
+            "status": self.status,
+            "chunks_total": self.chunks_total,
+            "chunks_done": self.chunks_done,
+            "index_version": self.index_version,
+            "error": self.error,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class IngestionJobManager:
+    """Queues ingestion jobs on a small thread pool and keeps recent results."""
+
+    def __init__(self, max_workers: int = 1, batch_size: int = 64, max_jobs: int = 100):
+        """
+        Initialize the job manager.
+
+        Args:
+            max_workers: Concurrent jobs; keep this low so embedding doesn't
+                starve the chat requests of CPU
+            batch_size: Chunks embedded and added per vector store call
+            max_jobs: Finished jobs remembered for GET /jobs/{id}
+        """
+        self.batch_size = batch_size
+        self.max_jobs = max_jobs
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ingest")
+        self._jobs: "OrderedDict[str, IngestionJob]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Jobs write to the same index, so they are applied one at a time
+        self._write_lock = threading.Lock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._jobs)
+
+    def submit(self, file_path: str, chatbot, remove_on_failure: bool = False) -> IngestionJob:
+        """
+        Queue a file for ingestion into the chatbot's index.
+
+        Args:
+            file_path: Path of the uploaded file (inside the data directory)
+            chatbot: NCDChatbot whose index receives the chunks
+            remove_on_failure: Delete the file if the job fails, so the same
+                name can be uploaded again
+
+        Returns:
+            The queued job
+        """
+        job = IngestionJob(
+            filename=os.path.basename(file_path),
+            file_path=file_path,
+            remove_on_failure=remove_on_failure
+        )
+        with self._lock:
+            self._jobs[job.job_id] = job
+            self._trim()
+        self._executor.submit(self._run, job, chatbot)
+        return job
+
+    def get(self, job_id: str) -> Optional[IngestionJob]:
+        """
+        Look up a job.
+
+        Args:
+            job_id: Job identifier
+
+        Returns:
+            The job, or None if it is unknown or was forgotten
+        """
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def shutdown(self) -> None:
+        """Stop accepting jobs and wait for running ones to finish."""
+        self._executor.shutdown(wait=True)
+
+    def _trim(self) -> None:
+        # Forget the oldest finished jobs beyond max_jobs
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished_at is not None]
+        for job_id in finished[:max(0, len(self._jobs) - self.max_jobs)]:
+            del self._jobs[job_id]
+
+    def _run(self, job: IngestionJob, chatbot) -> None:
+        # Imported here so the API doesn't pay for the text splitter at startup
+        from src.data_ingestion import DataIngestion
+
+        job.status = "running"
+        try:
+            ingestion = DataIngestion()
+            chunks = ingestion.split_documents(ingestion.load_file(job.file_path))
+            if not chunks:
+                raise ValueError("No text could be extracted from the file.")
+            job.chunks_total = len(chunks)
+
+            with self._write_lock:
+                job.index_version = self._add_chunks(job, chunks, chatbot)
+            job.status = "succeeded"
+        except Exception as e:
+            job.error = str(e)
+            job.status = "failed"
+            print(f"Ingestion job {job.job_id} ({job.filename}) failed: {str(e)}")
+            if job.remove_on_failure:
+                try:
+                    os.remove(job.file_path)
+                except OSError:
+                    pass
+        finally:
+            job.finished_at = time.time()
+
+    def _add_chunks(self, job: IngestionJob, chunks, chatbot) -> Optional[str]:
+        """
+        Add chunks in batches, into a new snapshot when snapshots are enabled.
+
+        Returns:
+            The snapshot version now being served, if any
+        """
+        snapshots = chatbot.snapshots
+        if snapshots is None:
+            # Live update: Chroma and the numpy store both accept writes while serving
+            vs_manager = chatbot.vs_manager
+            if job.filename in vs_manager.get_existing_sources():
+                raise ValueError(f"'{job.filename}' is already in the vector store.")
+            self._add_batches(job, chunks, vs_manager)
+            # The corpus changed: stale FAQ answers must stop being served
+            chatbot._on_index_loaded(vs_manager)
+            return None
+
+        # Build a copy of the current snapshot, then hot-swap to it
+        current = snapshots.current_version()
+        if not current:
+            # An empty snapshot with just this file would replace the whole corpus
+            raise ValueError(
+                "Snapshots are enabled but no snapshot is current. "
+                "Build one with 'python -m src.setup --snapshot' first."
+            )
+        version, path = snapshots.create_snapshot(base_version=current)
+        try:
+            vs_manager = chatbot._load_vector_store(version, embeddings=chatbot.vs_manager.embeddings)
+            try:
+                if job.filename in vs_manager.get_existing_sources():
+                    raise ValueError(f"'{job.filename}' is already in the vector store.")
+                self._add_batches(job, chunks, vs_manager)
+            finally:
+                # Stop this store's client before the snapshot is removed or reopened by reload
+                vs_manager.close()
+        except Exception:
+            shutil.rmtree(path, ignore_errors=True)
+            raise
+
+        snapshots.activate(version)
+        chatbot.reload(version)
+        return version
+
+    def _add_batches(self, job: IngestionJob, chunks, vs_manager) -> None:
+        for start in range(0, len(chunks), self.batch_size):
+            batch = chunks[start:start + self.batch_size]
+            is_last = start + self.batch_size >= len(chunks)
+            vs_manager.add_documents(batch, persist=is_last)
+            job.chunks_done += len(batch)
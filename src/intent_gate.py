@@ -0,0 +1,178 @@
+"""
+Intent gate module.
+Answers greetings, thanks and clearly off-topic questions from templates
+before any retrieval or LLM call, and counts the LLM calls it saved.
+"""
+
+import re
+import threading
+from typing import TYPE_CHECKING, Callable, List, Optional, Sequence
+
+from src.topics import TOPIC_SYNONYMS
+
+if TYPE_CHECKING:
+    import numpy as np
+
+GATE_MODES = ("off", "rules", "on")
+
+GREETING_PATTERN = re.compile(
+    r"^(hi|hello|hey|hiya|greetings|good (morning|afternoon|evening))\b"
+    r"(\s+(there|again|everyone|bot))?"
+    r"(\s*,?\s*(how are you( doing)?|how's it going))?$",
+    re.IGNORECASE
+)
+THANKS_PATTERN = re.compile(
+    r"^((ok(ay)?|great|cool|perfect)\s*,?\s*)?(thanks|thank you|thx|ty|cheers|much appreciated)"
+    r"(\s+(so much|a lot|very much))?$",
+    re.IGNORECASE
+)
+GOODBYE_PATTERN = re.compile(r"^(bye|goodbye|see you( later)?|good night|that's all)$", re.IGNORECASE)
+
+# Any of these means the question is for the assistant, whatever the embedding says
+NCD_TERMS = sorted(
+    set(TOPIC_SYNONYMS) | {term for terms in TOPIC_SYNONYMS.values() for term in terms} | {
+        "ncd", "ncds", "disease", "diseases", "condition", "symptom", "symptoms", "sign", "signs",
+        "treatment", "treat", "cure", "therapy", "medication", "medicine", "drug", "diagnosis",
+        "diagnose", "diagnosed", "risk", "risks", "cause", "causes", "prevent", "prevention",
+        "screening", "cancer", "tumor", "tumour", "heart", "stroke", "blood", "sugar", "weight",
+        "diet", "exercise", "smoking", "alcohol", "chronic", "health", "doctor", "chemotherapy",
+        "asthma", "copd", "chronic obstructive", "emphysema", "bronchitis", "lung", "lungs", "breathing",
+        "inhaler", "kidney", "kidneys", "renal", "dialysis", "liver", "cirrhosis", "arthritis",
+        "osteoporosis", "dementia", "alzheimer's", "parkinson's", "epilepsy", "depression", "anxiety",
+        "mental health", "sickle cell", "hypertension", "cardiovascular", "insulin", "pain",
+    },
+    key=len,
+    reverse=True
+)
+NCD_PATTERN = re.compile(r"\b(" + "|".join(re.escape(term) for term in NCD_TERMS) + r")\b", re.IGNORECASE)
+
+RESPONSES = {
+    "greeting": (
+        "Hello! I can answer questions about non-communicable diseases such as diabetes, "
+        "cancer, heart disease, obesity and high blood pressure. What would you like to know?"
+    ),
+    "thanks": "You're welcome! Feel free to ask if you have any other questions about non-communicable diseases.",
+    "goodbye": "Goodbye! Take care of your health.",
+    "off_topic": (
+        "I can only help with questions about non-communicable diseases such as diabetes, "
+        "cancer, heart disease, obesity and high blood pressure. Please ask me about one of these topics."
+    ),
+}
+
+
+class GateDecision:
+    """Outcome of the intent gate for one question."""
+
+    def __init__(self, intent: str, answer: Optional[str] = None, query_vector: Optional[List[float]] = None):
+        self.intent = intent
+        self.answer = answer
+        # Embedding computed for the similarity check, reusable for retrieval
+        self.query_vector = query_vector
+
+
+class IntentGate:
+    """Rule and corpus-similarity classifier run before retrieval."""
+
+    def __init__(self, mode: str = "rules", min_similarity: float = 0.15):
+        """
+        Initialize the gate.
+
+        Args:
+            mode: "off", "rules" (greetings/thanks/goodbye only) or "on"
+                (rules plus off-topic detection against the corpus centroid;
+                tune min_similarity with benchmarks.intent_gate first)
+            min_similarity: Questions whose embedding has a lower cosine
+                similarity to the corpus centroid are treated as off-topic
+        """
+        if mode not in GATE_MODES:
+            raise ValueError(f"Unknown intent gate mode '{mode}'. Choose one of: {', '.join(GATE_MODES)}")
+        self.mode = mode
+        self.min_similarity = min_similarity
+        self._centroid = None
+        self._counts = {"greeting": 0, "thanks": 0, "goodbye": 0, "off_topic": 0, "on_topic": 0}
+        self._lock = threading.Lock()
+
+    def set_corpus_centroid(self, centroid: Optional[Sequence[float]]) -> None:
+        """
+        Set the mean embedding of the indexed chunks.
+
+        Args:
+            centroid: Corpus centroid, or None to disable the similarity check
+        """
+        if centroid is None:
+            self._centroid = None
+            return
+        import numpy as np
+
+        vector = np.asarray(centroid, dtype=np.float32)
+        self._centroid = vector / (np.linalg.norm(vector) or 1.0)
+
+    def check(
+        self,
+        question: str,
+        embed_query: Optional[Callable[[str], List[float]]] = None,
+        allow_off_topic: bool = True
+    ) -> GateDecision:
+        """
+        Classify a question and answer it from a template if possible.
+
+        Args:
+            question: User question
+            embed_query: Embedding function for the similarity check
+            allow_off_topic: False to skip the similarity check (e.g. for
+                follow-ups that only make sense with the conversation)
+
+        Returns:
+            GateDecision; answer is None when the question should go to the LLM
+        """
+        if self.mode == "off":
+            return GateDecision("on_topic")
+
+        text = re.sub(r"[^\w\s',]", "", question).strip()
+        text = re.sub(r"\s+", " ", text).strip(" ,")
+        for intent, pattern in (
+            ("greeting", GREETING_PATTERN),
+            ("thanks", THANKS_PATTERN),
+            ("goodbye", GOODBYE_PATTERN),
+        ):
+            if pattern.match(text):
+                return self._decide(intent)
+
+        if (
+            self.mode != "on" or not allow_off_topic or self._centroid is None
+            or embed_query is None or NCD_PATTERN.search(question)
+        ):
+            return self._decide("on_topic")
+
+        import numpy as np
+
+        vector = embed_query(question)
+        query = np.asarray(vector, dtype=np.float32)
+        similarity = float(query @ self._centroid) / (float(np.linalg.norm(query)) or 1.0)
+        if similarity < self.min_similarity:
+            return self._decide("off_topic")
+        return self._decide("on_topic", query_vector=vector)
+
+    def stats(self) -> dict:
+        """
+        Report how many questions were answered without the LLM.
+
+        Returns:
+            Dictionary with per-intent counts and llm_calls_saved
+        """
+        with self._lock:
+            counts = dict(self._counts)
+        saved = sum(count for intent, count in counts.items() if intent != "on_topic")
+        total = sum(counts.values())
+        return {
+            "mode": self.mode,
+            "questions": total,
+            "llm_calls_saved": saved,
+            "saved_ratio": round(saved / total, 4) if total else 0.0,
+            "intents": counts,
+        }
+
+    def _decide(self, intent: str, query_vector: Optional[List[float]] = None) -> GateDecision:
+        with self._lock:
+            self._counts[intent] += 1
+        return GateDecision(intent, RESPONSES.get(intent), query_vector)
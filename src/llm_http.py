@@ -0,0 +1,223 @@
+"""
+LLM HTTP client module.
+Shared, pooled HTTP clients for the LLM provider: persistent keep-alive
+connections opened ahead of the first question, with pool-level metrics.
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    import httpx
+
+DEFAULT_BASE_URL = "https://api.groq.com"
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class LLMHTTPPool:
+    """Sync and async httpx clients with shared limits, timeouts and counters."""
+
+    def __init__(
+        self,
+        base_url: str = DEFAULT_BASE_URL,
+        max_connections: int = 20,
+        max_keepalive: int = 10,
+        keepalive_seconds: float = 120.0,
+        connect_timeout: float = 5.0,
+        read_timeout: float = 20.0,
+        http2: bool = False
+    ):
+        """
+        Initialize the clients; no connection is opened until warm() or the first call.
+
+        Args:
+            base_url: LLM provider URL, used to warm connections
+            max_connections: Most connections open at once per client
+            max_keepalive: Idle connections kept open for reuse
+            keepalive_seconds: How long an idle connection is kept (httpx
+                closes them after 5 seconds by default)
+            connect_timeout: Seconds to open a connection
+            read_timeout: Seconds to wait for response data
+            http2: Multiplex requests over one connection (needs the h2
+                package; falls back to HTTP/1.1 without it)
+        """
+        # httpx is imported here, not at module level, to keep app import fast
+        import httpx
+
+        if http2 and not _http2_available():
+            print("LLM_HTTP2 needs the 'h2' package (pip install httpx[http2]); using HTTP/1.1")
+            http2 = False
+        self.base_url = base_url
+        self.http2 = http2
+        self.keepalive_seconds = keepalive_seconds
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive,
+            keepalive_expiry=keepalive_seconds
+        )
+        self.timeout = httpx.Timeout(read_timeout, connect=connect_timeout)
+        self.client = httpx.Client(
+            limits=self.limits,
+            timeout=self.timeout,
+            http2=http2,
+            event_hooks={"request": [self._on_request], "response": [self._on_response]}
+        )
+        self.async_client = httpx.AsyncClient(
+            limits=self.limits,
+            timeout=self.timeout,
+            http2=http2,
+            event_hooks={"request": [self._on_async_request], "response": [self._on_async_response]}
+        )
+        self._counts = {
+            "requests": 0,
+            "responses": 0,
+            "connections_opened": 0,
+            "connect_ms_total": 0.0,
+            "warmed": 0,
+        }
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "LLMHTTPPool":
+        """Create the pool from the LLM_HTTP_* environment variables."""
+        return cls(
+            base_url=os.getenv("GROQ_API_BASE") or os.getenv("GROQ_BASE_URL") or DEFAULT_BASE_URL,
+            max_connections=int(os.getenv("LLM_HTTP_MAX_CONNECTIONS", "20")),
+            max_keepalive=int(os.getenv("LLM_HTTP_MAX_KEEPALIVE", "10")),
+            keepalive_seconds=float(os.getenv("LLM_HTTP_KEEPALIVE_SECONDS", "120")),
+            connect_timeout=float(os.getenv("LLM_HTTP_CONNECT_TIMEOUT", "5")),
+            read_timeout=float(os.getenv("LLM_TIMEOUT_SECONDS", "20")),
+            http2=os.getenv("LLM_HTTP2", "0").lower() in ("1", "true", "yes")
+        )
+
+    def _tracer(self):
+        """httpcore trace callback that counts and times new connections of one request."""
+        started = {}
+
+        def trace(event: str, info: dict) -> None:
+            if event.endswith("connect_tcp.started"):
+                started["at"] = time.perf_counter()
+            elif event.endswith("connect_tcp.complete") or event.endswith("start_tls.complete"):
+                if "at" not in started:
+                    return
+                with self._lock:
+                    if event.endswith("connect_tcp.complete"):
+                        self._counts["connections_opened"] += 1
+                    # TLS completes after TCP; count the time up to the last step
+                    self._counts["connect_ms_total"] += (time.perf_counter() - started["at"]) * 1000
+                started["at"] = time.perf_counter()
+
+        return trace
+
+    def _on_request(self, request: "httpx.Request") -> None:
+        with self._lock:
+            self._counts["requests"] += 1
+        request.extensions["trace"] = self._tracer()
+
+    def _on_response(self, response: "httpx.Response") -> None:
+        with self._lock:
+            self._counts["responses"] += 1
+
+    async def _on_async_request(self, request: "httpx.Request") -> None:
+        with self._lock:
+            self._counts["requests"] += 1
+        trace = self._tracer()
+
+        async def async_trace(event: str, info: dict) -> None:
+            trace(event, info)
+
+        request.extensions["trace"] = async_trace
+
+    async def _on_async_response(self, response: "httpx.Response") -> None:
+        self._on_response(response)
+
+    def warm(self, connections: int = 1) -> int:
+        """
+        Open keep-alive connections to the provider before the first question.
+
+        Sends concurrent HEAD requests to the base URL; any HTTP response
+        (even an error status) leaves a reusable connection in the pool.
+        Only the sync client is warmed: async connections belong to the
+        event loop that opens them.
+
+        Args:
+            connections: Connections to open (one is enough with HTTP/2)
+
+        Returns:
+            Number of warm-up requests that got a response
+        """
+        import httpx
+
+        if self.http2:
+            connections = min(connections, 1)
+
+        def head(_):
+            try:
+                self.client.head(self.base_url).close()
+                return True
+            except httpx.HTTPError as e:
+                print(f"Could not warm LLM connection to {self.base_url}: {str(e)}")
+                return False
+
+        with ThreadPoolExecutor(max_workers=max(connections, 1)) as executor:
+            warmed = sum(executor.map(head, range(connections)))
+        with self._lock:
+            self._counts["warmed"] += warmed
+        return warmed
+
+    def warm_in_background(self, connections: int = 1) -> Optional[threading.Thread]:
+        """Warm connections on a daemon thread so startup doesn't wait for the network."""
+        if connections <= 0:
+            return None
+        thread = threading.Thread(target=self.warm, args=(connections,), name="llm-http-warm", daemon=True)
+        thread.start()
+        return thread
+
+    @staticmethod
+    def _pool_state(client) -> dict:
+        """Open and idle connections of a client's pool (httpcore internals; best effort)."""
+        pool = getattr(getattr(client, "_transport", None), "_pool", None)
+        connections = list(getattr(pool, "connections", []))
+        return {
+            "open": len(connections),
+            "idle": sum(1 for connection in connections if connection.is_idle()),
+        }
+
+    def stats(self) -> dict:
+        """
+        Get the pool settings, connection reuse and connect time.
+
+        Returns:
+            Dictionary with settings, counters and the state of both pools
+        """
+        with self._lock:
+            counts = dict(self._counts)
+        opened = counts["connections_opened"]
+        requests = counts["requests"]
+        return {
+            "base_url": self.base_url,
+            "http2": self.http2,
+            "max_connections": self.limits.max_connections,
+            "max_keepalive": self.limits.max_keepalive_connections,
+            "keepalive_seconds": self.keepalive_seconds,
+            **counts,
+            "connect_ms_total": round(counts["connect_ms_total"], 2),
+            "avg_connect_ms": round(counts["connect_ms_total"] / opened, 2) if opened else None,
+            "reuse_ratio": round(1 - opened / requests, 3) if requests else None,
+            "sync_pool": self._pool_state(self.client),
+            "async_pool": self._pool_state(self.async_client),
+        }
+
+    def close(self) -> None:
+        """Close the sync client's connections (the async client closes with its event loop)."""
+        self.client.close()
@@ -0,0 +1,308 @@
+"""
+Memory report module.
+Breaks the resident memory of the process down by component (embedding
+model, vector index, Python heap by package) and applies the low-memory
+configuration for small pods.
+"""
+
+import ctypes
+import ctypes.util
+import gc
+import os
+import sys
+import tracemalloc
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+if TYPE_CHECKING:
+    from src.chatbot import NCDChatbot
+
+# LOW_MEMORY=1 lowers these defaults; variables set explicitly still win
+LOW_MEMORY_DEFAULTS = {
+    "SESSION_MAX_COUNT": "200",
+    "SESSION_HISTORY_TOKENS": "400",
+    "SOURCE_CACHE_SIZE": "64",
+    "SLOW_REQUEST_CAPTURES": "10",
+    "COLLECTION_CACHE_SIZE": "1",
+    "WS_STREAM_WORKERS": "4",
+    "WS_SEND_QUEUE": "64",
+    "INGEST_BATCH_SIZE": "16",
+    "INGEST_MAX_JOBS": "20",
+    "LLM_HTTP_MAX_KEEPALIVE": "2",
+    "LLM_HTTP_PREWARM": "1",
+}
+# Native thread pools each keep their own scratch memory
+THREAD_VARIABLES = ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS")
+# mallopt parameter: most glibc malloc arenas (one per thread by default)
+M_ARENA_MAX = -8
+MB = 1024 * 1024
+
+# Modules whose presence explains most of the unattributed native memory
+NATIVE_MODULES = ("torch", "sentence_transformers", "transformers", "chromadb", "langchain_community")
+
+
+def low_memory_enabled() -> bool:
+    return os.getenv("LOW_MEMORY", "0").lower() in ("1", "true", "yes")
+
+
+def _libc():
+    """glibc, or None on other C libraries (musl, macOS)."""
+    name = ctypes.util.find_library("c")
+    try:
+        libc = ctypes.CDLL(name)
+        libc.malloc_trim
+        libc.mallopt
+    except (OSError, AttributeError, TypeError):
+        return None
+    return libc
+
+
+def apply_low_memory_settings() -> bool:
+    """
+    Apply the low-memory configuration if LOW_MEMORY is set.
+
+    Call before the settings are read and before torch is imported: cache
+    sizes and thread counts are fixed when their objects are created.
+
+    Returns:
+        True if low-memory mode is on
+    """
+    if not low_memory_enabled():
+        return False
+
+    for name, value in LOW_MEMORY_DEFAULTS.items():
+        os.environ.setdefault(name, value)
+    threads = os.getenv("LOW_MEMORY_TORCH_THREADS", "1")
+    for name in THREAD_VARIABLES:
+        os.environ.setdefault(name, threads)
+    os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
+
+    libc = _libc()
+    if libc is not None:
+        # Fewer arenas means less memory held back per thread after frees
+        libc.mallopt(M_ARENA_MAX, int(os.getenv("LOW_MEMORY_MALLOC_ARENAS", "2")))
+    return True
+
+
+def release_memory() -> int:
+    """
+    Return memory freed while loading the model and index to the OS.
+
+    Caps torch's thread pool in low-memory mode, collects garbage and trims
+    the malloc heap (glibc only), which gives back the temporary copies made
+    while the model weights were loaded.
+
+    Returns:
+        Bytes of resident memory released (0 if unknown)
+    """
+    before = process_memory()["rss_bytes"]
+    if low_memory_enabled() and "torch" in sys.modules:
+        torch = sys.modules["torch"]
+        torch.set_num_threads(int(os.getenv("LOW_MEMORY_TORCH_THREADS", "1")))
+    gc.collect()
+    libc = _libc()
+    if libc is not None:
+        libc.malloc_trim(0)
+    after = process_memory()["rss_bytes"]
+    if before is None or after is None:
+        return 0
+    return max(before - after, 0)
+
+
+def process_memory() -> Dict[str, Optional[int]]:
+    """
+    Get the resident and peak resident memory of this process.
+
+    Returns:
+        Dictionary with rss_bytes and peak_rss_bytes (None where the
+        platform does not report it)
+    """
+    rss = peak = None
+    try:
+        with open("/proc/self/status", "r", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    rss = int(line.split()[1]) * 1024
+                elif line.startswith("VmHWM:"):
+                    peak = int(line.split()[1]) * 1024
+    except OSError:
+        pass
+
+    if peak is None:
+        try:
+            import resource
+        except ImportError:
+            return {"rss_bytes": rss, "peak_rss_bytes": None}
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Kilobytes on Linux, bytes on macOS
+        peak = max_rss if sys.platform == "darwin" else max_rss * 1024
+    return {"rss_bytes": rss, "peak_rss_bytes": peak}
+
+
+def start_tracing(frames: int = 1) -> None:
+    """
+    Start tracing Python allocations for the heap breakdown.
+
+    Tracing slows allocation-heavy code by roughly a third; it is enabled
+    with MEMORY_TRACE=1 or the CLI's --trace, not by default.
+
+    Args:
+        frames: Stack frames kept per allocation
+    """
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(frames)
+
+
+def _package_of(filename: str) -> str:
+    """Group an allocation's file by installed package or top-level project directory."""
+    for marker in ("site-packages" + os.sep, "dist-packages" + os.sep):
+        if marker in filename:
+            return filename.split(marker, 1)[1].split(os.sep, 1)[0].removesuffix(".py")
+    cwd = os.getcwd() + os.sep
+    if filename.startswith(cwd):
+        return filename[len(cwd):].split(os.sep, 1)[0].removesuffix(".py")
+    if filename.startswith("<"):
+        return filename
+    return "stdlib"
+
+
+def heap_by_package(top: int = 10) -> Optional[List[dict]]:
+    """
+    Break the traced Python heap down by package.
+
+    Covers objects and NumPy arrays; tensors and Chroma's index live outside
+    the Python heap and are not included.
+
+    Args:
+        top: Number of packages to return
+
+    Returns:
+        Packages with their traced megabytes, largest first, or None when
+        tracing is off
+    """
+    if not tracemalloc.is_tracing():
+        return None
+    totals: Dict[str, int] = {}
+    for stat in tracemalloc.take_snapshot().statistics("filename"):
+        package = _package_of(stat.traceback[0].filename)
+        totals[package] = totals.get(package, 0) + stat.size
+    ranked = sorted(totals.items(), key=lambda item: item[1], reverse=True)[:top]
+    return [{"package": package, "mb": round(size / MB, 2)} for package, size in ranked]
+
+
+def model_bytes(embeddings) -> int:
+    """
+    Size of an embedding model's weights.
+
+    Args:
+        embeddings: LangChain embeddings; HuggingFaceEmbeddings keeps the
+            torch model in .client
+
+    Returns:
+        Bytes of parameters and buffers (0 for models without torch weights)
+    """
+    model = getattr(embeddings, "client", None)
+    if model is None or not hasattr(model, "parameters"):
+        return 0
+    tensors = list(model.parameters()) + list(getattr(model, "buffers", lambda: [])())
+    return sum(tensor.numel() * tensor.element_size() for tensor in tensors)
+
+
+def memory_report(chatbot: Optional["NCDChatbot"] = None, caches: Optional[dict] = None, top: int = 10) -> dict:
+    """
+    Break the resident memory of the process down by component.
+
+    Components are sized directly (model weights, index arrays) or from the
+    tracemalloc snapshot (Python heap). What is left is native memory
+    nothing reports: torch and tokenizer runtimes, Chroma's client, shared
+    libraries and allocator slack.
+
+    Args:
+        chatbot: Loaded chatbot, for the model, index and collection sizes
+        caches: Entry counts and limits of in-process caches, by name
+        top: Packages listed in the heap breakdown
+
+    Returns:
+        Report dictionary; sizes in megabytes
+    """
+    memory = process_memory()
+    components = {}
+    if chatbot is not None:
+        vs_manager = chatbot.vs_manager
+        components["embedding_model"] = model_bytes(vs_manager.embeddings)
+        components["vector_index"] = vs_manager.memory_bytes()
+        if chatbot.collections is not None:
+            stats = chatbot.collections.stats()
+            components["collections"] = int(stats["memory_mb"] * 1e6)
+    heap = heap_by_package(top)
+    if heap is not None:
+        traced, peak_traced = tracemalloc.get_traced_memory()
+        # Index arrays are also traced; don't count them twice
+        components["python_heap"] = max(traced - components.get("vector_index", 0), 0)
+
+    rss = memory["rss_bytes"]
+    attributed = sum(components.values())
+    torch = sys.modules.get("torch")
+    return {
+        "low_memory": low_memory_enabled(),
+        "rss_mb": round(rss / MB, 1) if rss is not None else None,
+        "peak_rss_mb": round(memory["peak_rss_bytes"] / MB, 1) if memory["peak_rss_bytes"] else None,
+        "components_mb": {name: round(size / MB, 1) for name, size in components.items()},
+        "unattributed_mb": round((rss - attributed) / MB, 1) if rss is not None else None,
+        "python_heap_by_package": heap,
+        "python_heap_peak_mb": round(peak_traced / MB, 1) if heap is not None else None,
+        "native_modules_loaded": [name for name in NATIVE_MODULES if name in sys.modules],
+        "torch_threads": torch.get_num_threads() if torch is not None else None,
+        "caches": caches or {},
+    }
+
+
+def format_report(report: dict) -> str:
+    """Render a memory report as text for the terminal."""
+    lines = [
+        f"Resident memory: {report['rss_mb']} MB (peak {report['peak_rss_mb']} MB)"
+        + (" - low-memory mode" if report["low_memory"] else ""),
+        "",
+        "Component                  MB",
+    ]
+    for name, size in report["components_mb"].items():
+        lines.append(f"  {name:<22} {size:>8}")
+    lines.append(f"  {'unattributed (native)':<22} {report['unattributed_mb']:>8}")
+    if report["python_heap_by_package"]:
+        lines += ["", "Python heap by package     MB"]
+        for entry in report["python_heap_by_package"]:
+            lines.append(f"  {entry['package']:<22} {entry['mb']:>8}")
+    lines += ["", f"Native modules loaded: {', '.join(report['native_modules_loaded']) or 'none'}"]
+    if report["torch_threads"] is not None:
+        lines.append(f"Torch threads: {report['torch_threads']}")
+    for name, cache in report["caches"].items():
+        lines.append(f"Cache {name}: {cache}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    import argparse
+    from dotenv import load_dotenv
+
+    parser = argparse.ArgumentParser(description="Report the resident memory of a loaded chatbot by component.")
+    parser.add_argument("--low-memory", action="store_true", help="Load with LOW_MEMORY=1")
+    parser.add_argument("--trace", action="store_true",
+                        help="Trace Python allocations for the heap breakdown (slower loading)")
+    parser.add_argument("--question", default="What are the symptoms of diabetes?",
+                        help="Question retrieved once after loading, so query-time buffers are counted")
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    load_dotenv()
+    if args.low_memory:
+        os.environ["LOW_MEMORY"] = "1"
+    apply_low_memory_settings()
+    if args.trace or os.getenv("MEMORY_TRACE", "0") == "1":
+        start_tracing()
+
+    from src.chatbot import NCDChatbot
+
+    chatbot = NCDChatbot()
+    chatbot.vs_manager.similarity_search(args.question)
+    released = release_memory()
+    print(f"Released {released / MB:.1f} MB after loading\n")
+    print(format_report(memory_report(chatbot, top=args.top)))
@@ -0,0 +1,299 @@
+"""
+Memory-mapped vector index module.
+Exports the Chroma collection to flat files that every API worker can map
+read-only, so the index is shared through the OS page cache instead of being
+loaded once per process.
+"""
+
+import ctypes
+import errno
+import json
+import os
+import shutil
+import uuid
+from typing import Any, Iterable, List, Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from src.numpy_store import NumpyVectorStore, normalize_rows
+
+FORMAT_VERSION = 1
+EMBEDDINGS_FILE = "embeddings.npy"
+OFFSETS_FILE = "text_offsets.npy"
+TEXTS_FILE = "texts.bin"
+METADATA_FILE = "metadata.json"
+
+# renameat2() arguments: paths relative to the working directory, swap both
+_AT_FDCWD = -100
+_RENAME_EXCHANGE = 2
+
+
+def check_index_dir(index_dir: str) -> None:
+    """
+    Refuse to replace a directory that is not an index.
+
+    Args:
+        index_dir: Directory about to be replaced
+
+    Raises:
+        ValueError: If it exists, is not empty and holds no index files
+    """
+    if not os.path.isdir(index_dir) or not os.listdir(index_dir):
+        return
+    if not os.path.exists(os.path.join(index_dir, METADATA_FILE)):
+        raise ValueError(f"'{index_dir}' exists and is not an index; refusing to replace it.")
+
+
+def _exchange_paths(first: str, second: str) -> bool:
+    """Atomically swap two paths (Linux renameat2); False where that is unsupported."""
+    try:
+        renameat2 = ctypes.CDLL(None, use_errno=True).renameat2
+    except (OSError, AttributeError, TypeError):
+        return False
+    result = renameat2(_AT_FDCWD, os.fsencode(first), _AT_FDCWD, os.fsencode(second), _RENAME_EXCHANGE)
+    if result == 0:
+        return True
+    code = ctypes.get_errno()
+    # Old kernels and some filesystems can't exchange
+    if code in (errno.ENOSYS, errno.EINVAL):
+        return False
+    raise OSError(code, os.strerror(code), second)
+
+
+def replace_index_dir(new_dir: str, index_dir: str) -> None:
+    """
+    Move a finished index directory into place.
+
+    index_dir never goes missing, so a worker starting or reloading at the
+    same moment loads either the old index or the new one: on Linux the
+    two directories are exchanged atomically; elsewhere the old one is
+    renamed aside first, which leaves a gap of one rename. Workers that
+    already mapped the old files keep reading them until they reload; the
+    unlinked inodes stay valid while mapped.
+
+    Args:
+        new_dir: Complete index, on the same filesystem as index_dir
+        index_dir: Directory to create or replace
+    """
+    if not os.path.exists(index_dir):
+        os.rename(new_dir, index_dir)
+        return
+    if _exchange_paths(new_dir, index_dir):
+        # new_dir now holds the old index
+        shutil.rmtree(new_dir)
+        return
+    old_dir = f"{index_dir}.old-{uuid.uuid4().hex[:8]}"
+    os.rename(index_dir, old_dir)
+    try:
+        os.rename(new_dir, index_dir)
+    except OSError:
+        os.rename(old_dir, index_dir)
+        raise
+    shutil.rmtree(old_dir)
+
+
+def write_index_files(
+    index_dir: str,
+    ids: List[str],
+    texts: List[str],
+    metadatas: List[dict],
+    embeddings: np.ndarray,
+    embedding_model: Optional[str] = None
+) -> None:
+    """
+    Write an index to disk in the flat memory-mappable format.
+
+    The files are written to a temporary directory first and moved into
+    place afterwards (see replace_index_dir), so workers never map a
+    half-written index or find none.
+
+    Args:
+        index_dir: Target directory
+        ids: Chunk IDs
+        texts: Chunk texts
+        metadatas: Chunk metadata dictionaries
+        embeddings: Embedding matrix with one row per chunk
+        embedding_model: Name of the model that produced the embeddings
+
+    Raises:
+        ValueError: If the embeddings don't match the chunks, or index_dir
+            is a directory other than an index
+    """
+    matrix = np.asarray(embeddings, dtype=np.float32)
+    if matrix.ndim != 2 or matrix.shape[0] != len(ids):
+        raise ValueError("Embedding matrix does not match the number of chunks.")
+    check_index_dir(index_dir)
+
+    # Normalize once at export so a dot product is the cosine similarity
+    matrix = np.ascontiguousarray(normalize_rows(matrix))
+
+    encoded = [text.encode("utf-8") for text in texts]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(blob) for blob in encoded])
+
+    # A unique name, so concurrent writers don't share a temporary directory
+    tmp_dir = f"{index_dir}.tmp-{uuid.uuid4().hex[:8]}"
+    os.makedirs(tmp_dir)
+    try:
+        np.save(os.path.join(tmp_dir, EMBEDDINGS_FILE), matrix)
+        np.save(os.path.join(tmp_dir, OFFSETS_FILE), offsets)
+        with open(os.path.join(tmp_dir, TEXTS_FILE), "wb") as f:
+            f.write(b"".join(encoded))
+        with open(os.path.join(tmp_dir, METADATA_FILE), "w", encoding="utf-8") as f:
+            json.dump({
+                "format_version": FORMAT_VERSION,
+                "count": int(matrix.shape[0]),
+                "dim": int(matrix.shape[1]),
+                "embedding_model": embedding_model,
+                "ids": list(ids),
+                "metadatas": [metadata or {} for metadata in metadatas],
+            }, f, separators=(",", ":"))
+        replace_index_dir(tmp_dir, index_dir)
+    except Exception:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+
+def export_collection(
+    collection: Any,
+    index_dir: str,
+    embedding_model: Optional[str] = None,
+    page_size: int = 1000
+) -> int:
+    """
+    Export a ChromaDB collection to the flat memory-mappable format.
+
+    Args:
+        collection: ChromaDB collection to export
+        index_dir: Target directory
+        embedding_model: Name of the model that produced the embeddings
+        page_size: Number of records fetched from Chroma per call
+
+    Returns:
+        Number of exported chunks
+    """
+    ids, texts, metadatas, vectors = [], [], [], []
+    offset = 0
+
+    while True:
+        page = collection.get(
+            include=["embeddings", "documents", "metadatas"],
+            limit=page_size,
+            offset=offset
+        )
+        if not page["ids"]:
+            break
+        ids.extend(page["ids"])
+        texts.extend(page["documents"])
+        metadatas.extend(page["metadatas"])
+        vectors.extend(np.asarray(page["embeddings"], dtype=np.float32))
+        offset += len(page["ids"])
+
+    if not ids:
+        raise ValueError("Collection is empty, nothing to export.")
+
+    write_index_files(
+        index_dir,
+        ids=ids,
+        texts=texts,
+        metadatas=metadatas,
+        embeddings=np.vstack(vectors),
+        embedding_model=embedding_model
+    )
+    return len(ids)
+
+
+class MmapVectorStore(NumpyVectorStore):
+    """Read-only vector store backed by memory-mapped index files."""
+
+    def __init__(self, index_dir: str, embedding: Embeddings):
+        """
+        Map an exported index.
+
+        Args:
+            index_dir: Directory written by export_collection
+            embedding: Embedding model used to embed queries
+        """
+        metadata_path = os.path.join(index_dir, METADATA_FILE)
+        if not os.path.exists(metadata_path):
+            raise FileNotFoundError(
+                f"Memory-mapped index '{index_dir}' not found. "
+                "Export it first with: python -m src.mmap_index"
+            )
+
+        with open(metadata_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+
+        if manifest.get("format_version") != FORMAT_VERSION:
+            raise ValueError(
+                f"Unsupported index format version: {manifest.get('format_version')}"
+            )
+
+        super().__init__(embedding=embedding, dtype="float32")
+        self.index_dir = index_dir
+        self.embedding_model = manifest.get("embedding_model")
+        self._ids = manifest["ids"]
+        self._metadatas = manifest["metadatas"]
+
+        # mmap_mode="r" shares the pages with every other process that maps them
+        self._matrix = np.load(os.path.join(index_dir, EMBEDDINGS_FILE), mmap_mode="r")
+        self._arrays = (self._matrix, None, None)
+        self._offsets = np.load(os.path.join(index_dir, OFFSETS_FILE), mmap_mode="r")
+        texts_path = os.path.join(index_dir, TEXTS_FILE)
+        if os.path.getsize(texts_path) > 0:
+            self._blob = np.memmap(texts_path, dtype=np.uint8, mode="r")
+        else:
+            self._blob = np.zeros(0, dtype=np.uint8)
+
+    def add_embeddings(self, *args: Any, **kwargs: Any) -> List[str]:
+        raise NotImplementedError(
+            "Memory-mapped index is read-only. Add documents to Chroma and re-export."
+        )
+
+    def add_texts(
+        self,
+        texts: Iterable[str],
+        metadatas: Optional[List[dict]] = None,
+        **kwargs: Any
+    ) -> List[str]:
+        raise NotImplementedError(
+            "Memory-mapped index is read-only. Add documents to Chroma and re-export."
+        )
+
+    @classmethod
+    def from_texts(
+        cls,
+        texts: List[str],
+        embedding: Embeddings,
+        metadatas: Optional[List[dict]] = None,
+        **kwargs: Any
+    ) -> "MmapVectorStore":
+        raise NotImplementedError(
+            "Memory-mapped index is built with export_collection, not from_texts."
+        )
+
+    def _text(self, index: int) -> str:
+        start, end = int(self._offsets[index]), int(self._offsets[index + 1])
+        return bytes(self._blob[start:end]).decode("utf-8")
+
+
+if __name__ == "__main__":
+    import argparse
+    from dotenv import load_dotenv
+    from src.vector_store import VectorStoreManager
+
+    parser = argparse.ArgumentParser(
+        description="Export the Chroma collection to a memory-mapped index."
+    )
+    parser.add_argument("--chroma-dir", default="chroma_db", help="Source Chroma directory")
+    parser.add_argument("--output", default="mmap_index", help="Target index directory")
+    args = parser.parse_args()
+
+    load_dotenv()
+
+    vs_manager = VectorStoreManager(persist_directory=args.chroma_dir)
+    vs_manager.load_vector_store()
+    count = vs_manager.export_mmap_index(args.output)
+    print(f"Exported {count} chunks to '{args.output}'")
+    print("Serve it with: VECTOR_BACKEND=mmap VECTOR_STORE_DIR="
+          f"{args.output} uvicorn app:app --workers 4")
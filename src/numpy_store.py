@@ -0,0 +1,507 @@
+"""
+In-process NumPy vector store module.
+Brute-force cosine search over a contiguous embedding matrix, which beats an
+HNSW index plus a database client for a corpus of a few thousand chunks.
+"""
+
+import uuid
+from typing import Any, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+
+# float16 and int8 have no BLAS kernels, so they are scored in float32 blocks of this many rows.
+# Converting float16 is slow in NumPy: a float16 search takes about 10x as long as float32
+FLOAT16_BLOCK_ROWS = 4096
+STORAGE_DTYPES = ("float32", "float16", "int8")
+# Metadata filters whose matching rows are cached (topic routing uses one per topic)
+FILTER_CACHE_SIZE = 64
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """
+    L2-normalize every row so a dot product is the cosine similarity.
+
+    Args:
+        matrix: 2-D array of vectors
+
+    Returns:
+        float32 array of unit-length rows
+    """
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def quantize_int8(matrix: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Scalar-quantize vectors to int8 with one scale per dimension.
+
+    Args:
+        matrix: 2-D float array
+
+    Returns:
+        Tuple of (int8 codes, float32 scales); codes * scales approximates matrix
+    """
+    matrix = np.asarray(matrix, dtype=np.float32)
+    scales = np.abs(matrix).max(axis=0) / 127.0 if len(matrix) else np.ones(matrix.shape[1], dtype=np.float32)
+    scales[scales == 0] = 1.0
+    codes = np.clip(np.rint(matrix / scales), -127, 127).astype(np.int8)
+    return np.ascontiguousarray(codes), scales.astype(np.float32)
+
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    Select the indices of the k highest scores along the last axis.
+
+    Uses argpartition so only the k winners are sorted.
+
+    Args:
+        scores: 1-D or 2-D score array
+        k: Number of indices to keep
+
+    Returns:
+        Indices of the top k scores, best first
+    """
+    k = min(k, scores.shape[-1])
+    top = np.argpartition(-scores, k - 1, axis=-1)[..., :k]
+    order = np.argsort(-np.take_along_axis(scores, top, axis=-1), axis=-1)
+    return np.take_along_axis(top, order, axis=-1)
+
+
+def metadata_matches(metadata: dict, where: dict) -> bool:
+    """
+    Check a chunk's metadata against a Chroma-style where filter.
+
+    Supports field equality, $eq, $ne, $in, $nin, $and and $or.
+
+    Args:
+        metadata: Chunk metadata
+        where: Filter, e.g. {"topic": "diabetes"} or {"topic": {"$in": [...]}}
+
+    Returns:
+        True if the chunk matches
+    """
+    for key, condition in where.items():
+        if key == "$and":
+            if not all(metadata_matches(metadata, part) for part in condition):
+                return False
+        elif key == "$or":
+            if not any(metadata_matches(metadata, part) for part in condition):
+                return False
+        elif isinstance(condition, dict):
+            value = metadata.get(key)
+            for operator, operand in condition.items():
+                if operator == "$eq":
+                    matched = value == operand
+                elif operator == "$ne":
+                    matched = value != operand
+                elif operator == "$in":
+                    matched = value in operand
+                elif operator == "$nin":
+                    matched = value not in operand
+                else:
+                    raise ValueError(f"Unsupported filter operator '{operator}'.")
+                if not matched:
+                    return False
+        elif metadata.get(key) != condition:
+            return False
+    return True
+
+
+class NumpyVectorStore(VectorStore):
+    """Vector store holding normalized embeddings in one NumPy matrix."""
+
+    def __init__(self, embedding: Embeddings, dtype: str = "float32", rescore_factor: int = 4):
+        """
+        Initialize an empty store.
+
+        Args:
+            embedding: Embedding model used for documents and queries
+            dtype: Storage precision - "float32", "float16" (half the
+                memory, but about 10x slower searches) or "int8" (a
+                quarter; see rescore_factor)
+            rescore_factor: For int8, the k * rescore_factor best candidates
+                are rescored with the float32 vectors (0 disables rescoring)
+        """
+        if dtype not in STORAGE_DTYPES:
+            raise ValueError(f"dtype must be one of: {', '.join(STORAGE_DTYPES)}.")
+
+        self._embedding = embedding
+        self.dtype = np.dtype(dtype)
+        self.rescore_factor = rescore_factor
+        self._matrix = np.zeros((0, 0), dtype=self.dtype)
+        # int8 only: per-dimension scales, and the float32 rows used for
+        # rescoring (memory-mapped from disk when the store was loaded)
+        self._scales: Optional[np.ndarray] = None
+        self._float_matrix: Optional[np.ndarray] = None
+        # The three arrays above, published together: a search unpacks this
+        # once, so it never mixes codes and scales from before and after an add
+        self._arrays = (self._matrix, None, None)
+        self._ids: List[str] = []
+        self._texts: List[str] = []
+        self._metadatas: List[dict] = []
+        self._id_index: Optional[dict] = None
+        # Row indices per filter, so repeated topic filters don't rescan metadata
+        self._filter_rows: dict = {}
+
+    @property
+    def embeddings(self) -> Embeddings:
+        return self._embedding
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    @property
+    def nbytes(self) -> int:
+        """Size of the embedding matrix (int8: codes and scales) in bytes."""
+        matrix, scales, _ = self._arrays
+        if scales is not None:
+            return int(matrix.nbytes + scales.nbytes)
+        return int(matrix.nbytes)
+
+    def embedding_matrix(self) -> np.ndarray:
+        """
+        Get the embeddings of all chunks, one normalized row per chunk.
+
+        Returns:
+            The search matrix, or for int8 the float32 rows kept for rescoring
+        """
+        if self.dtype == np.int8:
+            return self._float_matrix
+        return self._matrix
+
+    def add_texts(
+        self,
+        texts: Iterable[str],
+        metadatas: Optional[List[dict]] = None,
+        ids: Optional[List[str]] = None,
+        **kwargs: Any
+    ) -> List[str]:
+        texts = list(texts)
+        if not texts:
+            return []
+        vectors = self._embedding.embed_documents(texts)
+        return self.add_embeddings(texts, vectors, metadatas=metadatas, ids=ids)
+
+    def add_embeddings(
+        self,
+        texts: Sequence[str],
+        embeddings: Any,
+        metadatas: Optional[Sequence[dict]] = None,
+        ids: Optional[Sequence[str]] = None
+    ) -> List[str]:
+        """
+        Add chunks whose embeddings are already computed.
+
+        With int8 storage every add requantizes the whole index, and the
+        float32 rows are copied into memory to append to them: after the
+        first add, a store loaded from disk no longer memory-maps its float32
+        rows and holds them in RAM as well. Rebuild and reload the index
+        instead of adding live when memory is tight.
+
+        Args:
+            texts: Chunk texts
+            embeddings: One embedding per text
+            metadatas: Optional metadata per text
+            ids: Optional chunk IDs (random UUIDs by default)
+
+        Returns:
+            IDs of the added chunks
+        """
+        vectors = normalize_rows(np.atleast_2d(embeddings))
+        if vectors.shape[0] != len(texts):
+            raise ValueError("Number of embeddings does not match number of texts.")
+
+        ids = list(ids) if ids else [str(uuid.uuid4()) for _ in texts]
+        metadatas = list(metadatas) if metadatas else [{} for _ in texts]
+
+        scales = float_matrix = None
+        if self.dtype == np.int8:
+            # New rows can widen a dimension's range, so requantize everything
+            float_matrix = vectors if len(self._ids) == 0 else np.vstack([self._float_matrix, vectors])
+            matrix, scales = quantize_int8(float_matrix)
+        elif len(self._ids) == 0:
+            matrix = np.ascontiguousarray(vectors.astype(self.dtype))
+        else:
+            matrix = np.ascontiguousarray(np.vstack([self._matrix, vectors.astype(self.dtype)]))
+
+        # Extend the row data before publishing the matrix, so a search running
+        # in another thread never sees a row it can't resolve
+        self._ids.extend(ids)
+        self._texts.extend(texts)
+        self._metadatas.extend(metadata or {} for metadata in metadatas)
+        self._id_index = None
+        self._filter_rows = {}
+        self._matrix = matrix
+        self._scales = scales
+        self._float_matrix = float_matrix
+        self._arrays = (matrix, scales, float_matrix)
+        return ids
+
+    @classmethod
+    def from_texts(
+        cls,
+        texts: List[str],
+        embedding: Embeddings,
+        metadatas: Optional[List[dict]] = None,
+        ids: Optional[List[str]] = None,
+        dtype: str = "float32",
+        rescore_factor: int = 4,
+        **kwargs: Any
+    ) -> "NumpyVectorStore":
+        store = cls(embedding=embedding, dtype=dtype, rescore_factor=rescore_factor)
+        store.add_texts(texts, metadatas=metadatas, ids=ids)
+        return store
+
+    def similarity_search(self, query: str, k: int = 4, **kwargs: Any) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score(query, k=k, **kwargs)]
+
+    def similarity_search_with_score(
+        self,
+        query: str,
+        k: int = 4,
+        **kwargs: Any
+    ) -> List[Tuple[Document, float]]:
+        vector = self._embedding.embed_query(query)
+        return self.similarity_search_by_vector_with_score(vector, k=k, filter=kwargs.get("filter"))
+
+    def similarity_search_by_vector(
+        self,
+        embedding: List[float],
+        k: int = 4,
+        **kwargs: Any
+    ) -> List[Document]:
+        return [
+            doc for doc, _ in
+            self.similarity_search_by_vector_with_score(embedding, k=k, filter=kwargs.get("filter"))
+        ]
+
+    def similarity_search_by_vector_with_score(
+        self,
+        embedding: List[float],
+        k: int = 4,
+        filter: Optional[dict] = None
+    ) -> List[Tuple[Document, float]]:
+        """
+        Return the k chunks with the highest cosine similarity to a vector.
+
+        Args:
+            embedding: Query embedding
+            k: Number of results to return
+            filter: Optional metadata filter (see metadata_matches)
+
+        Returns:
+            List of (document, similarity) pairs, best first
+        """
+        return self.batch_search_by_vectors([embedding], k=k, filter=filter)[0]
+
+    def batch_similarity_search(
+        self,
+        queries: List[str],
+        k: int = 4
+    ) -> List[List[Tuple[Document, float]]]:
+        """
+        Search several queries with one embedding call and one matrix product.
+
+        Args:
+            queries: Query strings
+            k: Number of results per query
+
+        Returns:
+            One list of (document, similarity) pairs per query
+        """
+        if not queries:
+            return []
+        return self.batch_search_by_vectors(self._embedding.embed_documents(queries), k=k)
+
+    def batch_search_by_vectors(
+        self,
+        embeddings: Any,
+        k: int = 4,
+        filter: Optional[dict] = None
+    ) -> List[List[Tuple[Document, float]]]:
+        """
+        Search several query vectors at once.
+
+        Args:
+            embeddings: One query embedding per row
+            k: Number of results per query
+            filter: Optional metadata filter; only matching rows are scored
+
+        Returns:
+            One list of (document, similarity) pairs per query
+        """
+        queries = normalize_rows(np.atleast_2d(embeddings))
+        matrix, scales, float_matrix = self._arrays
+        rows = None
+        if filter:
+            rows = self._rows_matching(filter)
+            # Rows appended after this search started are not in the matrix yet
+            rows = rows[rows < len(matrix)]
+        if len(self._ids) == 0 or k <= 0 or (rows is not None and len(rows) == 0):
+            return [[] for _ in range(queries.shape[0])]
+
+        candidates = matrix if rows is None else matrix[rows]
+        if self.dtype == np.int8 and self.rescore_factor > 0:
+            return self._search_int8(queries, candidates, rows, k, scales, float_matrix)
+
+        scores = self._scores(queries, candidates, scales)
+        top = top_k_indices(scores, k)
+        positions = top if rows is None else rows[top]
+        return [
+            [(self._document(int(i)), float(row_scores[j])) for i, j in zip(row_positions, row_top)]
+            for row_scores, row_positions, row_top in zip(scores, positions, top)
+        ]
+
+    def _search_int8(
+        self,
+        queries: np.ndarray,
+        codes: np.ndarray,
+        rows: Optional[np.ndarray],
+        k: int,
+        scales: np.ndarray,
+        float_matrix: np.ndarray
+    ) -> List[List[Tuple[Document, float]]]:
+        # Shortlist with the int8 codes, then rank the shortlist exactly
+        shortlist = top_k_indices(self._scores(queries, codes, scales), k * self.rescore_factor)
+        if rows is not None:
+            shortlist = rows[shortlist]
+        results = []
+        for query, candidates in zip(queries, shortlist):
+            # Sorted rows read the memory-mapped file in order
+            candidates = np.sort(candidates)
+            exact = float_matrix[candidates] @ query
+            order = np.argsort(-exact)[:k]
+            results.append([(self._document(int(candidates[j])), float(exact[j])) for j in order])
+        return results
+
+    def _rows_matching(self, where: dict) -> np.ndarray:
+        key = repr(sorted(where.items()))
+        rows = self._filter_rows.get(key)
+        if rows is None:
+            rows = np.array(
+                [i for i, metadata in enumerate(self._metadatas) if metadata_matches(metadata, where)],
+                dtype=np.int64
+            )
+            if len(self._filter_rows) >= FILTER_CACHE_SIZE:
+                # Forget the oldest filter; dicts keep insertion order
+                self._filter_rows.pop(next(iter(self._filter_rows)), None)
+            self._filter_rows[key] = rows
+        return rows
+
+    def filter_cache_stats(self) -> dict:
+        """Number of metadata filters whose matching rows are cached, and the limit."""
+        return {"entries": len(self._filter_rows), "max": FILTER_CACHE_SIZE}
+
+    def get_by_ids(self, ids: Sequence[str]) -> List[Document]:
+        """
+        Look up chunks by ID.
+
+        Args:
+            ids: Chunk IDs
+
+        Returns:
+            The chunks that exist, in the requested order
+        """
+        if self._id_index is None:
+            self._id_index = {chunk_id: i for i, chunk_id in enumerate(self._ids)}
+        return [
+            self._document(self._id_index[chunk_id])
+            for chunk_id in ids if chunk_id in self._id_index
+        ]
+
+    def get_sources(self) -> List[str]:
+        """
+        Get the unique source filenames in the store.
+
+        Returns:
+            Sorted list of source filenames
+        """
+        return sorted({
+            metadata["source"] for metadata in self._metadatas
+            if metadata and "source" in metadata
+        })
+
+    def save(self, index_dir: str, embedding_model: Optional[str] = None) -> None:
+        """
+        Persist the store in the flat format shared with the mmap backend.
+
+        Args:
+            index_dir: Target directory
+            embedding_model: Name of the model that produced the embeddings
+        """
+        from src.mmap_index import write_index_files
+
+        write_index_files(
+            index_dir,
+            ids=self._ids,
+            texts=[self._text(i) for i in range(len(self._ids))],
+            metadatas=self._metadatas,
+            embeddings=self.embedding_matrix(),
+            embedding_model=embedding_model
+        )
+
+    @classmethod
+    def load(
+        cls,
+        index_dir: str,
+        embedding: Embeddings,
+        dtype: str = "float32",
+        rescore_factor: int = 4
+    ) -> "NumpyVectorStore":
+        """
+        Load a saved or exported index fully into memory.
+
+        With dtype "int8" only the codes are loaded; the float32 rows stay
+        memory-mapped and just the rescored candidates are read.
+
+        Args:
+            index_dir: Directory written by save() or export_collection
+            embedding: Embedding model used for documents and queries
+            dtype: Storage precision - "float32", "float16" or "int8"
+            rescore_factor: Candidate multiplier for int8 rescoring
+
+        Returns:
+            NumpyVectorStore instance
+        """
+        from src.mmap_index import MmapVectorStore
+
+        mapped = MmapVectorStore(index_dir, embedding)
+        store = cls(embedding=embedding, dtype=dtype, rescore_factor=rescore_factor)
+        if store.dtype == np.int8:
+            store._float_matrix = mapped._matrix
+            store._matrix, store._scales = quantize_int8(mapped._matrix)
+        else:
+            store._matrix = np.array(mapped._matrix, dtype=store.dtype, order="C")
+        store._arrays = (store._matrix, store._scales, store._float_matrix)
+        store._ids = list(mapped._ids)
+        store._texts = [mapped._text(i) for i in range(len(mapped))]
+        store._metadatas = list(mapped._metadatas)
+        return store
+
+    def _scores(self, queries: np.ndarray, matrix: np.ndarray, scales: Optional[np.ndarray] = None) -> np.ndarray:
+        if matrix.dtype == np.float32:
+            return queries @ matrix.T
+        if matrix.dtype == np.int8:
+            # (codes * scales) . q == codes . (q * scales)
+            queries = queries * scales
+
+        scores = np.empty((queries.shape[0], matrix.shape[0]), dtype=np.float32)
+        for start in range(0, matrix.shape[0], FLOAT16_BLOCK_ROWS):
+            block = matrix[start:start + FLOAT16_BLOCK_ROWS].astype(np.float32)
+            scores[:, start:start + block.shape[0]] = queries @ block.T
+        return scores
+
+    def _text(self, index: int) -> str:
+        return self._texts[index]
+
+    def _document(self, index: int) -> Document:
+        return Document(
+            page_content=self._text(index),
+            metadata=dict(self._metadatas[index]),
+            id=self._ids[index]
+        )
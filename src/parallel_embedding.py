@@ -0,0 +1,171 @@
+"""
+Parallel embedding module.
+Embeds chunks for bulk indexing in a pool of worker processes, each with its
+own copy of the embedding model and a fixed number of torch threads.
+"""
+
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# The model of the worker process, loaded once by _init_worker
+_worker_model = None
+
+
+def load_embedding_model():
+    """Default worker model: the HuggingFace model the index is built with."""
+    from langchain_community.embeddings import HuggingFaceEmbeddings
+    from src.vector_store import EMBEDDING_MODEL_NAME
+
+    return HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL_NAME)
+
+
+def _init_worker(factory: Callable[[], object], torch_threads: int) -> None:
+    """Pin the worker's math libraries to torch_threads threads and load the model."""
+    global _worker_model
+    for name in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+        os.environ[name] = str(torch_threads)
+    # Each worker is already one of several processes; no tokenizer threads on top
+    os.environ["TOKENIZERS_PARALLELISM"] = "false"
+    try:
+        import torch
+        torch.set_num_threads(torch_threads)
+    except ImportError:
+        pass
+    _worker_model = factory()
+
+
+def _embed_batch(texts: List[str]) -> np.ndarray:
+    return np.asarray(_worker_model.embed_documents(texts), dtype=np.float32)
+
+
+class ParallelEmbedder:
+    """Process pool that embeds batches of chunk texts and returns them in order."""
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        torch_threads: int = 1,
+        batch_size: int = 64,
+        max_pending: Optional[int] = None,
+        factory: Callable[[], object] = load_embedding_model
+    ):
+        """
+        Initialize the embedder; worker processes start on first use.
+
+        Args:
+            workers: Worker processes (default: CPU cores / torch_threads)
+            torch_threads: Torch threads per worker; workers * torch_threads
+                should not exceed the CPU cores
+            batch_size: Chunks per batch sent to a worker
+            max_pending: Batches queued or running at once, which bounds the
+                finished-but-unconsumed results held in memory (default: 2 per worker)
+            factory: Picklable zero-argument callable that loads the model in
+                each worker
+        """
+        if torch_threads < 1:
+            raise ValueError("torch_threads must be at least 1")
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        self.torch_threads = torch_threads
+        self.workers = workers or max(1, (os.cpu_count() or 1) // torch_threads)
+        self.batch_size = batch_size
+        self.max_pending = max_pending or 2 * self.workers
+        self.factory = factory
+        self._pool = None
+        self._counts = {"chunks": 0, "batches": 0, "seconds": 0.0}
+
+    def __enter__(self) -> "ParallelEmbedder":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def start(self) -> None:
+        """Start the worker processes (each loads its own model)."""
+        if self._pool is None:
+            # spawn, not fork: forking a process that already ran torch can deadlock
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.factory, self.torch_threads)
+            )
+
+    def close(self) -> None:
+        """Stop the worker processes."""
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+    def embed_batches(self, texts: Sequence[str]) -> Iterator[Tuple[int, np.ndarray]]:
+        """
+        Embed texts in batches spread over the workers.
+
+        Batches are yielded in input order as soon as each one and all the
+        batches before it are done, so the caller can write them while later
+        batches are still being embedded.
+
+        Args:
+            texts: Chunk texts
+
+        Yields:
+            (offset of the batch's first text, float32 embeddings of the batch)
+        """
+        self.start()
+        start_time = time.perf_counter()
+        pending = deque()
+        try:
+            for offset in range(0, len(texts), self.batch_size):
+                batch = list(texts[offset:offset + self.batch_size])
+                pending.append((offset, self._pool.submit(_embed_batch, batch)))
+                if len(pending) >= self.max_pending:
+                    yield self._finish(*pending.popleft())
+            while pending:
+                yield self._finish(*pending.popleft())
+        finally:
+            for _, future in pending:
+                future.cancel()
+            self._counts["seconds"] += time.perf_counter() - start_time
+
+    def _finish(self, offset: int, future) -> Tuple[int, np.ndarray]:
+        vectors = future.result()
+        self._counts["chunks"] += len(vectors)
+        self._counts["batches"] += 1
+        return offset, vectors
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        """
+        Embed all texts.
+
+        Args:
+            texts: Chunk texts
+
+        Returns:
+            One float32 row per text
+        """
+        batches = [vectors for _, vectors in self.embed_batches(texts)]
+        return np.vstack(batches) if batches else np.zeros((0, 0), dtype=np.float32)
+
+    def stats(self) -> dict:
+        """
+        Get the pool settings and throughput so far.
+
+        Returns:
+            Dictionary with settings, counters and chunks per second
+        """
+        seconds = self._counts["seconds"]
+        return {
+            "workers": self.workers,
+            "torch_threads": self.torch_threads,
+            "batch_size": self.batch_size,
+            **self._counts,
+            "seconds": round(seconds, 3),
+            "chunks_per_second": round(self._counts["chunks"] / seconds, 1) if seconds else None,
+        }
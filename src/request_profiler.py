@@ -0,0 +1,262 @@
+"""
+Slow request profiler module.
+Times the stages of each request and samples its call stack; requests slower
+than a threshold are kept in a bounded in-memory buffer for later inspection.
+"""
+
+import itertools
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional
+
+MAX_STACK_DEPTH = 128
+# File paths in stack labels are shown relative to these
+PATH_PREFIXES = ("site-packages" + os.sep, os.getcwd() + os.sep)
+
+_current_capture: ContextVar[Optional["RequestCapture"]] = ContextVar("current_capture", default=None)
+
+
+class RequestCapture:
+    """Stage timings and stack samples of one request in progress."""
+
+    def __init__(self, capture_id: int, name: str, detail: Optional[str] = None):
+        self.capture_id = capture_id
+        self.name = name
+        self.detail = detail
+        self.thread_id = threading.get_ident()
+        self.started_at = time.time()
+        self.start = time.perf_counter()
+        self.duration_ms = None
+        self.stages: Dict[str, float] = {}
+        self.stacks: Counter = Counter()
+        self.samples = 0
+
+    def add_stage(self, name: str, ms: float) -> None:
+        self.stages[name] = self.stages.get(name, 0.0) + ms
+
+    def to_dict(self, sample_interval_ms: float) -> dict:
+        """Summary of a finished capture (stacks as collapsed lines, hottest first)."""
+        unaccounted = self.duration_ms - sum(self.stages.values())
+        return {
+            "capture_id": self.capture_id,
+            "name": self.name,
+            "detail": self.detail,
+            "started_at": round(self.started_at, 3),
+            "duration_ms": round(self.duration_ms, 2),
+            "stages": {
+                **{name: round(ms, 2) for name, ms in self.stages.items()},
+                "other": round(max(unaccounted, 0.0), 2),
+            },
+            "samples": self.samples,
+            "sample_interval_ms": sample_interval_ms,
+            "stacks": [
+                {"stack": stack, "count": count}
+                for stack, count in self.stacks.most_common()
+            ],
+        }
+
+
+@contextmanager
+def request_stage(name: str) -> Iterator[None]:
+    """
+    Time one stage of the request being profiled.
+
+    A no-op outside a profiled request, so library code can always call it.
+
+    Args:
+        name: Stage name (e.g. "retrieval"); repeated stages add up
+    """
+    capture = _current_capture.get()
+    if capture is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        capture.add_stage(name, (time.perf_counter() - start) * 1000)
+
+
+def _frame_label(frame) -> str:
+    """Short "function (file)" label for a collapsed stack."""
+    path = frame.f_code.co_filename
+    for marker in PATH_PREFIXES:
+        if marker in path:
+            path = path.split(marker, 1)[1]
+            break
+    return f"{frame.f_code.co_name} ({path})"
+
+
+def collapse_stack(frame) -> str:
+    """
+    Render a frame and its callers as one collapsed-stack line.
+
+    Args:
+        frame: Innermost frame
+
+    Returns:
+        Frames from outermost to innermost, separated by ";"
+    """
+    labels = []
+    while frame is not None and len(labels) < MAX_STACK_DEPTH:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+
+def merge_collapsed(captures: List[dict]) -> str:
+    """
+    Merge the stack samples of captures into collapsed-stack text.
+
+    Each line is "frame;frame;frame count", the input format of
+    flamegraph.pl, speedscope and inferno.
+
+    Args:
+        captures: Captures from SlowRequestProfiler.captures()
+
+    Returns:
+        Collapsed stacks, hottest first
+    """
+    merged = Counter()
+    for capture in captures:
+        for entry in capture["stacks"]:
+            merged[entry["stack"]] += entry["count"]
+    return "".join(f"{stack} {count}\n" for stack, count in merged.most_common())
+
+
+class SlowRequestProfiler:
+    """Keeps stage timings and stack profiles of requests over a threshold."""
+
+    def __init__(
+        self,
+        threshold_ms: Optional[float] = None,
+        sample_interval_ms: float = 10.0,
+        capacity: int = 50
+    ):
+        """
+        Initialize the profiler.
+
+        Args:
+            threshold_ms: Requests at least this slow are kept; None disables
+                profiling entirely
+            sample_interval_ms: How often the stacks of running requests are
+                sampled (0 records stage timings only)
+            capacity: Number of slow requests kept; older ones are dropped
+        """
+        self.threshold_ms = threshold_ms
+        self.sample_interval_ms = sample_interval_ms
+        self._captures = deque(maxlen=capacity)
+        self._active: Dict[int, RequestCapture] = {}
+        self._ids = itertools.count(1)
+        self._counts = {"profiled": 0, "captured": 0}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._sampler = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.threshold_ms is not None
+
+    @contextmanager
+    def capture(self, name: str, detail: Optional[str] = None) -> Iterator[Optional[RequestCapture]]:
+        """
+        Profile the body as one request.
+
+        Run it in the thread that does the request's work: only that thread's
+        stack is sampled.
+
+        Args:
+            name: Request name (e.g. "POST /chat")
+            detail: Extra context stored with a capture (e.g. the question)
+
+        Yields:
+            The capture in progress, or None when profiling is disabled
+        """
+        if not self.enabled:
+            yield None
+            return
+
+        capture = RequestCapture(next(self._ids), name, detail)
+        with self._lock:
+            self._active[capture.capture_id] = capture
+        if self.sample_interval_ms > 0:
+            self._start_sampler()
+        token = _current_capture.set(capture)
+        try:
+            yield capture
+        finally:
+            _current_capture.reset(token)
+            capture.duration_ms = (time.perf_counter() - capture.start) * 1000
+            with self._lock:
+                del self._active[capture.capture_id]
+                self._counts["profiled"] += 1
+                if capture.duration_ms >= self.threshold_ms:
+                    self._counts["captured"] += 1
+                    self._captures.append(capture.to_dict(self.sample_interval_ms))
+
+    def _start_sampler(self) -> None:
+        with self._lock:
+            if self._sampler is None:
+                self._sampler = threading.Thread(target=self._sample_loop, name="request-sampler", daemon=True)
+                self._sampler.start()
+        self._wake.set()
+
+    def _sample_loop(self) -> None:
+        """Sample the stacks of running requests; sleeps while there are none."""
+        while True:
+            self._wake.wait()
+            time.sleep(self.sample_interval_ms / 1000)
+            with self._lock:
+                active = list(self._active.values())
+                if not active:
+                    self._wake.clear()
+                    continue
+            frames = sys._current_frames()
+            stacks = [
+                (capture, collapse_stack(frames[capture.thread_id]))
+                for capture in active
+                if capture.thread_id in frames
+            ]
+            del frames
+            with self._lock:
+                # Skip requests that finished meanwhile; their captures are final
+                for capture, stack in stacks:
+                    if capture.capture_id in self._active:
+                        capture.stacks[stack] += 1
+                        capture.samples += 1
+
+    def captures(self, limit: Optional[int] = None) -> List[dict]:
+        """
+        Get the kept slow requests, newest first.
+
+        Args:
+            limit: Maximum number to return
+
+        Returns:
+            Capture dictionaries
+        """
+        with self._lock:
+            captures = list(reversed(self._captures))
+        return captures[:limit] if limit else captures
+
+    def stats(self) -> dict:
+        """
+        Get the profiler settings and counters.
+
+        Returns:
+            Dictionary with settings, request counts and buffered captures
+        """
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "threshold_ms": self.threshold_ms,
+                "sample_interval_ms": self.sample_interval_ms,
+                "capacity": self._captures.maxlen,
+                "buffered": len(self._captures),
+                **self._counts,
+            }
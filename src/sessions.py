@@ -0,0 +1,302 @@
+"""
+Conversation session module.
+Keeps bounded per-session history so follow-up questions can be answered
+without the user repeating the full question.
+"""
+
+import math
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Callable, List, Optional, Sequence, Tuple
+
+if TYPE_CHECKING:
+    from langchain_core.documents import Document
+
+# Words that point back at the previous topic ("what about its treatment?")
+FOLLOW_UP_PATTERN = re.compile(
+    r"^\s*(and|also|what about|how about|and what|then)\b"
+    r"|\b(it|its|it's|this|that|these|those|they|them|their|the disease|the condition)\b",
+    re.IGNORECASE
+)
+
+# Longer questions are treated as self-contained even if they contain "it"
+FOLLOW_UP_MAX_WORDS = 12
+
+# A follow-up reuses the previous chunks only if the question embeds at least
+# this close to the previous retrieval query (otherwise it may have changed topic)
+FOLLOW_UP_MIN_SIMILARITY = 0.35
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the LLM token count of a text (about 4 characters per token).
+
+    Args:
+        text: Text to measure
+
+    Returns:
+        Approximate number of tokens
+    """
+    return (len(text) + 3) // 4
+
+
+def summarize_turn(question: str, answer: str, max_chars: int = 200) -> str:
+    """
+    Summarize one turn without an LLM call: the question plus the first
+    sentence of the answer.
+
+    Args:
+        question: User question
+        answer: Chatbot answer
+        max_chars: Maximum length of the answer excerpt
+
+    Returns:
+        One-line summary
+    """
+    first_sentence = re.split(r"(?<=[.!?])\s|\n", answer.strip(), maxsplit=1)[0]
+    return f"User asked: {question.strip()} Answer: {first_sentence[:max_chars]}"
+
+
+class ConversationTurn:
+    """One question/answer exchange."""
+
+    def __init__(self, question: str, answer: str, retrieval_query: str):
+        self.question = question
+        self.answer = answer
+        self.retrieval_query = retrieval_query
+
+
+class ConversationSession:
+    """History and last retrieval of one conversation."""
+
+    def __init__(self, session_id: str, max_history_tokens: int = 800):
+        """
+        Initialize a session.
+
+        Args:
+            session_id: Unique session identifier
+            max_history_tokens: Hard cap on the history passed to the LLM
+        """
+        self.session_id = session_id
+        self.max_history_tokens = max_history_tokens
+        self.turns: List[ConversationTurn] = []
+        self.summary = ""
+        self.last_documents: List["Document"] = []
+        # Embedding of the query last_documents were retrieved with
+        self.last_query_vector: Optional[List[float]] = None
+        self.last_access = time.monotonic()
+        # Serializes turns of the same session; different sessions run in parallel
+        self.lock = threading.Lock()
+
+    @property
+    def last_query(self) -> Optional[str]:
+        """Retrieval query of the previous turn."""
+        return self.turns[-1].retrieval_query if self.turns else None
+
+    def history_text(self) -> str:
+        """
+        Render the summary and recent turns for the prompt.
+
+        Returns:
+            History text, empty for a new session
+        """
+        lines = []
+        if self.summary:
+            lines.append(f"Earlier: {self.summary}")
+        for turn in self.turns:
+            lines.append(f"User: {turn.question}")
+            lines.append(f"Assistant: {turn.answer}")
+        return "\n".join(lines)
+
+    def add_turn(
+        self,
+        question: str,
+        answer: str,
+        retrieval_query: str,
+        documents: List["Document"],
+        query_vector: Optional[List[float]] = None
+    ) -> None:
+        """
+        Record a finished turn and enforce the history token cap.
+
+        Args:
+            question: User question
+            answer: Chatbot answer
+            retrieval_query: Query the documents were retrieved with
+            documents: Retrieved documents, reused by follow-ups
+            query_vector: Embedding of retrieval_query if the documents were
+                retrieved this turn (None keeps the previous one)
+        """
+        self.turns.append(ConversationTurn(question, answer, retrieval_query))
+        self.last_documents = documents
+        if query_vector is not None:
+            self.last_query_vector = list(query_vector)
+        self._enforce_token_cap()
+
+    def _enforce_token_cap(self) -> None:
+        # Fold the oldest turns into the summary until the history fits
+        while estimate_tokens(self.history_text()) > self.max_history_tokens and len(self.turns) > 1:
+            oldest = self.turns.pop(0)
+            turn_summary = summarize_turn(oldest.question, oldest.answer)
+            self.summary = f"{self.summary} {turn_summary}".strip()
+
+        # The summary itself is capped at half the budget, keeping the newest part
+        max_summary_chars = self.max_history_tokens * 2
+        if len(self.summary) > max_summary_chars:
+            self.summary = "..." + self.summary[-max_summary_chars:]
+
+        # A single huge answer is truncated rather than exceeding the cap
+        if self.turns and estimate_tokens(self.history_text()) > self.max_history_tokens:
+            last = self.turns[-1]
+            budget = max(0, self.max_history_tokens * 4 - len(self.summary) - len(last.question) - 40)
+            last.answer = last.answer[:budget]
+
+
+def condense_question(question: str, session: ConversationSession) -> Tuple[str, bool]:
+    """
+    Turn a follow-up into a standalone retrieval query.
+
+    Short questions that refer back to the previous turn are prefixed with
+    the previous retrieval query, without an extra LLM call.
+
+    Args:
+        question: New user question
+        session: Conversation session
+
+    Returns:
+        Tuple of (retrieval query, whether the question is a follow-up)
+    """
+    previous = session.last_query
+    if not previous:
+        return question, False
+
+    is_follow_up = (
+        len(question.split()) <= FOLLOW_UP_MAX_WORDS
+        and FOLLOW_UP_PATTERN.search(question) is not None
+    )
+    if not is_follow_up:
+        return question, False
+    return f"{previous} {question}", True
+
+
+def cosine_similarity(a: Sequence[float], b: Sequence[float]) -> float:
+    """
+    Cosine similarity of two vectors.
+
+    Args:
+        a: First vector
+        b: Second vector
+
+    Returns:
+        Similarity between -1 and 1 (0 if either vector is zero)
+    """
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+
+class SessionStore:
+    """Bounded, TTL-evicted in-memory store of conversation sessions."""
+
+    def __init__(
+        self,
+        max_sessions: int = 1000,
+        ttl_seconds: float = 1800,
+        max_history_tokens: int = 800,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Initialize the session store.
+
+        Args:
+            max_sessions: Maximum live sessions; the least recently used is
+                evicted beyond this
+            ttl_seconds: Idle time after which a session expires
+            max_history_tokens: History token cap for new sessions
+            clock: Time source (injectable for tests)
+        """
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self.max_history_tokens = max_history_tokens
+        self._clock = clock
+        self._sessions: "OrderedDict[str, ConversationSession]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._evict_expired(self._clock())
+            return len(self._sessions)
+
+    def get(self, session_id: str) -> Optional[ConversationSession]:
+        """
+        Look up a live session and mark it as recently used.
+
+        Args:
+            session_id: Session identifier
+
+        Returns:
+            The session, or None if it does not exist or has expired
+        """
+        with self._lock:
+            now = self._clock()
+            self._evict_expired(now)
+            session = self._sessions.get(session_id)
+            if session is not None:
+                session.last_access = now
+                self._sessions.move_to_end(session_id)
+            return session
+
+    def create(self) -> ConversationSession:
+        """
+        Start a new session, evicting the least recently used if full.
+
+        Returns:
+            The new session
+        """
+        with self._lock:
+            now = self._clock()
+            self._evict_expired(now)
+            while len(self._sessions) >= self.max_sessions:
+                self._sessions.popitem(last=False)
+
+            session = ConversationSession(uuid.uuid4().hex, self.max_history_tokens)
+            session.last_access = now
+            self._sessions[session.session_id] = session
+            return session
+
+    def get_or_create(self, session_id: Optional[str] = None) -> ConversationSession:
+        """
+        Resume a session, or start a new one if it is unknown or expired.
+
+        Args:
+            session_id: Optional session identifier
+
+        Returns:
+            Live session (check session_id: it changes when a new one is started)
+        """
+        session = self.get(session_id) if session_id else None
+        return session if session is not None else self.create()
+
+    def delete(self, session_id: str) -> bool:
+        """
+        End a session.
+
+        Args:
+            session_id: Session identifier
+
+        Returns:
+            True if the session existed
+        """
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    def _evict_expired(self, now: float) -> None:
+        # Sessions are ordered by last access, so expired ones are at the front
+        while self._sessions:
+            session_id, session = next(iter(self._sessions.items()))
+            if now - session.last_access < self.ttl_seconds:
+                break
+            del self._sessions[session_id]
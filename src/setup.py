@@ -3,16 +3,62 @@ Setup script to initialize the RAG system.
 Loads documents and creates the vector store.
 """
 
+import argparse
 import os
+import shutil
 from dotenv import load_dotenv
+from src.chunking import CHUNKING_STRATEGIES
+from src.collection_registry import COLLECTION_NAME_PATTERN
 from src.data_ingestion import DataIngestion
-from src.vector_store import VectorStoreManager
+from src.parallel_embedding import ParallelEmbedder
+from src.snapshots import SnapshotManager
+from src.vector_store import VectorStoreManager, build_backend
 
 
-def main():
+def main(argv=None):
     """
     Main setup function to prepare the RAG system.
+    
+    Args:
+        argv: Command-line arguments (defaults to sys.argv)
     """
+    parser = argparse.ArgumentParser(description="Create the NCD vector store.")
+    parser.add_argument(
+        "--snapshot",
+        action="store_true",
+        help="Build into a new versioned snapshot under INDEX_SNAPSHOT_ROOT and activate it"
+    )
+    parser.add_argument(
+        "--chunking",
+        choices=CHUNKING_STRATEGIES,
+        help="Chunking strategy (default: CHUNKING_STRATEGY env var or recursive)"
+    )
+    parser.add_argument(
+        "--collection",
+        help="Build a named collection under COLLECTIONS_ROOT instead of the default index"
+    )
+    parser.add_argument(
+        "--data-dir",
+        default="data",
+        help="Directory with the PDF/TXT files to index (default: data)"
+    )
+    parser.add_argument(
+        "--embed-workers",
+        type=int,
+        help="Embed in this many worker processes (default: EMBED_WORKERS env var or 0, in-process)"
+    )
+    parser.add_argument(
+        "--torch-threads",
+        type=int,
+        help="Torch threads per embedding worker (default: EMBED_TORCH_THREADS env var or 1)"
+    )
+    args = parser.parse_args(argv)
+    
+    if args.collection and args.snapshot:
+        parser.error("--collection and --snapshot cannot be combined")
+    if args.collection and not COLLECTION_NAME_PATTERN.match(args.collection):
+        parser.error("collection names use up to 64 letters, digits, '-' and '_'")
+    
     print("=" * 70)
     print("RAG Chatbot Setup - Non-Communicable Diseases")
     print("=" * 70)
@@ -33,12 +79,12 @@ def main():
     print("Step 1: Loading and processing documents")
     print("=" * 70)
     
-    ingestion = DataIngestion(data_dir="data")
+    ingestion = DataIngestion(data_dir=args.data_dir, chunking=args.chunking)
     documents = ingestion.load_all_documents()
     
     if not documents:
-        print("\n❌ No documents found in the 'data' directory")
-        print("Please add PDF or TXT files to the 'data' directory")
+        print(f"\n❌ No documents found in the '{args.data_dir}' directory")
+        print(f"Please add PDF or TXT files to the '{args.data_dir}' directory")
         return
     
     print(f"\n✓ Loaded {len(documents)} documents")
@@ -61,13 +107,46 @@ def main():
     print("Step 3: Creating vector store (this may take a few minutes)")
     print("=" * 70)
     
+    snapshots = None
+    persist_directory = None
+    if args.snapshot:
+        snapshots = SnapshotManager(os.getenv("INDEX_SNAPSHOT_ROOT", "index_snapshots"))
+        version, persist_directory = snapshots.create_snapshot()
+        print(f"Building snapshot {version} in '{persist_directory}'")
+    elif args.collection:
+        persist_directory = os.path.join(os.getenv("COLLECTIONS_ROOT", "collections"), args.collection)
+        print(f"Building collection '{args.collection}' in '{persist_directory}'")
+    
+    embed_workers = args.embed_workers
+    if embed_workers is None:
+        embed_workers = int(os.getenv("EMBED_WORKERS", "0"))
+    torch_threads = args.torch_threads or int(os.getenv("EMBED_TORCH_THREADS", "1"))
+    embedder = None
+    if embed_workers > 0:
+        embedder = ParallelEmbedder(workers=embed_workers, torch_threads=torch_threads)
+    
+    # Servers load snapshots and collections with VECTOR_BACKEND, so build them in that format
+    backend = build_backend() if args.snapshot or args.collection else "chroma"
+    
     try:
-        vs_manager = VectorStoreManager()
-        vs_manager.create_vector_store(chunks)
+        vs_manager = VectorStoreManager(persist_directory=persist_directory, backend=backend)
+        vs_manager.create_vector_store(chunks, embedder=embedder)
         print("\n✓ Vector store created successfully")
     except Exception as e:
+        if snapshots:
+            # A partial version would otherwise look like the newest snapshot
+            shutil.rmtree(persist_directory, ignore_errors=True)
         print(f"\n❌ Error creating vector store: {str(e)}")
         return
+    finally:
+        if embedder:
+            embedder.close()
+    
+    if snapshots:
+        snapshots.activate(version)
+        print(f"✓ Snapshot {version} is now current")
+        print("  Running servers switch over on their next snapshot check,")
+        print("  or immediately with: POST /admin/reload")
     
     # Success
     print("\n" + "=" * 70)
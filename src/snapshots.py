@@ -0,0 +1,173 @@
+"""
+Versioned index snapshot module.
+Ingestion builds each new index into its own version directory; a CURRENT
+pointer file, replaced atomically, tells the API which version to serve.
+"""
+
+import json
+import os
+import re
+import shutil
+from typing import List, Optional, Tuple
+
+CURRENT_FILE = "CURRENT"
+HISTORY_FILE = "history.json"
+VERSION_PATTERN = re.compile(r"^v(\d{4,})$")
+
+
+class SnapshotManager:
+    """Manages versioned vector store snapshots under one root directory."""
+
+    def __init__(self, root: str = "index_snapshots"):
+        """
+        Initialize the snapshot manager.
+
+        Args:
+            root: Directory holding one sub-directory per version
+        """
+        self.root = root
+
+    def path_for(self, version: str) -> str:
+        """
+        Get the directory of a version.
+
+        Args:
+            version: Version name (e.g. "v0003")
+
+        Returns:
+            Path of the version directory
+        """
+        if not VERSION_PATTERN.match(version):
+            raise ValueError(f"Invalid snapshot version '{version}'.")
+        return os.path.join(self.root, version)
+
+    def list_versions(self) -> List[str]:
+        """
+        List the versions present on disk, oldest first.
+
+        Returns:
+            Sorted list of version names
+        """
+        if not os.path.isdir(self.root):
+            return []
+        versions = [name for name in os.listdir(self.root) if VERSION_PATTERN.match(name)]
+        return sorted(versions, key=lambda name: int(name[1:]))
+
+    def current_version(self) -> Optional[str]:
+        """
+        Get the version the API should serve.
+
+        Returns:
+            Active version name, or None if nothing has been activated
+        """
+        try:
+            with open(os.path.join(self.root, CURRENT_FILE), "r", encoding="utf-8") as f:
+                version = f.read().strip()
+        except FileNotFoundError:
+            return None
+        return version or None
+
+    def previous_version(self) -> Optional[str]:
+        """
+        Get the version that was active before the current one.
+
+        Returns:
+            Previous version name, or None if there is nothing to roll back to
+        """
+        history = self._read_history()
+        return history[-2] if len(history) >= 2 else None
+
+    def create_snapshot(self, base_version: Optional[str] = None) -> Tuple[str, str]:
+        """
+        Allocate a new version directory.
+
+        Args:
+            base_version: Optional version whose files are copied in first,
+                for incremental updates
+
+        Returns:
+            Tuple of (version name, directory path)
+        """
+        os.makedirs(self.root, exist_ok=True)
+        versions = self.list_versions()
+        number = int(versions[-1][1:]) + 1 if versions else 1
+        version = f"v{number:04d}"
+        path = self.path_for(version)
+
+        if base_version:
+            shutil.copytree(self.path_for(base_version), path)
+        else:
+            os.makedirs(path)
+
+        return version, path
+
+    def activate(self, version: str) -> None:
+        """
+        Point CURRENT at a version.
+
+        Args:
+            version: Version to serve
+        """
+        if not os.path.isdir(self.path_for(version)):
+            raise FileNotFoundError(f"Snapshot '{version}' does not exist.")
+
+        history = self._read_history()
+        if not history or history[-1] != version:
+            history.append(version)
+        self._write_atomic(HISTORY_FILE, json.dumps(history))
+        self._write_atomic(CURRENT_FILE, version)
+
+    def rollback(self) -> str:
+        """
+        Re-activate the previously active version.
+
+        Returns:
+            The version that is now current
+        """
+        history = self._read_history()
+        if len(history) < 2:
+            raise ValueError("No previous snapshot to roll back to.")
+
+        history.pop()
+        version = history[-1]
+        if not os.path.isdir(self.path_for(version)):
+            raise FileNotFoundError(f"Snapshot '{version}' no longer exists.")
+
+        self._write_atomic(HISTORY_FILE, json.dumps(history))
+        self._write_atomic(CURRENT_FILE, version)
+        return version
+
+    def prune(self, keep: int = 3) -> List[str]:
+        """
+        Delete old versions, never touching the current or previous one.
+
+        Args:
+            keep: Number of most recent versions to keep
+
+        Returns:
+            Deleted version names
+        """
+        protected = {self.current_version(), self.previous_version()}
+        removed = []
+        for version in self.list_versions()[:-keep or None]:
+            if version not in protected:
+                shutil.rmtree(self.path_for(version))
+                removed.append(version)
+        return removed
+
+    def _read_history(self) -> List[str]:
+        try:
+            with open(os.path.join(self.root, HISTORY_FILE), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            current = self.current_version()
+            return [current] if current else []
+
+    def _write_atomic(self, name: str, content: str) -> None:
+        path = os.path.join(self.root, name)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
@@ -0,0 +1,185 @@
+"""
+Startup profiler module.
+Records how long each deferred heavy import and each model/index load takes,
+so cold-start regressions show up in one report.
+"""
+
+import importlib
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Tuple
+
+# Taken when this module is first imported, i.e. very early in process startup
+PROCESS_START = time.perf_counter()
+
+
+class StartupProfiler:
+    """Collects import and load timings for the current process."""
+
+    def __init__(self, max_records: int = 500):
+        """
+        Initialize the profiler.
+
+        Args:
+            max_records: Timings kept; later ones (e.g. from repeated index
+                reloads) are only counted, so the startup timings are kept
+        """
+        self.max_records = max_records
+        self._records: List[dict] = []
+        self._dropped = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    @contextmanager
+    def measure(self, name: str, kind: str = "stage") -> Iterator[None]:
+        """
+        Time a block of code.
+
+        Args:
+            name: What is being timed (e.g. "load embedding model")
+            kind: "import" or "stage"
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            with self._lock:
+                if len(self._records) < self.max_records:
+                    self._records.append({
+                        "name": name,
+                        "kind": kind,
+                        "ms": round((end - start) * 1000, 2),
+                        "at_ms": round((start - PROCESS_START) * 1000, 2),
+                    })
+                else:
+                    self._dropped += 1
+
+    def import_module(self, module_name: str):
+        """
+        Import a module, timing it if this is the first import.
+
+        Args:
+            module_name: Dotted module name
+
+        Returns:
+            The imported module
+        """
+        if module_name in sys.modules:
+            return sys.modules[module_name]
+        with self.measure(module_name, kind="import"):
+            return importlib.import_module(module_name)
+
+    def report(self) -> dict:
+        """
+        Build the timing report.
+
+        Returns:
+            Dictionary with per-import and per-stage timings and totals
+        """
+        with self._lock:
+            records = list(self._records)
+            dropped = self._dropped
+        imports = [r for r in records if r["kind"] == "import"]
+        stages = [r for r in records if r["kind"] != "import"]
+        return {
+            "uptime_ms": round((time.perf_counter() - PROCESS_START) * 1000, 2),
+            "total_import_ms": round(sum(r["ms"] for r in imports), 2),
+            "total_stage_ms": round(sum(r["ms"] for r in stages), 2),
+            "imports": imports,
+            "stages": stages,
+            "dropped": dropped,
+        }
+
+    def format_report(self) -> str:
+        """
+        Render the report as plain text.
+
+        Returns:
+            Multi-line report
+        """
+        report = self.report()
+        lines = ["Startup timing report", "=" * 70]
+        for title, key in (("Imports", "imports"), ("Load stages", "stages")):
+            lines.append(f"{title}:")
+            for record in report[key]:
+                lines.append(f"  {record['ms']:>10.1f} ms  {record['name']}")
+            if not report[key]:
+                lines.append("  (none)")
+        lines.append("-" * 70)
+        lines.append(f"Deferred imports: {report['total_import_ms']:.1f} ms")
+        lines.append(f"Load stages:      {report['total_stage_ms']:.1f} ms")
+        return "\n".join(lines)
+
+
+# Process-wide profiler shared by all modules
+profiler = StartupProfiler()
+
+
+def lazy_import(module_name: str, lazy_imports: Dict[str, Tuple[str, str]], name: str):
+    """
+    Resolve a lazily imported name for a module-level __getattr__.
+
+    The value is cached on the module, so it is imported once and
+    unittest.mock.patch can replace it like a normal attribute.
+
+    Args:
+        module_name: Name of the module doing the lazy import (__name__)
+        lazy_imports: Mapping of attribute name to (source module, attribute)
+        name: Attribute being looked up
+
+    Returns:
+        The imported object
+    """
+    if name not in lazy_imports:
+        raise AttributeError(f"module {module_name!r} has no attribute {name!r}")
+
+    source_module, attribute = lazy_imports[name]
+    value = getattr(profiler.import_module(source_module), attribute)
+    setattr(sys.modules[module_name], name, value)
+    return value
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+    from dotenv import load_dotenv
+    # Record into the instance the other modules use, not this __main__ copy
+    from src.startup_profiler import profiler
+
+    parser = argparse.ArgumentParser(
+        description="Measure cold-start time of the API and chatbot."
+    )
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=None,
+        help="Exit with status 1 if the cold start takes longer than this"
+    )
+    args = parser.parse_args()
+
+    load_dotenv()
+
+    start = time.perf_counter()
+    with profiler.measure("import app"):
+        import app  # noqa: F401
+    from src.chatbot import NCDChatbot
+    NCDChatbot()
+    cold_start_ms = (time.perf_counter() - start) * 1000
+
+    report = profiler.report()
+    report["cold_start_ms"] = round(cold_start_ms, 2)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(profiler.format_report())
+        print(f"Cold start total: {cold_start_ms:.1f} ms")
+
+    if args.budget_ms is not None and cold_start_ms > args.budget_ms:
+        print(f"\nCold start {cold_start_ms:.0f} ms exceeds budget {args.budget_ms:.0f} ms")
+        sys.exit(1)
@@ -0,0 +1,197 @@
+"""
+Disease topic routing module.
+Chunks are tagged with the disease of their source document; a cheap router
+maps a question to one or more topics so retrieval can be restricted to them.
+"""
+
+import os
+import re
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Sequence, Set
+
+if TYPE_CHECKING:
+    import numpy as np
+
+ROUTING_MODES = ("off", "keyword", "centroid")
+
+# Extra phrases people use for a topic, keyed by topic name
+TOPIC_SYNONYMS = {
+    "diabetes": ["diabetic", "blood sugar", "insulin", "glucose"],
+    "high blood pressure": ["hypertension", "blood pressure"],
+    "heart attacks": ["heart attack", "myocardial infarction", "cardiac arrest"],
+    "cholesterol": ["ldl", "hdl", "lipid"],
+    "obesity": ["obese", "overweight", "bmi", "body mass index"],
+    "skin cancers": ["melanoma"],
+    "colorectal cancer": ["colon cancer", "bowel cancer", "rectal cancer"],
+}
+
+
+def topic_for_source(source: str) -> str:
+    """
+    Derive a chunk's topic from its source filename.
+
+    Args:
+        source: Source filename (e.g. "High Blood Pressure.pdf")
+
+    Returns:
+        Normalized topic name (e.g. "high blood pressure")
+    """
+    stem = os.path.splitext(os.path.basename(source))[0]
+    return re.sub(r"[\s\-_.]+", " ", stem).strip().lower()
+
+
+def topic_flag(topic: str) -> str:
+    """
+    Metadata key marking a chunk as also belonging to a topic.
+
+    A chunk has one "topic", but a passage merged from several PDFs by
+    deduplication belongs to each of their topics. Chroma metadata can't
+    hold lists, so every extra topic gets a True flag under this key.
+
+    Args:
+        topic: Topic name
+
+    Returns:
+        Metadata key, e.g. "topic:diabetes"
+    """
+    return f"topic:{topic}"
+
+
+def chunk_topics(metadata: Optional[dict]) -> Set[str]:
+    """
+    Get every topic a chunk belongs to: its own and any flagged ones.
+
+    Args:
+        metadata: Chunk metadata
+
+    Returns:
+        Topic names (empty for untagged chunks)
+    """
+    metadata = metadata or {}
+    topics = {key[len(topic_flag("")):] for key, value in metadata.items()
+              if key.startswith(topic_flag("")) and value is True}
+    if metadata.get("topic"):
+        topics.add(metadata["topic"])
+    return topics
+
+
+def topic_filter(topics: Sequence[str]) -> Optional[dict]:
+    """
+    Build a metadata filter restricting a search to some topics.
+
+    Matches chunks tagged with one of the topics or flagged with one (see
+    topic_flag).
+
+    Args:
+        topics: Topic names
+
+    Returns:
+        Chroma-style where filter, or None for a global search
+    """
+    if not topics:
+        return None
+    own = {"topic": topics[0]} if len(topics) == 1 else {"topic": {"$in": list(topics)}}
+    return {"$or": [own] + [{topic_flag(topic): True} for topic in topics]}
+
+
+def compute_centroids(metadatas: Iterable[dict], vectors: Iterable[Sequence[float]]) -> Dict[str, "np.ndarray"]:
+    """
+    Compute the normalized mean embedding of each topic.
+
+    Args:
+        metadatas: Chunk metadata (chunks without a topic are skipped)
+        vectors: Chunk embeddings, in the same order
+
+    Returns:
+        Dictionary of topic name to unit-length centroid
+    """
+    import numpy as np
+
+    sums: Dict[str, np.ndarray] = {}
+    for metadata, vector in zip(metadatas, vectors):
+        topic = (metadata or {}).get("topic")
+        if topic:
+            vector = np.asarray(vector, dtype=np.float32)
+            sums[topic] = sums[topic] + vector if topic in sums else vector.copy()
+    return {topic: total / (np.linalg.norm(total) or 1.0) for topic, total in sums.items()}
+
+
+class TopicRouter:
+    """Maps a question to the topics it is about, or to none if unclear."""
+
+    def __init__(
+        self,
+        topics: Sequence[str],
+        centroids: Optional[Dict[str, "np.ndarray"]] = None,
+        mode: str = "keyword",
+        min_similarity: float = 0.3,
+        min_margin: float = 0.05
+    ):
+        """
+        Initialize the router.
+
+        Args:
+            topics: Topic names present in the index
+            centroids: Mean chunk embedding per topic (required for "centroid")
+            mode: "keyword" matches topic names and synonyms in the question;
+                "centroid" picks the topic whose mean embedding is closest
+            min_similarity: Lowest cosine similarity accepted by "centroid"
+            min_margin: How much the best topic must beat the runner-up
+        """
+        if mode not in ROUTING_MODES or mode == "off":
+            raise ValueError(f"Unknown routing mode '{mode}'. Choose keyword or centroid.")
+        if mode == "centroid" and not centroids:
+            raise ValueError("Centroid routing needs per-topic embeddings.")
+
+        self.mode = mode
+        self.topics = sorted(set(topics))
+        self.min_similarity = min_similarity
+        self.min_margin = min_margin
+        self._patterns = {topic: self._keyword_pattern(topic) for topic in self.topics}
+
+        self._centroid_topics: List[str] = []
+        self._centroids = None
+        if centroids:
+            import numpy as np
+
+            self._centroid_topics = sorted(centroids)
+            matrix = np.array([centroids[t] for t in self._centroid_topics], dtype=np.float32)
+            self._centroids = matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+
+    @staticmethod
+    def _keyword_pattern(topic: str) -> "re.Pattern":
+        phrases = {topic}
+        # "heart attacks" should also match "heart attack"
+        if topic.endswith("s"):
+            phrases.add(topic[:-1])
+        phrases.update(TOPIC_SYNONYMS.get(topic, []))
+        alternatives = "|".join(re.escape(p) for p in sorted(phrases, key=len, reverse=True))
+        return re.compile(rf"\b(?:{alternatives})\b", re.IGNORECASE)
+
+    def route(self, question: str, query_embedding: Optional[Sequence[float]] = None) -> List[str]:
+        """
+        Pick the topics a question is about.
+
+        Args:
+            question: User question
+            query_embedding: Embedding of the question (used by "centroid")
+
+        Returns:
+            Topic names; empty when the question should search everything
+        """
+        if self.mode == "keyword":
+            return [topic for topic, pattern in self._patterns.items() if pattern.search(question)]
+
+        if query_embedding is None or self._centroids is None:
+            return []
+        import numpy as np
+
+        query = np.asarray(query_embedding, dtype=np.float32)
+        query = query / (np.linalg.norm(query) or 1.0)
+        similarities = self._centroids @ query
+
+        order = np.argsort(-similarities)
+        best = similarities[order[0]]
+        runner_up = similarities[order[1]] if len(order) > 1 else -1.0
+        if best < self.min_similarity or best - runner_up < self.min_margin:
+            return []
+        return [self._centroid_topics[int(order[0])]]
@@ -4,10 +4,124 @@ Handles document embedding and similarity search.
 """
 
 import os
-from typing import List, Optional
-from langchain_core.documents import Document
-from langchain_community.vectorstores import Chroma
-from langchain_community.embeddings import HuggingFaceEmbeddings
+import sys
+import time
+import uuid
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+from src.startup_profiler import lazy_import, profiler
+
+if TYPE_CHECKING:
+    import numpy as np
+    from langchain_core.documents import Document
+    from langchain_core.embeddings import Embeddings
+    from src.parallel_embedding import ParallelEmbedder
+
+# Heavy dependencies (chromadb, sentence-transformers/torch) are imported on
+# first use so importing this module stays cheap
+_LAZY_IMPORTS = {
+    "Chroma": ("langchain_community.vectorstores", "Chroma"),
+    "HuggingFaceEmbeddings": ("langchain_community.embeddings", "HuggingFaceEmbeddings"),
+}
+
+
+def __getattr__(name: str):
+    return lazy_import(__name__, _LAZY_IMPORTS, name)
+
+
+def _lazy(name: str):
+    """Get a lazily imported dependency (honours test patches)."""
+    return getattr(sys.modules[__name__], name)
+
+
+# Chroma HNSW settings: name -> (collection metadata key, environment variable, type)
+HNSW_PARAMS = {
+    "space": ("hnsw:space", "HNSW_SPACE", str),
+    "M": ("hnsw:M", "HNSW_M", int),
+    "construction_ef": ("hnsw:construction_ef", "HNSW_CONSTRUCTION_EF", int),
+    "search_ef": ("hnsw:search_ef", "HNSW_SEARCH_EF", int),
+}
+HNSW_SPACES = ("l2", "cosine", "ip")
+
+
+def _stop_chroma_client(client) -> bool:
+    """
+    Stop the Chroma system behind a client, freeing its in-memory index.
+    
+    Chroma has no public way to close a persistent client. All clients of
+    one persist directory share a System, which is kept in the private
+    SharedSystemClient._identifier_to_system map until it is removed from
+    there and stopped. This was checked with the pinned chromadb 1.3.7. If a
+    release changes it, the index is left in memory with a warning instead.
+    
+    Args:
+        client: Chroma client of the collection to release
+        
+    Returns:
+        True if the system was stopped
+    """
+    shared_client = profiler.import_module("chromadb.api.shared_system_client").SharedSystemClient
+    systems = getattr(shared_client, "_identifier_to_system", None)
+    identifier = getattr(client, "_identifier", None)
+    if not isinstance(systems, dict) or identifier is None:
+        print("Warning: this Chroma version can't be closed; the index stays in memory until exit")
+        return False
+    system = systems.pop(identifier, None)
+    if system is None:
+        return False
+    system.stop()
+    return True
+
+
+def hnsw_params_from_env() -> Dict[str, object]:
+    """
+    Read the HNSW settings configured in the environment.
+    
+    Returns:
+        Dictionary with the HNSW_PARAMS names that are set
+    """
+    params = {}
+    for name, (_, env_var, cast) in HNSW_PARAMS.items():
+        value = os.getenv(env_var)
+        if value:
+            params[name] = cast(value)
+    return params
+
+
+def _directory_size(path: str) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            total += os.path.getsize(os.path.join(root, name))
+    return total
+
+
+def _chunk_ids(documents: List["Document"]) -> Optional[List[str]]:
+    """Stable chunk IDs set at ingestion, or None for legacy chunks."""
+    ids = [doc.metadata.get("chunk_id") for doc in documents]
+    return ids if all(ids) else None
+
+
+EMBEDDING_MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+
+# Default on-disk location for each storage backend
+DEFAULT_PERSIST_DIRECTORIES = {
+    "chroma": "chroma_db",
+    "numpy": "numpy_index",
+    "mmap": "mmap_index",
+}
+
+
+def build_backend() -> str:
+    """
+    Backend that writes an index in the format VECTOR_BACKEND loads.
+    
+    The mmap backend is read-only; it maps the files the numpy backend writes.
+    
+    Returns:
+        "chroma" or "numpy"
+    """
+    backend = os.getenv("VECTOR_BACKEND", "chroma")
+    return "numpy" if backend == "mmap" else backend
 
 
 class VectorStoreManager:
@@ -15,57 +129,176 @@ class VectorStoreManager:
     
     def __init__(
         self,
-        persist_directory: str = "chroma_db",
-        collection_name: str = "ncd_diseases"
+        persist_directory: Optional[str] = None,
+        collection_name: str = "ncd_diseases",
+        backend: str = "chroma",
+        dtype: str = "float32",
+        embeddings: Optional["Embeddings"] = None,
+        hnsw: Optional[Dict[str, object]] = None
     ):
         """
         Initialize the vector store manager.
         
         Args:
             persist_directory: Directory to persist ChromaDB data
+                (defaults to the backend's standard directory)
             collection_name: Name of the ChromaDB collection
+            backend: Storage backend - "chroma" (read/write), "numpy"
+                (in-process brute-force index for small corpora) or "mmap"
+                (read-only memory-mapped export shared across workers)
+            dtype: Embedding precision for the numpy backend ("float32",
+                "float16" or "int8")
+            embeddings: Already-loaded embedding model to share instead of
+                loading a new one
+            hnsw: Chroma HNSW settings - space ("l2", "cosine" or "ip"), M
+                and construction_ef apply when the collection is created,
+                search_ef when it is loaded (default: HNSW_* env vars; the
+                numpy and mmap backends search exhaustively and ignore them)
         """
-        self.persist_directory = persist_directory
+        if backend not in DEFAULT_PERSIST_DIRECTORIES:
+            raise ValueError(
+                f"Unknown vector store backend '{backend}'. "
+                f"Choose one of: {', '.join(DEFAULT_PERSIST_DIRECTORIES)}"
+            )
+        
+        hnsw = hnsw_params_from_env() if hnsw is None else dict(hnsw)
+        unknown = set(hnsw) - set(HNSW_PARAMS)
+        if unknown:
+            raise ValueError(f"Unknown HNSW parameters: {', '.join(sorted(unknown))}")
+        if hnsw.get("space", "l2") not in HNSW_SPACES:
+            raise ValueError(f"HNSW space must be one of: {', '.join(HNSW_SPACES)}")
+        
+        self.backend = backend
+        self.persist_directory = persist_directory or DEFAULT_PERSIST_DIRECTORIES[backend]
         self.collection_name = collection_name
+        self.dtype = dtype
+        self.hnsw = hnsw
         
-        # Use free HuggingFace embeddings
-        print("Loading embedding model (this may take a moment on first run)...")
-        self.embeddings = HuggingFaceEmbeddings(
-            model_name="sentence-transformers/all-MiniLM-L6-v2"
-        )
+        if embeddings is not None:
+            self.embeddings = embeddings
+        else:
+            # Use free HuggingFace embeddings
+            print("Loading embedding model (this may take a moment on first run)...")
+            embeddings_cls = _lazy("HuggingFaceEmbeddings")
+            with profiler.measure("load embedding model"):
+                self.embeddings = embeddings_cls(
+                    model_name=EMBEDDING_MODEL_NAME
+                )
         self.vector_store = None
+        self.topic_router = None
+        # (store, keyword TopicRouter) for mentioned_topics, rebuilt on changes
+        self._topic_keywords = None
     
-    def create_vector_store(self, documents: List[Document]) -> Chroma:
+    def create_vector_store(
+        self,
+        documents: List["Document"],
+        embedder: Optional["ParallelEmbedder"] = None
+    ):
         """
         Create a new vector store from documents.
         
         Args:
             documents: List of document chunks to embed
+            embedder: Process pool to embed the chunks with instead of the
+                in-process model (for large bulk builds)
             
         Returns:
-            Chroma vector store instance
+            Chroma or NumpyVectorStore instance, depending on the backend
         """
         if not documents:
             raise ValueError("No documents provided to create vector store.")
         
+        if self.backend == "mmap":
+            raise ValueError(
+                "The memory-mapped index is exported from Chroma, not created directly. "
+                "Create a Chroma store and run: python -m src.mmap_index"
+            )
+        
         print(f"Creating vector store with {len(documents)} documents...")
         
-        self.vector_store = Chroma.from_documents(
+        if embedder is not None:
+            return self._create_with_embedder(documents, embedder)
+        
+        if self.backend == "numpy":
+            from src.numpy_store import NumpyVectorStore
+            self.vector_store = NumpyVectorStore.from_documents(
+                documents,
+                embedding=self.embeddings,
+                ids=_chunk_ids(documents),
+                dtype=self.dtype
+            )
+            self.vector_store.save(self.persist_directory, embedding_model=EMBEDDING_MODEL_NAME)
+            print(f"Vector store created and persisted to '{self.persist_directory}'")
+            return self.vector_store
+        
+        self.vector_store = _lazy("Chroma").from_documents(
             documents=documents,
             embedding=self.embeddings,
+            ids=_chunk_ids(documents),
             persist_directory=self.persist_directory,
-            collection_name=self.collection_name
+            collection_name=self.collection_name,
+            collection_metadata=self._collection_metadata()
         )
         
         print(f"Vector store created and persisted to '{self.persist_directory}'")
         return self.vector_store
     
-    def load_vector_store(self) -> Chroma:
+    def _create_with_embedder(self, documents: List["Document"], embedder: "ParallelEmbedder"):
+        """
+        Create the vector store from embeddings computed by a process pool.
+        
+        Chroma gets one upsert per batch as the batches arrive in order; the
+        numpy store is written once, after all chunks are embedded.
+        
+        Args:
+            documents: List of document chunks to embed
+            embedder: Process pool to embed the chunks with
+            
+        Returns:
+            Chroma or NumpyVectorStore instance, depending on the backend
+        """
+        texts = [doc.page_content for doc in documents]
+        metadatas = [doc.metadata for doc in documents]
+        ids = _chunk_ids(documents) or [str(uuid.uuid4()) for _ in documents]
+        print(
+            f"Embedding with {embedder.workers} worker process(es), "
+            f"{embedder.torch_threads} torch thread(s) each..."
+        )
+        start = time.perf_counter()
+        
+        if self.backend == "numpy":
+            from src.numpy_store import NumpyVectorStore
+            self.vector_store = NumpyVectorStore(self.embeddings, dtype=self.dtype)
+            self.vector_store.add_embeddings(texts, embedder.embed(texts), metadatas, ids)
+            self.vector_store.save(self.persist_directory, embedding_model=EMBEDDING_MODEL_NAME)
+        else:
+            self.vector_store = _lazy("Chroma")(
+                embedding_function=self.embeddings,
+                persist_directory=self.persist_directory,
+                collection_name=self.collection_name,
+                collection_metadata=self._collection_metadata()
+            )
+            collection = self.vector_store._collection
+            for offset, vectors in embedder.embed_batches(texts):
+                end = offset + len(vectors)
+                collection.upsert(
+                    ids=ids[offset:end],
+                    embeddings=vectors,
+                    documents=texts[offset:end],
+                    metadatas=metadatas[offset:end]
+                )
+        
+        seconds = time.perf_counter() - start
+        print(f"Embedded {len(documents)} chunks in {seconds:.1f}s ({len(documents) / seconds:.0f} chunks/s)")
+        print(f"Vector store created and persisted to '{self.persist_directory}'")
+        return self.vector_store
+    
+    def load_vector_store(self):
         """
         Load an existing vector store from disk.
         
         Returns:
-            Chroma vector store instance
+            Chroma, NumpyVectorStore or MmapVectorStore instance, depending on the backend
         """
         if not os.path.exists(self.persist_directory):
             raise FileNotFoundError(
@@ -75,26 +308,198 @@ class VectorStoreManager:
         
         print(f"Loading vector store from '{self.persist_directory}'...")
         
-        self.vector_store = Chroma(
-            persist_directory=self.persist_directory,
-            embedding_function=self.embeddings,
-            collection_name=self.collection_name
-        )
+        if self.backend == "mmap":
+            store_cls = profiler.import_module("src.mmap_index").MmapVectorStore
+            with profiler.measure("load vector store (mmap)"):
+                self.vector_store = store_cls(
+                    index_dir=self.persist_directory,
+                    embedding=self.embeddings
+                )
+            print(f"Memory-mapped index loaded ({len(self.vector_store)} chunks, read-only)")
+            return self.vector_store
+        
+        if self.backend == "numpy":
+            store_cls = profiler.import_module("src.numpy_store").NumpyVectorStore
+            with profiler.measure("load vector store (numpy)"):
+                self.vector_store = store_cls.load(
+                    self.persist_directory,
+                    embedding=self.embeddings,
+                    dtype=self.dtype
+                )
+            print(f"NumPy index loaded ({len(self.vector_store)} chunks, {self.dtype})")
+            return self.vector_store
+        
+        chroma_cls = _lazy("Chroma")
+        with profiler.measure("load vector store (chroma)"):
+            self.vector_store = chroma_cls(
+                persist_directory=self.persist_directory,
+                embedding_function=self.embeddings,
+                collection_name=self.collection_name
+            )
+        self._apply_hnsw_settings()
         
         print("Vector store loaded successfully")
         return self.vector_store
     
+    def _collection_metadata(self) -> Optional[dict]:
+        """HNSW settings in Chroma's collection metadata format."""
+        metadata = {HNSW_PARAMS[name][0]: value for name, value in self.hnsw.items()}
+        return metadata or None
+    
+    def _apply_hnsw_settings(self) -> None:
+        """Apply search_ef to a loaded collection; report build settings it can't change."""
+        if "search_ef" in self.hnsw:
+            self._apply_search_ef(self.hnsw["search_ef"])
+        if not set(self.hnsw) - {"search_ef"}:
+            return
+        
+        actual = self.index_settings()
+        built = {"space": actual.get("space"), "M": actual.get("max_neighbors"),
+                 "construction_ef": actual.get("ef_construction")}
+        for name, value in built.items():
+            if name in self.hnsw and self.hnsw[name] != value:
+                print(f"Warning: the collection was built with HNSW {name}={value}; "
+                      f"rebuild it to use {name}={self.hnsw[name]}")
+    
+    def _apply_search_ef(self, search_ef: int) -> None:
+        """
+        Set how many candidates the Chroma HNSW search explores.
+        
+        This is a load-time setting, not a per-query one: Chroma's query API
+        has no ef argument, and Chroma reads the value stored in the
+        collection's configuration when a process first searches it. The
+        stored value is only rewritten when it differs, and the change is
+        seen by every process that loads the collection afterwards.
+        
+        Args:
+            search_ef: HNSW ef used by searches
+        """
+        if self.index_settings().get("ef_search") == int(search_ef):
+            return
+        self.vector_store._collection.modify(configuration={"hnsw": {"ef_search": int(search_ef)}})
+    
+    def index_settings(self) -> dict:
+        """
+        Get the settings of the loaded index.
+        
+        Returns:
+            Chroma's HNSW configuration, or the numpy/mmap storage settings
+        """
+        if not self.vector_store:
+            raise ValueError("Vector store not initialized. Load it first.")
+        
+        if self.backend in ("numpy", "mmap"):
+            store = self.vector_store
+            return {
+                "type": "exhaustive",
+                "dtype": "float32" if self.backend == "mmap" else str(store.dtype),
+                "dim": int(store._matrix.shape[1]) if len(store) else 0,
+                "memory_bytes": store.nbytes if self.backend == "numpy" else 0,
+            }
+        
+        configuration = self.vector_store._collection.configuration
+        return {"type": "hnsw", **(configuration.get("hnsw") or {})}
+    
+    def index_stats(self) -> dict:
+        """
+        Describe the loaded index: size, sources and settings.
+        
+        Returns:
+            Dictionary with chunk count, chunks per source, on-disk size and
+            index settings
+        """
+        if not self.vector_store:
+            raise ValueError("Vector store not initialized. Load it first.")
+        
+        metadatas = self._all_metadatas()
+        per_source: Dict[str, int] = {}
+        for metadata in metadatas:
+            source = (metadata or {}).get("source", "unknown")
+            per_source[source] = per_source.get(source, 0) + 1
+        
+        return {
+            "backend": self.backend,
+            "collection": self.collection_name if self.backend == "chroma" else None,
+            "persist_directory": self.persist_directory,
+            "chunks": len(metadatas),
+            "sources": dict(sorted(per_source.items())),
+            "disk_bytes": _directory_size(self.persist_directory),
+            "index": self.index_settings(),
+        }
+    
+    def memory_bytes(self) -> int:
+        """
+        Estimate the memory the loaded index keeps resident.
+        
+        numpy counts its matrix and chunk texts. mmap counts nothing, because
+        its pages are shared page cache the OS can drop, so memory budgets
+        (COLLECTION_MEMORY_MB) never unload mmap collections; only the count
+        limit does. Chroma counts the vectors plus HNSW graph links that it
+        holds in memory once queried.
+        
+        Returns:
+            Estimated bytes (0 if nothing is loaded)
+        """
+        if not self.vector_store:
+            return 0
+        if self.backend == "mmap":
+            return 0
+        if self.backend == "numpy":
+            return self.vector_store.nbytes + sum(len(text) for text in self.vector_store._texts)
+        
+        collection = self.vector_store._collection
+        count = collection.count()
+        if not count:
+            return 0
+        sample = collection.get(limit=1, include=["embeddings"])["embeddings"]
+        settings = self.index_settings()
+        links = 2 * int(settings.get("max_neighbors") or 16)
+        return count * (len(sample[0]) + links) * 4
+        
+    def close(self) -> None:
+        """
+        Release the loaded index.
+        
+        Chroma keeps a collection's HNSW index in memory until the client
+        for its persist directory is stopped, so that client is stopped too
+        (see _stop_chroma_client). Only call this when no other manager uses
+        the same directory.
+        """
+        if self.vector_store is not None and self.backend == "chroma":
+            _stop_chroma_client(self.vector_store._client)
+        self.vector_store = None
+        self.topic_router = None
+        self._topic_keywords = None
+    
+    def _all_metadatas(self) -> List[dict]:
+        """Metadata of every chunk, without the embeddings."""
+        if self.backend in ("numpy", "mmap"):
+            return self.vector_store._metadatas
+        
+        metadatas = []
+        collection = self.vector_store._collection
+        offset = 0
+        while True:
+            page = collection.get(include=["metadatas"], limit=1000, offset=offset)
+            if not page["ids"]:
+                break
+            metadatas.extend(page["metadatas"])
+            offset += len(page["ids"])
+        return metadatas
+    
     def similarity_search(
         self,
         query: str,
-        k: int = 4
-    ) -> List[Document]:
+        k: int = 4,
+        filter: Optional[dict] = None
+    ) -> List["Document"]:
         """
         Perform similarity search on the vector store.
         
         Args:
             query: Search query
             k: Number of results to return
+            filter: Optional metadata filter (e.g. {"topic": "diabetes"})
             
         Returns:
             List of most similar documents
@@ -102,25 +507,227 @@ class VectorStoreManager:
         if not self.vector_store:
             raise ValueError("Vector store not initialized. Load or create one first.")
         
+        if filter:
+            return self.vector_store.similarity_search(query, k=k, filter=filter)
         results = self.vector_store.similarity_search(query, k=k)
         return results
     
-    def add_documents(self, documents: List[Document]) -> None:
+    def _all_embeddings(self) -> Tuple[List[dict], "np.ndarray"]:
+        """Metadata and embedding of every chunk (paged out of Chroma)."""
+        if self.backend in ("numpy", "mmap"):
+            return self.vector_store._metadatas, self.vector_store.embedding_matrix()
+        
+        import numpy as np
+        
+        metadatas, vectors = [], []
+        collection = self.vector_store._collection
+        offset = 0
+        while True:
+            page = collection.get(include=["embeddings", "metadatas"], limit=1000, offset=offset)
+            if not page["ids"]:
+                break
+            metadatas.extend(page["metadatas"])
+            vectors.extend(page["embeddings"])
+            offset += len(page["ids"])
+        return metadatas, np.asarray(vectors, dtype=np.float32)
+    
+    def topic_centroids(self) -> Dict[str, "np.ndarray"]:
+        """
+        Compute the mean embedding of each topic's chunks.
+        
+        Returns:
+            Dictionary of topic name to normalized centroid (empty for
+            indexes built before chunks were tagged with topics)
+        """
+        if not self.vector_store:
+            raise ValueError("Vector store not initialized. Load it first.")
+        
+        from src.topics import compute_centroids
+        
+        return compute_centroids(*self._all_embeddings())
+    
+    def corpus_version(self) -> str:
+        """
+        Fingerprint the indexed content.
+        
+        Chunk IDs are derived from chunk text, so the fingerprint changes
+        whenever a chunk is added, removed or edited.
+        
+        Returns:
+            12-character hexadecimal version
+        """
+        if not self.vector_store:
+            raise ValueError("Vector store not initialized. Load it first.")
+        
+        import hashlib
+        
+        if self.backend in ("numpy", "mmap"):
+            ids = list(self.vector_store._ids)
+        else:
+            ids = []
+            collection = self.vector_store._collection
+            offset = 0
+            while True:
+                page = collection.get(include=[], limit=1000, offset=offset)
+                if not page["ids"]:
+                    break
+                ids.extend(page["ids"])
+                offset += len(page["ids"])
+        
+        digest = hashlib.sha1("\n".join(sorted(ids)).encode("utf-8"))
+        return digest.hexdigest()[:12]
+    
+    def corpus_centroid(self) -> Optional["np.ndarray"]:
+        """
+        Compute the normalized mean embedding of all chunks.
+        
+        Returns:
+            Corpus centroid, or None for an empty store
+        """
+        if not self.vector_store:
+            raise ValueError("Vector store not initialized. Load it first.")
+        
+        import numpy as np
+        
+        _, vectors = self._all_embeddings()
+        if len(vectors) == 0:
+            return None
+        vectors = np.asarray(vectors, dtype=np.float32)
+        # Normalize rows first so long and short chunks weigh the same
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        centroid = (vectors / norms).mean(axis=0)
+        return centroid / (np.linalg.norm(centroid) or 1.0)
+    
+    def enable_topic_routing(self, mode: str = "keyword") -> bool:
+        """
+        Restrict searches to the question's disease topic when it is clear.
+        
+        Args:
+            mode: "keyword" or "centroid" (see src.topics.TopicRouter)
+            
+        Returns:
+            True if routing is active (False for untagged indexes)
+        """
+        from src.topics import TopicRouter
+        
+        centroids = self.topic_centroids()
+        if not centroids:
+            print("Topic routing disabled: chunks have no topic tags. Rebuild the index to add them.")
+            self.topic_router = None
+            return False
+        
+        self.topic_router = TopicRouter(list(centroids), centroids=centroids, mode=mode)
+        return True
+    
+    def mentioned_topics(self, question: str) -> List[str]:
+        """
+        Find the index's topics a question names (by keyword, whatever TOPIC_ROUTING is).
+        
+        Args:
+            question: User question
+            
+        Returns:
+            Topic names mentioned in the question
+        """
+        if not self.vector_store:
+            return []
+        if self._topic_keywords is None or self._topic_keywords[0] is not self.vector_store:
+            from src.topics import TopicRouter, topic_for_source
+            
+            topics = {topic_for_source(source) for source in self.get_existing_sources()}
+            self._topic_keywords = (self.vector_store, TopicRouter(sorted(topics), mode="keyword"))
+        return self._topic_keywords[1].route(question)
+    
+    def similarity_search_by_vector(
+        self,
+        vector: List[float],
+        k: int = 4,
+        filter: Optional[dict] = None
+    ) -> List["Document"]:
+        """
+        Perform similarity search with an already-computed query embedding.
+        
+        Args:
+            vector: Query embedding
+            k: Number of results to return
+            filter: Optional metadata filter
+            
+        Returns:
+            List of most similar documents
+        """
+        if not self.vector_store:
+            raise ValueError("Vector store not initialized. Load or create one first.")
+        
+        if filter:
+            return self.vector_store.similarity_search_by_vector(vector, k=k, filter=filter)
+        return self.vector_store.similarity_search_by_vector(vector, k=k)
+    
+    def routed_search(
+        self,
+        query: str,
+        k: int = 4,
+        vector: Optional[List[float]] = None
+    ) -> Tuple[List["Document"], List[str]]:
+        """
+        Search within the query's topics, falling back to the whole index.
+        
+        The query is embedded once and the vector is used for routing and
+        for the search.
+        
+        Args:
+            query: Search query
+            k: Number of results to return
+            vector: Query embedding, if already computed
+            
+        Returns:
+            Tuple of (documents, topics searched - empty for a global search)
+        """
+        if not self.vector_store:
+            raise ValueError("Vector store not initialized. Load or create one first.")
+        if self.topic_router is None:
+            if vector is not None:
+                return self.similarity_search_by_vector(vector, k=k), []
+            return self.similarity_search(query, k=k), []
+        
+        from src.topics import topic_filter
+        
+        if vector is None:
+            vector = self.embeddings.embed_query(query)
+        topics = self.topic_router.route(query, vector)
+        if topics:
+            documents = self.similarity_search_by_vector(vector, k=k, filter=topic_filter(topics))
+            if documents:
+                return documents, topics
+        return self.similarity_search_by_vector(vector, k=k), []
+    
+    def add_documents(self, documents: List["Document"], persist: bool = True) -> None:
         """
         Add new documents to an existing vector store.
         
         Args:
             documents: List of document chunks to add
+            persist: Save the numpy index afterwards (pass False for all but
+                the last of several batches)
         """
         if not self.vector_store:
             raise ValueError("Vector store not initialized. Load it first.")
         
+        if self.backend == "mmap":
+            raise ValueError(
+                "The memory-mapped index is read-only. "
+                "Add documents to Chroma and re-export the index."
+            )
+        
         if not documents:
             print("No documents to add.")
             return
         
         print(f"Adding {len(documents)} new document chunks to vector store...")
-        self.vector_store.add_documents(documents)
+        self.vector_store.add_documents(documents, ids=_chunk_ids(documents))
+        self._topic_keywords = None
+        if self.backend == "numpy" and persist:
+            self.vector_store.save(self.persist_directory, embedding_model=EMBEDDING_MODEL_NAME)
         print("Documents added successfully")
     
     def get_existing_sources(self) -> List[str]:
@@ -133,6 +740,9 @@ class VectorStoreManager:
         if not self.vector_store:
             raise ValueError("Vector store not initialized. Load it first.")
         
+        if self.backend in ("numpy", "mmap"):
+            return self.vector_store.get_sources()
+        
         # Get all documents and extract unique sources
         collection = self.vector_store._collection
         all_metadata = collection.get()['metadatas']
@@ -144,6 +754,68 @@ class VectorStoreManager:
         
         return sorted(list(sources))
     
+    def get_chunk(self, chunk_id: str) -> Optional["Document"]:
+        """
+        Look up a single chunk by its ID.
+        
+        Args:
+            chunk_id: Chunk ID returned with answer sources
+            
+        Returns:
+            The chunk, or None if it is not in the store
+        """
+        if not self.vector_store:
+            raise ValueError("Vector store not initialized. Load it first.")
+        
+        if self.backend in ("numpy", "mmap"):
+            found = self.vector_store.get_by_ids([chunk_id])
+            return found[0] if found else None
+        
+        from langchain_core.documents import Document
+        
+        result = self.vector_store._collection.get(
+            ids=[chunk_id],
+            include=["documents", "metadatas"]
+        )
+        if not result["ids"]:
+            return None
+        return Document(
+            page_content=result["documents"][0],
+            metadata=result["metadatas"][0] or {},
+            id=result["ids"][0]
+        )
+    
+    def export_mmap_index(self, index_dir: str = DEFAULT_PERSIST_DIRECTORIES["mmap"]) -> int:
+        """
+        Export the loaded vector store to a memory-mapped index.
+        
+        The same files can be loaded by the "numpy" and "mmap" backends.
+        
+        Args:
+            index_dir: Directory to write the index files to
+            
+        Returns:
+            Number of exported chunks
+        """
+        if not self.vector_store:
+            raise ValueError("Vector store not initialized. Load it first.")
+        
+        if self.backend == "numpy":
+            self.vector_store.save(index_dir, embedding_model=EMBEDDING_MODEL_NAME)
+            return len(self.vector_store)
+        
+        if self.backend != "chroma":
+            raise ValueError("The memory-mapped index is already an export.")
+        
+        from src.mmap_index import export_collection
+        
+        print(f"Exporting collection '{self.collection_name}' to '{index_dir}'...")
+        return export_collection(
+            self.vector_store._collection,
+            index_dir,
+            embedding_model=EMBEDDING_MODEL_NAME
+        )
+    
     def get_retriever(self, search_kwargs: dict = None):
         """
         Get a retriever instance for use in chains.
@@ -0,0 +1,263 @@
+"""
+WebSocket chat module.
+Runs several streamed questions over one WebSocket connection, with a cap on
+questions in flight and a bounded send queue per connection.
+"""
+
+import asyncio
+import concurrent.futures
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterator, Optional
+
+from starlette.websockets import WebSocket, WebSocketDisconnect
+
+# How often a blocked producer checks whether its question was cancelled
+CANCEL_POLL_SECONDS = 0.1
+# Close code sent to a client that stopped reading (policy violation)
+SLOW_CLIENT_CLOSE_CODE = 1008
+
+
+class _Question:
+    """One question being answered on a connection."""
+
+    def __init__(self, question_id):
+        self.question_id = question_id
+        self.cancelled = threading.Event()
+
+
+class ChatConnection:
+    """
+    Serves one /ws/chat connection.
+
+    Client messages:
+        {"type": "ask", "id": ..., "question": ..., "session_id"?, "start_session"?, "collection"?}
+        {"type": "cancel", "id": ...}
+
+    Server messages, interleaved across questions and tagged with their id:
+        {"type": "token", "id", "text"}, then {"type": "sources", "id", "sources"}
+        and {"type": "done", "id", "answer", ...}; or {"type": "error", "id", "detail"};
+        {"type": "cancelled", "id"} after a cancel.
+
+    Answers are produced on worker threads into a bounded queue that a single
+    sender drains. A client that reads slowly fills its own queue, which
+    pauses its own producers (and their LLM streams), not other connections.
+    A client that reads nothing for send_timeout seconds is disconnected, so
+    its producers give their worker threads back.
+    """
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        open_stream: Callable[[dict], Iterator[dict]],
+        executor: ThreadPoolExecutor,
+        max_questions: int = 4,
+        send_queue_size: int = 256,
+        send_timeout: float = 30.0,
+        in_flight: Optional[threading.Semaphore] = None
+    ):
+        """
+        Initialize the connection.
+
+        Args:
+            websocket: Accepted WebSocket
+            open_stream: Starts answering an "ask" message; returns an
+                NCDChatbot.stream-style event iterator (runs on a worker thread)
+            executor: Worker threads shared by all connections
+            max_questions: Questions one connection may have in flight
+            send_queue_size: Events buffered for the client before producers wait
+            send_timeout: Seconds a send, or a producer waiting for queue
+                space, may block before the client is disconnected
+            in_flight: Slots shared by all connections; a question that
+                finds none free is refused instead of waiting for a thread
+        """
+        self.websocket = websocket
+        self.open_stream = open_stream
+        self.executor = executor
+        self.max_questions = max_questions
+        self.send_timeout = send_timeout
+        self.in_flight = in_flight
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=send_queue_size)
+        self._questions: Dict[object, _Question] = {}
+        self._closed = threading.Event()
+        self._stalled = False
+        self._loop = None
+        self._sender: Optional[asyncio.Task] = None
+
+    async def run(self) -> None:
+        """Handle messages until the client disconnects or stops reading."""
+        self._loop = asyncio.get_running_loop()
+        self._sender = sender = asyncio.create_task(self._send_loop())
+        try:
+            while True:
+                receive = asyncio.ensure_future(self.websocket.receive_json())
+                await asyncio.wait({receive, sender}, return_when=asyncio.FIRST_COMPLETED)
+                if not receive.done():
+                    # The sender stopped: the client is gone or stopped reading
+                    receive.cancel()
+                    break
+                try:
+                    message = receive.result()
+                except WebSocketDisconnect:
+                    break
+                except (json.JSONDecodeError, UnicodeDecodeError):
+                    await self._queue.put({"type": "error", "id": None, "detail": "Messages must be JSON objects"})
+                    continue
+                await self._handle(message)
+        finally:
+            self._closed.set()
+            for question in self._questions.values():
+                question.cancelled.set()
+            sender.cancel()
+            if self._stalled:
+                await self._close_stalled()
+
+    async def _send_loop(self) -> None:
+        """Send queued events in order; waits while the client is not reading."""
+        try:
+            while True:
+                event = await self._queue.get()
+                await asyncio.wait_for(self.websocket.send_json(event), self.send_timeout)
+        except asyncio.TimeoutError:
+            self._stalled = True
+        except (WebSocketDisconnect, RuntimeError):
+            # Client went away; run() stops receiving
+            pass
+
+    async def _close_stalled(self) -> None:
+        """Disconnect a client that stopped reading."""
+        try:
+            await asyncio.wait_for(
+                self.websocket.close(code=SLOW_CLIENT_CLOSE_CODE, reason="Client is not reading"),
+                self.send_timeout
+            )
+        except Exception:
+            # The connection is being dropped anyway
+            pass
+
+    def _stall(self) -> None:
+        """Stop the connection from a worker thread because the client stopped reading."""
+        self._stalled = True
+        self._closed.set()
+        try:
+            self._loop.call_soon_threadsafe(self._sender.cancel)
+        except RuntimeError:
+            # The connection already finished and its loop is gone
+            pass
+
+    async def _handle(self, message) -> None:
+        """Start or cancel a question."""
+        if not isinstance(message, dict):
+            await self._queue.put({"type": "error", "id": None, "detail": "Messages must be JSON objects"})
+            return
+
+        question_id = message.get("id")
+        kind = message.get("type", "ask")
+        if question_id is None or isinstance(question_id, (dict, list)):
+            await self._queue.put({"type": "error", "id": None, "detail": "Every message needs a string or number 'id'"})
+            return
+
+        if kind == "cancel":
+            question = self._questions.get(question_id)
+            if question is not None:
+                question.cancelled.set()
+            return
+
+        if kind != "ask":
+            await self._queue.put({"type": "error", "id": question_id, "detail": f"Unknown message type '{kind}'"})
+            return
+        if not isinstance(message.get("question"), str) or not message["question"].strip():
+            await self._queue.put({"type": "error", "id": question_id, "detail": "Question cannot be empty"})
+            return
+        if question_id in self._questions:
+            await self._queue.put({"type": "error", "id": question_id, "detail": "A question with this id is still running"})
+            return
+        if len(self._questions) >= self.max_questions:
+            await self._queue.put({
+                "type": "error",
+                "id": question_id,
+                "detail": f"Too many questions in flight (limit {self.max_questions}); wait for one to finish"
+            })
+            return
+
+        if self.in_flight is not None and not self.in_flight.acquire(blocking=False):
+            await self._queue.put({
+                "type": "error",
+                "id": question_id,
+                "detail": "The server is answering too many questions; try again shortly"
+            })
+            return
+
+        question = _Question(question_id)
+        self._questions[question_id] = question
+        future = self._loop.run_in_executor(self.executor, self._produce, question, message)
+        future.add_done_callback(lambda _: self._finish(question_id))
+
+    def _finish(self, question_id) -> None:
+        self._questions.pop(question_id, None)
+        if self.in_flight is not None:
+            self.in_flight.release()
+
+    def _produce(self, question: _Question, message: dict) -> None:
+        """Answer one question on a worker thread, queueing its events."""
+        question_id = question.question_id
+        stopped = False
+        try:
+            events = self.open_stream(message)
+            try:
+                for event in events:
+                    if event["type"] == "done":
+                        sources = {"type": "sources", "id": question_id, "sources": event.get("sources", [])}
+                        event = {key: value for key, value in event.items() if key != "sources"}
+                        if not self._put(question, sources):
+                            stopped = True
+                            break
+                    if question.cancelled.is_set() or not self._put(question, {**event, "id": question_id}):
+                        stopped = True
+                        break
+            finally:
+                # Stops the LLM call if the question was cancelled
+                events.close()
+        except Exception as e:
+            self._put(question, {"type": "error", "id": question_id, "detail": str(getattr(e, "detail", e))})
+            return
+
+        if stopped:
+            self._put(question, {"type": "cancelled", "id": question_id}, force=True)
+
+    def _put(self, question: _Question, event: dict, force: bool = False) -> bool:
+        """
+        Queue an event from a worker thread, waiting while the queue is full.
+
+        A queue that stays full for send_timeout seconds means the client
+        stopped reading; the connection is then closed.
+
+        Args:
+            question: Question the event belongs to
+            event: Event to send
+            force: Queue it even if the question was cancelled
+
+        Returns:
+            False if the question was cancelled or the connection closed
+            before the event could be queued
+        """
+        if self._closed.is_set():
+            return False
+        deadline = time.monotonic() + self.send_timeout
+        future = asyncio.run_coroutine_threadsafe(self._queue.put(event), self._loop)
+        while True:
+            try:
+                future.result(timeout=CANCEL_POLL_SECONDS)
+                return True
+            except concurrent.futures.TimeoutError:
+                if self._closed.is_set() or (question.cancelled.is_set() and not force):
+                    future.cancel()
+                    return False
+                if time.monotonic() >= deadline:
+                    future.cancel()
+                    self._stall()
+                    return False
+            except concurrent.futures.CancelledError:
+                return False
@@ -0,0 +1,35 @@
+"""
+Shared test doubles.
+"""
+
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+KEYWORDS = ["diabetes", "cancer", "pressure"]
+
+
+class KeywordEmbeddings(Embeddings):
+    """Deterministic embeddings: one dimension per keyword."""
+
+    def embed_documents(self, texts):
+        return [self.embed_query(text) for text in texts]
+
+    def embed_query(self, text):
+        return [float(word in text.lower()) + 0.01 for word in KEYWORDS]
+
+
+class RecordingChatModel(BaseChatModel):
+    """Chat model that records its prompts and replies with a fixed answer."""
+
+    answer: str = "A fixed answer."
+    prompts: list = []
+
+    @property
+    def _llm_type(self) -> str:
+        return "recording"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        self.prompts.append(messages[-1].content)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self.answer))])
@@ -4,7 +4,9 @@ Run with: pytest tests/test_api.py
 """
 
 import os
+import threading
 import pytest
+from concurrent.futures import ThreadPoolExecutor
 from fastapi.testclient import TestClient
 from unittest.mock import patch
 from app import app
@@ -47,6 +49,26 @@ class TestAPIEndpoints:
         assert isinstance(data["answer"], str)
         assert len(data["answer"]) > 0
     
+    @patch('app.get_chatbot')
+    def test_chat_does_not_block_other_requests(self, mock_get_chatbot):
+        """Test other requests are answered while /chat waits for the LLM."""
+        started, release = threading.Event(), threading.Event()
+        
+        def slow_ask(**kwargs):
+            started.set()
+            release.wait(timeout=10)
+            return {"answer": "Diabetes is a chronic disease."}
+        
+        mock_get_chatbot.return_value.ask.side_effect = slow_ask
+        # One event loop for both requests, as in a server
+        with TestClient(app) as shared, ThreadPoolExecutor(1) as pool:
+            pending = pool.submit(shared.post, "/chat", json={"question": "What is diabetes?"})
+            assert started.wait(timeout=10)
+            assert shared.get("/").status_code == 200
+            assert not pending.done()
+            release.set()
+            assert pending.result().status_code == 200
+    
     def test_chat_endpoint_with_empty_question(self):
         """Test chat endpoint rejects empty questions."""
         response = client.post(
@@ -98,3 +120,289 @@ class TestCORS:
             headers={"Origin": "http://localhost:5173"}
         )
         assert response.status_code in [200, 405]
+
+
+class TestAdminSnapshots:
+    """Test snapshot admin endpoints."""
+    
+    def test_admin_disabled_without_token(self, monkeypatch):
+        """Test admin endpoints are refused when ADMIN_TOKEN is unset."""
+        monkeypatch.delenv("ADMIN_TOKEN", raising=False)
+        response = client.get("/admin/snapshots")
+        assert response.status_code == 403
+    
+    def test_admin_rejects_wrong_token(self, monkeypatch):
+        """Test admin endpoints require the configured token."""
+        monkeypatch.setenv("ADMIN_TOKEN", "secret")
+        response = client.post("/admin/reload", headers={"X-Admin-Token": "wrong"})
+        assert response.status_code == 401
+    
+    @patch('app.get_chatbot')
+    def test_reload_activates_version(self, mock_get_chatbot, monkeypatch, tmp_path):
+        """Test reload swaps the chatbot and moves the CURRENT pointer."""
+        from src.snapshots import SnapshotManager
+        monkeypatch.setenv("ADMIN_TOKEN", "secret")
+        snapshots = SnapshotManager(str(tmp_path))
+        v1, _ = snapshots.create_snapshot()
+        v2, _ = snapshots.create_snapshot()
+        snapshots.activate(v1)
+        
+        chatbot = mock_get_chatbot.return_value
+        chatbot.snapshots = snapshots
+        chatbot.index_version = v1
+        
+        def reload(version):
+            chatbot.index_version = version
+        chatbot.reload.side_effect = reload
+        
+        response = client.post("/admin/reload", json={"version": v2}, headers={"X-Admin-Token": "secret"})
+        assert response.status_code == 200
+        assert response.json()["loaded"] == v2
+        assert snapshots.current_version() == v2
+        
+        response = client.post("/admin/rollback", headers={"X-Admin-Token": "secret"})
+        assert response.status_code == 200
+        assert response.json()["current"] == v1
+    
+    @patch('app.get_chatbot')
+    def test_reload_defaults_to_current(self, mock_get_chatbot, monkeypatch, tmp_path):
+        """Test reload without a version never picks a newer, possibly half-built directory."""
+        from src.snapshots import SnapshotManager
+        monkeypatch.setenv("ADMIN_TOKEN", "secret")
+        snapshots = SnapshotManager(str(tmp_path))
+        v1, _ = snapshots.create_snapshot()
+        snapshots.activate(v1)
+        snapshots.create_snapshot()
+        
+        chatbot = mock_get_chatbot.return_value
+        chatbot.snapshots = snapshots
+        chatbot.index_version = v1
+        
+        response = client.post("/admin/reload", headers={"X-Admin-Token": "secret"})
+        assert response.status_code == 200
+        chatbot.reload.assert_called_once_with(v1)
+        assert snapshots.current_version() == v1
+
+
+class TestSessions:
+    """Test conversation sessions over the API."""
+    
+    @patch('app.get_chatbot')
+    def test_start_session_returns_id(self, mock_get_chatbot):
+        """Test start_session creates a session that can be resumed and ended."""
+        mock_get_chatbot.return_value.ask.return_value = {"answer": "Diabetes is a chronic disease."}
+        
+        response = client.post("/chat", json={"question": "What is diabetes?", "start_session": True})
+        assert response.status_code == 200
+        session_id = response.json()["session_id"]
+        assert session_id
+        
+        response = client.post("/chat", json={"question": "And its symptoms?", "session_id": session_id})
+        assert response.json()["session_id"] == session_id
+        
+        assert client.delete(f"/sessions/{session_id}").status_code == 204
+        assert client.delete(f"/sessions/{session_id}").status_code == 404
+    
+    @patch('app.get_chatbot')
+    def test_stateless_by_default(self, mock_get_chatbot):
+        """Test requests without session fields stay stateless."""
+        mock_get_chatbot.return_value.ask.return_value = {"answer": "Diabetes is a chronic disease."}
+        
+        response = client.post("/chat", json={"question": "What is diabetes?"})
+        assert response.json()["session_id"] is None
+        assert mock_get_chatbot.return_value.ask.call_args.kwargs["session"] is None
+
+
+class TestSources:
+    """Test lazily fetched source chunks."""
+    
+    @patch('app.get_chatbot')
+    def test_get_source(self, mock_get_chatbot):
+        """Test a chunk is served with long-lived cache headers."""
+        mock_get_chatbot.return_value.get_source.return_value = {
+            "chunk_id": "abc123", "source": "Diabetes.pdf", "page": 2, "content": "Diabetes text"
+        }
+        
+        response = client.get("/sources/abc123")
+        assert response.status_code == 200
+        assert response.json()["content"] == "Diabetes text"
+        assert "immutable" in response.headers["cache-control"]
+    
+    @patch('app.get_chatbot')
+    def test_missing_source_not_cached(self, mock_get_chatbot):
+        """Test unknown chunks return 404 on every request."""
+        mock_get_chatbot.return_value.get_source.return_value = None
+        
+        assert client.get("/sources/missing").status_code == 404
+        assert client.get("/sources/missing").status_code == 404
+        assert mock_get_chatbot.return_value.get_source.call_count == 2
+    
+    @patch('app.get_chatbot')
+    def test_large_responses_gzipped(self, mock_get_chatbot):
+        """Test long answers are compressed when the client accepts gzip."""
+        mock_get_chatbot.return_value.ask.return_value = {"answer": "Diabetes is a chronic disease. " * 100}
+        
+        response = client.post(
+            "/chat",
+            json={"question": "What is diabetes?"},
+            headers={"Accept-Encoding": "gzip"}
+        )
+        assert response.headers["content-encoding"] == "gzip"
+
+
+class TestDocumentUploads:
+    """Test background document ingestion over the API."""
+    
+    @patch('app.ingestion_jobs')
+    @patch('app.get_chatbot')
+    def test_upload_queues_job(self, mock_get_chatbot, mock_jobs, monkeypatch, tmp_path):
+        """Test an upload is saved to the data directory and queued."""
+        from src.ingestion_jobs import IngestionJob
+        monkeypatch.setenv("ADMIN_TOKEN", "secret")
+        monkeypatch.setattr("app.DATA_DIR", str(tmp_path))
+        job = IngestionJob("Asthma.txt", str(tmp_path / "Asthma.txt"))
+        mock_jobs.submit.return_value = job
+        mock_jobs.get.return_value = job
+        
+        response = client.post(
+            "/documents",
+            files={"file": ("Asthma.txt", b"Asthma narrows the airways.", "text/plain")},
+            headers={"X-Admin-Token": "secret"}
+        )
+        assert response.status_code == 202
+        assert response.json()["status"] == "queued"
+        assert (tmp_path / "Asthma.txt").read_text() == "Asthma narrows the airways."
+        
+        response = client.get(f"/jobs/{job.job_id}", headers={"X-Admin-Token": "secret"})
+        assert response.json()["job_id"] == job.job_id
+        assert mock_jobs.submit.call_args.kwargs["remove_on_failure"]
+    
+    @patch('app.ingestion_jobs')
+    @patch('app.get_chatbot')
+    def test_upload_existing_file_conflicts(self, mock_get_chatbot, mock_jobs, monkeypatch, tmp_path):
+        """Test a name already in the data directory is refused and left untouched."""
+        monkeypatch.setenv("ADMIN_TOKEN", "secret")
+        monkeypatch.setattr("app.DATA_DIR", str(tmp_path))
+        (tmp_path / "Asthma.txt").write_text("original")
+        
+        response = client.post(
+            "/documents",
+            files={"file": ("Asthma.txt", b"replacement", "text/plain")},
+            headers={"X-Admin-Token": "secret"}
+        )
+        assert response.status_code == 409
+        assert (tmp_path / "Asthma.txt").read_text() == "original"
+        mock_jobs.submit.assert_not_called()
+    
+    def test_upload_rejects_unsupported_type(self, monkeypatch):
+        """Test only PDF and TXT uploads are accepted."""
+        monkeypatch.setenv("ADMIN_TOKEN", "secret")
+        response = client.post(
+            "/documents",
+            files={"file": ("notes.exe", b"binary", "application/octet-stream")},
+            headers={"X-Admin-Token": "secret"}
+        )
+        assert response.status_code == 400
+    
+    def test_unknown_job(self, monkeypatch):
+        """Test an unknown job ID returns 404."""
+        monkeypatch.setenv("ADMIN_TOKEN", "secret")
+        assert client.get("/jobs/nope", headers={"X-Admin-Token": "secret"}).status_code == 404
+
+
+class TestIntentGateStats:
+    """Test the intent gate report."""
+    
+    @patch('app.get_chatbot')
+    def test_intent_gate_stats(self, mock_get_chatbot, monkeypatch):
+        """Test saved LLM calls are reported to admins."""
+        monkeypatch.setenv("ADMIN_TOKEN", "secret")
+        mock_get_chatbot.return_value.intent_gate.stats.return_value = {"llm_calls_saved": 3}
+        
+        response = client.get("/admin/intent-gate", headers={"X-Admin-Token": "secret"})
+        assert response.status_code == 200
+        assert response.json()["llm_calls_saved"] == 3
+
+
+class TestIndexStats:
+    """Test the index report."""
+    
+    @patch('app.get_chatbot')
+    def test_index_stats(self, mock_get_chatbot, monkeypatch):
+        """Test index size and settings are reported to admins only."""
+        monkeypatch.setenv("ADMIN_TOKEN", "secret")
+        mock_get_chatbot.return_value.vs_manager.index_stats.return_value = {"chunks": 575}
+        
+        assert client.get("/admin/index").status_code == 401
+        response = client.get("/admin/index", headers={"X-Admin-Token": "secret"})
+        assert response.status_code == 200
+        assert response.json()["chunks"] == 575
+
+
+class TestDegradedAnswers:
+    """Test degraded answers are flagged."""
+    
+    @patch('app.get_chatbot')
+    def test_chat_flags_degraded_answer(self, mock_get_chatbot):
+        """Test the degraded flag reaches the response."""
+        mock_get_chatbot.return_value.ask.return_value = {"answer": "• Extracted.", "degraded": True}
+        response = client.post("/chat", json={"question": "What is diabetes?"})
+        assert response.status_code == 200
+        assert response.json()["degraded"] is True
+    
+    @patch('app.get_chatbot')
+    def test_llm_circuit_stats(self, mock_get_chatbot, monkeypatch):
+        """Test the breaker state is reported to admins only."""
+        monkeypatch.setenv("ADMIN_TOKEN", "secret")
+        mock_get_chatbot.return_value.llm_breaker.stats.return_value = {"state": "open"}
+        
+        assert client.get("/admin/llm").status_code == 401
+        response = client.get("/admin/llm", headers={"X-Admin-Token": "secret"})
+        assert response.json()["state"] == "open"
+
+
+class TestSlowRequests:
+    """Test the slow request dump."""
+    
+    @patch('app.get_chatbot')
+    def test_slow_requests(self, mock_get_chatbot, monkeypatch):
+        """Test slow /chat requests are listed as JSON and collapsed stacks."""
+        from src.request_profiler import SlowRequestProfiler
+        
+        monkeypatch.setenv("ADMIN_TOKEN", "secret")
+        monkeypatch.setattr("app.request_profiler", SlowRequestProfiler(threshold_ms=0, sample_interval_ms=1))
+        mock_get_chatbot.return_value.ask.return_value = {"answer": "Diabetes is a chronic disease."}
+        client.post("/chat", json={"question": "What is diabetes?"})
+        
+        assert client.get("/admin/slow-requests").status_code == 401
+        headers = {"X-Admin-Token": "secret"}
+        data = client.get("/admin/slow-requests", headers=headers).json()
+        assert data["captured"] == 1
+        assert data["captures"][0]["detail"] == "What is diabetes?"
+        assert "load chatbot" in data["captures"][0]["stages"]
+        
+        response = client.get("/admin/slow-requests?format=collapsed", headers=headers)
+        assert response.headers["content-type"].startswith("text/plain")
+        assert client.get("/admin/slow-requests?format=svg", headers=headers).status_code == 400
+
+
+class TestCollections:
+    """Test routing /chat to a named collection."""
+    
+    @patch('app.get_chatbot')
+    def test_chat_with_collection(self, mock_get_chatbot):
+        """Test the collection reaches the chatbot and unknown names are rejected."""
+        chatbot = mock_get_chatbot.return_value
+        chatbot.ask.return_value = {"answer": "La diabetes es una enfermedad crónica."}
+        chatbot.collections.exists.side_effect = lambda name: name == "es"
+        
+        response = client.post("/chat", json={"question": "¿Qué es la diabetes?", "collection": "es"})
+        assert response.status_code == 200
+        assert chatbot.ask.call_args.kwargs["collection"] == "es"
+        
+        response = client.post("/chat", json={"question": "Was ist Diabetes?", "collection": "de"})
+        assert response.status_code == 404
+        
+        chatbot.collections = None
+        response = client.post("/chat", json={"question": "¿Qué es la diabetes?", "collection": "es"})
+        assert response.status_code == 400
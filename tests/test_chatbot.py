@@ -66,3 +66,93 @@ class TestChatbotQueries:
         result = chatbot.ask("")
         assert isinstance(result, dict)
         assert "answer" in result
+
+
+class TestDirectAnswerEngine:
+    """Test the direct engine behaves exactly like the RetrievalQA chain."""
+    
+    def make_chatbot(self, engine):
+        from langchain_core.documents import Document
+        from src.numpy_store import NumpyVectorStore
+        from src.vector_store import VectorStoreManager
+        from tests.fakes import KeywordEmbeddings, RecordingChatModel
+        
+        embeddings = KeywordEmbeddings()
+        vs_manager = VectorStoreManager(backend="numpy", embeddings=embeddings)
+        vs_manager.vector_store = NumpyVectorStore.from_documents([
+            Document(page_content="Diabetes affects blood sugar.",
+                     metadata={"source": "Diabetes.pdf", "chunk_id": "c1"}),
+            Document(page_content="Lung cancer is linked to smoking.",
+                     metadata={"source": "Lung Cancer.pdf", "chunk_id": "c2"}),
+        ], embeddings)
+        llm = RecordingChatModel(prompts=[])
+        return NCDChatbot(answer_engine=engine, llm=llm, vs_manager=vs_manager), llm
+    
+    def test_direct_matches_chain(self):
+        """Test both engines send the same prompt and return the same response."""
+        chain_bot, chain_llm = self.make_chatbot("chain")
+        direct_bot, direct_llm = self.make_chatbot("direct")
+        
+        chain_result = chain_bot.ask("What is diabetes?", return_sources=True)
+        direct_result = direct_bot.ask("What is diabetes?", return_sources=True)
+        
+        assert direct_bot.qa_chain is None
+        assert direct_result == chain_result
+        assert direct_llm.prompts == chain_llm.prompts
+        assert "Diabetes affects blood sugar." in direct_llm.prompts[0]
+        assert direct_result["sources"][0]["chunk_id"] == "c1"
+        assert "content" not in direct_result["sources"][0]
+    
+    def test_unknown_engine_rejected(self):
+        """Test an invalid engine name is rejected."""
+        with pytest.raises(ValueError):
+            NCDChatbot(answer_engine="fast", llm=Mock(), vs_manager=Mock())
+
+
+class TestStreaming:
+    """Test token streaming used by the CLI."""
+    
+    def make_chatbot(self):
+        from langchain_core.documents import Document
+        from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+        from src.numpy_store import NumpyVectorStore
+        from src.vector_store import VectorStoreManager
+        from tests.fakes import KeywordEmbeddings
+        
+        embeddings = KeywordEmbeddings()
+        vs_manager = VectorStoreManager(backend="numpy", embeddings=embeddings)
+        vs_manager.vector_store = NumpyVectorStore.from_documents([
+            Document(page_content="Diabetes affects blood sugar.",
+                     metadata={"source": "Diabetes.pdf", "chunk_id": "c1"}),
+        ], embeddings)
+        llm = GenericFakeChatModel(messages=iter(["Diabetes is a chronic disease."] * 3))
+        return NCDChatbot(answer_engine="direct", llm=llm, vs_manager=vs_manager)
+    
+    def test_stream_yields_tokens_then_done(self):
+        """Test tokens arrive one by one and the done event has the full answer."""
+        chatbot = self.make_chatbot()
+        events = list(chatbot.stream("What is diabetes?"))
+        
+        tokens = [e["text"] for e in events if e["type"] == "token"]
+        done = events[-1]
+        assert len(tokens) > 1
+        assert done["type"] == "done"
+        assert done["answer"] == "".join(tokens) == "Diabetes is a chronic disease."
+        assert done["sources"][0]["chunk_id"] == "c1"
+        assert {"retrieval_ms", "first_token_ms", "llm_ms", "total_ms"} <= set(done["timings"])
+    
+    def test_cancelled_stream_not_recorded(self):
+        """Test closing the stream early leaves the session unchanged."""
+        from src.sessions import ConversationSession
+        
+        chatbot = self.make_chatbot()
+        session = ConversationSession("s1")
+        events = chatbot.stream("What is diabetes?", session=session)
+        next(events)
+        events.close()
+        
+        assert session.turns == []
+        assert not session.lock.locked()
+        
+        list(chatbot.stream("What is diabetes?", session=session))
+        assert len(session.turns) == 1
@@ -0,0 +1,67 @@
+"""
+Unit tests for the chunking strategies.
+Run with: pytest tests/test_chunking.py
+"""
+
+import pytest
+from langchain_core.documents import Document
+from src.chunking import CHUNKING_STRATEGIES, approximate_tokens, make_text_splitter
+from src.data_ingestion import DataIngestion
+
+TEXT = (
+    "Diabetes \n \nOverview \n"
+    + "Diabetes is a chronic disease that affects how the body uses insulin. " * 6
+    + "\nSymptoms \n"
+    + "Symptoms include feeling very thirsty and needing to urinate often. " * 6
+    + "\nTreatment \n"
+    + "Treatment includes diet, physical activity and medication when needed. " * 6
+)
+DOCUMENT = Document(page_content=TEXT, metadata={"source": "Diabetes.pdf"})
+
+
+def split(strategy, **kwargs):
+    splitter = make_text_splitter(strategy, length_function=approximate_tokens, **kwargs)
+    return splitter.split_documents([DOCUMENT])
+
+
+class TestChunkingStrategies:
+    """Test each strategy's chunk boundaries and offsets."""
+
+    @pytest.mark.parametrize("strategy", CHUNKING_STRATEGIES)
+    def test_start_index_points_at_chunk(self, strategy):
+        """Test every chunk's start_index locates it in the document."""
+        chunks = split(strategy, chunk_size=60 if strategy != "recursive" else 300)
+        assert len(chunks) > 1
+        for chunk in chunks:
+            assert TEXT[chunk.metadata["start_index"]:].startswith(chunk.page_content)
+
+    def test_token_chunks_respect_size(self):
+        """Test token-based chunks stay within the token budget."""
+        assert all(approximate_tokens(c.page_content) <= 50 for c in split("token", chunk_size=50))
+
+    def test_sentence_chunks_end_at_sentences(self):
+        """Test sentence chunks are not cut mid-sentence."""
+        chunks = split("sentence", chunk_size=50, chunk_overlap=0)
+        assert all(chunk.page_content.endswith(".") for chunk in chunks[1:])
+
+    def test_header_chunks_follow_sections(self):
+        """Test sections become chunks tagged with their heading."""
+        splitter = make_text_splitter("header", length_function=approximate_tokens, chunk_size=100)
+        assert [h for _, h in splitter.find_headers(TEXT)] == ["Diabetes", "Overview", "Symptoms", "Treatment"]
+
+        chunks = split("header", chunk_size=100)
+        assert [c.metadata["section"] for c in chunks] == ["Diabetes", "Symptoms", "Treatment"]
+        assert chunks[1].page_content.startswith("Symptoms")
+
+    def test_unknown_strategy(self):
+        """Test an unknown strategy is rejected."""
+        with pytest.raises(ValueError):
+            make_text_splitter("paragraph")
+
+    def test_strategy_from_environment(self, monkeypatch):
+        """Test CHUNKING_STRATEGY and CHUNK_SIZE configure DataIngestion."""
+        monkeypatch.setenv("CHUNKING_STRATEGY", "recursive")
+        monkeypatch.setenv("CHUNK_SIZE", "400")
+        ingestion = DataIngestion(dedupe_threshold=0)
+        assert ingestion.chunking == "recursive"
+        assert all(len(c.page_content) <= 400 for c in ingestion.split_documents([DOCUMENT]))
@@ -0,0 +1,232 @@
+"""
+Unit tests for the LLM circuit breaker and degraded answers.
+Run with: pytest tests/test_circuit_breaker.py
+"""
+
+import pytest
+from unittest.mock import Mock, patch
+from langchain_core.documents import Document
+from langchain_core.messages import AIMessage
+from src.circuit_breaker import CircuitBreaker, CircuitOpenError, extractive_answer
+
+DOCUMENTS = [
+    Document(
+        page_content=(
+            "Diabetes is a chronic disease that occurs when the pancreas does not produce enough insulin. "
+            "Symptoms of diabetes include frequent urination, thirst and blurred vision. "
+            "The clinic is open on weekdays from nine to five."
+        ),
+        metadata={"source": "Diabetes.pdf", "page": 2},
+    ),
+    Document(
+        page_content="Lung cancer is linked to smoking. Stopping smoking lowers the risk of lung cancer over time.",
+        metadata={"source": "Lung Cancer.pdf"},
+    ),
+]
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def fail():
+    raise TimeoutError("Request timed out")
+
+
+class TestCircuitBreaker:
+    """Test state transitions."""
+
+    def test_opens_after_threshold(self):
+        """Test consecutive failures open the circuit and calls are rejected."""
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30, clock=FakeClock())
+        for _ in range(2):
+            with pytest.raises(TimeoutError):
+                breaker.call(fail)
+        assert breaker.state == "open"
+
+        with pytest.raises(CircuitOpenError):
+            breaker.call(lambda: "answer")
+        stats = breaker.stats()
+        assert stats["failures"] == 2
+        assert stats["rejected"] == 1
+        assert stats["retry_in_seconds"] == 30
+        assert "timed out" in stats["last_error"]
+
+    def test_success_resets_failure_count(self):
+        """Test only consecutive failures count."""
+        breaker = CircuitBreaker(failure_threshold=2, clock=FakeClock())
+        with pytest.raises(TimeoutError):
+            breaker.call(fail)
+        assert breaker.call(lambda: "answer") == "answer"
+        with pytest.raises(TimeoutError):
+            breaker.call(fail)
+        assert breaker.state == "closed"
+
+    def test_half_open_probe(self):
+        """Test one probe is let through after the reset timeout and decides the state."""
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock)
+        with pytest.raises(TimeoutError):
+            breaker.call(fail)
+
+        clock.now = 10
+        assert breaker.state == "half_open"
+        with pytest.raises(TimeoutError):
+            breaker.call(fail)
+        assert breaker.state == "open"
+
+        clock.now = 20
+        assert breaker.allow()
+        assert not breaker.allow()  # only one probe at a time
+        breaker.record_success()
+        assert breaker.state == "closed"
+        assert breaker.allow() and breaker.allow()
+
+    def test_abandoned_probe_is_released(self):
+        """Test a probe cut short by closing a stream lets the next call probe."""
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock)
+        with pytest.raises(TimeoutError):
+            breaker.call(fail)
+        clock.now = 10
+
+        def stream():
+            with breaker.guard():
+                yield "token"
+                yield "token"
+
+        tokens = stream()
+        next(tokens)
+        tokens.close()
+        assert breaker.state == "half_open"
+        assert breaker.allow()
+
+
+class TestExtractiveAnswer:
+    """Test answers built without the LLM."""
+
+    def test_picks_relevant_sentences(self):
+        """Test sentences matching the question come first and keep their source."""
+        answer = extractive_answer("What are the symptoms of diabetes?", DOCUMENTS, max_sentences=2)
+        bullets = [line for line in answer.splitlines() if line.startswith("•")]
+        assert len(bullets) == 2
+        assert bullets[0].startswith("• Symptoms of diabetes include")
+        assert bullets[0].endswith("(Diabetes.pdf, page 2)")
+        assert "weekdays" not in answer
+        assert answer.endswith("consult a healthcare professional for medical advice.")
+
+    def test_no_documents(self):
+        """Test an empty retrieval still gives an answer."""
+        assert "temporarily unavailable" in extractive_answer("What is diabetes?", [])
+
+
+class FailingChatModel:
+    """Chat model whose calls fail until `healthy` is set."""
+
+    def __init__(self):
+        self.healthy = False
+        self.calls = 0
+
+    def invoke(self, prompt):
+        self.calls += 1
+        if not self.healthy:
+            raise TimeoutError("Request timed out")
+        return AIMessage(content="Diabetes is a chronic disease.")
+
+    def stream(self, prompt):
+        yield self.invoke(prompt)
+
+
+class TestDegradedChatbot:
+    """Test the chatbot answers in degraded mode while the LLM is down."""
+
+    def make_chatbot(self, monkeypatch, llm=None, engine="direct"):
+        from src.chatbot import NCDChatbot
+        from src.numpy_store import NumpyVectorStore
+        from src.vector_store import VectorStoreManager
+        from tests.fakes import KeywordEmbeddings
+
+        monkeypatch.setenv("LLM_FAILURE_THRESHOLD", "2")
+        monkeypatch.setenv("LLM_RESET_SECONDS", "30")
+        embeddings = KeywordEmbeddings()
+        vs_manager = VectorStoreManager(backend="numpy", embeddings=embeddings)
+        vs_manager.vector_store = NumpyVectorStore.from_documents(DOCUMENTS, embeddings)
+        llm = llm or FailingChatModel()
+        chatbot = NCDChatbot(answer_engine=engine, llm=llm, vs_manager=vs_manager)
+        chatbot.llm_breaker._clock = clock = FakeClock()
+        return chatbot, llm, clock
+
+    def test_degraded_until_probe_succeeds(self, monkeypatch):
+        """Test failures degrade answers, the open circuit skips the LLM and a probe restores it."""
+        chatbot, llm, clock = self.make_chatbot(monkeypatch)
+
+        for _ in range(3):
+            result = chatbot.ask("What are the symptoms of diabetes?", return_sources=True)
+            assert result["degraded"] is True
+            assert "Symptoms of diabetes include" in result["answer"]
+            assert result["sources"][0]["source"] == "Diabetes.pdf"
+        assert llm.calls == 2
+        assert chatbot.llm_breaker.state == "open"
+
+        llm.healthy = True
+        clock.now = 30
+        result = chatbot.ask("What are the symptoms of diabetes?")
+        assert result == {"answer": "Diabetes is a chronic disease."}
+        assert chatbot.llm_breaker.state == "closed"
+
+    def test_chain_engine_degraded(self, monkeypatch):
+        """Test the chain engine guards only the LLM step with the breaker."""
+        from tests.fakes import RecordingChatModel
+
+        class FailingChainModel(RecordingChatModel):
+            healthy: bool = False
+            calls: int = 0
+
+            def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+                self.calls += 1
+                if not self.healthy:
+                    raise TimeoutError("Request timed out")
+                return super()._generate(messages, stop, run_manager, **kwargs)
+
+        chatbot, llm, _ = self.make_chatbot(monkeypatch, FailingChainModel(prompts=[]), engine="chain")
+
+        result = chatbot.ask("What are the symptoms of diabetes?", return_sources=True)
+        assert result["degraded"] is True
+        assert result["sources"][0]["source"] == "Diabetes.pdf"
+        assert llm.calls == 1
+
+        llm.healthy = True
+        monkeypatch.setattr(chatbot.vs_manager.vector_store, "similarity_search", Mock(side_effect=OSError("index gone")))
+        with pytest.raises(OSError):
+            chatbot.ask("What are the symptoms of diabetes?")
+        assert chatbot.llm_breaker.stats()["consecutive_failures"] == 1
+        assert llm.calls == 1
+
+    def test_chain_engine_runs_the_chain(self, monkeypatch):
+        """Test the chain engine answers with RetrievalQA.invoke, its LLM call counted by the breaker."""
+        from tests.fakes import RecordingChatModel
+
+        chatbot, llm, _ = self.make_chatbot(monkeypatch, RecordingChatModel(prompts=[], answer="Chain answer"), engine="chain")
+        chain_cls = type(chatbot.qa_chain)
+        with patch.object(chain_cls, "invoke", autospec=True, side_effect=chain_cls.invoke) as invoke:
+            result = chatbot.ask("What are the symptoms of diabetes?", return_sources=True)
+
+        assert result["answer"] == "Chain answer"
+        assert "degraded" not in result
+        assert result["sources"][0]["source"] == "Diabetes.pdf"
+        invoke.assert_called_once_with(chatbot.qa_chain, {"query": "What are the symptoms of diabetes?"})
+        assert len(llm.prompts) == 1
+        stats = chatbot.llm_breaker.stats()
+        assert (stats["calls"], stats["failures"]) == (1, 0)
+
+    def test_stream_degraded(self, monkeypatch):
+        """Test streaming sends the extractive answer and flags it."""
+        chatbot, _, _ = self.make_chatbot(monkeypatch)
+        events = list(chatbot.stream("What are the symptoms of diabetes?"))
+        assert events[0]["type"] == "token"
+        assert events[-1]["degraded"] is True
+        assert events[-1]["answer"] == events[0]["text"]
@@ -0,0 +1,143 @@
+"""
+Unit tests for the collection registry.
+Run with: pytest tests/test_collection_registry.py
+"""
+
+import pytest
+from unittest.mock import patch
+from langchain_core.documents import Document
+from src import setup
+from src.collection_registry import CollectionRegistry
+from src.numpy_store import NumpyVectorStore
+from src.vector_store import EMBEDDING_MODEL_NAME, VectorStoreManager
+from tests.fakes import KeywordEmbeddings, RecordingChatModel
+
+
+def make_registry(root, names, sizes=None, **kwargs):
+    for name in names:
+        (root / name).mkdir()
+    loads, closed = [], []
+
+    def load(name, path):
+        loads.append(name)
+        return {"name": name, "path": path}
+
+    registry = CollectionRegistry(
+        str(root),
+        load=load,
+        memory_bytes=lambda value: (sizes or {}).get(value["name"], 0),
+        close=lambda value: closed.append(value["name"]),
+        **kwargs
+    )
+    return registry, loads, closed
+
+
+def use(registry, name):
+    with registry.lease(name) as value:
+        return value
+
+
+class TestCollectionRegistry:
+    """Test lazy loading and least-recently-used eviction."""
+
+    def test_loads_once_and_evicts_least_recently_used(self, tmp_path):
+        """Test collections load on first use and the oldest one is closed past max_loaded."""
+        registry, loads, closed = make_registry(tmp_path, ["en", "es", "fr"], max_loaded=2)
+        use(registry, "en")
+        use(registry, "es")
+        use(registry, "en")
+        use(registry, "fr")
+
+        assert loads == ["en", "es", "fr"]
+        assert closed == ["es"]
+        stats = registry.stats()
+        assert [item["name"] for item in stats["loaded"]] == ["en", "fr"]
+        assert (stats["hits"], stats["loads"], stats["evictions"]) == (1, 3, 1)
+        assert stats["available"] == ["en", "es", "fr"]
+
+    def test_memory_budget(self, tmp_path):
+        """Test collections are evicted to stay under max_memory_mb, except the one in use."""
+        sizes = {"en": 30e6, "es": 30e6, "fr": 80e6}
+        registry, _, closed = make_registry(tmp_path, ["en", "es", "fr"], sizes, max_loaded=5, max_memory_mb=70)
+        use(registry, "en")
+        use(registry, "es")
+        assert closed == []
+        use(registry, "fr")
+        assert closed == ["en", "es"]
+        assert registry.stats()["memory_mb"] == 80
+
+    def test_close_waits_for_leases(self, tmp_path):
+        """Test an evicted collection is only closed once its last request finishes."""
+        registry, _, closed = make_registry(tmp_path, ["en", "es"], max_loaded=1)
+        with registry.lease("en"):
+            use(registry, "es")
+            assert closed == []
+        assert closed == ["en"]
+
+    def test_unknown_and_invalid_names(self, tmp_path):
+        """Test missing collections and names that could escape the root are rejected."""
+        registry, loads, _ = make_registry(tmp_path, ["en"])
+        for name in ("de", "../en", ""):
+            assert not registry.exists(name)
+            with pytest.raises(KeyError):
+                use(registry, name)
+        assert loads == []
+
+
+class TestChatbotCollections:
+    """Test the chatbot answers from a named collection."""
+
+    def test_ask_collection(self, tmp_path, monkeypatch):
+        """Test a request for a collection retrieves from it with the shared embedding model."""
+        from src.chatbot import NCDChatbot
+
+        embeddings = KeywordEmbeddings()
+        store = NumpyVectorStore.from_documents([
+            Document(page_content="La diabetes afecta el azúcar en la sangre.",
+                     metadata={"source": "Diabetes.pdf", "chunk_id": "es1"}),
+        ], embeddings)
+        store.save(str(tmp_path / "es"), embedding_model=EMBEDDING_MODEL_NAME)
+
+        monkeypatch.setenv("COLLECTIONS_ROOT", str(tmp_path))
+        monkeypatch.setenv("VECTOR_BACKEND", "numpy")
+        vs_manager = VectorStoreManager(backend="numpy", embeddings=embeddings)
+        vs_manager.vector_store = NumpyVectorStore.from_documents([
+            Document(page_content="Diabetes affects blood sugar.",
+                     metadata={"source": "Diabetes.pdf", "chunk_id": "en1"}),
+        ], embeddings)
+        llm = RecordingChatModel(prompts=[])
+        chatbot = NCDChatbot(answer_engine="direct", llm=llm, vs_manager=vs_manager)
+
+        result = chatbot.ask("¿Qué es la diabetes?", return_sources=True, collection="es")
+        assert result["sources"][0]["chunk_id"] == "es1"
+        assert "La diabetes afecta" in llm.prompts[-1]
+
+        with chatbot.collections.lease("es") as (collection_manager, _):
+            assert collection_manager.embeddings is embeddings
+
+        assert chatbot.ask("What is diabetes?", return_sources=True)["sources"][0]["chunk_id"] == "en1"
+
+    @pytest.mark.parametrize("backend", ["chroma", "mmap"])
+    @patch('src.vector_store.HuggingFaceEmbeddings')
+    def test_setup_builds_collection_for_backend(self, mock_embeddings, backend, tmp_path, monkeypatch):
+        """Test a collection built by setup loads with the configured backend."""
+        from src.chatbot import NCDChatbot
+
+        embeddings = KeywordEmbeddings()
+        mock_embeddings.return_value = embeddings
+        monkeypatch.setenv("GOOGLE_API_KEY", "test-key")
+        monkeypatch.setenv("VECTOR_BACKEND", backend)
+        monkeypatch.setenv("COLLECTIONS_ROOT", str(tmp_path / "collections"))
+        (tmp_path / "data_es").mkdir()
+        (tmp_path / "data_es" / "Diabetes.txt").write_text("La diabetes afecta el azúcar en la sangre.")
+        setup.main(["--collection", "es", "--data-dir", str(tmp_path / "data_es")])
+
+        vs_manager = VectorStoreManager(backend="numpy", embeddings=embeddings)
+        vs_manager.vector_store = NumpyVectorStore.from_documents([
+            Document(page_content="Diabetes affects blood sugar.", metadata={"source": "Diabetes.pdf"}),
+        ], embeddings)
+        chatbot = NCDChatbot(answer_engine="direct", llm=RecordingChatModel(prompts=[]), vs_manager=vs_manager)
+
+        result = chatbot.ask("¿Qué es la diabetes?", return_sources=True, collection="es")
+        assert result["sources"][0]["source"] == "Diabetes.txt"
+        assert chatbot.collections.evict("es")
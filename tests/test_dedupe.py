@@ -0,0 +1,106 @@
+"""
+Unit tests for near-duplicate chunk removal.
+Run with: pytest tests/test_dedupe.py
+"""
+
+import random
+from langchain_core.documents import Document
+from src.data_ingestion import DataIngestion
+from src.dedupe import ChunkDeduplicator
+from src.numpy_store import NumpyVectorStore
+from src.topics import topic_filter
+from tests.fakes import KeywordEmbeddings
+
+
+def text(seed, words=150):
+    rng = random.Random(seed)
+    return " ".join(f"word{rng.randrange(5000)}" for _ in range(words))
+
+
+class TestChunkDeduplicator:
+    """Test near-duplicates are dropped and their sources recorded."""
+
+    def test_drops_near_duplicates_with_provenance(self):
+        """Test a passage repeated in other files is kept once."""
+        passage = text(1)
+        chunks = [
+            Document(page_content=passage, metadata={"source": "Cancer-overview.pdf"}),
+            Document(page_content=text(2), metadata={"source": "Cancer-overview.pdf"}),
+            Document(page_content=passage.replace("word", "Word", 1) + " extra", metadata={"source": "Lung Cancer.pdf"}),
+            Document(page_content=passage, metadata={"source": "Liver Cancer.pdf"}),
+        ]
+
+        kept, report = ChunkDeduplicator().deduplicate(chunks)
+
+        assert kept == chunks[:2]
+        assert kept[0].metadata["duplicate_count"] == 2
+        assert kept[0].metadata["duplicate_sources"] == "Liver Cancer.pdf; Lung Cancer.pdf"
+        assert "duplicate_count" not in kept[1].metadata
+        assert report.chunks_removed == 2
+        assert report.to_dict()["chunk_reduction"] == 0.5
+
+    def test_flags_the_topics_of_merged_copies(self):
+        """Test a passage shared by two topics is kept once, flagged with the other topic."""
+        passage = text(6)
+        chunks = [
+            Document(page_content=passage, metadata={"source": "Diabetes.pdf", "topic": "diabetes"}),
+            Document(page_content=passage, metadata={"source": "diabetes-guide.pdf", "topic": "diabetes"}),
+            Document(page_content=passage, metadata={"source": "Heart attacks.pdf", "topic": "heart attacks"}),
+        ]
+
+        kept, _ = ChunkDeduplicator().deduplicate(chunks)
+
+        assert kept == [chunks[0]]
+        assert kept[0].metadata["duplicate_sources"] == "Heart attacks.pdf; diabetes-guide.pdf"
+        assert kept[0].metadata["topic:heart attacks"] is True
+        assert "topic:diabetes" not in kept[0].metadata
+
+    def test_keeps_partially_overlapping_chunks(self):
+        """Test neighbouring chunks that only share their overlap are kept."""
+        words = text(3, words=300).split()
+        chunks = [Document(page_content=" ".join(words[:180])), Document(page_content=" ".join(words[140:]))]
+        kept, report = ChunkDeduplicator(threshold=0.8).deduplicate(chunks)
+        assert len(kept) == 2
+        assert report.chunks_removed == 0
+
+
+class TestSplitDocumentsDedupe:
+    """Test the dedupe pass in DataIngestion.split_documents."""
+
+    def test_split_documents_dedupes(self):
+        """Test documents of one topic sharing a passage produce one copy of its chunk."""
+        passage = text(4, words=80)
+        documents = [
+            Document(page_content=passage, metadata={"source": "data/Diabetes.pdf"}),
+            Document(page_content=passage, metadata={"source": "uploads/Diabetes.txt"}),
+        ]
+        ingestion = DataIngestion(dedupe_threshold=0.8)
+        chunks = ingestion.split_documents(documents)
+        assert len(chunks) == 1
+        assert chunks[0].metadata["duplicate_sources"] == "uploads/Diabetes.txt"
+        assert ingestion.dedupe_report.chunks_before == 2
+
+    def test_merges_across_pdfs(self):
+        """Test a paragraph in two differently named PDFs is kept once and found under both topics."""
+        passage = text(7, words=80)
+        documents = [
+            Document(page_content=passage, metadata={"source": "data/Diabetes.pdf"}),
+            Document(page_content=passage, metadata={"source": "data/Heart attacks.pdf"}),
+        ]
+        chunks = DataIngestion(dedupe_threshold=0.8).split_documents(documents)
+
+        assert len(chunks) == 1
+        assert chunks[0].metadata["duplicate_sources"] == "data/Heart attacks.pdf"
+        store = NumpyVectorStore.from_documents(chunks, KeywordEmbeddings())
+        for topic in ("diabetes", "heart attacks"):
+            assert store.similarity_search("diabetes", k=1, filter=topic_filter([topic])) == chunks
+        assert store.similarity_search("diabetes", k=1, filter=topic_filter(["obesity"])) == []
+
+    def test_off_by_default(self, monkeypatch):
+        """Test every chunk is kept unless CHUNK_DEDUPE_THRESHOLD is set."""
+        monkeypatch.delenv("CHUNK_DEDUPE_THRESHOLD", raising=False)
+        passage = text(5, words=80)
+        documents = [Document(page_content=passage, metadata={"source": s}) for s in ("a/Diabetes.pdf", "b/Diabetes.pdf")]
+        ingestion = DataIngestion()
+        assert len(ingestion.split_documents(documents)) == 2
+        assert ingestion.dedupe_report is None
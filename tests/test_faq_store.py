@@ -0,0 +1,117 @@
+"""
+Unit tests for the precomputed FAQ answer store.
+Run with: pytest tests/test_faq_store.py
+"""
+
+from langchain_core.documents import Document
+from src.chatbot import NCDChatbot
+from src.faq_store import FAQStore, build_faq_store
+from src.ingestion_jobs import IngestionJobManager
+from src.numpy_store import NumpyVectorStore
+from src.vector_store import VectorStoreManager
+from tests.fakes import KeywordEmbeddings, RecordingChatModel
+
+CURATED = {
+    "Diabetes.pdf": ["What is diabetes?"],
+    "Lung Cancer.pdf": ["What causes lung cancer?"],
+}
+
+
+def make_chatbot(documents=None, engine="direct", embeddings=None, persist_directory=None):
+    embeddings = embeddings or KeywordEmbeddings()
+    vs_manager = VectorStoreManager(persist_directory=persist_directory, backend="numpy", embeddings=embeddings)
+    vs_manager.vector_store = NumpyVectorStore.from_documents(documents or [
+        Document(page_content="Diabetes affects blood sugar.",
+                 metadata={"source": "Diabetes.pdf", "chunk_id": "c1"}),
+        Document(page_content="Lung cancer is linked to smoking.",
+                 metadata={"source": "Lung Cancer.pdf", "chunk_id": "c2"}),
+    ], embeddings, ids=["c1", "c2"] if documents is None else None)
+    llm = RecordingChatModel(prompts=[], answer="Precomputed answer.")
+    return NCDChatbot(answer_engine=engine, llm=llm, vs_manager=vs_manager), llm
+
+
+class TestFAQStore:
+    """Test building, saving and serving precomputed answers."""
+
+    def test_build_and_serve(self, tmp_path, monkeypatch):
+        """Test a close question is served from the store without the LLM."""
+        builder, _ = make_chatbot()
+        store = build_faq_store(builder, CURATED)
+        store.save(str(tmp_path / "faq.json"))
+        assert len(store) == 2
+        assert store.entries[0]["sources"][0]["chunk_id"] == "c1"
+
+        monkeypatch.setenv("FAQ_STORE", str(tmp_path / "faq.json"))
+        chatbot, llm = make_chatbot()
+        assert chatbot.faq_store.active
+
+        result = chatbot.ask("Tell me about diabetes", return_sources=True)
+        assert result["faq"] is True
+        assert result["answer"] == "Precomputed answer."
+        assert result["sources"] == store.entries[0]["sources"]
+        assert llm.prompts == []
+        assert chatbot.faq_store.stats()["hits"] == 1
+
+    def test_stale_store_disabled(self, tmp_path, monkeypatch):
+        """Test answers built from other content are not served."""
+        builder, _ = make_chatbot()
+        build_faq_store(builder, CURATED).save(str(tmp_path / "faq.json"))
+
+        monkeypatch.setenv("FAQ_STORE", str(tmp_path / "faq.json"))
+        chatbot, llm = make_chatbot([
+            Document(page_content="Diabetes now has new guidance.", metadata={"source": "Diabetes.pdf"}),
+        ])
+        assert not chatbot.faq_store.active
+
+        result = chatbot.ask("What is diabetes?")
+        assert "faq" not in result
+        assert len(llm.prompts) == 1
+
+    def test_live_ingestion_disables_store(self, tmp_path, monkeypatch):
+        """Test a document added while serving turns the store off."""
+        builder, _ = make_chatbot()
+        build_faq_store(builder, CURATED).save(str(tmp_path / "faq.json"))
+        monkeypatch.setenv("FAQ_STORE", str(tmp_path / "faq.json"))
+        monkeypatch.delenv("INDEX_SNAPSHOT_ROOT", raising=False)
+        chatbot, _ = make_chatbot(persist_directory=str(tmp_path / "numpy_index"))
+        upload = tmp_path / "Diabetes update.txt"
+        upload.write_text("Diabetes guidance changed this year.", encoding="utf-8")
+
+        manager = IngestionJobManager()
+        job = manager.submit(str(upload), chatbot)
+        manager.shutdown()
+
+        assert job.status == "succeeded", job.error
+        assert not chatbot.faq_store.active
+        assert "faq" not in chatbot.ask("Tell me about diabetes")
+
+    def test_miss_embeds_once(self, tmp_path, monkeypatch):
+        """Test a question missing the store is not embedded again for retrieval."""
+        builder, _ = make_chatbot()
+        build_faq_store(builder, CURATED).save(str(tmp_path / "faq.json"))
+        monkeypatch.setenv("FAQ_STORE", str(tmp_path / "faq.json"))
+        embedded = []
+
+        class CountingEmbeddings(KeywordEmbeddings):
+            def embed_query(self, text):
+                embedded.append(text)
+                return super().embed_query(text)
+
+        chatbot, llm = make_chatbot(engine="chain", embeddings=CountingEmbeddings())
+        embedded.clear()
+        result = chatbot.ask("How does smoking affect the heart?", return_sources=True)
+
+        assert "faq" not in result
+        assert embedded == ["How does smoking affect the heart?"]
+        assert len(llm.prompts) == 1
+
+    def test_threshold(self):
+        """Test only close questions match."""
+        store = FAQStore(
+            [{"question": "q", "answer": "a", "sources": [], "embedding": [1.0, 0.0]}],
+            corpus_version="v1",
+            min_similarity=0.9
+        )
+        assert store.match([0.99, 0.05]) is not None
+        assert store.match([0.5, 0.5]) is None
+        assert store.stats()["misses"] == 1
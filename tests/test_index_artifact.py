@@ -0,0 +1,211 @@
+"""
+Unit tests for portable index artifacts.
+Run with: pytest tests/test_index_artifact.py
+"""
+
+import os
+import sys
+import zipfile
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+from langchain_core.documents import Document
+from src.index_artifact import (
+    ArtifactError,
+    check_model,
+    export_artifact,
+    install_artifact,
+    verify_artifact,
+)
+from src.numpy_store import NumpyVectorStore
+from src.vector_store import EMBEDDING_MODEL_NAME, VectorStoreManager
+from tests.fakes import KeywordEmbeddings
+
+DOCUMENTS = [
+    Document(page_content="Diabetes affects blood sugar.", metadata={"source": "Diabetes.pdf", "chunk_id": "c1"}),
+    Document(page_content="Lung cancer is linked to smoking.", metadata={"source": "Lung Cancer.pdf", "chunk_id": "c2"}),
+    Document(page_content="High blood pressure strains the heart.", metadata={"source": "High Blood Pressure.pdf", "chunk_id": "c3"}),
+]
+
+
+class ShiftedEmbeddings(KeywordEmbeddings):
+    """Same dimension as KeywordEmbeddings, different vectors (another model revision)."""
+
+    def embed_query(self, text):
+        return list(reversed(super().embed_query(text)))
+
+
+def build_index(tmp_path, backend="numpy", documents=DOCUMENTS):
+    manager = VectorStoreManager(str(tmp_path / backend), backend=backend, embeddings=KeywordEmbeddings())
+    manager.create_vector_store(documents)
+    return manager
+
+
+def rewrite_member(path, name, data):
+    """Replace one file of an artifact, keeping the original manifest."""
+    with zipfile.ZipFile(path) as archive:
+        members = {info.filename: archive.read(info.filename) for info in archive.infolist()}
+    members[name] = data
+    with zipfile.ZipFile(path, "w") as archive:
+        for member, content in members.items():
+            archive.writestr(member, content)
+
+
+class TestExportAndInstall:
+    """Test artifacts round-trip an index and are only installed when intact."""
+
+    @pytest.mark.parametrize("backend", ["numpy", "chroma"])
+    def test_round_trip(self, tmp_path, backend):
+        """Test an installed artifact loads the same chunks and vectors without embedding."""
+        source = build_index(tmp_path, backend)
+        manifest = export_artifact(source, str(tmp_path / "index.zip"), version="v1")
+
+        assert manifest["version"] == "v1"
+        assert manifest["count"] == 3
+        assert manifest["corpus_version"] == source.corpus_version()
+        assert manifest["model_fingerprint"]["model"] == EMBEDDING_MODEL_NAME
+        assert verify_artifact(str(tmp_path / "index.zip"))["files"] == manifest["files"]
+
+        install_artifact(str(tmp_path / "index.zip"), str(tmp_path / "installed"))
+        store = NumpyVectorStore.load(str(tmp_path / "installed"), KeywordEmbeddings())
+        by_id = dict(zip(store._ids, store.embedding_matrix()))
+        for metadata, vector in zip(*source._all_embeddings()):
+            assert np.allclose(by_id[metadata["chunk_id"]], vector / np.linalg.norm(vector), atol=1e-6)
+        assert sorted(store._texts) == sorted(doc.page_content for doc in DOCUMENTS)
+        assert store.similarity_search("lung cancer", k=1)[0].metadata["chunk_id"] == "c2"
+
+    def test_reinstall_is_skipped(self, tmp_path):
+        """Test installing the artifact already in place leaves the files alone."""
+        export_artifact(build_index(tmp_path), str(tmp_path / "index.zip"))
+        install_artifact(str(tmp_path / "index.zip"), str(tmp_path / "installed"))
+        before = os.stat(tmp_path / "installed" / "embeddings.npy").st_mtime_ns
+
+        install_artifact(str(tmp_path / "index.zip"), str(tmp_path / "installed"))
+
+        assert os.stat(tmp_path / "installed" / "embeddings.npy").st_mtime_ns == before
+
+    def test_float16_artifact(self, tmp_path):
+        """Test half-size embeddings are restored as float32 rows close to the originals."""
+        source = build_index(tmp_path)
+        export_artifact(source, str(tmp_path / "full.zip"))
+        manifest = export_artifact(source, str(tmp_path / "half.zip"), embedding_dtype="float16")
+
+        assert manifest["embedding_dtype"] == "float16"
+        assert manifest["files"]["embeddings.npy"]["bytes"] < (
+            verify_artifact(str(tmp_path / "full.zip"))["files"]["embeddings.npy"]["bytes"]
+        )
+        install_artifact(str(tmp_path / "half.zip"), str(tmp_path / "installed"))
+        store = NumpyVectorStore.load(str(tmp_path / "installed"), KeywordEmbeddings())
+        assert store.embedding_matrix().dtype == np.float32
+        assert np.allclose(store.embedding_matrix(), source.vector_store.embedding_matrix(), atol=1e-3)
+
+    def test_corrupt_artifact_keeps_existing_index(self, tmp_path):
+        """Test a checksum mismatch is refused before the installed index is touched."""
+        path = str(tmp_path / "index.zip")
+        export_artifact(build_index(tmp_path, documents=DOCUMENTS[:2]), path, version="v1")
+        install_artifact(path, str(tmp_path / "installed"))
+
+        export_artifact(build_index(tmp_path), path, version="v2")
+        rewrite_member(path, "texts.bin", b"tampered")
+
+        with pytest.raises(ArtifactError, match="Checksum mismatch"):
+            verify_artifact(path)
+        with pytest.raises(ArtifactError, match="Checksum mismatch"):
+            install_artifact(path, str(tmp_path / "installed"))
+        assert NumpyVectorStore.load(str(tmp_path / "installed"), KeywordEmbeddings())._ids == ["c1", "c2"]
+
+    @pytest.mark.skipif(sys.platform != "linux", reason="renameat2 is Linux-only")
+    def test_upgrade_never_removes_the_index(self, tmp_path):
+        """Test a new artifact is swapped in without the index directory ever going missing."""
+        path = str(tmp_path / "index.zip")
+        export_artifact(build_index(tmp_path, documents=DOCUMENTS[:2]), path, version="v1")
+        install_artifact(path, str(tmp_path / "installed"))
+        export_artifact(build_index(tmp_path), path, version="v2")
+
+        with patch("src.mmap_index.os.rename", side_effect=AssertionError("index went missing")):
+            assert install_artifact(path, str(tmp_path / "installed"))["version"] == "v2"
+        assert NumpyVectorStore.load(str(tmp_path / "installed"), KeywordEmbeddings())._ids == ["c1", "c2", "c3"]
+        assert sorted(os.listdir(tmp_path)) == ["index.zip", "installed", "numpy"]
+
+    def test_refuses_to_replace_other_directory(self, tmp_path):
+        """Test an artifact is not installed over a directory that is not an index."""
+        path = str(tmp_path / "index.zip")
+        export_artifact(build_index(tmp_path), path)
+        build_index(tmp_path, backend="chroma").close()
+
+        with pytest.raises(ValueError, match="not an index"):
+            install_artifact(path, str(tmp_path / "chroma"))
+        assert "chroma.sqlite3" in os.listdir(tmp_path / "chroma")
+
+    def test_not_an_artifact(self, tmp_path):
+        """Test other files are rejected with a clear error."""
+        (tmp_path / "index.zip").write_text("not a zip")
+        with pytest.raises(ArtifactError, match="not an index artifact"):
+            verify_artifact(str(tmp_path / "index.zip"))
+
+
+class TestModelCheck:
+    """Test artifacts are refused when the query model differs."""
+
+    def test_matching_model(self, tmp_path):
+        """Test the model the artifact was built with passes."""
+        manifest = export_artifact(build_index(tmp_path), str(tmp_path / "index.zip"))
+        check_model(manifest, KeywordEmbeddings(), EMBEDDING_MODEL_NAME)
+
+    def test_other_model_name(self, tmp_path):
+        """Test a different model name is refused."""
+        manifest = export_artifact(build_index(tmp_path), str(tmp_path / "index.zip"))
+        with pytest.raises(ArtifactError, match="embedded with"):
+            check_model(manifest, KeywordEmbeddings(), "sentence-transformers/all-mpnet-base-v2")
+
+    def test_same_name_different_vectors(self, tmp_path):
+        """Test a model with the same name but different weights is refused."""
+        manifest = export_artifact(build_index(tmp_path), str(tmp_path / "index.zip"))
+        with pytest.raises(ArtifactError, match="does not match"):
+            check_model(manifest, ShiftedEmbeddings(), EMBEDDING_MODEL_NAME)
+
+
+class TestChatbotStartup:
+    """Test the chatbot serves INDEX_ARTIFACT."""
+
+    def make_chatbot(self):
+        from src.chatbot import NCDChatbot
+        from tests.fakes import RecordingChatModel
+
+        vs_manager = VectorStoreManager(backend="numpy", embeddings=KeywordEmbeddings())
+        vs_manager.vector_store = NumpyVectorStore.from_documents(DOCUMENTS[:1], KeywordEmbeddings())
+        return NCDChatbot(answer_engine="direct", llm=RecordingChatModel(prompts=[]), vs_manager=vs_manager)
+
+    def test_loads_artifact(self, tmp_path, monkeypatch):
+        """Test the default index is installed from the artifact and loaded."""
+        export_artifact(build_index(tmp_path), str(tmp_path / "index.zip"))
+        monkeypatch.setenv("INDEX_ARTIFACT", str(tmp_path / "index.zip"))
+        monkeypatch.setenv("VECTOR_BACKEND", "numpy")
+        monkeypatch.setenv("VECTOR_STORE_DIR", str(tmp_path / "served"))
+
+        vs_manager = self.make_chatbot()._load_vector_store(embeddings=KeywordEmbeddings())
+
+        assert len(vs_manager.vector_store) == 3
+        assert os.path.exists(tmp_path / "served" / "artifact.json")
+
+    def test_refuses_other_model(self, tmp_path, monkeypatch):
+        """Test startup fails instead of serving vectors from another model, keeping the installed index."""
+        export_artifact(build_index(tmp_path), str(tmp_path / "index.zip"))
+        monkeypatch.setenv("INDEX_ARTIFACT", str(tmp_path / "index.zip"))
+        monkeypatch.setenv("VECTOR_BACKEND", "numpy")
+        monkeypatch.setenv("VECTOR_STORE_DIR", str(tmp_path / "served"))
+        (tmp_path / "served").mkdir()
+        (tmp_path / "served" / "working.txt").write_text("current index")
+
+        with pytest.raises(ArtifactError):
+            self.make_chatbot()._load_vector_store(embeddings=ShiftedEmbeddings())
+        assert os.listdir(tmp_path / "served") == ["working.txt"]
+
+    def test_needs_flat_backend(self, tmp_path, monkeypatch):
+        """Test INDEX_ARTIFACT with the chroma backend is a configuration error."""
+        monkeypatch.setenv("INDEX_ARTIFACT", str(tmp_path / "index.zip"))
+        monkeypatch.setenv("VECTOR_BACKEND", "chroma")
+
+        with pytest.raises(ValueError, match="VECTOR_BACKEND"):
+            self.make_chatbot()._load_vector_store(embeddings=KeywordEmbeddings())
@@ -0,0 +1,153 @@
+"""
+Unit tests for background ingestion jobs.
+Run with: pytest tests/test_ingestion_jobs.py
+"""
+
+from unittest.mock import patch
+from langchain_core.documents import Document
+from src.chatbot import NCDChatbot
+from src.ingestion_jobs import IngestionJobManager
+from src.numpy_store import NumpyVectorStore
+from src.snapshots import SnapshotManager
+from src.vector_store import VectorStoreManager
+from tests.fakes import KeywordEmbeddings, RecordingChatModel
+
+EXISTING = [Document(page_content="Diabetes affects blood sugar.", metadata={"source": "Diabetes.pdf"})]
+
+
+def write_upload(tmp_path, name="Cancer.txt"):
+    path = tmp_path / name
+    text = "".join(f"Lung cancer case {i} is linked to smoking. " for i in range(100))
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+
+def make_chatbot(tmp_path):
+    embeddings = KeywordEmbeddings()
+    vs_manager = VectorStoreManager(
+        persist_directory=str(tmp_path / "numpy_index"),
+        backend="numpy",
+        embeddings=embeddings
+    )
+    vs_manager.vector_store = NumpyVectorStore.from_documents(EXISTING, embeddings)
+    return NCDChatbot(answer_engine="direct", llm=RecordingChatModel(prompts=[]), vs_manager=vs_manager)
+
+
+class TestIngestionJobs:
+    """Test documents are indexed in batches off the request path."""
+
+    def test_job_adds_chunks_in_batches(self, tmp_path, monkeypatch):
+        """Test a job reports progress and its chunks become searchable."""
+        monkeypatch.delenv("INDEX_SNAPSHOT_ROOT", raising=False)
+        chatbot = make_chatbot(tmp_path)
+        manager = IngestionJobManager(batch_size=2)
+
+        job = manager.submit(write_upload(tmp_path), chatbot)
+        manager.shutdown()
+
+        assert job.status == "succeeded", job.error
+        assert job.chunks_total > 2
+        assert job.chunks_done == job.chunks_total
+        assert manager.get(job.job_id) is job
+        assert chatbot.vs_manager.vector_store.similarity_search("cancer", k=1)[0].metadata["source"] == "Cancer.txt"
+
+    def test_duplicate_source_fails(self, tmp_path, monkeypatch):
+        """Test a file already in the index is rejected instead of duplicated."""
+        monkeypatch.delenv("INDEX_SNAPSHOT_ROOT", raising=False)
+        chatbot = make_chatbot(tmp_path)
+        manager = IngestionJobManager()
+
+        path = write_upload(tmp_path)
+        first = manager.submit(path, chatbot)
+        second = manager.submit(path, chatbot)
+        manager.shutdown()
+
+        assert first.status == "succeeded"
+        assert second.status == "failed"
+        assert "already" in second.error
+
+    def test_failed_upload_is_removed(self, tmp_path, monkeypatch):
+        """Test a failed job deletes the uploaded file so the name can be uploaded again."""
+        monkeypatch.delenv("INDEX_SNAPSHOT_ROOT", raising=False)
+        chatbot = make_chatbot(tmp_path)
+        manager = IngestionJobManager()
+        empty = tmp_path / "Empty.txt"
+        empty.write_text("")
+
+        job = manager.submit(str(empty), chatbot, remove_on_failure=True)
+        manager.shutdown()
+
+        assert job.status == "failed"
+        assert not empty.exists()
+
+    def test_snapshot_without_current_is_refused(self, tmp_path, monkeypatch):
+        """Test an upload never replaces the served corpus with an empty snapshot."""
+        chatbot = make_chatbot(tmp_path)
+        chatbot.snapshots = SnapshotManager(str(tmp_path / "snapshots"))
+        manager = IngestionJobManager()
+
+        job = manager.submit(write_upload(tmp_path), chatbot)
+        manager.shutdown()
+
+        assert job.status == "failed"
+        assert "no snapshot is current" in job.error
+        assert chatbot.snapshots.list_versions() == []
+        assert chatbot.vs_manager.get_existing_sources() == ["Diabetes.pdf"]
+
+    @patch('src.vector_store.HuggingFaceEmbeddings')
+    def test_job_builds_new_snapshot(self, mock_embeddings, tmp_path, monkeypatch):
+        """Test with snapshots enabled the job builds and hot-swaps a new version."""
+        mock_embeddings.return_value = KeywordEmbeddings()
+        snapshots = SnapshotManager(str(tmp_path / "snapshots"))
+        v1, path = snapshots.create_snapshot()
+        VectorStoreManager(persist_directory=path, backend="numpy").create_vector_store(EXISTING)
+        snapshots.activate(v1)
+
+        monkeypatch.setenv("INDEX_SNAPSHOT_ROOT", snapshots.root)
+        monkeypatch.setenv("VECTOR_BACKEND", "numpy")
+        chatbot = NCDChatbot(answer_engine="direct", llm=RecordingChatModel(prompts=[]))
+        manager = IngestionJobManager()
+
+        job = manager.submit(write_upload(tmp_path), chatbot)
+        manager.shutdown()
+
+        assert job.status == "succeeded", job.error
+        assert job.index_version == snapshots.current_version() == chatbot.index_version
+        assert job.index_version != v1
+        assert "Cancer.txt" in chatbot.vs_manager.get_existing_sources()
+
+    @patch('src.vector_store.HuggingFaceEmbeddings')
+    def test_job_closes_its_store(self, mock_embeddings, tmp_path, monkeypatch):
+        """Test the store a job builds the snapshot with is closed, on success and on failure."""
+        mock_embeddings.return_value = KeywordEmbeddings()
+        snapshots = SnapshotManager(str(tmp_path / "snapshots"))
+        v1, path = snapshots.create_snapshot()
+        builder = VectorStoreManager(persist_directory=path)
+        builder.create_vector_store(EXISTING)
+        builder.close()
+        snapshots.activate(v1)
+
+        monkeypatch.setenv("INDEX_SNAPSHOT_ROOT", snapshots.root)
+        monkeypatch.setenv("VECTOR_BACKEND", "chroma")
+        chatbot = NCDChatbot(answer_engine="direct", llm=RecordingChatModel(prompts=[]))
+        manager = IngestionJobManager()
+        closed = []
+        close = VectorStoreManager.close
+
+        def record_close(vs_manager):
+            closed.append(vs_manager.persist_directory)
+            close(vs_manager)
+
+        with patch.object(VectorStoreManager, "close", record_close):
+            upload = write_upload(tmp_path)
+            first = manager.submit(upload, chatbot)
+            second = manager.submit(upload, chatbot)
+            manager.shutdown()
+
+        assert first.status == "succeeded", first.error
+        assert second.status == "failed"
+        job_paths = [snapshots.path_for(first.index_version), snapshots.path_for("v0003")]
+        # Each job's own store, then the v1 pipeline retired by the hot-swap
+        assert closed == [job_paths[0], path, job_paths[1]]
+        assert "Cancer.txt" in chatbot.vs_manager.get_existing_sources()
+        chatbot.vs_manager.close()
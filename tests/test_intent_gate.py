@@ -0,0 +1,128 @@
+"""
+Unit tests for the pre-LLM intent gate.
+Run with: pytest tests/test_intent_gate.py
+"""
+
+import pytest
+from langchain_core.documents import Document
+from src.chatbot import NCDChatbot
+from src.intent_gate import IntentGate
+from src.numpy_store import NumpyVectorStore
+from src.sessions import ConversationSession
+from src.vector_store import VectorStoreManager
+from tests.fakes import KeywordEmbeddings, RecordingChatModel
+
+
+class TestIntentGate:
+    """Test rule and centroid classification."""
+
+    @pytest.mark.parametrize("question,intent", [
+        ("Hi!", "greeting"),
+        ("hello there, how are you?", "greeting"),
+        ("Thank you so much", "thanks"),
+        ("ok, thanks", "thanks"),
+        ("Bye", "goodbye"),
+        ("Hi, what is diabetes?", "on_topic"),
+    ])
+    def test_rules(self, question, intent):
+        """Test small talk is answered and real questions pass through."""
+        decision = IntentGate(mode="rules").check(question)
+        assert decision.intent == intent
+        assert (decision.answer is None) == (intent == "on_topic")
+
+    def test_off_topic_by_centroid_similarity(self):
+        """Test questions far from the corpus are answered from a template."""
+        embeddings = KeywordEmbeddings()
+        gate = IntentGate(mode="on", min_similarity=0.9)
+        gate.set_corpus_centroid([1.0, 0.0, 0.0])
+
+        assert gate.check("Who won the football match?", embeddings.embed_query).intent == "off_topic"
+
+        # The embedding computed for the check is handed on to retrieval
+        gate.set_corpus_centroid([0.0, 0.0, 1.0])
+        decision = gate.check("Is a pressure of 140 too much?", embeddings.embed_query)
+        assert decision.intent == "on_topic"
+        assert decision.query_vector == embeddings.embed_query("Is a pressure of 140 too much?")
+        # Medical vocabulary skips the similarity check
+        assert gate.check("What causes asthma?", embeddings.embed_query).intent == "on_topic"
+        assert gate.check("Is COPD curable?", embeddings.embed_query).intent == "on_topic"
+        assert gate.check("Can dialysis be stopped?", embeddings.embed_query).intent == "on_topic"
+        assert gate.check("Who won?", embeddings.embed_query, allow_off_topic=False).intent == "on_topic"
+
+    def test_stats(self):
+        """Test saved LLM calls are counted."""
+        gate = IntentGate(mode="rules")
+        gate.check("hello")
+        gate.check("thanks")
+        gate.check("What is obesity?")
+        stats = gate.stats()
+        assert stats["llm_calls_saved"] == 2
+        assert stats["questions"] == 3
+        assert stats["intents"]["greeting"] == 1
+
+
+class TestChatbotIntentGate:
+    """Test the gate sits in front of retrieval and the LLM."""
+
+    def make_chatbot(self, engine="direct", embeddings=None):
+        embeddings = embeddings or KeywordEmbeddings()
+        vs_manager = VectorStoreManager(backend="numpy", embeddings=embeddings)
+        vs_manager.vector_store = NumpyVectorStore.from_documents([
+            Document(page_content="Diabetes affects blood sugar.", metadata={"source": "Diabetes.pdf"}),
+        ], embeddings)
+        llm = RecordingChatModel(prompts=[])
+        return NCDChatbot(answer_engine=engine, llm=llm, vs_manager=vs_manager), llm
+
+    def test_off_topic_check_is_opt_in(self, monkeypatch):
+        """Test the default gate only answers small talk."""
+        monkeypatch.delenv("INTENT_GATE", raising=False)
+        chatbot, llm = self.make_chatbot()
+
+        assert chatbot.intent_gate.mode == "rules"
+        chatbot.ask("Who won the football match?")
+        assert len(llm.prompts) == 1
+
+    @pytest.mark.parametrize("engine", ["chain", "direct"])
+    def test_gate_embedding_reused(self, engine, monkeypatch):
+        """Test a question embedded by the off-topic check is not embedded again for retrieval."""
+        monkeypatch.setenv("INTENT_GATE", "on")
+        monkeypatch.setenv("INTENT_MIN_SIMILARITY", "0.1")
+        embedded = []
+
+        class CountingEmbeddings(KeywordEmbeddings):
+            def embed_query(self, text):
+                embedded.append(text)
+                return super().embed_query(text)
+
+        chatbot, llm = self.make_chatbot(engine, CountingEmbeddings())
+        embedded.clear()
+        result = chatbot.ask("Why am I always thirsty?", return_sources=True)
+
+        assert embedded == ["Why am I always thirsty?"]
+        assert result["sources"][0]["source"] == "Diabetes.pdf"
+        assert len(llm.prompts) == 1
+
+    def test_greeting_skips_llm(self, monkeypatch):
+        """Test small talk never reaches the LLM while questions do."""
+        monkeypatch.delenv("INTENT_GATE", raising=False)
+        chatbot, llm = self.make_chatbot()
+
+        result = chatbot.ask("Hello!", return_sources=True)
+        assert result["intent"] == "greeting"
+        assert result["sources"] == []
+        assert llm.prompts == []
+
+        chatbot.ask("What is diabetes?")
+        assert len(llm.prompts) == 1
+        assert chatbot.intent_gate.stats()["llm_calls_saved"] == 1
+
+    def test_follow_up_not_rejected(self, monkeypatch):
+        """Test vague follow-ups in a session still reach the LLM."""
+        monkeypatch.setenv("INTENT_MIN_SIMILARITY", "0.99")
+        chatbot, llm = self.make_chatbot()
+        session = ConversationSession("s1")
+
+        chatbot.ask("What is diabetes?", session=session)
+        result = chatbot.ask("And how common is it?", session=session)
+        assert "intent" not in result
+        assert len(llm.prompts) == 2
@@ -0,0 +1,119 @@
+"""
+Unit tests for the pooled LLM HTTP client.
+Run with: pytest tests/test_llm_http.py
+"""
+
+import asyncio
+from unittest.mock import Mock, patch
+
+import pytest
+from benchmarks.llm_http import start_stub_server
+from src.llm_http import LLMHTTPPool
+
+
+@pytest.fixture(scope="module")
+def stub_url():
+    server = start_stub_server()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+def make_llm(stub_url, pool):
+    from langchain_groq import ChatGroq
+
+    return ChatGroq(
+        model="stub",
+        groq_api_key="stub",
+        groq_api_base=stub_url,
+        max_retries=0,
+        timeout=pool.timeout,
+        http_client=pool.client,
+        http_async_client=pool.async_client
+    )
+
+
+class TestLLMHTTPPool:
+    """Test connection reuse, warming and pool metrics."""
+
+    def test_calls_reuse_one_connection(self, stub_url):
+        """Test sequential LLM calls share a single keep-alive connection."""
+        pool = LLMHTTPPool(base_url=stub_url)
+        llm = make_llm(stub_url, pool)
+
+        for _ in range(5):
+            assert llm.invoke("hi").content == "A stub answer."
+
+        stats = pool.stats()
+        assert stats["requests"] == stats["responses"] == 5
+        assert stats["connections_opened"] == 1
+        assert stats["reuse_ratio"] == 0.8
+        assert stats["avg_connect_ms"] is not None
+        assert stats["sync_pool"] == {"open": 1, "idle": 1}
+
+    def test_warm_opens_connections_before_first_call(self, stub_url):
+        """Test warmed connections are reused by the first LLM call."""
+        pool = LLMHTTPPool(base_url=stub_url)
+        assert pool.warm(2) == 2
+        opened = pool.stats()["connections_opened"]
+        assert 1 <= opened <= 2
+
+        make_llm(stub_url, pool).invoke("hi")
+
+        assert pool.stats()["connections_opened"] == opened
+        assert pool.stats()["warmed"] == 2
+
+    def test_warm_failure_is_not_fatal(self):
+        """Test an unreachable provider only makes warming report zero."""
+        pool = LLMHTTPPool(base_url="http://127.0.0.1:9", connect_timeout=0.5)
+        assert pool.warm(1) == 0
+
+    def test_async_calls(self, stub_url):
+        """Test async LLM calls go through the pooled async client."""
+        pool = LLMHTTPPool(base_url=stub_url)
+        llm = make_llm(stub_url, pool)
+
+        async def ask_twice():
+            first = await llm.ainvoke("hi")
+            second = await llm.ainvoke("hi")
+            await pool.async_client.aclose()
+            return first, second
+
+        first, second = asyncio.run(ask_twice())
+        assert first.content == second.content == "A stub answer."
+        assert pool.stats()["requests"] == 2
+        assert pool.stats()["connections_opened"] == 1
+
+    def test_settings(self, monkeypatch):
+        """Test limits and timeouts come from the environment."""
+        monkeypatch.setenv("LLM_HTTP_MAX_CONNECTIONS", "7")
+        monkeypatch.setenv("LLM_HTTP_KEEPALIVE_SECONDS", "300")
+        monkeypatch.setenv("LLM_TIMEOUT_SECONDS", "12")
+        monkeypatch.setenv("LLM_HTTP2", "1")
+
+        pool = LLMHTTPPool.from_env()
+
+        assert pool.limits.max_connections == 7
+        assert pool.limits.keepalive_expiry == 300
+        assert pool.timeout.read == 12
+        # HTTP/2 needs the optional h2 package
+        assert pool.http2 == pool.stats()["http2"]
+
+
+class TestChatbotClient:
+    """Test the chatbot hands the pooled clients to ChatGroq."""
+
+    @patch('src.chatbot.VectorStoreManager')
+    @patch('src.chatbot.ChatGroq')
+    @patch('src.chatbot.RetrievalQA')
+    def test_chatgroq_uses_pool(self, mock_qa, mock_llm, mock_vector, monkeypatch):
+        """Test ChatGroq gets the shared sync and async clients and timeout."""
+        from src.chatbot import NCDChatbot
+
+        monkeypatch.delenv("GROQ_API_KEY", raising=False)
+        mock_vector.return_value = Mock()
+        chatbot = NCDChatbot()
+
+        kwargs = mock_llm.call_args.kwargs
+        assert kwargs["http_client"] is chatbot.llm_http.client
+        assert kwargs["http_async_client"] is chatbot.llm_http.async_client
+        assert kwargs["timeout"] is chatbot.llm_http.timeout
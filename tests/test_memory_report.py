@@ -0,0 +1,230 @@
+"""
+Unit tests for the memory report and low-memory mode.
+Run with: pytest tests/test_memory_report.py
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tracemalloc
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from langchain_core.documents import Document
+from src.memory_report import (
+    _package_of,
+    apply_low_memory_settings,
+    heap_by_package,
+    memory_report,
+    model_bytes,
+    process_memory,
+)
+from src.numpy_store import FILTER_CACHE_SIZE, NumpyVectorStore
+from src.vector_store import VectorStoreManager
+from tests.fakes import KeywordEmbeddings
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Loads a 20k-chunk index and a torch stand-in for the embedding model and
+# embeds a few batches, then fills the session store with long conversations.
+# Reports what loading left resident, and how far the peak RSS grew while
+# the sessions filled up with the index and model already in memory
+FILL_SESSIONS = """
+import json
+import tempfile
+import app
+import numpy as np
+import torch
+from langchain_core.documents import Document
+from src.memory_report import process_memory, release_memory
+from src.numpy_store import NumpyVectorStore
+
+start = process_memory()
+model = torch.nn.Sequential(torch.nn.Linear(384, 1536), torch.nn.GELU(), torch.nn.Linear(1536, 384))
+with tempfile.TemporaryDirectory() as index_dir:
+    writer = NumpyVectorStore(None)
+    writer.add_embeddings([f"chunk {i}" for i in range(20000)],
+                          np.random.default_rng(0).standard_normal((20000, 384), dtype=np.float32))
+    writer.save(index_dir)
+    del writer
+    store = NumpyVectorStore.load(index_dir, None)
+with torch.no_grad():
+    for _ in range(20):
+        queries = model(torch.randn(32, 128, 384)).mean(dim=1)
+        store.batch_search_by_vectors(queries.numpy(), k=4)
+release_memory()
+loaded = process_memory()
+
+# Reset the peak so only the growth from here on is measured
+with open("/proc/self/clear_refs", "w") as f:
+    f.write("5")
+base = process_memory()["peak_rss_bytes"]
+for i in range(2000):
+    session = app.session_store.create()
+    documents = [Document(page_content=f"{i}-{j} " + "chunk text " * 300, metadata={"source": "x.pdf"}) for j in range(4)]
+    for turn in range(6):
+        session.add_turn(f"question {i} {turn} " * 20, f"answer {i} {turn} " * 200, "query", documents)
+growth = process_memory()["peak_rss_bytes"] - base
+
+print(json.dumps({
+    "loaded_mb": (loaded["rss_bytes"] - start["rss_bytes"]) / 2**20,
+    "load_peak_mb": (loaded["peak_rss_bytes"] - start["peak_rss_bytes"]) / 2**20,
+    "growth_mb": growth / 2**20,
+    "sessions": len(app.session_store),
+    "torch_threads": torch.get_num_threads(),
+}))
+"""
+
+
+def run_fill(low_memory: str) -> dict:
+    env = {**os.environ, "LOW_MEMORY": low_memory, "PYTHONPATH": PROJECT_ROOT}
+    for name in ("SESSION_MAX_COUNT", "SESSION_HISTORY_TOKENS", "OMP_NUM_THREADS", "LOW_MEMORY_TORCH_THREADS"):
+        env.pop(name, None)
+    result = subprocess.run(
+        [sys.executable, "-c", FILL_SESSIONS],
+        cwd=PROJECT_ROOT, env=env, capture_output=True, text=True, timeout=300
+    )
+    assert result.returncode == 0, result.stderr
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+class TestProcessMemory:
+    """Test resident memory and heap breakdown."""
+
+    def test_process_memory(self):
+        """Test RSS and peak RSS are reported and the peak follows allocations."""
+        before = process_memory()
+        block = np.ones(64 * 2**20 // 8)
+        after = process_memory()
+        del block
+
+        assert after["peak_rss_bytes"] >= after["rss_bytes"] > 0
+        assert after["peak_rss_bytes"] - before["peak_rss_bytes"] >= 32 * 2**20
+
+    def test_package_of(self):
+        """Test allocation sites are grouped by package or project directory."""
+        assert _package_of("/usr/lib/python3.11/site-packages/numpy/core/numeric.py") == "numpy"
+        assert _package_of(os.path.join(os.getcwd(), "src", "sessions.py")) == "src"
+        assert _package_of("/usr/lib/python3.11/json/decoder.py") == "stdlib"
+
+    def test_heap_by_package(self):
+        """Test the heap breakdown needs tracing and ranks the largest package first."""
+        assert not tracemalloc.is_tracing()
+        assert heap_by_package() is None
+
+        tracemalloc.start()
+        try:
+            block = np.ones(16 * 2**20 // 8)
+            heap = heap_by_package(top=3)
+        finally:
+            tracemalloc.stop()
+
+        assert heap[0]["package"] == "numpy"
+        assert heap[0]["mb"] >= block.nbytes / 2**20
+
+    def test_model_bytes(self):
+        """Test model size counts torch parameters and buffers."""
+        torch = pytest.importorskip("torch")
+
+        class Embeddings:
+            client = torch.nn.BatchNorm1d(10)
+
+        # weight, bias, running mean and variance (float32) plus a 64-bit counter
+        assert model_bytes(Embeddings()) == 4 * 10 * 4 + 8
+        assert model_bytes(object()) == 0
+
+    def test_report_without_chatbot(self):
+        """Test the report covers the process without a chatbot loaded."""
+        report = memory_report(caches={"sessions": {"entries": 0, "max": 10}})
+
+        assert report["rss_mb"] > 0
+        assert report["components_mb"] == {}
+        assert report["python_heap_by_package"] is None
+        assert report["caches"]["sessions"]["max"] == 10
+
+
+class TestLowMemorySettings:
+    """Test LOW_MEMORY lowers defaults without overriding explicit settings."""
+
+    def test_off_by_default(self, monkeypatch):
+        """Test nothing changes without LOW_MEMORY."""
+        monkeypatch.delenv("LOW_MEMORY", raising=False)
+        monkeypatch.delenv("SESSION_MAX_COUNT", raising=False)
+
+        assert apply_low_memory_settings() is False
+        assert "SESSION_MAX_COUNT" not in os.environ
+
+    def test_explicit_values_win(self, monkeypatch):
+        """Test variables already set keep their values."""
+        monkeypatch.setenv("LOW_MEMORY", "1")
+        monkeypatch.setenv("SESSION_MAX_COUNT", "5000")
+        for name in ("SOURCE_CACHE_SIZE", "OMP_NUM_THREADS", "TOKENIZERS_PARALLELISM"):
+            monkeypatch.delenv(name, raising=False)
+        monkeypatch.setenv("LOW_MEMORY_TORCH_THREADS", "2")
+
+        assert apply_low_memory_settings() is True
+        assert os.environ["SESSION_MAX_COUNT"] == "5000"
+        assert os.environ["SOURCE_CACHE_SIZE"] == "64"
+        assert os.environ["OMP_NUM_THREADS"] == "2"
+        assert os.environ["TOKENIZERS_PARALLELISM"] == "false"
+
+    @pytest.mark.skipif(not os.path.exists("/proc/self/clear_refs"), reason="needs Linux to reset the peak RSS")
+    def test_peak_rss(self):
+        """Test low-memory mode bounds peak RSS growth from long sessions with a model and index loaded."""
+        normal = run_fill("0")
+        low = run_fill("1")
+
+        assert normal["sessions"] == 1000
+        assert low["sessions"] == 200
+        assert low["torch_threads"] == 1
+        # Measured: about 57 MB left resident (29 MB index, 5 MB model, torch
+        # runtime) after a load peak of about 200 MB
+        for run in (normal, low):
+            assert run["loaded_mb"] < 100
+            assert run["loaded_mb"] < run["load_peak_mb"] / 2
+        # Measured: about 19 MB vs 3 MB
+        assert low["growth_mb"] < 10
+        assert low["growth_mb"] < normal["growth_mb"] / 2
+
+
+class TestMemoryEndpoint:
+    """Test GET /admin/memory."""
+
+    def test_requires_admin(self, monkeypatch):
+        """Test the endpoint needs the admin token."""
+        import app
+
+        monkeypatch.setenv("ADMIN_TOKEN", "secret")
+        client = TestClient(app.app)
+
+        assert client.get("/admin/memory").status_code == 401
+
+    @patch('app.get_chatbot')
+    def test_report(self, mock_get_chatbot, monkeypatch):
+        """Test the report sizes the index and lists the app's caches."""
+        import app
+
+        vs_manager = VectorStoreManager(backend="numpy", embeddings=KeywordEmbeddings())
+        vs_manager.vector_store = NumpyVectorStore.from_documents(
+            [Document(page_content="Diabetes affects blood sugar " * 5000, metadata={"source": "Diabetes.pdf"})],
+            KeywordEmbeddings()
+        )
+        mock_get_chatbot.return_value.vs_manager = vs_manager
+        mock_get_chatbot.return_value.collections = None
+        monkeypatch.setenv("ADMIN_TOKEN", "secret")
+        client = TestClient(app.app)
+
+        response = client.get("/admin/memory", headers={"X-Admin-Token": "secret"})
+
+        assert response.status_code == 200
+        report = response.json()
+        assert report["components_mb"] == {"embedding_model": 0.0, "vector_index": 0.1}
+        assert report["caches"]["sessions"]["max"] == app.session_store.max_sessions
+        assert set(report["caches"]) == {
+            "sessions", "sources", "slow_requests", "ingestion_jobs", "startup_timings", "filter_rows"
+        }
+        assert report["caches"]["startup_timings"]["max"] == app.profiler.max_records
+        assert report["caches"]["filter_rows"] == {"entries": 0, "max": FILTER_CACHE_SIZE}
@@ -0,0 +1,130 @@
+"""
+Unit tests for the memory-mapped vector index.
+Run with: pytest tests/test_mmap_index.py
+"""
+
+import os
+import sys
+import numpy as np
+import pytest
+from unittest.mock import Mock, patch
+from src.mmap_index import MmapVectorStore, export_collection
+from src.vector_store import VectorStoreManager
+from tests.fakes import KeywordEmbeddings
+
+
+def make_collection():
+    """Build a mock Chroma collection with three chunks."""
+    texts = [
+        "Diabetes affects blood sugar.",
+        "Lung cancer is linked to smoking.",
+        "High blood pressure strains the heart.",
+    ]
+    records = {
+        "ids": ["c1", "c2", "c3"],
+        "documents": texts,
+        "metadatas": [
+            {"source": "Diabetes.pdf"},
+            {"source": "Lung Cancer.pdf"},
+            {"source": "High Blood Pressure.pdf"},
+        ],
+        "embeddings": np.array(KeywordEmbeddings().embed_documents(texts)),
+    }
+
+    def get(include, limit, offset):
+        return {key: records[key][offset:offset + limit] for key in records}
+
+    collection = Mock()
+    collection.get.side_effect = get
+    return collection
+
+
+class TestMmapVectorStore:
+    """Test export and read-only querying."""
+
+    def test_export_and_search(self, tmp_path):
+        """Test exported index returns the most similar chunk first."""
+        index_dir = str(tmp_path / "index")
+        count = export_collection(make_collection(), index_dir, page_size=2)
+        assert count == 3
+
+        store = MmapVectorStore(index_dir, KeywordEmbeddings())
+        results = store.similarity_search_with_score("What is diabetes?", k=2)
+        assert len(results) == 2
+        doc, score = results[0]
+        assert doc.metadata["source"] == "Diabetes.pdf"
+        assert doc.id == "c1"
+        assert doc.page_content == "Diabetes affects blood sugar."
+        assert score >= results[1][1]
+
+    def test_index_is_memory_mapped(self, tmp_path):
+        """Test embeddings are mapped rather than copied into memory."""
+        index_dir = str(tmp_path / "index")
+        export_collection(make_collection(), index_dir)
+
+        store = MmapVectorStore(index_dir, KeywordEmbeddings())
+        assert isinstance(store._matrix, np.memmap)
+        assert not store._matrix.flags.writeable
+
+    def test_store_is_read_only(self, tmp_path):
+        """Test adding texts to the mapped index is rejected."""
+        index_dir = str(tmp_path / "index")
+        export_collection(make_collection(), index_dir)
+
+        store = MmapVectorStore(index_dir, KeywordEmbeddings())
+        with pytest.raises(NotImplementedError):
+            store.add_texts(["new chunk"])
+        assert store.get_sources() == [
+            "Diabetes.pdf", "High Blood Pressure.pdf", "Lung Cancer.pdf"
+        ]
+
+    @pytest.mark.parametrize("exchange", [
+        pytest.param(True, marks=pytest.mark.skipif(sys.platform != "linux", reason="renameat2 is Linux-only")),
+        False,
+    ])
+    def test_reexport_replaces_index(self, tmp_path, exchange):
+        """Test re-exporting swaps the index in place while mapped stores keep working."""
+        index_dir = str(tmp_path / "index")
+        export_collection(make_collection(), index_dir)
+        old_store = MmapVectorStore(index_dir, KeywordEmbeddings())
+
+        if exchange:
+            # The directories are exchanged, never renamed away, so index_dir always exists
+            with patch("src.mmap_index.os.rename", side_effect=AssertionError("index_dir went missing")):
+                export_collection(make_collection(), index_dir)
+        else:
+            with patch("src.mmap_index._exchange_paths", return_value=False):
+                export_collection(make_collection(), index_dir)
+
+        assert os.listdir(tmp_path) == ["index"]
+        assert old_store.similarity_search("diabetes", k=1)[0].id == "c1"
+        assert MmapVectorStore(index_dir, KeywordEmbeddings()).similarity_search("diabetes", k=1)[0].id == "c1"
+
+    def test_refuses_to_replace_other_directory(self, tmp_path):
+        """Test exporting over a directory that is not an index leaves it alone."""
+        (tmp_path / "notes").mkdir()
+        (tmp_path / "notes" / "keep.txt").write_text("not an index")
+
+        with pytest.raises(ValueError, match="not an index"):
+            export_collection(make_collection(), str(tmp_path / "notes"))
+        assert os.listdir(tmp_path) == ["notes"]
+        assert os.listdir(tmp_path / "notes") == ["keep.txt"]
+
+    def test_missing_index_raises(self, tmp_path):
+        """Test loading a missing index raises FileNotFoundError."""
+        with pytest.raises(FileNotFoundError):
+            MmapVectorStore(str(tmp_path / "missing"), KeywordEmbeddings())
+
+    @patch('src.vector_store.HuggingFaceEmbeddings')
+    def test_manager_mmap_backend(self, mock_embeddings, tmp_path):
+        """Test VectorStoreManager serves the mapped index as a retriever."""
+        mock_embeddings.return_value = KeywordEmbeddings()
+        index_dir = str(tmp_path / "index")
+        export_collection(make_collection(), index_dir)
+
+        manager = VectorStoreManager(persist_directory=index_dir, backend="mmap")
+        manager.load_vector_store()
+        docs = manager.get_retriever({"k": 1}).invoke("blood pressure")
+        assert docs[0].metadata["source"] == "High Blood Pressure.pdf"
+        with pytest.raises(ValueError):
+            manager.add_documents(docs)
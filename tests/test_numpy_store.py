@@ -0,0 +1,158 @@
+"""
+Unit tests for the in-process NumPy vector store.
+Run with: pytest tests/test_numpy_store.py
+"""
+
+import numpy as np
+import pytest
+from unittest.mock import patch
+from langchain_core.documents import Document
+from src.numpy_store import FILTER_CACHE_SIZE, NumpyVectorStore, top_k_indices
+from src.data_ingestion import DataIngestion
+from src.vector_store import VectorStoreManager
+from tests.fakes import KeywordEmbeddings
+
+DOCUMENTS = [
+    Document(page_content="Diabetes affects blood sugar.", metadata={"source": "Diabetes.pdf"}),
+    Document(page_content="Lung cancer is linked to smoking.", metadata={"source": "Lung Cancer.pdf"}),
+    Document(page_content="High blood pressure strains the heart.",
+             metadata={"source": "High Blood Pressure.pdf"}),
+]
+
+
+class TestNumpyVectorStore:
+    """Test brute-force search."""
+
+    def test_top_k_indices_sorted(self):
+        """Test argpartition top-k returns the best scores first."""
+        scores = np.array([[0.1, 0.9, 0.5, 0.7], [0.8, 0.2, 0.3, 0.1]])
+        assert top_k_indices(scores, 2).tolist() == [[1, 3], [0, 2]]
+
+    @pytest.mark.parametrize("dtype", ["float32", "float16", "int8"])
+    def test_similarity_search(self, dtype):
+        """Test the closest chunk is returned first in every precision."""
+        store = NumpyVectorStore.from_documents(DOCUMENTS, KeywordEmbeddings(), dtype=dtype)
+        assert store._matrix.dtype == np.dtype(dtype)
+        assert store._matrix.flags.c_contiguous
+
+        docs = store.similarity_search("Tell me about lung cancer", k=2)
+        assert len(docs) == 2
+        assert docs[0].metadata["source"] == "Lung Cancer.pdf"
+
+    def test_batch_search_matches_single_search(self):
+        """Test batched multi-query search agrees with one-by-one search."""
+        store = NumpyVectorStore.from_documents(DOCUMENTS, KeywordEmbeddings())
+        queries = ["diabetes", "blood pressure", "cancer"]
+
+        batched = store.batch_similarity_search(queries, k=1)
+        single = [store.similarity_search_with_score(q, k=1) for q in queries]
+        assert [r[0][0].id for r in batched] == [r[0][0].id for r in single]
+
+    def test_save_and_load(self, tmp_path):
+        """Test a saved store loads back with the same results."""
+        store = NumpyVectorStore.from_documents(DOCUMENTS, KeywordEmbeddings())
+        store.save(str(tmp_path / "index"))
+
+        loaded = NumpyVectorStore.load(str(tmp_path / "index"), KeywordEmbeddings())
+        assert len(loaded) == 3
+        assert loaded.get_sources() == store.get_sources()
+        assert loaded.similarity_search("diabetes", k=1)[0].id == \
+            store.similarity_search("diabetes", k=1)[0].id
+
+    def test_int8_rescoring_matches_float32(self, tmp_path):
+        """Test int8 search with rescoring returns the exact float32 results."""
+        rng = np.random.default_rng(0)
+        vectors = rng.standard_normal((500, 32)).astype(np.float32)
+        queries = vectors[:20] + 0.5 * rng.standard_normal((20, 32)).astype(np.float32)
+        texts = [str(i) for i in range(500)]
+
+        exact = NumpyVectorStore(None)
+        exact.add_embeddings(texts, vectors, ids=texts)
+        exact.save(str(tmp_path / "index"))
+        quantized = NumpyVectorStore.load(str(tmp_path / "index"), None, dtype="int8", rescore_factor=4)
+        assert quantized.nbytes < exact.nbytes / 3
+
+        for expected, found in zip(exact.batch_search_by_vectors(queries, k=5),
+                                   quantized.batch_search_by_vectors(queries, k=5)):
+            assert [d.id for d, _ in found] == [d.id for d, _ in expected]
+            assert [s for _, s in found] == pytest.approx([s for _, s in expected], abs=1e-5)
+
+    def test_int8_add_and_save(self, tmp_path):
+        """Test adding to an int8 store requantizes and saves float32 rows."""
+        store = NumpyVectorStore.from_documents(DOCUMENTS[:2], KeywordEmbeddings(), dtype="int8")
+        store.add_documents(DOCUMENTS[2:])
+        assert store._matrix.shape == store.embedding_matrix().shape == (3, 3)
+        assert store.similarity_search("pressure", k=1)[0].metadata["source"] == "High Blood Pressure.pdf"
+
+        store.save(str(tmp_path / "index"))
+        loaded = NumpyVectorStore.load(str(tmp_path / "index"), KeywordEmbeddings())
+        assert loaded._matrix.dtype == np.float32
+        np.testing.assert_allclose(loaded._matrix, store.embedding_matrix())
+
+    def test_int8_search_during_add(self):
+        """Test a search that started before an add scores with the codes' own scales."""
+        store = NumpyVectorStore(None, dtype="int8", rescore_factor=0)
+        store.add_embeddings(["a", "b"], [[1.0, 0.1], [0.9, 0.2]], metadatas=[{"topic": "x"}] * 2)
+        expected = store.batch_search_by_vectors([[1.0, 0.1]], k=2, filter={"topic": "x"})[0]
+        rows_matching = store._rows_matching
+
+        def add_then_filter(where):
+            # Widens the second dimension's range, which changes its scale
+            store.add_embeddings(["c"], [[0.0, 1.0]], metadatas=[{"topic": "y"}])
+            return rows_matching(where)
+
+        with patch.object(store, "_rows_matching", add_then_filter):
+            found = store.batch_search_by_vectors([[1.0, 0.1]], k=2, filter={"topic": "x"})[0]
+
+        assert [d.id for d, _ in found] == [d.id for d, _ in expected]
+        assert [s for _, s in found] == pytest.approx([s for _, s in expected])
+
+    def test_filter_cache_is_bounded(self):
+        """Test the rows matching each filter are cached up to a limit, oldest first out."""
+        store = NumpyVectorStore.from_documents(DOCUMENTS, KeywordEmbeddings())
+        for i in range(FILTER_CACHE_SIZE + 10):
+            store.similarity_search("diabetes", k=1, filter={"source": f"{i}.pdf"})
+
+        assert store.filter_cache_stats() == {"entries": FILTER_CACHE_SIZE, "max": FILTER_CACHE_SIZE}
+        assert repr(sorted({"source": "0.pdf"}.items())) not in store._filter_rows
+        docs = store.similarity_search("diabetes", k=1, filter={"source": "Diabetes.pdf"})
+        assert docs[0].metadata["source"] == "Diabetes.pdf"
+
+    @patch('src.vector_store.HuggingFaceEmbeddings')
+    def test_manager_numpy_backend(self, mock_embeddings, tmp_path):
+        """Test VectorStoreManager creates, reloads and extends a numpy store."""
+        mock_embeddings.return_value = KeywordEmbeddings()
+        index_dir = str(tmp_path / "numpy_index")
+
+        manager = VectorStoreManager(persist_directory=index_dir, backend="numpy")
+        manager.create_vector_store(DOCUMENTS[:2])
+
+        reloaded = VectorStoreManager(persist_directory=index_dir, backend="numpy")
+        reloaded.load_vector_store()
+        reloaded.add_documents(DOCUMENTS[2:])
+        assert len(reloaded.get_existing_sources()) == 3
+
+        retriever = reloaded.get_retriever({"k": 1})
+        assert retriever.invoke("pressure")[0].metadata["source"] == "High Blood Pressure.pdf"
+
+    @patch('src.vector_store.HuggingFaceEmbeddings')
+    def test_manager_get_chunk(self, mock_embeddings, tmp_path):
+        """Test chunks keep stable IDs and pages and can be fetched by ID."""
+        mock_embeddings.return_value = KeywordEmbeddings()
+        document = Document(
+            page_content="Diabetes affects blood sugar. " * 30 + "Lung cancer is linked to smoking. " * 30,
+            metadata={"source": "NCD.pdf", "page_starts": [0, 900]}
+        )
+        chunks = DataIngestion().split_documents([document])
+        assert [c.metadata["page"] for c in chunks][0] == 1
+        assert chunks[-1].metadata["page"] == 2
+        assert "page_starts" not in chunks[0].metadata
+        assert [c.id for c in DataIngestion().split_documents([document])] == [c.id for c in chunks]
+
+        manager = VectorStoreManager(persist_directory=str(tmp_path / "index"), backend="numpy")
+        manager.create_vector_store(chunks)
+
+        chunk = manager.get_chunk(chunks[1].id)
+        assert chunk.page_content == chunks[1].page_content
+        assert chunk.metadata["chunk_id"] == chunks[1].id
+        assert manager.get_chunk("missing") is None
@@ -0,0 +1,78 @@
+"""
+Unit tests for multi-process embedding.
+Run with: pytest tests/test_parallel_embedding.py
+"""
+
+import numpy as np
+import pytest
+from langchain_core.documents import Document
+from src.parallel_embedding import ParallelEmbedder
+from src.vector_store import VectorStoreManager
+from tests.fakes import KEYWORDS, KeywordEmbeddings
+
+WORDS = KEYWORDS
+
+
+@pytest.fixture(scope="module")
+def embedder():
+    # Starting worker processes is slow, so the tests share one pool
+    with ParallelEmbedder(workers=2, batch_size=3, max_pending=2, factory=KeywordEmbeddings) as pool:
+        yield pool
+
+
+def make_documents(count):
+    return [
+        Document(
+            page_content=f"Chunk {i} about {WORDS[i % len(WORDS)]}.",
+            metadata={"source": f"{WORDS[i % len(WORDS)]}.pdf", "chunk_id": f"c{i}"}
+        )
+        for i in range(count)
+    ]
+
+
+class TestParallelEmbedder:
+    """Test batching, ordering and throughput counters."""
+
+    def test_batches_come_back_in_order(self, embedder):
+        """Test batches are yielded in input order with the in-process embeddings."""
+        texts = [doc.page_content for doc in make_documents(20)]
+
+        batches = list(embedder.embed_batches(texts))
+
+        assert [offset for offset, _ in batches] == list(range(0, 20, 3))
+        expected = np.asarray(KeywordEmbeddings().embed_documents(texts), dtype=np.float32)
+        assert np.array_equal(np.vstack([vectors for _, vectors in batches]), expected)
+        assert embedder.stats()["chunks_per_second"] > 0
+
+    def test_invalid_settings(self):
+        """Test nonsensical pool settings are rejected."""
+        with pytest.raises(ValueError):
+            ParallelEmbedder(torch_threads=0)
+        with pytest.raises(ValueError):
+            ParallelEmbedder(batch_size=0)
+
+
+class TestParallelBuild:
+    """Test vector stores built with worker processes match in-process builds."""
+
+    @pytest.mark.parametrize("backend", ["chroma", "numpy"])
+    def test_same_index_as_in_process_build(self, embedder, backend, tmp_path):
+        """Test the parallel build stores the same chunks and embeddings."""
+        documents = make_documents(25)
+        serial = VectorStoreManager(str(tmp_path / "serial"), backend=backend, embeddings=KeywordEmbeddings())
+        serial.create_vector_store(documents)
+        parallel = VectorStoreManager(str(tmp_path / "parallel"), backend=backend, embeddings=KeywordEmbeddings())
+        parallel.create_vector_store(documents, embedder=embedder)
+
+        def vectors_by_id(manager):
+            metadatas, vectors = manager._all_embeddings()
+            return {metadata["chunk_id"]: vector for metadata, vector in zip(metadatas, vectors)}
+
+        expected = vectors_by_id(serial)
+        found = vectors_by_id(parallel)
+        assert sorted(found) == sorted(expected)
+        for chunk_id, vector in expected.items():
+            assert np.allclose(found[chunk_id], vector, atol=1e-6)
+        for word in WORDS:
+            results = parallel.similarity_search(word, k=5)
+            assert {doc.metadata["source"] for doc in results} == {f"{word}.pdf"}
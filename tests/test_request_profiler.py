@@ -0,0 +1,67 @@
+"""
+Unit tests for the slow request profiler.
+Run with: pytest tests/test_request_profiler.py
+"""
+
+import time
+from src.request_profiler import SlowRequestProfiler, merge_collapsed, request_stage
+
+
+def busy_work(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+class TestSlowRequestProfiler:
+    """Test slow requests are captured with stages and stacks."""
+
+    def test_disabled_by_default(self):
+        """Test nothing is recorded without a threshold."""
+        profiler = SlowRequestProfiler()
+        with profiler.capture("POST /chat") as capture:
+            with request_stage("retrieval"):
+                pass
+        assert capture is None
+        assert profiler.captures() == []
+        assert profiler.stats()["enabled"] is False
+
+    def test_only_slow_requests_are_kept(self):
+        """Test requests under the threshold are profiled but not kept."""
+        profiler = SlowRequestProfiler(threshold_ms=50, sample_interval_ms=1)
+        with profiler.capture("POST /chat", detail="fast"):
+            pass
+        with profiler.capture("POST /chat", detail="slow"):
+            with request_stage("retrieval"):
+                busy_work(0.02)
+            with request_stage("llm"):
+                busy_work(0.06)
+
+        captures = profiler.captures()
+        assert [c["detail"] for c in captures] == ["slow"]
+        stats = profiler.stats()
+        assert (stats["profiled"], stats["captured"]) == (2, 1)
+
+        capture = captures[0]
+        assert capture["duration_ms"] >= 80
+        assert set(capture["stages"]) == {"retrieval", "llm", "other"}
+        assert capture["stages"]["llm"] >= 60
+        assert capture["samples"] > 0
+        assert "busy_work (tests/test_request_profiler.py)" in capture["stacks"][0]["stack"]
+
+    def test_ring_buffer_keeps_newest(self):
+        """Test the buffer is bounded and listed newest first."""
+        profiler = SlowRequestProfiler(threshold_ms=0, sample_interval_ms=0, capacity=2)
+        for i in range(3):
+            with profiler.capture("POST /chat", detail=str(i)):
+                pass
+        assert [c["detail"] for c in profiler.captures()] == ["2", "1"]
+        assert [c["detail"] for c in profiler.captures(limit=1)] == ["2"]
+
+    def test_merge_collapsed(self):
+        """Test stacks from several captures are summed into collapsed lines."""
+        captures = [
+            {"stacks": [{"stack": "main;ask;invoke", "count": 3}, {"stack": "main;ask", "count": 1}]},
+            {"stacks": [{"stack": "main;ask;invoke", "count": 2}]},
+        ]
+        assert merge_collapsed(captures) == "main;ask;invoke 5\nmain;ask 1\n"
@@ -0,0 +1,165 @@
+"""
+Unit tests for conversation sessions.
+Run with: pytest tests/test_sessions.py
+"""
+
+import pytest
+from unittest.mock import Mock, patch
+from langchain_core.documents import Document
+from src.chatbot import NCDChatbot
+from src.numpy_store import NumpyVectorStore
+from src.sessions import (
+    ConversationSession,
+    SessionStore,
+    condense_question,
+    cosine_similarity,
+    estimate_tokens,
+)
+from src.vector_store import VectorStoreManager
+from tests.fakes import KeywordEmbeddings, RecordingChatModel
+
+
+class FakeClock:
+    """Manually advanced time source."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestSessionStore:
+    """Test bounded, TTL-evicted session storage."""
+
+    def test_get_or_create_resumes_session(self):
+        """Test a known session ID returns the same session."""
+        store = SessionStore()
+        session = store.get_or_create()
+        assert store.get_or_create(session.session_id) is session
+        assert store.get_or_create("unknown").session_id != session.session_id
+
+    def test_sessions_expire_after_ttl(self):
+        """Test idle sessions are evicted after the TTL."""
+        clock = FakeClock()
+        store = SessionStore(ttl_seconds=60, clock=clock)
+        session = store.create()
+
+        clock.now = 59
+        assert store.get(session.session_id) is session
+        clock.now = 200
+        assert store.get(session.session_id) is None
+        assert len(store) == 0
+
+    def test_least_recently_used_evicted_when_full(self):
+        """Test the store never holds more than max_sessions."""
+        store = SessionStore(max_sessions=2)
+        first, second = store.create(), store.create()
+        store.get(first.session_id)
+        store.create()
+
+        assert len(store) == 2
+        assert store.get(second.session_id) is None
+        assert store.get(first.session_id) is first
+
+
+class TestConversationSession:
+    """Test history capping and question condensation."""
+
+    def test_history_respects_token_cap(self):
+        """Test older turns are summarized to stay under the cap."""
+        session = ConversationSession("s", max_history_tokens=100)
+        for i in range(10):
+            session.add_turn(f"Question {i}?", f"Answer number {i}. " + "detail " * 30, f"q{i}", [])
+
+        assert estimate_tokens(session.history_text()) <= 100
+        assert session.summary
+        assert session.turns[-1].question == "Question 9?"
+
+    def test_condense_follow_up(self):
+        """Test a follow-up is expanded with the previous retrieval query."""
+        session = ConversationSession("s")
+        assert condense_question("What is diabetes?", session) == ("What is diabetes?", False)
+
+        session.add_turn("What is diabetes?", "Diabetes is...", "What is diabetes?", [])
+        query, follow_up = condense_question("What about its treatment?", session)
+        assert follow_up
+        assert query == "What is diabetes? What about its treatment?"
+        assert condense_question("How is lung cancer diagnosed?", session)[1] is False
+
+    def test_cosine_similarity(self):
+        """Test the similarity of parallel, orthogonal and zero vectors."""
+        assert cosine_similarity([1.0, 2.0], [2.0, 4.0]) == pytest.approx(1.0)
+        assert cosine_similarity([1.0, 0.0], [0.0, 3.0]) == 0.0
+        assert cosine_similarity([0.0, 0.0], [1.0, 1.0]) == 0.0
+
+
+class TestChatbotSessions:
+    """Test session-aware answering."""
+
+    @patch('src.chatbot.VectorStoreManager')
+    @patch('src.chatbot.ChatGroq')
+    @patch('src.chatbot.RetrievalQA')
+    def test_follow_up_reuses_retrieval(self, mock_qa, mock_llm, mock_vector):
+        """Test a follow-up skips retrieval and includes the history."""
+        chain = Mock()
+        chain.combine_documents_chain.invoke.return_value = {"output_text": "An answer."}
+        mock_qa.from_chain_type.return_value = chain
+        mock_vector.return_value.similarity_search_by_vector.return_value = [
+            Document(page_content="Diabetes text", metadata={"source": "Diabetes.pdf"})
+        ]
+        mock_vector.return_value.embeddings = KeywordEmbeddings()
+        mock_vector.return_value.mentioned_topics.return_value = []
+
+        chatbot = NCDChatbot()
+        session = ConversationSession("s")
+        first = chatbot.ask("What is diabetes?", session=session)
+        second = chatbot.ask("What about its treatment?", return_sources=True, session=session)
+
+        assert first["session_id"] == "s"
+        assert not first["reused_retrieval"]
+        assert second["reused_retrieval"]
+        assert mock_vector.return_value.similarity_search_by_vector.call_count == 1
+        assert second["sources"][0]["source"] == "Diabetes.pdf"
+
+        prompt_question = chain.combine_documents_chain.invoke.call_args.args[0]["question"]
+        assert "User: What is diabetes?" in prompt_question
+        assert prompt_question.endswith("Follow-up question: What about its treatment?")
+
+    def make_chatbot(self):
+        vs_manager = VectorStoreManager(backend="numpy", embeddings=KeywordEmbeddings())
+        vs_manager.vector_store = NumpyVectorStore.from_documents([
+            Document(page_content="Diabetes raises blood sugar.", metadata={"source": "Diabetes.pdf", "topic": "diabetes"}),
+            Document(page_content="Diabetes is treated with insulin.", metadata={"source": "Diabetes.pdf", "topic": "diabetes"}),
+            Document(page_content="Lung cancer runs in some families.", metadata={"source": "Lung Cancer.pdf", "topic": "lung cancer"}),
+        ], KeywordEmbeddings())
+        chatbot = NCDChatbot(answer_engine="direct", llm=RecordingChatModel(prompts=[]), vs_manager=vs_manager)
+        chatbot.top_k = 2
+        return chatbot
+
+    def test_topic_switch_retrieves_again(self):
+        """Test a pronoun-bearing question about another disease is not answered from the old chunks."""
+        chatbot = self.make_chatbot()
+        session = ConversationSession("s")
+        chatbot.ask("What is diabetes?", session=session)
+
+        same = chatbot.ask("What about its treatment?", return_sources=True, session=session)
+        switched = chatbot.ask("Is lung cancer hereditary? What causes it?", return_sources=True, session=session)
+
+        assert same["reused_retrieval"]
+        assert not switched["reused_retrieval"]
+        assert switched["sources"][0]["source"] == "Lung Cancer.pdf"
+        assert session.last_query == "Is lung cancer hereditary? What causes it?"
+
+    def test_dissimilar_follow_up_uses_condensed_query(self):
+        """Test a follow-up that embeds far from the previous query is retrieved again with it as context."""
+        chatbot = self.make_chatbot()
+        chatbot.follow_up_min_similarity = 0.99
+        session = ConversationSession("s")
+        chatbot.ask("What is diabetes?", session=session)
+
+        follow_up = chatbot.ask("What about its treatment?", return_sources=True, session=session)
+
+        assert not follow_up["reused_retrieval"]
+        assert session.last_query == "What is diabetes? What about its treatment?"
+        assert {source["source"] for source in follow_up["sources"]} == {"Diabetes.pdf"}
@@ -0,0 +1,150 @@
+"""
+Unit tests for versioned index snapshots and hot-swap reload.
+Run with: pytest tests/test_snapshots.py
+"""
+
+import pytest
+from unittest.mock import Mock, patch
+from src import setup
+from src.chatbot import NCDChatbot
+from src.snapshots import SnapshotManager
+from src.vector_store import VectorStoreManager
+from tests.fakes import KeywordEmbeddings
+
+
+class TestSnapshotManager:
+    """Test snapshot versioning and the CURRENT pointer."""
+
+    def test_create_and_activate(self, tmp_path):
+        """Test new snapshots get increasing versions and can be activated."""
+        snapshots = SnapshotManager(str(tmp_path))
+        assert snapshots.current_version() is None
+
+        v1, path1 = snapshots.create_snapshot()
+        (tmp_path / v1 / "marker").write_text("one")
+        snapshots.activate(v1)
+        v2, path2 = snapshots.create_snapshot(base_version=v1)
+
+        assert (v1, v2) == ("v0001", "v0002")
+        assert (tmp_path / v2 / "marker").read_text() == "one"
+        assert snapshots.current_version() == "v0001"
+        assert snapshots.list_versions() == ["v0001", "v0002"]
+
+    def test_rollback(self, tmp_path):
+        """Test rollback re-activates the previous version."""
+        snapshots = SnapshotManager(str(tmp_path))
+        v1, _ = snapshots.create_snapshot()
+        v2, _ = snapshots.create_snapshot()
+        snapshots.activate(v1)
+        snapshots.activate(v2)
+
+        assert snapshots.previous_version() == v1
+        assert snapshots.rollback() == v1
+        assert snapshots.current_version() == v1
+        with pytest.raises(ValueError):
+            snapshots.rollback()
+
+    def test_prune_keeps_active_versions(self, tmp_path):
+        """Test pruning never deletes the current or previous version."""
+        snapshots = SnapshotManager(str(tmp_path))
+        versions = [snapshots.create_snapshot()[0] for _ in range(5)]
+        snapshots.activate(versions[0])
+        snapshots.activate(versions[1])
+
+        removed = snapshots.prune(keep=2)
+        assert removed == ["v0003"]
+        assert snapshots.list_versions() == ["v0001", "v0002", "v0004", "v0005"]
+
+    def test_invalid_version_rejected(self, tmp_path):
+        """Test version names cannot escape the snapshot root."""
+        with pytest.raises(ValueError):
+            SnapshotManager(str(tmp_path)).path_for("../chroma_db")
+
+
+class TestChatbotReload:
+    """Test hot-swapping the chatbot's index."""
+
+    @patch('src.chatbot.VectorStoreManager')
+    @patch('src.chatbot.ChatGroq')
+    @patch('src.chatbot.RetrievalQA')
+    def test_reload_swaps_chain(self, mock_qa, mock_llm, mock_vector, tmp_path, monkeypatch):
+        """Test reload loads the new snapshot and swaps the chain."""
+        snapshots = SnapshotManager(str(tmp_path))
+        v1, _ = snapshots.create_snapshot()
+        v2, path2 = snapshots.create_snapshot()
+        snapshots.activate(v1)
+        monkeypatch.setenv("INDEX_SNAPSHOT_ROOT", str(tmp_path))
+
+        old_chain, new_chain = Mock(), Mock()
+        mock_qa.from_chain_type.side_effect = [old_chain, new_chain]
+
+        chatbot = NCDChatbot()
+        assert chatbot.index_version == v1
+        assert chatbot.qa_chain is old_chain
+
+        assert chatbot.reload(v2) == v2
+        assert chatbot.qa_chain is new_chain
+        assert chatbot.index_version == v2
+        assert mock_vector.call_args.kwargs["persist_directory"] == path2
+
+    @patch('src.chatbot.VectorStoreManager')
+    @patch('src.chatbot.ChatGroq')
+    @patch('src.chatbot.RetrievalQA')
+    def test_reload_closes_old_index_after_requests(self, mock_qa, mock_llm, mock_vector, tmp_path, monkeypatch):
+        """Test the swapped-out index is closed once the requests using it finish."""
+        snapshots = SnapshotManager(str(tmp_path))
+        v1, _ = snapshots.create_snapshot()
+        v2, _ = snapshots.create_snapshot()
+        v3, _ = snapshots.create_snapshot()
+        snapshots.activate(v1)
+        monkeypatch.setenv("INDEX_SNAPSHOT_ROOT", str(tmp_path))
+        mock_vector.side_effect = lambda **kwargs: Mock()
+
+        chatbot = NCDChatbot()
+        first = chatbot.vs_manager
+        with chatbot._use_pipeline() as pipeline:
+            chatbot.reload(v2)
+            assert pipeline[0] is first
+            first.close.assert_not_called()
+        first.close.assert_called_once()
+
+        second = chatbot.vs_manager
+        chatbot.reload(v3)
+        second.close.assert_called_once()
+
+    @patch('src.chatbot.VectorStoreManager')
+    @patch('src.chatbot.ChatGroq')
+    @patch('src.chatbot.RetrievalQA')
+    def test_reload_requires_snapshots(self, mock_qa, mock_llm, mock_vector, monkeypatch):
+        """Test reload is refused when snapshots are not configured."""
+        monkeypatch.delenv("INDEX_SNAPSHOT_ROOT", raising=False)
+        chatbot = NCDChatbot()
+        with pytest.raises(ValueError):
+            chatbot.reload()
+
+
+class TestSetupSnapshot:
+    """Test python -m src.setup --snapshot."""
+
+    @pytest.mark.parametrize("backend", ["chroma", "numpy", "mmap"])
+    @patch('src.vector_store.HuggingFaceEmbeddings')
+    def test_snapshot_matches_backend(self, mock_embeddings, backend, tmp_path, monkeypatch):
+        """Test a snapshot is built in the format the configured backend loads."""
+        mock_embeddings.return_value = KeywordEmbeddings()
+        monkeypatch.setenv("GOOGLE_API_KEY", "test-key")
+        monkeypatch.setenv("VECTOR_BACKEND", backend)
+        monkeypatch.setenv("INDEX_SNAPSHOT_ROOT", str(tmp_path / "snapshots"))
+        (tmp_path / "data").mkdir()
+        (tmp_path / "data" / "Diabetes.txt").write_text("Diabetes affects blood sugar.")
+
+        setup.main(["--snapshot", "--data-dir", str(tmp_path / "data")])
+
+        snapshots = SnapshotManager(str(tmp_path / "snapshots"))
+        vs_manager = VectorStoreManager(
+            persist_directory=snapshots.path_for(snapshots.current_version()),
+            backend=backend,
+            embeddings=KeywordEmbeddings()
+        )
+        vs_manager.load_vector_store()
+        assert vs_manager.get_existing_sources() == ["Diabetes.txt"]
+        vs_manager.close()
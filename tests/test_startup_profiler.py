@@ -0,0 +1,80 @@
+"""
+Unit tests for lazy imports and the startup profiler.
+Run with: pytest tests/test_startup_profiler.py
+"""
+
+import os
+import subprocess
+import sys
+import pytest
+from src.startup_profiler import StartupProfiler, lazy_import
+
+HEAVY_MODULES = [
+    "langchain_classic",
+    "langchain_community",
+    "langchain_groq",
+    "chromadb",
+    "sentence_transformers",
+    "torch",
+]
+
+
+class TestLazyImports:
+    """Test heavy dependencies are deferred to first use."""
+
+    def test_importing_app_skips_heavy_modules(self):
+        """Test importing app.py does not import LangChain, Chroma or torch."""
+        code = (
+            "import sys, app; "
+            f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+            capture_output=True,
+            text=True,
+            check=True
+        )
+        assert result.stdout.strip() == ""
+
+    def test_lazy_import_caches_on_module(self):
+        """Test a lazily imported name is resolved once and cached."""
+        import src.chatbot as chatbot_module
+        value = lazy_import(chatbot_module.__name__, {"JSON": ("json", "dumps")}, "JSON")
+        try:
+            assert chatbot_module.JSON is value
+        finally:
+            del chatbot_module.JSON
+
+    def test_unknown_name_raises_attribute_error(self):
+        """Test unknown attributes still raise AttributeError."""
+        import src.chatbot as chatbot_module
+        with pytest.raises(AttributeError):
+            chatbot_module.DoesNotExist
+
+
+class TestStartupProfiler:
+    """Test the timing report."""
+
+    def test_report_separates_imports_and_stages(self):
+        """Test imports and load stages are reported separately."""
+        profiler = StartupProfiler()
+        with profiler.measure("load embedding model"):
+            pass
+
+        report = profiler.report()
+        assert [r["name"] for r in report["stages"]] == ["load embedding model"]
+        assert report["total_stage_ms"] >= 0
+        assert "Load stages" in profiler.format_report()
+
+    def test_records_are_bounded(self):
+        """Test timings past the limit are counted, not kept."""
+        profiler = StartupProfiler(max_records=2)
+        for i in range(5):
+            with profiler.measure(f"reload {i}"):
+                pass
+
+        report = profiler.report()
+        assert len(profiler) == 2
+        assert [r["name"] for r in report["stages"]] == ["reload 0", "reload 1"]
+        assert report["dropped"] == 3
@@ -0,0 +1,104 @@
+"""
+Unit tests for disease topic routing.
+Run with: pytest tests/test_topics.py
+"""
+
+import numpy as np
+import pytest
+from langchain_core.documents import Document
+from src.numpy_store import NumpyVectorStore, metadata_matches
+from src.topics import TopicRouter, chunk_topics, topic_filter, topic_flag, topic_for_source
+from src.vector_store import VectorStoreManager
+from tests.fakes import KeywordEmbeddings
+
+DOCUMENTS = [
+    Document(page_content="Diabetes affects blood sugar.",
+             metadata={"source": "Diabetes.pdf", "topic": "diabetes"}),
+    Document(page_content="Diabetes and cancer risk.",
+             metadata={"source": "Lung Cancer.pdf", "topic": "lung cancer"}),
+    Document(page_content="Lung cancer is linked to smoking.",
+             metadata={"source": "Lung Cancer.pdf", "topic": "lung cancer"}),
+    Document(page_content="High blood pressure strains the heart.",
+             metadata={"source": "High Blood Pressure.pdf", "topic": "high blood pressure"}),
+]
+
+
+def make_manager(documents=DOCUMENTS):
+    embeddings = KeywordEmbeddings()
+    manager = VectorStoreManager(backend="numpy", embeddings=embeddings)
+    manager.vector_store = NumpyVectorStore.from_documents(documents, embeddings)
+    return manager
+
+
+class TestTopicRouter:
+    """Test questions are mapped to topics only when the topic is clear."""
+
+    def test_topic_for_source(self):
+        """Test topics are normalized from filenames."""
+        assert topic_for_source("High Blood Pressure.pdf") == "high blood pressure"
+        assert topic_for_source("data/Cancer-overview.pdf") == "cancer overview"
+
+    def test_keyword_routing(self):
+        """Test topic names, plurals and synonyms route; vague questions don't."""
+        router = TopicRouter(["diabetes", "heart attacks", "high blood pressure"])
+        assert router.route("What is a heart attack?") == ["heart attacks"]
+        assert router.route("How is hypertension treated?") == ["high blood pressure"]
+        assert router.route("Diabetes and blood pressure") == ["diabetes", "high blood pressure"]
+        assert router.route("What are NCDs?") == []
+
+    def test_centroid_routing(self):
+        """Test the closest topic wins only with a clear margin."""
+        centroids = {"diabetes": np.array([1.0, 0.0]), "lung cancer": np.array([0.0, 1.0])}
+        router = TopicRouter(list(centroids), centroids=centroids, mode="centroid")
+        assert router.route("q", [0.9, 0.1]) == ["diabetes"]
+        assert router.route("q", [1.0, 1.0]) == []
+
+    def test_topic_filter(self):
+        """Test single and multi-topic filters match the right chunks."""
+        assert metadata_matches({"topic": "diabetes"}, topic_filter(["diabetes"]))
+        assert metadata_matches({"topic": "obesity"}, topic_filter(["diabetes", "obesity"]))
+        assert not metadata_matches({"topic": "obesity"}, topic_filter(["diabetes"]))
+        # A deduplicated chunk also belongs to the topics it is flagged with
+        merged = {"topic": "obesity", topic_flag("diabetes"): True}
+        assert metadata_matches(merged, topic_filter(["diabetes"]))
+        assert chunk_topics(merged) == {"obesity", "diabetes"}
+        with pytest.raises(ValueError):
+            metadata_matches({"topic": "obesity"}, {"topic": {"$regex": "o"}})
+
+
+class TestRoutedSearch:
+    """Test filtered retrieval and the global fallback."""
+
+    def test_filtered_search_stays_in_topic(self):
+        """Test a filter excludes better-scoring chunks from other topics."""
+        store = make_manager().vector_store
+        docs = store.similarity_search("diabetes", k=4, filter={"topic": "lung cancer"})
+        assert {doc.metadata["topic"] for doc in docs} == {"lung cancer"}
+        assert len(docs) == 2
+
+    @pytest.mark.parametrize("mode", ["keyword", "centroid"])
+    def test_routed_search(self, mode):
+        """Test a clear question is routed and the results stay in its topic."""
+        manager = make_manager()
+        assert manager.enable_topic_routing(mode)
+
+        docs, topics = manager.routed_search("Tell me about lung cancer", k=4)
+        assert topics == ["lung cancer"]
+        assert all(doc.metadata["topic"] == "lung cancer" for doc in docs)
+
+    def test_falls_back_to_global_search(self):
+        """Test an unclear question searches the whole index."""
+        manager = make_manager()
+        manager.enable_topic_routing("keyword")
+
+        docs, topics = manager.routed_search("What are non-communicable diseases?", k=4)
+        assert topics == []
+        assert len(docs) == 4
+
+    def test_untagged_index_disables_routing(self):
+        """Test indexes built before topic tagging keep global search."""
+        untagged = [Document(page_content=d.page_content, metadata={"source": d.metadata["source"]})
+                    for d in DOCUMENTS]
+        manager = make_manager(untagged)
+        assert not manager.enable_topic_routing("keyword")
+        assert manager.routed_search("lung cancer", k=2)[1] == []
@@ -30,3 +30,102 @@ class TestVectorStoreManager:
         retriever = manager.get_retriever()
         assert retriever is not None
         mock_db.as_retriever.assert_called_once()
+
+
+class TestIndexSettings:
+    """Test HNSW parameters and index stats."""
+    
+    def test_hnsw_params_at_creation_and_load(self, tmp_path):
+        """Test build settings reach the collection and search_ef is applied on load."""
+        from langchain_core.documents import Document
+        from tests.fakes import KeywordEmbeddings
+        
+        documents = [
+            Document(page_content="Diabetes affects blood sugar.", metadata={"source": "Diabetes.pdf", "chunk_id": "c1"}),
+            Document(page_content="Lung cancer is linked to smoking.", metadata={"source": "Lung Cancer.pdf", "chunk_id": "c2"}),
+            Document(page_content="Cancer screening saves lives.", metadata={"source": "Lung Cancer.pdf", "chunk_id": "c3"}),
+        ]
+        manager = VectorStoreManager(
+            persist_directory=str(tmp_path / "chroma"),
+            embeddings=KeywordEmbeddings(),
+            hnsw={"space": "cosine", "M": 8, "construction_ef": 50}
+        )
+        manager.create_vector_store(documents)
+        
+        loaded = VectorStoreManager(
+            persist_directory=str(tmp_path / "chroma"),
+            embeddings=KeywordEmbeddings(),
+            hnsw={"search_ef": 20}
+        )
+        loaded.load_vector_store()
+        stats = loaded.index_stats()
+        
+        assert stats["chunks"] == 3
+        assert stats["sources"] == {"Diabetes.pdf": 1, "Lung Cancer.pdf": 2}
+        assert stats["disk_bytes"] > 0
+        assert stats["index"]["space"] == "cosine"
+        assert stats["index"]["max_neighbors"] == 8
+        assert stats["index"]["ef_construction"] == 50
+        assert stats["index"]["ef_search"] == 20
+        
+        # An unchanged search_ef is not written back on every load
+        from chromadb.api.models.Collection import Collection
+        with patch.object(Collection, "modify") as modify:
+            VectorStoreManager(
+                persist_directory=str(tmp_path / "chroma"),
+                embeddings=KeywordEmbeddings(),
+                hnsw={"search_ef": 20}
+            ).load_vector_store()
+        modify.assert_not_called()
+    
+    def test_hnsw_params_from_env(self, monkeypatch):
+        """Test HNSW_* variables configure the manager and bad values are rejected."""
+        from tests.fakes import KeywordEmbeddings
+        
+        monkeypatch.setenv("HNSW_M", "32")
+        monkeypatch.setenv("HNSW_SEARCH_EF", "64")
+        assert VectorStoreManager(embeddings=KeywordEmbeddings()).hnsw == {"M": 32, "search_ef": 64}
+        
+        with pytest.raises(ValueError):
+            VectorStoreManager(embeddings=KeywordEmbeddings(), hnsw={"space": "manhattan"})
+        with pytest.raises(ValueError):
+            VectorStoreManager(embeddings=KeywordEmbeddings(), hnsw={"ef": 10})
+    
+    def test_memory_estimate_and_close(self, tmp_path):
+        """Test a Chroma index reports its size and close stops its client."""
+        from chromadb.api.shared_system_client import SharedSystemClient
+        from langchain_core.documents import Document
+        from tests.fakes import KeywordEmbeddings
+        
+        manager = VectorStoreManager(persist_directory=str(tmp_path / "chroma"), embeddings=KeywordEmbeddings())
+        manager.create_vector_store([
+            Document(page_content="Diabetes affects blood sugar.", metadata={"source": "Diabetes.pdf"}),
+            Document(page_content="Lung cancer is linked to smoking.", metadata={"source": "Lung Cancer.pdf"}),
+        ])
+        # 2 chunks x (3 dims + 2 x 16 HNSW links) x 4 bytes
+        assert manager.memory_bytes() == 2 * (3 + 32) * 4
+        
+        identifier = manager.vector_store._client._identifier
+        assert identifier in SharedSystemClient._identifier_to_system
+        manager.close()
+        assert manager.vector_store is None
+        assert identifier not in SharedSystemClient._identifier_to_system
+    
+    def test_close_without_chroma_internals(self, tmp_path, monkeypatch):
+        """Test close still releases the manager if Chroma's client map changes."""
+        from chromadb.api.shared_system_client import SharedSystemClient
+        from langchain_core.documents import Document
+        from tests.fakes import KeywordEmbeddings
+        
+        manager = VectorStoreManager(persist_directory=str(tmp_path / "chroma"), embeddings=KeywordEmbeddings())
+        manager.create_vector_store([Document(page_content="Diabetes affects blood sugar.")])
+        systems = SharedSystemClient._identifier_to_system
+        identifier = manager.vector_store._client._identifier
+        
+        monkeypatch.delattr(SharedSystemClient, "_identifier_to_system")
+        manager.close()
+        monkeypatch.undo()
+        
+        assert manager.vector_store is None
+        assert identifier in systems
+        systems.pop(identifier).stop()
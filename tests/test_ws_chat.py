@@ -0,0 +1,243 @@
+"""
+Unit tests for the /ws/chat WebSocket endpoint.
+Run with: pytest tests/test_ws_chat.py
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import Mock, patch
+
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from app import app
+from src.ws_chat import ChatConnection
+
+client = TestClient(app)
+
+
+def fake_stream(question, tokens=3, delay=0.0, gate=None, closed=None):
+    """Events shaped like NCDChatbot.stream."""
+    try:
+        for i in range(tokens):
+            if gate is not None:
+                gate.wait(5)
+            time.sleep(delay)
+            yield {"type": "token", "text": f"{question}-{i} "}
+        yield {"type": "done", "answer": "full answer", "sources": [{"chunk_id": "c1"}], "timings": {}}
+    finally:
+        if closed is not None:
+            closed.set()
+
+
+def receive_until(ws, count_done):
+    """Collect events until count_done questions have finished."""
+    events = []
+    finished = 0
+    while finished < count_done:
+        event = ws.receive_json()
+        events.append(event)
+        if event["type"] in ("done", "error", "cancelled"):
+            finished += 1
+    return events
+
+
+class TestWebSocketChat:
+    """Test multiplexed streaming over one connection."""
+
+    def test_chatbot_loaded_once(self, monkeypatch):
+        """Test questions arriving together on worker threads share one chatbot."""
+        import app as app_module
+
+        created = []
+
+        def slow_chatbot():
+            time.sleep(0.05)
+            created.append(Mock(snapshots=None))
+            return created[-1]
+
+        monkeypatch.setattr(app_module, "chatbot_instance", None)
+        monkeypatch.setattr(app_module, "NCDChatbot", slow_chatbot)
+        with ThreadPoolExecutor(8) as pool:
+            chatbots = list(pool.map(lambda _: app_module.get_chatbot(), range(8)))
+
+        assert len(created) == 1
+        assert all(chatbot is created[0] for chatbot in chatbots)
+
+    @patch('app.get_chatbot')
+    def test_interleaved_questions(self, mock_get_chatbot):
+        """Test two questions stream at once, each tagged with its id."""
+        mock_get_chatbot.return_value.stream.side_effect = (
+            lambda question, session=None, collection=None: fake_stream(question, tokens=4, delay=0.02)
+        )
+        with client.websocket_connect("/ws/chat") as ws:
+            ws.send_json({"type": "ask", "id": "q1", "question": "a"})
+            ws.send_json({"type": "ask", "id": "q2", "question": "b"})
+            events = receive_until(ws, 2)
+
+        for question_id, prefix in (("q1", "a"), ("q2", "b")):
+            own = [e for e in events if e["id"] == question_id]
+            assert [e["type"] for e in own] == ["token"] * 4 + ["sources", "done"]
+            assert all(e["text"].startswith(prefix) for e in own[:4])
+            assert own[-2]["sources"] == [{"chunk_id": "c1"}]
+            assert "sources" not in own[-1]
+        order = [e["id"] for e in events]
+        assert order.index("q2") < len(order) - 1 - order[::-1].index("q1")
+
+    @patch('app.get_chatbot')
+    def test_question_limit_and_cancel(self, mock_get_chatbot, monkeypatch):
+        """Test questions over WS_MAX_QUESTIONS are refused and cancel stops the stream."""
+        monkeypatch.setenv("WS_MAX_QUESTIONS", "1")
+        gate, closed = threading.Event(), threading.Event()
+        mock_get_chatbot.return_value.stream.side_effect = (
+            lambda question, session=None, collection=None: fake_stream(question, gate=gate, closed=closed)
+        )
+        with client.websocket_connect("/ws/chat") as ws:
+            ws.send_json({"type": "ask", "id": 1, "question": "a"})
+            ws.send_json({"type": "ask", "id": 2, "question": "b"})
+            error = ws.receive_json()
+            assert error["type"] == "error" and error["id"] == 2
+            assert "Too many questions" in error["detail"]
+
+            ws.send_json({"type": "cancel", "id": 1})
+            gate.set()
+            events = receive_until(ws, 1)
+            assert events[-1] == {"type": "cancelled", "id": 1}
+        assert closed.wait(1)
+
+    @patch('app.get_chatbot')
+    def test_invalid_messages(self, mock_get_chatbot):
+        """Test malformed messages get error events and the connection stays usable."""
+        mock_get_chatbot.return_value.collections = None
+        mock_get_chatbot.return_value.stream.side_effect = (
+            lambda question, session=None, collection=None: fake_stream(question, tokens=1)
+        )
+        with client.websocket_connect("/ws/chat") as ws:
+            ws.send_text("not json")
+            assert ws.receive_json()["detail"] == "Messages must be JSON objects"
+            ws.send_json({"type": "ask", "question": "a"})
+            assert "needs a string or number 'id'" in ws.receive_json()["detail"]
+            ws.send_json({"type": "ask", "id": "q1", "question": " "})
+            assert ws.receive_json() == {"type": "error", "id": "q1", "detail": "Question cannot be empty"}
+            ws.send_json({"type": "ask", "id": "q2", "question": "a", "collection": "es"})
+            assert ws.receive_json() == {"type": "error", "id": "q2", "detail": "Collections are not enabled"}
+            ws.send_json({"type": "ask", "id": "q3", "question": "a"})
+            assert receive_until(ws, 1)[-1]["type"] == "done"
+
+
+class BlockedSocket:
+    """WebSocket double whose client does not read until released."""
+
+    def __init__(self):
+        self.incoming = asyncio.Queue()
+        self.sent = []
+        self.reading = asyncio.Event()
+        self.close_code = None
+
+    async def receive_json(self):
+        message = await self.incoming.get()
+        if message is None:
+            raise WebSocketDisconnect()
+        return message
+
+    async def send_json(self, event):
+        await self.reading.wait()
+        self.sent.append(event)
+
+    async def close(self, code=1000, reason=None):
+        self.close_code = code
+
+
+class TestFlowControl:
+    """Test a slow reader pauses its own producers."""
+
+    def test_full_queue_pauses_stream(self):
+        """Test the stream is not read ahead of the client by more than the queue size."""
+        pulled = []
+
+        def open_stream(message):
+            def events():
+                for i in range(100):
+                    pulled.append(i)
+                    yield {"type": "token", "text": str(i)}
+                yield {"type": "done", "answer": "", "sources": [], "timings": {}}
+            return events()
+
+        async def scenario():
+            socket = BlockedSocket()
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                connection = ChatConnection(socket, open_stream, executor, send_queue_size=5)
+                task = asyncio.create_task(connection.run())
+                await socket.incoming.put({"type": "ask", "id": "q1", "question": "a"})
+                await asyncio.sleep(0.3)
+                paused_at = len(pulled)
+
+                socket.reading.set()
+                while not socket.sent or socket.sent[-1]["type"] != "done":
+                    await asyncio.sleep(0.01)
+                await socket.incoming.put(None)
+                await task
+            return paused_at, socket.sent
+
+        paused_at, sent = asyncio.run(scenario())
+        # 5 queued, 1 held by the blocked sender, 1 waiting to be queued
+        assert paused_at <= 7
+        assert [e["text"] for e in sent if e["type"] == "token"] == [str(i) for i in range(100)]
+
+    def test_stalled_client_is_disconnected(self):
+        """Test a client that stops reading is closed and its producer frees its thread."""
+        finished = threading.Event()
+
+        def open_stream(message):
+            return fake_stream(message["question"], tokens=1000, closed=finished)
+
+        async def scenario():
+            socket = BlockedSocket()
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                connection = ChatConnection(socket, open_stream, executor, send_queue_size=5, send_timeout=0.3)
+                task = asyncio.create_task(connection.run())
+                await socket.incoming.put({"type": "ask", "id": "q1", "question": "a"})
+                # The client never reads and never disconnects
+                await asyncio.wait_for(task, 5)
+                return socket.close_code, await asyncio.get_running_loop().run_in_executor(None, finished.wait, 5)
+
+        close_code, stream_closed = asyncio.run(scenario())
+        assert close_code == 1008
+        assert stream_closed
+
+    def test_global_in_flight_limit(self):
+        """Test questions beyond the shared in-flight limit are refused, not queued."""
+        gate = threading.Event()
+
+        def open_stream(message):
+            return fake_stream(message["question"], tokens=1, gate=gate)
+
+        async def scenario():
+            socket = BlockedSocket()
+            socket.reading.set()
+            in_flight = threading.BoundedSemaphore(1)
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                connection = ChatConnection(socket, open_stream, executor, in_flight=in_flight)
+                task = asyncio.create_task(connection.run())
+                await socket.incoming.put({"type": "ask", "id": "q1", "question": "a"})
+                await socket.incoming.put({"type": "ask", "id": "q2", "question": "b"})
+                while not socket.sent:
+                    await asyncio.sleep(0.01)
+                refused = socket.sent[0]
+
+                gate.set()
+                while socket.sent[-1]["type"] != "done":
+                    await asyncio.sleep(0.01)
+                await socket.incoming.put({"type": "ask", "id": "q3", "question": "c"})
+                while socket.sent[-1].get("id") != "q3" or socket.sent[-1]["type"] != "done":
+                    await asyncio.sleep(0.01)
+                await socket.incoming.put(None)
+                await task
+            return refused, in_flight
+
+        refused, in_flight = asyncio.run(scenario())
+        assert refused["id"] == "q2" and refused["type"] == "error"
+        assert "too many questions" in refused["detail"]
+        assert in_flight.acquire(blocking=False)